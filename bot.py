@@ -1,28 +1,25 @@
 import os
 import discord
 from discord.ext import commands, tasks
-import aiohttp
 from dotenv import load_dotenv
-from database import init_db_pool, close_db_pool
+from database import (
+    init_db_pool, close_db_pool, prewarm_db_pool, get_pool_controller, get_replicas, revisar_replicas,
+    get_circuit, get_journal, replay_journal,
+)
+from utils import (
+    precargar_practicantes, cargar_estados_asistencia, cargar_politicas, reconciliar_asistencia_dia,
+    materializar_faltas,
+)
+from bot.core.database import get_query_registry, is_connection_error
+from bot.core.backend import BackendClient
+from bot.core.metrics import MetricsSerializer, get_command_metrics
+from bot.config import get_settings, HORA_PRECALENTAMIENTO_POOL, HORA_CIERRE_FALTAS, DIAS_SEMANA_PERMITIDOS, MSG_BD_NO_DISPONIBLE
+from bot.core.cache import get_historial_cache
+from bot.core.utils import dias_laborables, get_reloj, responder_rechazo
+from bot.core.sharding import parse_shard_ids, es_proceso_principal, metricas_shards, identidad_proceso
+from bot.config.logging_config import setup_logging, stop_logging
 import asyncio
 import logging
-import datetime as _datetime
-from zoneinfo import ZoneInfo
-
-
-# Sobrescribir datetime para usar la zona horaria de Lima
-class datetimeLima(_datetime.datetime):
-    @classmethod
-    def now(cls, tz=None):
-        tz = ZoneInfo("America/Lima")
-        return super().now(tz=tz)
-
-    @classmethod
-    def utcnow(cls):
-        tz = ZoneInfo("America/Lima")
-        return super().now(tz=tz)
-
-_datetime.datetime = datetimeLima
 import datetime
 
 # Cargar variables de entorno
@@ -31,24 +28,22 @@ TOKEN = os.getenv('DISCORD_TOKEN')
 BACKEND_API_KEY = os.getenv('BACKEND_API_KEY')
 BACKEND_URL = os.getenv('BACKEND_URL')
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s %(levelname)-8s %(name)s %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S' 
-)
+# Formateo y escritura de logs fuera del event loop
+setup_logging()
+logger = logging.getLogger(__name__)
 
-logging.Formatter.converter = lambda *args: datetime.datetime.now(ZoneInfo("America/Lima")).timetuple()
+reloj = get_reloj()
 
 # Clase para métricas del bot
 class BotMetrics:
     def __init__(self):
-        self.start_time = datetime.datetime.now(datetime.timezone.utc)
+        self.start_time = reloj.ahora()
         self.events_processed_today = 0
         self.last_reset_day = self.start_time.day
 
     def increment_event_count(self):
         """Incrementa el contador de eventos y lo resetea si es un nuevo día."""
-        now = datetime.datetime.now(datetime.timezone.utc)
+        now = reloj.ahora()
         if now.day != self.last_reset_day:
             self.events_processed_today = 0
             self.last_reset_day = now.day
@@ -56,7 +51,7 @@ class BotMetrics:
 
     def get_uptime(self):
         """Calcula el tiempo de actividad del bot."""
-        return datetime.datetime.now(datetime.timezone.utc) - self.start_time
+        return reloj.ahora() - self.start_time
 
 metrics = BotMetrics()
 
@@ -65,36 +60,65 @@ intents.messages = True
 intents.message_content = True
 intents.members = True
 
-bot = commands.Bot(command_prefix='/', intents=intents)
+# Con DISCORD_SHARDED el proceso atiende DISCORD_SHARD_IDS (todos si está vacío); launcher.py
+# reparte los rangos entre varios procesos. Solo el que tiene el shard 0 corre las tareas globales
+settings = get_settings()
+shard_ids = parse_shard_ids(settings.DISCORD_SHARD_IDS)
+proceso_principal = es_proceso_principal(shard_ids)
+if settings.DISCORD_SHARDED:
+    bot = commands.AutoShardedBot(
+        command_prefix='/',
+        intents=intents,
+        shard_count=settings.DISCORD_SHARD_COUNT or None,
+        shard_ids=shard_ids,
+    )
+else:
+    bot = commands.Bot(command_prefix='/', intents=intents)
 
-# Diccionario de canales permitidos por servidor
-bot.canales_permitidos = {
-    1389959112556679239: [1390353417079361607, 1390013888791183370, 1395093712832565339, 1400200650402431007, 1404466917002969128, 1412152264969162969, 1415770590975102986], # Servidor RP Soft
-    1405602519635202048: [1406544076534190110] # Servidor Laboratorios
-}
+# Canales habilitados y roles de recuperación: tabla Politica_Servidor (ver recargar_politicas).
+# Los checks de los comandos rechazan antes del callback; aquí se responde al usuario
+@bot.tree.error
+async def on_app_command_error(interaction: discord.Interaction, error: discord.app_commands.AppCommandError):
+    if await responder_rechazo(interaction, error):
+        return
+    comando = interaction.command.qualified_name if interaction.command else "desconocido"
+    if is_connection_error(getattr(error, "original", error)):
+        # Base de datos caída (o circuito abierto): respuesta inmediata en vez de dejar la interacción colgada
+        logger.warning("Comando '%s' sin base de datos: %s", comando, error)
+        try:
+            if interaction.response.is_done():
+                await interaction.followup.send(MSG_BD_NO_DISPONIBLE, ephemeral=True)
+            else:
+                await interaction.response.send_message(MSG_BD_NO_DISPONIBLE, ephemeral=True)
+        except discord.HTTPException:
+            pass
+        return
+    logger.error("Error en el comando '%s': %s", comando, error, exc_info=error)
 
-# Diccionario de roles permitidos para recuperación por servidor
-# Agregar aquí los IDs de los roles que pueden usar el comando de recuperación
-bot.roles_recuperacion = {
-    1389959112556679239: [], # Servidor RP Soft - lista vacía significa que todos los practicantes pueden usar
-    1405602519635202048: []  # Servidor Laboratorios - lista vacía significa que todos los practicantes pueden usar
-    # Ejemplo con roles: 1389959112556679239: [123456789012345678, 987654321098765432]
-}
+# Cliente del backend con sesión HTTP persistente, reintentos y bandeja de salida
+backend = BackendClient(
+    BACKEND_URL,
+    BACKEND_API_KEY,
+    timeout=settings.BACKEND_TIMEOUT,
+    max_connections=settings.BACKEND_MAX_CONNECTIONS,
+    max_retries=settings.BACKEND_MAX_RETRIES,
+    outbox_size=settings.BACKEND_OUTBOX_SIZE,
+)
+
+# Serializador de métricas: solo envía los servidores que cambiaron desde el último envío
+metrics_serializer = MetricsSerializer(
+    full_every=settings.METRICS_FULL_SNAPSHOT_EVERY,
+    gzip_threshold=settings.METRICS_GZIP_THRESHOLD,
+)
 
 # Función para actualizar el estado del bot en el backend
 async def update_bot_status(status: str):
     """Envía una actualización de estado al backend."""
-    headers = {"Authorization": f"Bearer {BACKEND_API_KEY}"}
     payload = {"status": status}
-    async with aiohttp.ClientSession(headers=headers) as session:
-        try:
-            async with session.post(f"{BACKEND_URL}/status/", json=payload) as response:
-                if response.status == 200:
-                    logging.info(f"Estado del bot actualizado a '{status}' en el backend.")
-                else:
-                    logging.error(f"Error al actualizar el estado del bot: {response.status}")
-        except aiohttp.ClientConnectorError as e:
-            logging.error(f"No se pudo conectar al backend para actualizar estado: {e}")
+    if await backend.send("/status/", json=payload, key="status"):
+        logger.info("Estado del bot actualizado a '%s' en el backend.", status)
+    else:
+        logger.error("No se pudo actualizar el estado del bot a '%s'; quedó pendiente de reenvío.", status)
 
 # Eventos para Contar Métricas
 @bot.event
@@ -114,9 +138,12 @@ async def send_metrics_to_backend():
     await bot.wait_until_ready()
     
     uptime_delta = metrics.get_uptime()
-    now_lima = datetime.datetime.now()
+    now_lima = reloj.ahora()
 
-    payload = {
+    # Cada proceso de launcher.py reporta solo sus shards; el backend agrega por proceso.clave
+    proceso = identidad_proceso(shard_ids, bot.shard_count)
+    base = {
+        "proceso": proceso,
         "resumen": {
             "servidores_conectados": len(bot.guilds),
             "eventos_procesados_hoy": metrics.events_processed_today,
@@ -129,69 +156,194 @@ async def send_metrics_to_backend():
             "latencia_ms": round(bot.latency * 1000, 2),
             "ultima_conexion": now_lima.isoformat()
         },
-        "servers": [
-            {
-                "server_id": guild.id,
-                "server_name": guild.name,
-                "miembros": guild.member_count,
-                "canales": len(guild.channels),
-                "status": "conectado"
-            } for guild in bot.guilds
-        ]
+        "consultas": get_query_registry().snapshot(),
+        "pool_db": get_pool_controller().snapshot(),
+        "replicas_db": get_replicas().snapshot() if get_replicas() else None,
+        "circuito_db": {**get_circuit().snapshot(), "diario_pendientes": get_journal().pending},
+        "comandos": get_command_metrics().snapshot(),
+        "shards": metricas_shards(bot)
     }
-
-    headers = {
-        "Authorization": f"Bearer {BACKEND_API_KEY}",
-        "Content-Type": "application/json"
+    servers = {
+        guild.id: {
+            "server_id": guild.id,
+            "server_name": guild.name,
+            "miembros": guild.member_count,
+            "canales": len(guild.channels),
+            "status": "conectado",
+            "shard_id": guild.shard_id
+        } for guild in bot.guilds
     }
 
-    async with aiohttp.ClientSession(headers=headers) as session:
-        try:
-            async with session.post(f"{BACKEND_URL}/metrics/", json=payload) as response:
-                if response.status == 200:
-                    logging.info("Métricas enviadas exitosamente al backend.")
-                else:
-                    logging.error(f"Error al enviar métricas: {response.status} - {await response.text()}")
-        except aiohttp.ClientConnectorError as e:
-            logging.error(f"No se pudo conectar al backend para enviar métricas: {e}")
-        except Exception as e:
-            logging.error(f"Ocurrió un error inesperado al enviar métricas: {e}")
+    # Si el backend no responde, el payload queda en la bandeja de salida y
+    # el siguiente lo reemplaza; tras un fallo el siguiente es un snapshot completo
+    try:
+        # El desglose por servidor crece con los servidores: solo va en los snapshots completos
+        batch = metrics_serializer.prepare(base, servers, solo_completo=lambda: {
+            "comandos_por_servidor": get_command_metrics().snapshot_por_servidor()
+        })
+        if await backend.send("/metrics/", data=batch.body, headers=batch.headers, key=f"metrics:{proceso['clave']}"):
+            metrics_serializer.confirm(batch)
+            logger.info(
+                "Métricas enviadas exitosamente al backend (%s, %s servidores).",
+                batch.payload['tipo'], len(batch.payload['servers'])
+            )
+        else:
+            metrics_serializer.reset()
+            logger.error("No se pudieron enviar las métricas; pendientes en bandeja de salida: %s", len(backend.outbox))
+    except Exception as e:
+        metrics_serializer.reset()
+        logger.error("Ocurrió un error inesperado al enviar métricas: %s", e)
+
+# Tarea Periódica para refrescar el catálogo de estados de asistencia
+@tasks.loop(minutes=30)
+async def refrescar_catalogos():
+    try:
+        catalogo = await cargar_estados_asistencia()
+        logger.info("Catálogo de estados de asistencia cargado (%s estados).", len(catalogo))
+    except Exception as e:
+        logger.error("No se pudo refrescar el catálogo de estados: %s", e)
+
+# Recargar las políticas por servidor si la tabla cambió (sin reiniciar el bot)
+@tasks.loop(seconds=settings.POLITICAS_RECARGA_S)
+async def recargar_politicas():
+    try:
+        politicas = await cargar_politicas()
+        if politicas is not None:
+            logger.info("Políticas por servidor recargadas.")
+    except Exception as e:
+        logger.error("No se pudieron recargar las políticas por servidor: %s", e)
+
+# Pre-calentar el pool de conexiones antes de la hora punta de entrada
+@tasks.loop(time=HORA_PRECALENTAMIENTO_POOL.replace(tzinfo=settings.TIMEZONE))
+async def precalentar_pool():
+    if reloj.ahora().weekday() not in DIAS_SEMANA_PERMITIDOS:
+        return
+    try:
+        tamano = await prewarm_db_pool()
+        logger.info("Pool de conexiones pre-calentado (%s conexiones abiertas).", tamano)
+    except Exception as e:
+        logger.error("No se pudo pre-calentar el pool de conexiones: %s", e)
+
+# Reconciliar la instantánea de asistencia del día con MySQL (escrituras hechas fuera del bot,
+# o de otros procesos de launcher.py, como las faltas que registra el principal)
+@tasks.loop(minutes=settings.ttl_cache(settings.ASISTENCIA_DIA_RECONCILIACION_MIN * 60) / 60)
+async def reconciliar_asistencia():
+    try:
+        diferencias = await reconciliar_asistencia_dia()
+        if diferencias:
+            logger.warning("Asistencia del día reconciliada: %s registros diferían de la base de datos.", diferencias)
+    except Exception as e:
+        logger.error("No se pudo reconciliar la asistencia del día: %s", e)
+
+# Registrar faltas injustificadas al cierre de la jornada.
+# Revisa también los días anteriores (FALTAS_BACKFILL_DIAS) para cubrir caídas del bot
+async def registrar_faltas(hasta: datetime.date):
+    fechas = dias_laborables(hasta - datetime.timedelta(days=settings.FALTAS_BACKFILL_DIAS), hasta)
+    try:
+        insertadas = await materializar_faltas(fechas)
+        logger.info("Faltas injustificadas registradas: %s (días revisados: %s).", insertadas, len(fechas))
+    except Exception as e:
+        logger.error("No se pudieron registrar las faltas injustificadas: %s", e)
+
+@tasks.loop(time=HORA_CIERRE_FALTAS.replace(tzinfo=settings.TIMEZONE))
+async def cierre_faltas():
+    await registrar_faltas(reloj.hoy())
+
+# Ajuste adaptativo del tamaño del pool según la espera medida por conexión
+@tasks.loop(seconds=30)
+async def ajustar_pool():
+    get_pool_controller().adjust()
+
+# Medir el retraso de las réplicas de lectura; las atrasadas o caídas se dejan de usar
+@tasks.loop(seconds=settings.DB_REPLICA_CHECK_S)
+async def vigilar_replicas():
+    try:
+        await revisar_replicas()
+    except Exception as e:
+        logger.error("No se pudo revisar las réplicas de lectura: %s", e)
+
+# Aplicar las escrituras guardadas en el diario local mientras la base de datos no estaba disponible
+@tasks.loop(seconds=settings.DB_JOURNAL_REPLAY_S)
+async def aplicar_diario():
+    if not get_journal().pending:
+        return
+    try:
+        aplicadas = await replay_journal()
+    except Exception as e:
+        logger.warning(
+            "Diario de escrituras pendiente (%s registros); la base de datos sigue sin responder: %s",
+            get_journal().pending, e
+        )
+        return
+    if aplicadas:
+        # Los historiales y la instantánea del día pudieron leerse sin estas escrituras
+        get_historial_cache().invalidate()
+        await reconciliar_asistencia()
 
 # Evento de inicio del bot
 @bot.event
 async def setup_hook():
-    logging.info('Iniciando conexión a la base de datos...')
+    logger.info('Iniciando conexión a la base de datos...')
     await init_db_pool()
-    logging.info('Conexión a la base de datos establecida.')
-    logging.info('Sincronizando comandos...')
+    logger.info('Conexión a la base de datos establecida.')
+    try:
+        total = await precargar_practicantes()
+        logger.info('Caché de practicantes precargada con %s registros.', total)
+    except Exception as e:
+        logger.error('No se pudo precargar la caché de practicantes: %s', e)
+    await refrescar_catalogos()
+    await recargar_politicas()
+    if proceso_principal:
+        # Recuperar faltas de días en que el bot no estuvo activo al cierre (hoy lo cubre cierre_faltas)
+        await registrar_faltas(reloj.hoy() - datetime.timedelta(days=1))
+    logger.info('Sincronizando comandos...')
     await bot.load_extension('cogs.asistencia')
     await bot.load_extension('cogs.faltas')
     await bot.load_extension('cogs.recuperacion')
-    await bot.tree.sync()
-    logging.info('Comandos sincronizados.')
-    logging.info('Iniciando tarea de envío de métricas...')
+    await bot.load_extension('cogs.admin')
+    if proceso_principal:
+        await bot.tree.sync()
+        logger.info('Comandos sincronizados.')
+    logger.info('Iniciando tarea de envío de métricas...')
+    await backend.start()
     send_metrics_to_backend.start()
-    logging.info(f'Bot conectado como {bot.user}')
+    refrescar_catalogos.start()
+    recargar_politicas.start()
+    precalentar_pool.start()
+    ajustar_pool.start()
+    if get_replicas() is not None:
+        vigilar_replicas.start()
+    reconciliar_asistencia.start()
+    aplicar_diario.start()
+    if proceso_principal:
+        cierre_faltas.start()
+    logger.info('Bot conectado como %s (shards: %s).', bot.user, settings.DISCORD_SHARD_IDS or "todos")
 
 # Manejo de errores globales
 async def main():
     if not all([TOKEN, BACKEND_API_KEY, BACKEND_URL]):
-        logging.error("Faltan variables de entorno necesarias. Asegúrate de que DISCORD_TOKEN, BACKEND_API_KEY y BACKEND_URL estén configuradas.")
+        logger.error("Faltan variables de entorno necesarias. Asegúrate de que DISCORD_TOKEN, BACKEND_API_KEY y BACKEND_URL estén configuradas.")
         return
 
     try:
         await bot.start(TOKEN)
     except (KeyboardInterrupt, asyncio.CancelledError):
-        logging.info("Bot detenido manualmente.")
+        logger.info("Bot detenido manualmente.")
     finally:
-        logging.info("Bot apagándose...")
+        logger.info("Bot apagándose...")
         if send_metrics_to_backend.is_running():
             send_metrics_to_backend.cancel()
-        await update_bot_status("offline")
+        for tarea in (refrescar_catalogos, recargar_politicas, precalentar_pool, ajustar_pool, vigilar_replicas, reconciliar_asistencia, aplicar_diario, cierre_faltas):
+            if tarea.is_running():
+                tarea.cancel()
+        if proceso_principal:
+            await update_bot_status("offline")
+        await backend.close()
         await asyncio.sleep(1)
         await close_db_pool()
-        logging.info("Conexión a la base de datos cerrada.")
+        logger.info("Conexión a la base de datos cerrada.")
         await bot.close()
+        stop_logging()
 
 if __name__ == "__main__":
     asyncio.run(main())
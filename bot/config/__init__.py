@@ -8,11 +8,22 @@ from .constants import (
     HORARIO_RECUPERACION_INICIO,
     HORARIO_RECUPERACION_FIN,
     HORA_LIMITE_TARDANZA,
+    HORA_PRECALENTAMIENTO_POOL,
+    HORA_CIERRE_FALTAS,
     DIAS_SEMANA_PERMITIDOS,
     DIAS_HISTORIAL_MIN,
     DIAS_HISTORIAL_MAX,
     DIAS_HISTORIAL_RECUPERACION_MIN,
     DIAS_HISTORIAL_RECUPERACION_MAX,
+    HISTORIAL_FILAS_POR_PAGINA,
+    REPORTE_FILAS_POR_LOTE,
+    REPORTE_ADJUNTOS_POR_MENSAJE,
+    PLAZO_RESPUESTA_INTERACCION_S,
+    RETRASO_ENTREGA_MAX_S,
+    MSG_CANAL_NO_PERMITIDO,
+    MSG_SIN_PERMISOS,
+    MSG_REGISTRO_PENDIENTE,
+    MSG_BD_NO_DISPONIBLE,
 )
 
 __all__ = [
@@ -24,11 +35,22 @@ __all__ = [
     "HORARIO_RECUPERACION_INICIO",
     "HORARIO_RECUPERACION_FIN",
     "HORA_LIMITE_TARDANZA",
+    "HORA_PRECALENTAMIENTO_POOL",
+    "HORA_CIERRE_FALTAS",
     "DIAS_SEMANA_PERMITIDOS",
     "DIAS_HISTORIAL_MIN",
     "DIAS_HISTORIAL_MAX",
     "DIAS_HISTORIAL_RECUPERACION_MIN",
     "DIAS_HISTORIAL_RECUPERACION_MAX",
+    "HISTORIAL_FILAS_POR_PAGINA",
+    "REPORTE_FILAS_POR_LOTE",
+    "REPORTE_ADJUNTOS_POR_MENSAJE",
+    "PLAZO_RESPUESTA_INTERACCION_S",
+    "RETRASO_ENTREGA_MAX_S",
+    "MSG_CANAL_NO_PERMITIDO",
+    "MSG_SIN_PERMISOS",
+    "MSG_REGISTRO_PENDIENTE",
+    "MSG_BD_NO_DISPONIBLE",
 ]
 
 
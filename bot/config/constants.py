@@ -12,20 +12,39 @@ HORARIO_ENTRADA_FIN = time(14, 0)        # 2:00 PM
 HORA_LIMITE_TARDANZA = time(8, 10, 59)   # 8:10:59 AM
 HORARIO_SALIDA_MINIMA = time(14, 0)      # 2:00 PM
 
+# Pre-calentamiento del pool de conexiones antes de la hora punta de entrada
+HORA_PRECALENTAMIENTO_POOL = time(7, 45)  # 7:45 AM
+
 # Horarios de recuperación
 HORARIO_RECUPERACION_INICIO = time(14, 30)  # 2:30 PM
 HORARIO_RECUPERACION_FIN = time(20, 0)      # 8:00 PM
 
+# Cierre de la jornada: se registran las faltas injustificadas del día
+HORA_CIERRE_FALTAS = time(20, 30)           # 8:30 PM
+
 # Días de la semana (0=Lunes, 6=Domingo)
 # Solo permitir lunes a viernes (0-4)
 DIAS_SEMANA_PERMITIDOS: Set[int] = {0, 1, 2, 3, 4}
 
-# Límites de historial
+# Límites de historial (paginado, ver HISTORIAL_FILAS_POR_PAGINA)
 DIAS_HISTORIAL_MIN = 1
-DIAS_HISTORIAL_MAX = 15
+DIAS_HISTORIAL_MAX = 60
 
 DIAS_HISTORIAL_RECUPERACION_MIN = 1
-DIAS_HISTORIAL_RECUPERACION_MAX = 30
+DIAS_HISTORIAL_RECUPERACION_MAX = 90
+
+# Filas por página en los historiales (un embed admite hasta 25 campos)
+HISTORIAL_FILAS_POR_PAGINA = 10
+
+# Reporte de asistencia: filas leídas por viaje al servidor y adjuntos por mensaje
+REPORTE_FILAS_POR_LOTE = 1000
+REPORTE_ADJUNTOS_POR_MENSAJE = 10  # máximo de Discord
+
+# Segundos que da Discord para la primera respuesta (o defer) a una interacción
+PLAZO_RESPUESTA_INTERACCION_S = 3.0
+# Retraso de entrega máximo que se descuenta según el snowflake: más que eso indica
+# que el reloj local va adelantado respecto al de Discord
+RETRASO_ENTREGA_MAX_S = 1.0
 
 # Límites de caracteres
 MAX_LENGTH_MOTIVO = 255
@@ -33,7 +52,13 @@ MAX_LENGTH_NOMBRE = 100
 
 # Mensajes comunes
 MSG_CANAL_NO_PERMITIDO = "Este comando no está habilitado en este canal."
+MSG_SIN_PERMISOS = "No tienes los permisos necesarios para usar este comando."
 MSG_NO_REGISTRADO = "no estás registrado como practicante."
 MSG_CONTACTO_ADMIN = "Si tienes dudas, contacta con el administrador."
+MSG_REGISTRO_PENDIENTE = (
+    "⏳ La base de datos no está disponible en este momento: tu registro quedó guardado "
+    "y se aplicará automáticamente en cuanto vuelva."
+)
+MSG_BD_NO_DISPONIBLE = "La base de datos no está disponible en este momento. Inténtalo de nuevo en unos minutos."
 
 
@@ -1,23 +1,56 @@
 """
 Configuración de logging para el bot
+
+Los registros se encolan en el event loop (``QueueHandler``) y un hilo
+aparte (``QueueListener``) los formatea y escribe. Opcionalmente se emiten
+como líneas JSON con el servidor, comando y usuario de la interacción, y
+los INFO de loggers ruidosos se pueden muestrear.
 """
 
+import copy
+import json
 import logging
+import queue
 import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
-from zoneinfo import ZoneInfo
-from typing import Any
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Iterator, Optional
 
 from .settings import Settings
 
+# Campos de la interacción en curso que se agregan a cada registro
+CAMPOS_CONTEXTO = ("guild_id", "comando", "usuario_id")
+
+_contexto_log: ContextVar[Optional[Dict[str, Any]]] = ContextVar("contexto_log", default=None)
+
+# Listener activo (uno por proceso)
+_listener: Optional[QueueListener] = None
+
+
+@contextmanager
+def contexto_log(**campos: Any) -> Iterator[None]:
+    """Asocia campos (guild_id, comando, usuario_id) a los registros emitidos dentro del bloque"""
+    token = _contexto_log.set(campos)
+    try:
+        yield
+    finally:
+        _contexto_log.reset(token)
+
+
+def contexto_actual() -> Dict[str, Any]:
+    """Campos de contexto de la interacción en curso (vacío fuera de un comando)"""
+    return _contexto_log.get() or {}
+
 
 class LimaFormatter(logging.Formatter):
     """Formatter que usa la zona horaria de Lima"""
-    
+
     def __init__(self, *args: Any, **kwargs: Any):
         super().__init__(*args, **kwargs)
         self.tz = Settings.TIMEZONE
-    
+
     def formatTime(self, record: logging.LogRecord, datefmt: str = None) -> str:
         """Formatea el tiempo usando la zona horaria de Lima"""
         dt = datetime.fromtimestamp(record.created, tz=self.tz)
@@ -28,29 +61,151 @@ class LimaFormatter(logging.Formatter):
         return s
 
 
-def setup_logging(level: str = None) -> None:
-    """Configura el sistema de logging del bot"""
+class JsonFormatter(LimaFormatter):
+    """Un objeto JSON por línea, con los campos de contexto de la interacción"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        datos = {
+            "ts": self.formatTime(record, self.datefmt),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensaje": record.getMessage(),
+        }
+        for campo in CAMPOS_CONTEXTO:
+            valor = getattr(record, campo, None)
+            if valor is not None:
+                datos[campo] = valor
+        if record.exc_info:
+            datos["excepcion"] = self.formatException(record.exc_info)
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class MuestreoFilter(logging.Filter):
+    """
+    Deja pasar solo una fracción de los registros INFO (o menores) por logger
+
+    ``tasas`` asocia un prefijo de logger (p. ej. ``cogs.asistencia``) a la
+    fracción que se conserva; el prefijo más largo gana. WARNING y superiores
+    pasan siempre. El muestreo es determinista: con 0.25 pasa 1 de cada 4.
+    """
+
+    def __init__(self, tasas: Dict[str, float]):
+        super().__init__()
+        self.tasas = tasas
+        self._tasa_por_logger: Dict[str, Optional[float]] = {}
+        self._acumulado: Dict[str, float] = {}
+        self.descartados = 0
+
+    def _tasa(self, nombre: str) -> Optional[float]:
+        if nombre not in self._tasa_por_logger:
+            prefijos = [p for p in self.tasas if nombre == p or nombre.startswith(p + ".")]
+            self._tasa_por_logger[nombre] = self.tasas[max(prefijos, key=len)] if prefijos else None
+        return self._tasa_por_logger[nombre]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        tasa = self._tasa(record.name)
+        if tasa is None or tasa >= 1:
+            return True
+        # El primero de cada logger pasa (salvo tasa 0), luego uno cada 1/tasa
+        acumulado = self._acumulado.get(record.name, 1.0 - tasa) + tasa
+        if tasa > 0 and acumulado >= 1:
+            self._acumulado[record.name] = acumulado - 1
+            return True
+        self._acumulado[record.name] = acumulado
+        self.descartados += 1
+        return False
+
+
+class ContextoQueueHandler(QueueHandler):
+    """
+    Encola el registro sin formatearlo
+
+    El ``QueueHandler`` estándar formatea el mensaje antes de encolar, es
+    decir, en el event loop. Aquí solo se copian los campos de contexto (que
+    viven en el contexto de la tarea) y el formateo queda para el listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        contexto = _contexto_log.get()
+        if contexto:
+            for campo in CAMPOS_CONTEXTO:
+                if campo in contexto:
+                    setattr(record, campo, contexto[campo])
+        return record
+
+
+def parse_muestreo(valor: str) -> Dict[str, float]:
+    """Convierte ``"cogs.asistencia=0.2,cogs.faltas=0.5"`` en un diccionario de tasas"""
+    tasas: Dict[str, float] = {}
+    for parte in valor.split(","):
+        if "=" not in parte:
+            continue
+        nombre, tasa = parte.split("=", 1)
+        tasas[nombre.strip()] = min(1.0, max(0.0, float(tasa)))
+    return tasas
+
+
+def setup_logging(level: str = None, formato: str = None, muestreo: str = None) -> QueueListener:
+    """
+    Configura el sistema de logging del bot
+
+    Args:
+        level: Nivel del logger raíz (por defecto LOG_LEVEL)
+        formato: "texto" o "json" (por defecto LOG_FORMAT)
+        muestreo: Tasas por logger, "logger=fraccion,..." (por defecto LOG_SAMPLING)
+
+    Returns:
+        El listener en marcha; se detiene con ``stop_logging`` al apagar
+    """
+    global _listener
     settings = Settings()
-    log_level = level or settings.LOG_LEVEL
-    
+    log_level = getattr(logging, (level or settings.LOG_LEVEL).upper(), logging.INFO)
+    formato = (formato or settings.LOG_FORMAT).lower()
+    muestreo = settings.LOG_SAMPLING if muestreo is None else muestreo
+
     # Configurar formato
-    formatter = LimaFormatter(
-        fmt='%(asctime)s %(levelname)-8s %(name)s %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    # Handler para consola
+    if formato == "json":
+        formatter = JsonFormatter(datefmt='%Y-%m-%dT%H:%M:%S%z')
+    else:
+        formatter = LimaFormatter(
+            fmt='%(asctime)s %(levelname)-8s %(name)s %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+
+    # Handler para consola (corre en el hilo del listener)
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
-    console_handler.setLevel(getattr(logging, log_level.upper(), logging.INFO))
-    
+    console_handler.setLevel(log_level)
+
+    stop_logging()
+    cola: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = ContextoQueueHandler(cola)
+    tasas = parse_muestreo(muestreo)
+    if tasas:
+        queue_handler.addFilter(MuestreoFilter(tasas))
+
     # Configurar logger raíz
     root_logger = logging.getLogger()
-    root_logger.setLevel(getattr(logging, log_level.upper(), logging.INFO))
-    root_logger.addHandler(console_handler)
-    
+    root_logger.setLevel(log_level)
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(queue_handler)
+
     # Silenciar loggers de librerías externas si es necesario
     logging.getLogger("discord").setLevel(logging.WARNING)
     logging.getLogger("aiomysql").setLevel(logging.WARNING)
 
+    _listener = QueueListener(cola, console_handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
 
+def stop_logging() -> None:
+    """Detiene el listener, escribiendo antes los registros pendientes"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -27,10 +27,22 @@ class Settings:
     # Backend API
     BACKEND_API_KEY: str = os.getenv("BACKEND_API_KEY", "")
     BACKEND_URL: str = os.getenv("BACKEND_URL", "")
+    BACKEND_TIMEOUT: float = float(os.getenv("BACKEND_TIMEOUT", "10"))
+    BACKEND_MAX_CONNECTIONS: int = int(os.getenv("BACKEND_MAX_CONNECTIONS", "4"))
+    BACKEND_MAX_RETRIES: int = int(os.getenv("BACKEND_MAX_RETRIES", "3"))
+    BACKEND_OUTBOX_SIZE: int = int(os.getenv("BACKEND_OUTBOX_SIZE", "100"))
+    
+    # Métricas: snapshot completo cada N envíos y compresión gzip sobre este tamaño (bytes)
+    METRICS_FULL_SNAPSHOT_EVERY: int = int(os.getenv("METRICS_FULL_SNAPSHOT_EVERY", "30"))
+    METRICS_GZIP_THRESHOLD: int = int(os.getenv("METRICS_GZIP_THRESHOLD", "4096"))
     
     # Zona horaria
     TIMEZONE: ZoneInfo = ZoneInfo("America/Lima")
     
+    # Canales habilitados y roles de recuperación: se leen de la tabla Politica_Servidor
+    # (scripts/sql/politica_servidor.sql); estos valores solo se usan mientras esté vacía
+    POLITICAS_RECARGA_S: float = float(os.getenv("POLITICAS_RECARGA_S", "60"))
+    
     # Configuración de servidores (canales permitidos)
     CANALES_PERMITIDOS: Dict[int, List[int]] = {
         1389959112556679239: [
@@ -51,12 +63,80 @@ class Settings:
         1405602519635202048: [],  # Todos pueden usar
     }
     
+    # Sharding (ver launcher.py): AutoShardedBot, total de shards (0 = el que recomiende
+    # Discord) y shards que atiende este proceso ("0-3" o "0,2"; vacío = todos)
+    DISCORD_SHARDED: bool = os.getenv("DISCORD_SHARDED", "false").lower() in ("1", "true", "yes")
+    DISCORD_SHARD_COUNT: int = int(os.getenv("DISCORD_SHARD_COUNT", "0"))
+    DISCORD_SHARD_IDS: str = os.getenv("DISCORD_SHARD_IDS", "")
+    
     # Pool de conexiones
-    DB_POOL_MINSIZE: int = 1
-    DB_POOL_MAXSIZE: int = 10
+    DB_POOL_MINSIZE: int = int(os.getenv("DB_POOL_MINSIZE", "1"))
+    DB_POOL_MAXSIZE: int = int(os.getenv("DB_POOL_MAXSIZE", "10"))
+    # Conexiones abiertas por adelantado antes de la ventana de entrada
+    DB_POOL_WARM_SIZE: int = int(os.getenv("DB_POOL_WARM_SIZE", "10"))
+    # Segundos máximos esperando una conexión libre
+    DB_ACQUIRE_TIMEOUT: float = float(os.getenv("DB_ACQUIRE_TIMEOUT", "2"))
+    # Ajuste adaptativo del tamaño del pool según la espera medida
+    DB_POOL_ADAPTIVE: bool = os.getenv("DB_POOL_ADAPTIVE", "true").lower() in ("1", "true", "yes")
+    DB_POOL_MAX_LIMIT: int = int(os.getenv("DB_POOL_MAX_LIMIT", "30"))
+    DB_POOL_GROW_WAIT_MS: float = float(os.getenv("DB_POOL_GROW_WAIT_MS", "50"))
+    DB_POOL_SHRINK_WAIT_MS: float = float(os.getenv("DB_POOL_SHRINK_WAIT_MS", "5"))
+    
+    # Réplicas de lectura: "host[:puerto],..." con el mismo usuario y base que el primario.
+    # Vacío = todas las consultas van al primario
+    DB_REPLICA_HOSTS: str = os.getenv("DB_REPLICA_HOSTS", "")
+    DB_REPLICA_POOL_MAXSIZE: int = int(os.getenv("DB_REPLICA_POOL_MAXSIZE", "10"))
+    # Retraso de replicación máximo (segundos) para seguir leyendo de una réplica
+    DB_REPLICA_MAX_LAG_S: float = float(os.getenv("DB_REPLICA_MAX_LAG_S", "2"))
+    # Cada cuántos segundos se mide el retraso de las réplicas
+    DB_REPLICA_CHECK_S: int = int(os.getenv("DB_REPLICA_CHECK_S", "10"))
+    # Tras escribir, las lecturas del mismo usuario van al primario durante esta ventana (segundos)
+    DB_READ_YOUR_WRITES_S: float = float(os.getenv("DB_READ_YOUR_WRITES_S", "5"))
+    
+    # Circuit breaker del primario: fallos de conexión seguidos para abrirlo y
+    # segundos abierto antes de probar de nuevo
+    DB_CIRCUIT_FAILURES: int = int(os.getenv("DB_CIRCUIT_FAILURES", "3"))
+    DB_CIRCUIT_RESET_S: float = float(os.getenv("DB_CIRCUIT_RESET_S", "10"))
+    # Diario local de escrituras pendientes mientras la base de datos no está disponible
+    DB_JOURNAL_PATH: str = os.getenv("DB_JOURNAL_PATH", "data/diario_escrituras.jsonl")
+    # Cada cuántos segundos se intenta aplicar el diario pendiente
+    DB_JOURNAL_REPLAY_S: int = int(os.getenv("DB_JOURNAL_REPLAY_S", "5"))
+    
+    # Escritura por lotes de asistencias (hora punta de entrada)
+    DB_BATCH_MAX_SIZE: int = int(os.getenv("DB_BATCH_MAX_SIZE", "50"))
+    DB_BATCH_MAX_DELAY_MS: int = int(os.getenv("DB_BATCH_MAX_DELAY_MS", "50"))
+    
+    # Caché de practicantes (Discord ID -> practicante_id), en segundos
+    PRACTICANTE_CACHE_MAX_SIZE: int = int(os.getenv("PRACTICANTE_CACHE_MAX_SIZE", "5000"))
+    PRACTICANTE_CACHE_TTL: float = float(os.getenv("PRACTICANTE_CACHE_TTL", "3600"))
+    PRACTICANTE_CACHE_NEGATIVE_TTL: float = float(os.getenv("PRACTICANTE_CACHE_NEGATIVE_TTL", "60"))
+    
+    # Reconciliación de la instantánea de asistencia del día con MySQL, en minutos
+    ASISTENCIA_DIA_RECONCILIACION_MIN: float = float(os.getenv("ASISTENCIA_DIA_RECONCILIACION_MIN", "10"))
+    
+    # Caché de historiales renderizados, en segundos
+    HISTORIAL_CACHE_MAX_SIZE: int = int(os.getenv("HISTORIAL_CACHE_MAX_SIZE", "2000"))
+    HISTORIAL_CACHE_TTL: float = float(os.getenv("HISTORIAL_CACHE_TTL", "900"))
+    
+    # Con varios procesos (DISCORD_SHARD_IDS) cada uno tiene sus cachés y las invalidaciones
+    # (/admin practicante, cierre de faltas) solo alcanzan al proceso que las hace: tope de TTL en segundos
+    CACHE_TTL_MULTIPROCESO: float = float(os.getenv("CACHE_TTL_MULTIPROCESO", "120"))
+    
+    # Tamaño máximo de cada adjunto del reporte de asistencia (también se respeta el límite del servidor)
+    REPORTE_PARTE_MAX_BYTES: int = int(os.getenv("REPORTE_PARTE_MAX_BYTES", str(8 * 1024 * 1024)))
+    
+    # Días hacia atrás que revisa el registro nocturno de faltas (recupera días perdidos por caídas)
+    FALTAS_BACKFILL_DIAS: int = int(os.getenv("FALTAS_BACKFILL_DIAS", "7"))
+    
+    # Margen antes del plazo de 3 s de Discord en el que se hace defer automático, en ms
+    INTERACCION_MARGEN_DEFER_MS: float = float(os.getenv("INTERACCION_MARGEN_DEFER_MS", "1000"))
     
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    # "texto" o "json" (una línea JSON por registro, con servidor, comando y usuario)
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "texto")
+    # Fracción de INFO que se conserva por logger: "cogs.asistencia=0.2,cogs.faltas=0.5"
+    LOG_SAMPLING: str = os.getenv("LOG_SAMPLING", "")
     
     @classmethod
     def validate(cls) -> bool:
@@ -68,6 +148,13 @@ class Settings:
         ]
         return all(required)
     
+    @classmethod
+    def ttl_cache(cls, ttl: float) -> float:
+        """TTL efectivo de una caché local, acortado si el bot corre en varios procesos"""
+        if cls.DISCORD_SHARD_IDS:
+            return min(ttl, cls.CACHE_TTL_MULTIPROCESO)
+        return ttl
+    
     @classmethod
     def get_canales_permitidos(cls, guild_id: int) -> List[int]:
         """Obtiene los canales permitidos para un servidor"""
@@ -0,0 +1,5 @@
+"""Comunicación con el backend"""
+
+from .client import BackendClient, Outbox
+
+__all__ = ["BackendClient", "Outbox"]
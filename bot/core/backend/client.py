@@ -0,0 +1,200 @@
+"""
+Cliente HTTP del backend
+Una sesión aiohttp persistente (keep-alive) con reintentos exponenciales con
+jitter y una bandeja de salida acotada para reenviar cuando el backend vuelva
+"""
+
+import asyncio
+import logging
+import random
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Códigos que justifican reintentar: el backend está sobrecargado o caído
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class Outbox:
+    """
+    Bandeja de salida acotada que coalesce por clave
+
+    Un envío con la misma clave reemplaza al pendiente (solo interesa el
+    último snapshot de métricas). Al superar ``max_size`` se descarta el
+    más antiguo.
+    """
+
+    def __init__(self, max_size: int = 100):
+        self.max_size = max_size
+        self._items: "OrderedDict[Hashable, Tuple[str, Any, Dict[str, str]]]" = OrderedDict()
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, key: Hashable, path: str, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        """Encola un envío, reemplazando el pendiente con la misma clave"""
+        self._items.pop(key, None)
+        self._items[key] = (path, body, headers or {})
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+            self.dropped += 1
+
+    def discard(self, key: Hashable) -> None:
+        """Descarta el envío pendiente con esa clave"""
+        self._items.pop(key, None)
+
+    def peek(self) -> Optional[Tuple[Hashable, Tuple[str, Any, Dict[str, str]]]]:
+        """El envío pendiente más antiguo, sin quitarlo"""
+        if not self._items:
+            return None
+        return next(iter(self._items.items()))
+
+
+class BackendClient:
+    """Cliente del backend con una sesión HTTP compartida"""
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        timeout: float = 10.0,
+        max_connections: int = 4,
+        keepalive_timeout: float = 75.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 10.0,
+        outbox_size: int = 100,
+    ):
+        self.base_url = (base_url or "").rstrip("/")
+        self.api_key = api_key
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.outbox = Outbox(outbox_size)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        """Crea la sesión HTTP si aún no existe"""
+        if self._session is not None and not self._session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            headers={"Authorization": f"Bearer {self.api_key}"},
+        )
+
+    async def close(self) -> None:
+        """Cierra la sesión HTTP"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _backoff(self, attempt: int) -> float:
+        """Espera exponencial con jitter completo"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def post(
+        self,
+        path: str,
+        json: Any = None,
+        data: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> bool:
+        """
+        Envía un POST con reintentos
+
+        Args:
+            path: Ruta relativa a ``base_url``
+            json: Cuerpo a serializar como JSON
+            data: Cuerpo ya serializado (alternativa a ``json``)
+            headers: Cabeceras adicionales
+
+        Returns:
+            True si el backend respondió 2xx
+        """
+        await self.start()
+        url = f"{self.base_url}{path}"
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._session.post(url, json=json, data=data, headers=headers) as response:
+                    if 200 <= response.status < 300:
+                        return True
+                    body = await response.text()
+                    if response.status not in RETRYABLE_STATUS:
+                        logger.error("El backend rechazó %s: %s - %s", path, response.status, body)
+                        return False
+                    logger.warning("El backend respondió %s en %s (intento %s)", response.status, path, attempt + 1)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning("No se pudo conectar al backend en %s (intento %s): %s", path, attempt + 1, e)
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(self._backoff(attempt))
+
+        return False
+
+    async def send(
+        self,
+        path: str,
+        json: Any = None,
+        data: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        key: Optional[Hashable] = None,
+    ) -> bool:
+        """
+        Envía un POST y, si falla, lo guarda en la bandeja de salida
+
+        Antes de enviar se reintenta lo pendiente, en orden. Un envío con
+        ``key`` reemplaza al pendiente con la misma clave.
+
+        Returns:
+            True si este envío llegó al backend
+        """
+        async with self._lock:
+            if key is not None:
+                self.outbox.discard(key)
+            if not await self._flush_outbox():
+                if key is not None:
+                    self.outbox.put(key, path, json if data is None else data, headers)
+                return False
+
+            body = json if data is None else data
+            if await self._post_body(path, body, headers):
+                return True
+            if key is not None:
+                self.outbox.put(key, path, body, headers)
+            return False
+
+    async def _post_body(self, path: str, body: Any, headers: Optional[Dict[str, str]]) -> bool:
+        if isinstance(body, (bytes, bytearray)):
+            return await self.post(path, data=body, headers=headers)
+        return await self.post(path, json=body, headers=headers)
+
+    async def _flush_outbox(self) -> bool:
+        """Reenvía lo pendiente en orden; se detiene en el primer fallo"""
+        while True:
+            pending = self.outbox.peek()
+            if pending is None:
+                return True
+            key, (path, body, headers) = pending
+            if not await self._post_body(path, body, headers):
+                return False
+            self.outbox.discard(key)
+            logger.info("Reenviado al backend el envío pendiente '%s'.", key)
+
+    async def flush_outbox(self) -> bool:
+        """Reenvía lo pendiente; True si la bandeja quedó vacía"""
+        async with self._lock:
+            return await self._flush_outbox()
@@ -0,0 +1,31 @@
+"""Cachés en memoria del bot"""
+
+from .ttl_cache import TTLCache, MISSING
+from .practicantes import PracticanteCache, get_practicante_cache
+from .estados import Estado, EstadoCatalogo, get_estado_catalogo, set_estado_catalogo
+from .asistencia_dia import RegistroAsistencia, AsistenciaDelDia, get_asistencia_dia
+from .historial import HistorialCache, get_historial_cache, HISTORIAL_ASISTENCIA, HISTORIAL_RECUPERACION
+from .politicas import PoliticasServidor, get_politicas, set_politicas, TIPO_CANAL, TIPO_ROL_RECUPERACION
+
+__all__ = [
+    "TTLCache",
+    "MISSING",
+    "PracticanteCache",
+    "get_practicante_cache",
+    "Estado",
+    "EstadoCatalogo",
+    "get_estado_catalogo",
+    "set_estado_catalogo",
+    "RegistroAsistencia",
+    "AsistenciaDelDia",
+    "get_asistencia_dia",
+    "HistorialCache",
+    "get_historial_cache",
+    "HISTORIAL_ASISTENCIA",
+    "HISTORIAL_RECUPERACION",
+    "PoliticasServidor",
+    "get_politicas",
+    "set_politicas",
+    "TIPO_CANAL",
+    "TIPO_ROL_RECUPERACION",
+]
@@ -0,0 +1,167 @@
+"""
+Instantánea en memoria de la asistencia del día
+practicante_id -> registro de hoy, cargada con una sola consulta
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import date, time, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+Loader = Callable[[date], Awaitable[List[Dict[str, Any]]]]
+
+
+def hora_columna(valor: Union[time, timedelta]) -> timedelta:
+    """Convierte una hora al valor que devuelve aiomysql para una columna TIME (segundos enteros)"""
+    if isinstance(valor, timedelta):
+        return timedelta(seconds=int(valor.total_seconds()))
+    return timedelta(hours=valor.hour, minutes=valor.minute, seconds=valor.second)
+
+
+@dataclass
+class RegistroAsistencia:
+    """Fila de Asistencia del día, con las horas como las devuelve la base de datos"""
+
+    # Las escrituras del bot no conocen el id: no cuenta al comparar con la base de datos
+    id: Optional[int] = field(default=None, compare=False)
+    hora_entrada: Optional[timedelta] = None
+    hora_salida: Optional[timedelta] = None
+    estado_id: Optional[int] = None
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "RegistroAsistencia":
+        return cls(
+            id=row.get("id", row.get("asistencia_id")),
+            hora_entrada=row.get("hora_entrada"),
+            hora_salida=row.get("hora_salida"),
+            estado_id=row.get("estado_id"),
+        )
+
+
+class AsistenciaDelDia:
+    """
+    Registros de Asistencia de un día, por practicante_id
+
+    Se carga al primer uso y cada vez que cambia la fecha; las rutas de
+    escritura la actualizan en el momento. Un practicante sin entrada
+    en la instantánea no ha registrado asistencia ese día (salvo escrituras
+    hechas fuera del bot, que corrige la reconciliación periódica).
+    """
+
+    def __init__(self):
+        self.fecha: Optional[date] = None
+        self._registros: Dict[int, RegistroAsistencia] = {}
+        # Escrituras ocurridas durante una carga: se reaplican sobre lo leído
+        self._durante_carga: Optional[Dict[int, RegistroAsistencia]] = None
+        self._fecha_carga: Optional[date] = None
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._registros)
+
+    def vigente(self, fecha: date) -> bool:
+        """True si la instantánea corresponde a ``fecha``"""
+        return self.fecha == fecha
+
+    def get(self, practicante_id: int) -> Optional[RegistroAsistencia]:
+        return self._registros.get(practicante_id)
+
+    async def asegurar(self, fecha: date, loader: Loader) -> None:
+        """Carga la instantánea de ``fecha`` si no está cargada (una sola vez aunque haya concurrencia)"""
+        if self.fecha == fecha:
+            return
+        async with self._lock:
+            if self.fecha != fecha:
+                await self._cargar(fecha, loader)
+
+    async def reconciliar(self, loader: Loader) -> int:
+        """
+        Vuelve a leer el día cargado y reemplaza la instantánea
+
+        Returns:
+            Cantidad de practicantes cuyo registro difería de la base de datos
+        """
+        if self.fecha is None:
+            return 0
+        async with self._lock:
+            return await self._cargar(self.fecha, loader)
+
+    async def _cargar(self, fecha: date, loader: Loader) -> int:
+        self._durante_carga, self._fecha_carga = {}, fecha
+        try:
+            rows = await loader(fecha)
+        finally:
+            escritos, self._durante_carga, self._fecha_carga = self._durante_carga, None, None
+
+        nuevos = {row["practicante_id"]: RegistroAsistencia.from_row(row) for row in rows}
+        nuevos.update(escritos)
+
+        diferencias = 0
+        if self.fecha == fecha:
+            claves = nuevos.keys() | self._registros.keys()
+            diferencias = sum(1 for k in claves if nuevos.get(k) != self._registros.get(k))
+        self.fecha, self._registros = fecha, nuevos
+        return diferencias
+
+    def _guardar(self, fecha: date, practicante_id: int, registro: RegistroAsistencia) -> None:
+        if self._durante_carga is not None and self._fecha_carga == fecha:
+            self._durante_carga[practicante_id] = registro
+        if self.fecha == fecha:
+            self._registros[practicante_id] = registro
+
+    def guardar(self, fecha: date, practicante_id: int, row: Dict[str, Any]) -> RegistroAsistencia:
+        """Guarda un registro leído de la base de datos (respaldo ante un fallo de caché)"""
+        registro = RegistroAsistencia.from_row(row)
+        self._guardar(fecha, practicante_id, registro)
+        return registro
+
+    def registrar_entrada(
+        self,
+        fecha: date,
+        practicante_id: int,
+        hora_entrada: Union[time, timedelta],
+        estado_id: Optional[int],
+    ) -> None:
+        """Refleja un INSERT de entrada"""
+        self._guardar(fecha, practicante_id, RegistroAsistencia(
+            hora_entrada=hora_columna(hora_entrada),
+            estado_id=estado_id,
+        ))
+
+    def registrar_salida(
+        self,
+        fecha: date,
+        practicante_id: int,
+        hora_salida: Union[time, timedelta],
+        estado_id: Optional[int] = None,
+    ) -> None:
+        """Refleja un UPDATE de salida (``estado_id`` solo si cambia, p. ej. salida anticipada)"""
+        actual = self._registros.get(practicante_id) if self.fecha == fecha else None
+        if actual is None:
+            # No hay registro en memoria que actualizar: la próxima lectura irá a la base de datos
+            return
+        self._guardar(fecha, practicante_id, RegistroAsistencia(
+            id=actual.id,
+            hora_entrada=actual.hora_entrada,
+            hora_salida=hora_columna(hora_salida),
+            estado_id=actual.estado_id if estado_id is None else estado_id,
+        ))
+
+    def descartar(self, practicante_id: Optional[int] = None) -> None:
+        """Descarta un registro, o toda la instantánea si no se indica ``practicante_id``"""
+        if practicante_id is None:
+            self.fecha, self._registros = None, {}
+        else:
+            self._registros.pop(practicante_id, None)
+
+
+# Instancia global de la instantánea
+_asistencia_dia: Optional[AsistenciaDelDia] = None
+
+
+def get_asistencia_dia() -> AsistenciaDelDia:
+    """Obtiene la instantánea de asistencia del día (singleton)"""
+    global _asistencia_dia
+    if _asistencia_dia is None:
+        _asistencia_dia = AsistenciaDelDia()
+    return _asistencia_dia
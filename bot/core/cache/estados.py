@@ -0,0 +1,83 @@
+"""
+Catálogo en memoria de Estado_Asistencia
+La tabla es pequeña y casi estática: se carga al inicio y se refresca
+periódicamente, de modo que resolver un estado nunca requiere ir a la red
+"""
+
+from enum import Enum
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+
+class Estado(str, Enum):
+    """Estados de asistencia conocidos por el bot"""
+
+    PRESENTE = "Presente"
+    TARDANZA = "Tardanza"
+    SALIDA_ANTICIPADA = "Salida Anticipada"
+    FALTA_INJUSTIFICADA = "Falta injustificada"
+    FALTA_RECUPERADA = "Falta Recuperada"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+def _normalizar(nombre: str) -> str:
+    return str(nombre).strip().casefold()
+
+
+class EstadoCatalogo:
+    """
+    Mapa inmutable nombre <-> id de Estado_Asistencia
+
+    Los nombres se comparan sin distinguir mayúsculas, igual que la
+    collation de MySQL, para que 'Falta Injustificada' y
+    'Falta injustificada' resuelvan al mismo id.
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, Any]] = ()):
+        por_nombre: Dict[str, int] = {}
+        por_id: Dict[int, str] = {}
+        for row in rows:
+            por_nombre[_normalizar(row["estado"])] = row["id"]
+            por_id[row["id"]] = row["estado"]
+        self._por_nombre: Mapping[str, int] = MappingProxyType(por_nombre)
+        self._por_id: Mapping[int, str] = MappingProxyType(por_id)
+
+    def __len__(self) -> int:
+        return len(self._por_id)
+
+    @property
+    def cargado(self) -> bool:
+        """True si el catálogo tiene al menos un estado"""
+        return bool(self._por_id)
+
+    def id(self, nombre: str) -> Optional[int]:
+        """Obtiene el id de un estado por su nombre"""
+        return self._por_nombre.get(_normalizar(nombre))
+
+    def nombre(self, estado_id: Optional[int]) -> Optional[str]:
+        """Obtiene el nombre de un estado por su id"""
+        if estado_id is None:
+            return None
+        return self._por_id.get(estado_id)
+
+    def es(self, estado_id: Optional[int], estado: str) -> bool:
+        """Verifica si ``estado_id`` corresponde al estado indicado"""
+        return estado_id is not None and estado_id == self.id(estado)
+
+
+# Catálogo vigente; se reemplaza completo en cada recarga
+_catalogo = EstadoCatalogo()
+
+
+def get_estado_catalogo() -> EstadoCatalogo:
+    """Obtiene el catálogo de estados vigente"""
+    return _catalogo
+
+
+def set_estado_catalogo(rows: Iterable[Dict[str, Any]]) -> EstadoCatalogo:
+    """Reemplaza el catálogo vigente a partir de filas con ``id`` y ``estado``"""
+    global _catalogo
+    _catalogo = EstadoCatalogo(rows)
+    return _catalogo
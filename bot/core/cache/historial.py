@@ -0,0 +1,74 @@
+"""
+Caché de historiales ya consultados y renderizados
+(practicante_id, días, fecha) -> argumentos listos para enviar el mensaje
+"""
+
+from datetime import date
+from typing import Any, Dict, Optional
+
+from bot.config import get_settings
+from .ttl_cache import MISSING, TTLCache
+
+# Tipos de historial
+HISTORIAL_ASISTENCIA = "asistencia"
+HISTORIAL_RECUPERACION = "recuperacion"
+
+
+class HistorialCache:
+    """
+    Memoriza el resultado renderizado (embed o texto) de un historial
+
+    Cada practicante tiene una versión por tipo de historial; una escritura
+    la incrementa y las entradas anteriores dejan de encontrarse, sin tener
+    que recorrer la caché. La fecha en la clave hace que expiren al cambiar de día.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self._cache: TTLCache = TTLCache(max_size=max_size, ttl=ttl)
+        self._versiones: Dict[tuple, int] = {}
+
+    def _clave(self, tipo: str, practicante_id: int, dias: int, fecha: date) -> tuple:
+        version = self._versiones.get((tipo, practicante_id), 0)
+        return (tipo, practicante_id, version, dias, fecha)
+
+    def get(self, tipo: str, practicante_id: int, dias: int, fecha: date) -> Any:
+        """Retorna los kwargs de envío cacheados o ``MISSING``"""
+        return self._cache.get(self._clave(tipo, practicante_id, dias, fecha))
+
+    def set(self, tipo: str, practicante_id: int, dias: int, fecha: date, mensaje: Dict[str, Any]) -> None:
+        """Guarda los kwargs de envío (``embed=...`` o ``content=...``) de un historial"""
+        self._cache.set(self._clave(tipo, practicante_id, dias, fecha), mensaje)
+
+    def invalidate(self, tipo: Optional[str] = None, practicante_id: Optional[int] = None) -> None:
+        """
+        Invalida los historiales de un practicante tras una escritura
+
+        Sin ``practicante_id`` se vacía todo (p. ej. tras una carga masiva).
+        """
+        if practicante_id is None:
+            self._cache.clear()
+            self._versiones.clear()
+            return
+        for t in ((tipo,) if tipo else (HISTORIAL_ASISTENCIA, HISTORIAL_RECUPERACION)):
+            clave = (t, practicante_id)
+            self._versiones[clave] = self._versiones.get(clave, 0) + 1
+
+    def stats(self) -> Dict[str, int]:
+        """Estadísticas de la caché"""
+        return self._cache.stats()
+
+
+# Instancia global de la caché
+_historial_cache: Optional[HistorialCache] = None
+
+
+def get_historial_cache() -> HistorialCache:
+    """Obtiene la caché de historiales (singleton)"""
+    global _historial_cache
+    if _historial_cache is None:
+        settings = get_settings()
+        _historial_cache = HistorialCache(
+            max_size=settings.HISTORIAL_CACHE_MAX_SIZE,
+            ttl=settings.ttl_cache(settings.HISTORIAL_CACHE_TTL),
+        )
+    return _historial_cache
@@ -0,0 +1,85 @@
+"""
+Políticas por servidor: canales habilitados y roles de recuperación
+Se cargan de la tabla Politica_Servidor en índices inmutables (frozenset)
+y se reemplazan completos cuando la tabla cambia, sin reiniciar el bot
+"""
+
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Iterable, Mapping, Optional, Set
+
+from bot.config import Settings
+
+# Valores de la columna Politica_Servidor.tipo
+TIPO_CANAL = "canal"
+TIPO_ROL_RECUPERACION = "rol_recuperacion"
+
+_VACIO: FrozenSet[int] = frozenset()
+
+
+class PoliticasServidor:
+    """
+    Índices guild_id -> frozenset de IDs permitidos
+
+    Un servidor sin canales no tiene ningún canal habilitado; un servidor
+    sin roles de recuperación permite la recuperación a todos.
+    """
+
+    def __init__(
+        self,
+        canales: Mapping[int, Iterable[int]],
+        roles_recuperacion: Mapping[int, Iterable[int]],
+        version: Any = None,
+    ):
+        self._canales: Mapping[int, FrozenSet[int]] = MappingProxyType(
+            {guild_id: frozenset(ids) for guild_id, ids in canales.items()}
+        )
+        self._roles: Mapping[int, FrozenSet[int]] = MappingProxyType(
+            {guild_id: frozenset(ids) for guild_id, ids in roles_recuperacion.items()}
+        )
+        self.version = version
+
+    @classmethod
+    def desde_filas(cls, rows: Iterable[Dict[str, Any]], version: Any = None) -> "PoliticasServidor":
+        """Construye los índices a partir de filas con ``guild_id``, ``tipo`` y ``objetivo_id``"""
+        canales: Dict[int, Set[int]] = {}
+        roles: Dict[int, Set[int]] = {}
+        for row in rows:
+            destino = canales if row["tipo"] == TIPO_CANAL else roles
+            destino.setdefault(int(row["guild_id"]), set()).add(int(row["objetivo_id"]))
+        return cls(canales, roles, version)
+
+    @classmethod
+    def desde_settings(cls, version: Any = None) -> "PoliticasServidor":
+        """Valores de configuración, usados mientras la tabla no tenga filas"""
+        return cls(Settings.CANALES_PERMITIDOS, Settings.ROLES_RECUPERACION, version)
+
+    def canales(self, guild_id: Optional[int]) -> FrozenSet[int]:
+        return self._canales.get(guild_id, _VACIO)
+
+    def roles_recuperacion(self, guild_id: Optional[int]) -> FrozenSet[int]:
+        return self._roles.get(guild_id, _VACIO)
+
+    def canal_permitido(self, guild_id: Optional[int], channel_id: Optional[int]) -> bool:
+        """True si el canal está habilitado para los comandos en el servidor"""
+        return channel_id in self._canales.get(guild_id, _VACIO)
+
+    def rol_recuperacion_permitido(self, guild_id: Optional[int], role_ids: Iterable[int]) -> bool:
+        """True si el servidor no restringe la recuperación o el usuario tiene alguno de los roles"""
+        roles = self._roles.get(guild_id)
+        return not roles or not roles.isdisjoint(role_ids)
+
+
+# Políticas vigentes; se reemplazan completas en cada recarga
+_politicas = PoliticasServidor.desde_settings()
+
+
+def get_politicas() -> PoliticasServidor:
+    """Obtiene las políticas vigentes"""
+    return _politicas
+
+
+def set_politicas(politicas: PoliticasServidor) -> PoliticasServidor:
+    """Reemplaza las políticas vigentes"""
+    global _politicas
+    _politicas = politicas
+    return _politicas
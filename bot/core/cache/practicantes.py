@@ -0,0 +1,76 @@
+"""
+Caché de identidad Discord ID -> practicante_id
+"""
+
+from typing import Any, Dict, Iterable, Optional
+
+from bot.config import get_settings
+from .ttl_cache import MISSING, TTLCache
+
+
+class PracticanteCache:
+    """
+    Mapeo en memoria de ``id_discord`` a ``Practicante.id``
+
+    Las respuestas "no registrado" se guardan como ``None`` con un TTL
+    más corto, para que un practicante recién dado de alta no tenga que
+    esperar el TTL completo.
+    """
+
+    def __init__(self, max_size: int, ttl: float, negative_ttl: float):
+        self.negative_ttl = negative_ttl
+        self._cache: TTLCache[int, Optional[int]] = TTLCache(max_size=max_size, ttl=ttl)
+
+    def get(self, discord_id: int) -> Any:
+        """Retorna el practicante_id, ``None`` si no está registrado o ``MISSING``"""
+        return self._cache.get(int(discord_id))
+
+    def set(self, discord_id: int, practicante_id: Optional[int]) -> None:
+        """Guarda el resultado de una búsqueda (``None`` = no registrado)"""
+        ttl = self.negative_ttl if practicante_id is None else None
+        self._cache.set(int(discord_id), practicante_id, ttl=ttl)
+
+    def warm(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Precarga la caché desde filas con ``id`` e ``id_discord``
+
+        Returns:
+            Cantidad de practicantes cargados
+        """
+        count = 0
+        for row in rows:
+            try:
+                discord_id = int(row["id_discord"])
+            except (TypeError, ValueError):
+                continue
+            self._cache.set(discord_id, row["id"])
+            count += 1
+        return count
+
+    def invalidate(self, discord_id: Optional[int] = None) -> None:
+        """Invalida un practicante, o toda la caché si no se indica ``discord_id``"""
+        if discord_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(int(discord_id))
+
+    def stats(self) -> Dict[str, int]:
+        """Estadísticas de la caché"""
+        return self._cache.stats()
+
+
+# Instancia global de la caché
+_practicante_cache: Optional[PracticanteCache] = None
+
+
+def get_practicante_cache() -> PracticanteCache:
+    """Obtiene la caché de practicantes (singleton)"""
+    global _practicante_cache
+    if _practicante_cache is None:
+        settings = get_settings()
+        _practicante_cache = PracticanteCache(
+            max_size=settings.PRACTICANTE_CACHE_MAX_SIZE,
+            ttl=settings.ttl_cache(settings.PRACTICANTE_CACHE_TTL),
+            negative_ttl=settings.ttl_cache(settings.PRACTICANTE_CACHE_NEGATIVE_TTL),
+        )
+    return _practicante_cache
@@ -0,0 +1,82 @@
+"""
+Caché en memoria acotada (LRU) con expiración por entrada (TTL)
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class _Missing:
+    """Marcador para distinguir 'no está en caché' de un valor None cacheado"""
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+MISSING: Any = _Missing()
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Caché LRU acotada con TTL por entrada
+
+    Al superar ``max_size`` se descarta la entrada menos usada recientemente.
+    Cada entrada puede tener su propio TTL (útil para caché negativa).
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> Any:
+        """Retorna el valor cacheado o ``MISSING`` si no existe o expiró"""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            self.misses += 1
+            return MISSING
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        """Guarda un valor, desalojando la entrada más antigua si hace falta"""
+        expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        """Elimina una entrada si existe"""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Elimina todas las entradas"""
+        self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Estadísticas básicas de uso"""
+        return {"entradas": len(self._data), "hits": self.hits, "misses": self.misses}
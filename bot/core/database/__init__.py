@@ -1,7 +1,27 @@
 """Módulo de base de datos"""
 
 from .connection import Database, get_database
+from .batch_writer import BatchWriter
+from .registry import Query, QueryRegistry, get_query_registry
+from .replicas import ReplicaRouter
+from .circuit import CircuitBreaker, is_connection_error
+from .journal import WriteJournal
+from .contexto import usuario_db, usuario_actual, con_usuario_db
 
-__all__ = ["Database", "get_database"]
+__all__ = [
+    "Database",
+    "get_database",
+    "BatchWriter",
+    "Query",
+    "QueryRegistry",
+    "get_query_registry",
+    "ReplicaRouter",
+    "CircuitBreaker",
+    "is_connection_error",
+    "WriteJournal",
+    "usuario_db",
+    "usuario_actual",
+    "con_usuario_db",
+]
 
 
@@ -0,0 +1,211 @@
+"""
+Escritura por lotes (write-behind) de INSERTs
+Agrupa filas enviadas en una ventana corta y las inserta con un solo
+INSERT multi-fila dentro de una única transacción
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Any, AsyncContextManager, Awaitable, Callable, List, Optional, Sequence, Tuple
+
+import aiomysql
+
+from bot.core.exceptions.database import DatabaseQueryError
+from bot.core.metrics import sumar_tiempo_db
+from .registry import Query, get_query_registry
+
+logger = logging.getLogger(__name__)
+
+ConnectionFactory = Callable[[], AsyncContextManager[aiomysql.Connection]]
+
+
+class BatchWriter:
+    """
+    Acumula filas para una tabla y las escribe en lotes
+
+    Cada llamada a ``submit`` recibe su propio resultado (filas afectadas),
+    aunque la fila se haya escrito junto con otras en el mismo lote.
+    Un lote se vacía al alcanzar ``max_batch`` filas o al cumplirse
+    ``max_delay`` segundos desde la primera fila pendiente.
+
+    Con ``skip_duplicates`` las filas que violan una clave única se omiten
+    (``ON DUPLICATE KEY UPDATE`` sin cambios) y su resultado es 0.
+
+    ``on_written`` se llama tras escribir cada fila, en el contexto de quien
+    la envió (no en el de la tarea que escribe el lote).
+
+    ``before_commit`` recibe un cursor y las filas insertadas antes de cada
+    commit, para escribir en la misma transacción (p. ej. contadores).
+    """
+
+    def __init__(
+        self,
+        table: str,
+        columns: Sequence[str],
+        connection_factory: ConnectionFactory,
+        max_batch: int = 50,
+        max_delay: float = 0.05,
+        skip_duplicates: bool = False,
+        name: Optional[str] = None,
+        on_written: Optional[Callable[[], None]] = None,
+        before_commit: Optional[Callable[[aiomysql.Cursor, List[Tuple[Any, ...]]], Awaitable[None]]] = None,
+    ):
+        self.table = table
+        self.columns = tuple(columns)
+        self.connection_factory = connection_factory
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.skip_duplicates = skip_duplicates
+        self.name = name or f"{table.lower()}.insertar_lote"
+        self.on_written = on_written
+        self.before_commit = before_commit
+        self._pending: List[Tuple[Tuple[Any, ...], asyncio.Future]] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._flushes: set = set()
+        self._closed = False
+
+    def _build_query(self, rows: int) -> Query:
+        """Construye el INSERT multi-fila para ``rows`` filas"""
+        placeholders = "(" + ", ".join(["%s"] * len(self.columns)) + ")"
+        query = (
+            f"INSERT INTO {self.table} ({', '.join(self.columns)}) "
+            f"VALUES {', '.join([placeholders] * rows)}"
+        )
+        if self.skip_duplicates:
+            # Actualización sin cambios: MySQL reporta 0 filas afectadas para el duplicado
+            query += f" ON DUPLICATE KEY UPDATE {self.columns[0]} = {self.columns[0]}"
+        return Query(self.name, query)
+
+    async def submit(self, values: Sequence[Any]) -> int:
+        """
+        Encola una fila y espera a que su lote se escriba
+
+        Args:
+            values: Valores en el mismo orden que ``columns``
+
+        Returns:
+            Número de filas afectadas por esta fila
+        """
+        if self._closed:
+            raise DatabaseQueryError("El escritor por lotes está cerrado", details=self.table)
+        if len(values) != len(self.columns):
+            raise ValueError(f"Se esperaban {len(self.columns)} valores, se recibieron {len(values)}")
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((tuple(values), future))
+
+        if len(self._pending) >= self.max_batch:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_after_delay())
+
+        # La espera del lote es tiempo de base de datos para quien envió la fila
+        start = time.perf_counter()
+        try:
+            affected = await future
+        finally:
+            sumar_tiempo_db((time.perf_counter() - start) * 1000)
+        if affected and self.on_written is not None:
+            self.on_written()
+        return affected
+
+    async def _flush_after_delay(self) -> None:
+        await asyncio.sleep(self.max_delay)
+        self._timer = None
+        self._start_flush()
+
+    def _start_flush(self) -> None:
+        """Toma las filas pendientes y lanza su escritura en segundo plano"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        # Contexto vacío: el lote no pertenece a ningún comando en particular
+        task = asyncio.create_task(self._write(batch), context=contextvars.Context())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _write(self, batch: List[Tuple[Tuple[Any, ...], asyncio.Future]]) -> None:
+        params = [value for values, _ in batch for value in values]
+        try:
+            async with self.connection_factory() as conn:
+                try:
+                    query = self._build_query(len(batch))
+                    with get_query_registry().track(query) as stats:
+                        async with conn.cursor() as cursor:
+                            await cursor.execute(query, params)
+                            affected = stats.rows = cursor.rowcount
+                    if affected < len(batch):
+                        # Hubo duplicados: hay que saber qué filas se insertaron
+                        await conn.rollback()
+                        await self._write_one_by_one(conn, batch)
+                        return
+                    await self._before_commit(conn, [values for values, _ in batch])
+                    await conn.commit()
+                except aiomysql.Error as e:
+                    await conn.rollback()
+                    logger.warning(
+                        f"Falló el lote de {len(batch)} filas en {self.table}, "
+                        f"reintentando fila por fila: {e}"
+                    )
+                    await self._write_one_by_one(conn, batch)
+                    return
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    error = DatabaseQueryError(f"Error escribiendo lote en {self.table}: {e}")
+                    # Se conserva la causa (p. ej. para distinguir una caída de la conexión)
+                    error.__cause__ = e
+                    future.set_exception(error)
+            return
+
+        for _, future in batch:
+            if not future.done():
+                future.set_result(1)
+
+    async def _write_one_by_one(
+        self,
+        conn: aiomysql.Connection,
+        batch: List[Tuple[Tuple[Any, ...], asyncio.Future]],
+    ) -> None:
+        """Escribe fila por fila un lote fallido o con duplicados, con resultado propio por fila"""
+        query = self._build_query(1)
+        for values, future in batch:
+            try:
+                with get_query_registry().track(query) as stats:
+                    async with conn.cursor() as cursor:
+                        await cursor.execute(query, values)
+                        affected = stats.rows = cursor.rowcount
+                if affected:
+                    await self._before_commit(conn, [values])
+                await conn.commit()
+            except aiomysql.Error as e:
+                await conn.rollback()
+                if not future.done():
+                    future.set_exception(
+                        DatabaseQueryError(f"Error insertando en {self.table}: {e}", details=str(values))
+                    )
+                continue
+            if not future.done():
+                future.set_result(affected)
+
+    async def _before_commit(self, conn: aiomysql.Connection, rows: List[Tuple[Any, ...]]) -> None:
+        if self.before_commit is not None:
+            async with conn.cursor() as cursor:
+                await self.before_commit(cursor, rows)
+
+    async def flush(self) -> None:
+        """Escribe de inmediato las filas pendientes y espera a los lotes en curso"""
+        self._start_flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    async def close(self) -> None:
+        """Rechaza nuevas filas y vacía lo pendiente"""
+        self._closed = True
+        await self.flush()
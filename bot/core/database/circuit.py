@@ -0,0 +1,99 @@
+"""
+Circuit breaker de la base de datos
+Tras varios fallos de conexión seguidos deja de intentar conectar durante
+un tiempo y rechaza al instante, en vez de hacer esperar a cada comando
+hasta el timeout de adquisición
+"""
+
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import aiomysql
+
+from bot.core.exceptions.database import DatabaseConnectionError, DatabasePoolTimeoutError
+
+logger = logging.getLogger(__name__)
+
+CERRADO = "cerrado"
+ABIERTO = "abierto"
+SEMIABIERTO = "semiabierto"
+
+
+# Errores de MySQL que indican que no hay servidor (no problemas de la consulta):
+# demasiadas conexiones, apagándose, sin socket, no se pudo conectar, se fue, se perdió
+_CODIGOS_CONEXION = {1040, 1053, 2002, 2003, 2006, 2013, 2055}
+
+
+def is_connection_error(exc: Optional[BaseException]) -> bool:
+    """
+    True si el error (o su causa) indica que no se pudo hablar con el servidor
+
+    Los errores de la consulta (clave duplicada, bloqueos, sintaxis) no
+    cuentan: el servidor respondió. Un timeout del pool tampoco, porque con
+    el pool lleno el servidor sigue atendiendo.
+    """
+    while exc is not None:
+        if isinstance(exc, DatabasePoolTimeoutError):
+            return False
+        if isinstance(exc, (DatabaseConnectionError, aiomysql.InterfaceError, OSError)):
+            return True
+        if isinstance(exc, aiomysql.OperationalError):
+            return bool(exc.args) and exc.args[0] in _CODIGOS_CONEXION
+        exc = exc.__cause__
+    return False
+
+
+class CircuitBreaker:
+    """
+    Cerrado: todo pasa. Abierto: todo se rechaza hasta ``reset_timeout``.
+    Semiabierto: pasa un solo intento de prueba; si funciona se cierra,
+    si falla se vuelve a abrir.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 10.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CERRADO
+        self.failures = 0
+        self.opened = 0
+        self._opened_at = 0.0
+        self._probe_at: Optional[float] = None
+
+    def allow(self) -> bool:
+        """Indica si se puede intentar usar la base de datos ahora"""
+        if self.state == CERRADO:
+            return True
+        now = time.monotonic()
+        if self.state == ABIERTO:
+            if now - self._opened_at < self.reset_timeout:
+                return False
+            self.state = SEMIABIERTO
+            logger.info("Circuito de la base de datos semiabierto: se prueba la conexión.")
+        # Un solo intento de prueba a la vez (uno que quedó colgado no bloquea para siempre)
+        if self._probe_at is not None and now - self._probe_at < self.reset_timeout:
+            return False
+        self._probe_at = now
+        return True
+
+    def record_success(self) -> None:
+        if self.state != CERRADO:
+            logger.info("Circuito de la base de datos cerrado: la conexión se recuperó.")
+        self.state = CERRADO
+        self.failures = 0
+        self._probe_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_at = None
+        if self.state == SEMIABIERTO or (self.state == CERRADO and self.failures >= self.failure_threshold):
+            if self.state == CERRADO:
+                logger.error(
+                    "Circuito de la base de datos abierto tras %s fallos de conexión seguidos.", self.failures
+                )
+            self.state = ABIERTO
+            self.opened += 1
+            self._opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"estado": self.state, "fallos_seguidos": self.failures, "aperturas": self.opened}
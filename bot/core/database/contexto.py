@@ -0,0 +1,39 @@
+"""
+Usuario de la interacción en curso, para el enrutado de lecturas
+La ventana read-your-writes de las réplicas se abre y se consulta por
+usuario. Cada punto de entrada de una interacción (comandos, modales y
+botones) fija aquí el usuario, sin depender de la configuración de logs.
+"""
+
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+_usuario_db: ContextVar[Optional[int]] = ContextVar("usuario_db", default=None)
+
+
+@contextmanager
+def usuario_db(usuario_id: Optional[int]) -> Iterator[None]:
+    """Asocia ``usuario_id`` a las lecturas y escrituras hechas dentro del bloque"""
+    token = _usuario_db.set(usuario_id)
+    try:
+        yield
+    finally:
+        _usuario_db.reset(token)
+
+
+def usuario_actual() -> Optional[int]:
+    """Usuario de la interacción en curso (None fuera de una interacción)"""
+    return _usuario_db.get()
+
+
+def con_usuario_db(callback: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """Decorador para callbacks de vistas y modales con firma ``(self, interaction, ...)``"""
+    @functools.wraps(callback)
+    async def envuelto(self: Any, interaction: Any, *args: Any, **kwargs: Any) -> T:
+        with usuario_db(getattr(getattr(interaction, "user", None), "id", None)):
+            return await callback(self, interaction, *args, **kwargs)
+    return envuelto
@@ -0,0 +1,138 @@
+"""
+Diario local de escrituras
+Mientras la base de datos no está disponible, las escrituras idempotentes
+(entrada, salida, recuperación) se agregan a un archivo JSON Lines con
+fsync por registro. Al volver la conexión se aplican en el mismo orden.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, List, Sequence, Tuple
+
+from .registry import Query, get_query_registry
+
+logger = logging.getLogger(__name__)
+
+Executor = Callable[[Query, Tuple[Any, ...]], Awaitable[Any]]
+
+
+def _codificar(valor: Any) -> Any:
+    """Fechas y horas como objetos etiquetados; el resto tal cual (JSON)"""
+    if isinstance(valor, datetime):
+        return {"fechahora": valor.isoformat()}
+    if isinstance(valor, date):
+        return {"fecha": valor.isoformat()}
+    if isinstance(valor, time):
+        return {"hora": valor.isoformat()}
+    return valor
+
+
+def _decodificar(valor: Any) -> Any:
+    if isinstance(valor, dict):
+        if "fechahora" in valor:
+            return datetime.fromisoformat(valor["fechahora"])
+        if "fecha" in valor:
+            return date.fromisoformat(valor["fecha"])
+        if "hora" in valor:
+            return time.fromisoformat(valor["hora"])
+    return valor
+
+
+def _contar_lineas(ruta: Path) -> int:
+    if not ruta.exists():
+        return 0
+    with ruta.open("rb") as archivo:
+        return sum(1 for linea in archivo if linea.strip())
+
+
+class WriteJournal:
+    """
+    Diario de escrituras pendientes
+
+    Cada registro guarda el nombre de una consulta registrada y sus
+    parámetros, así que solo admite consultas del registro. Al reproducir,
+    el archivo se renombra (``.reproduciendo``) y lo que llegue mientras
+    tanto va a un archivo nuevo que se procesa después, sin alterar el orden.
+    Las consultas deben ser idempotentes: si la reproducción se corta, se
+    repite completa.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.replay_path = self.path.with_name(self.path.name + ".reproduciendo")
+        self._lock = asyncio.Lock()
+        self._replay_lock = asyncio.Lock()
+        self.pending = _contar_lineas(self.path) + _contar_lineas(self.replay_path)
+        self.replayed = 0
+
+    def _escribir(self, linea: bytes) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("ab") as archivo:
+            archivo.write(linea)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+
+    async def append(self, query: Query, params: Sequence[Any]) -> None:
+        """Agrega una escritura y espera a que esté en disco"""
+        if query.name not in get_query_registry():
+            raise ValueError(f"Solo se pueden diferir consultas registradas: {query.name}")
+        linea = json.dumps(
+            {"consulta": query.name, "params": [_codificar(p) for p in params]},
+            ensure_ascii=False,
+        ).encode("utf-8") + b"\n"
+        async with self._lock:
+            # El fsync bloquea: se hace en un hilo para no frenar el event loop
+            await asyncio.to_thread(self._escribir, linea)
+            self.pending += 1
+
+    def _leer(self) -> List[Tuple[Query, Tuple[Any, ...]]]:
+        registry = get_query_registry()
+        entradas = []
+        with self.replay_path.open("rb") as archivo:
+            for numero, linea in enumerate(archivo, start=1):
+                if not linea.strip():
+                    continue
+                try:
+                    registro = json.loads(linea)
+                    query = registry.get(registro["consulta"])
+                except (ValueError, KeyError) as e:
+                    # Una línea cortada por una caída a mitad de escritura no se pudo confirmar al usuario
+                    logger.error("Registro %s del diario ilegible, se omite: %s", numero, e)
+                    continue
+                entradas.append((query, tuple(_decodificar(p) for p in registro["params"])))
+        return entradas
+
+    async def replay(self, execute: Executor) -> int:
+        """
+        Aplica en orden las escrituras pendientes
+
+        Si ``execute`` falla, la reproducción se detiene (la excepción se
+        propaga) y los registros quedan para el siguiente intento.
+
+        Returns:
+            Número de escrituras aplicadas
+        """
+        aplicadas = 0
+        async with self._replay_lock:
+            while True:
+                async with self._lock:
+                    if not self.replay_path.exists():
+                        if not self.path.exists():
+                            self.pending = 0
+                            return aplicadas
+                        os.replace(self.path, self.replay_path)
+
+                entradas = await asyncio.to_thread(self._leer)
+                for query, params in entradas:
+                    await execute(query, params)
+                    aplicadas += 1
+                    self.replayed += 1
+                self.replay_path.unlink()
+                async with self._lock:
+                    self.pending = _contar_lineas(self.path)
+                if entradas:
+                    logger.info("Diario de escrituras: %s registros aplicados.", len(entradas))
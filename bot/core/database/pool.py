@@ -0,0 +1,245 @@
+"""
+Control del pool de conexiones
+Timeouts de adquisición, pre-calentamiento y ajuste adaptativo del tamaño
+según la espera medida para obtener una conexión
+"""
+
+import asyncio
+import collections
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import aiomysql
+
+from bot.core.exceptions.database import DatabasePoolTimeoutError
+from bot.core.metrics import LatencyHistogram, sumar_tiempo_db
+
+logger = logging.getLogger(__name__)
+
+# Buckets de espera por conexión, en milisegundos
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2000)
+
+
+# Atributos privados de aiomysql.Pool que usa resize_pool. Probado con
+# aiomysql 0.3.x (versión fijada en requirements.txt)
+_ATRIBUTOS_POOL = ("_free", "_cond")
+
+# Tareas que despiertan a quienes esperan conexión tras agrandar un pool
+_despertares: set = set()
+
+
+def _despertar(pool: aiomysql.Pool) -> None:
+    """Avisa a las adquisiciones bloqueadas en ``pool._cond`` de que hay capacidad nueva"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # sin event loop no hay nadie esperando
+
+    async def notificar() -> None:
+        async with pool._cond:
+            pool._cond.notify_all()
+
+    tarea = loop.create_task(notificar())
+    _despertares.add(tarea)
+    tarea.add_done_callback(_despertares.discard)
+
+
+def resize_pool(pool: aiomysql.Pool, maxsize: int) -> bool:
+    """
+    Cambia el tamaño máximo de un pool de aiomysql en caliente
+
+    aiomysql no expone una API pública para esto: el máximo es el ``maxlen``
+    de la cola de conexiones libres. Al reducir, las conexiones libres que
+    sobran se cierran (la deque las descartaría sin cerrarlas) y nunca se
+    baja de las conexiones en uso, que deben caber al volver al pool. Al
+    crecer se despierta a quien ya esperaba una conexión, que si no seguiría
+    bloqueado hasta la próxima devolución.
+
+    Returns:
+        False si el pool no tiene la estructura esperada (otra versión de
+        aiomysql) y no se cambió
+    """
+    if not all(hasattr(pool, atributo) for atributo in _ATRIBUTOS_POOL):
+        logger.warning(
+            "No se puede redimensionar el pool: aiomysql %s no tiene la estructura esperada.",
+            getattr(aiomysql, "__version__", "?"),
+        )
+        return False
+    in_use = pool.size - pool.freesize
+    maxsize = max(maxsize, pool.minsize, in_use, 1)
+    crece = maxsize > pool.maxsize
+    free = pool._free
+    while free and len(free) + in_use > maxsize:
+        free.popleft().close()
+    pool._free = collections.deque(free, maxlen=maxsize)
+    if crece:
+        _despertar(pool)
+    return True
+
+
+class PoolController:
+    """
+    Envoltorio de adquisición sobre un pool de aiomysql
+
+    Mide la espera de cada adquisición, aplica un tiempo límite y, si está
+    habilitado, ajusta ``maxsize`` entre ``base_size`` (el máximo configurado)
+    y ``max_limit``.
+    """
+
+    def __init__(
+        self,
+        acquire_timeout: float = 2.0,
+        base_size: int = 10,
+        max_limit: int = 30,
+        grow_wait_ms: float = 50.0,
+        shrink_wait_ms: float = 5.0,
+        step: int = 2,
+        adaptive: bool = True,
+    ):
+        self.acquire_timeout = acquire_timeout
+        self.base_size = base_size
+        self.max_limit = max_limit
+        self.grow_wait_ms = grow_wait_ms
+        self.shrink_wait_ms = shrink_wait_ms
+        self.step = step
+        self.adaptive = adaptive
+        self.pool: Optional[aiomysql.Pool] = None
+        self.wait = LatencyHistogram(WAIT_BUCKETS_MS)
+        self._window = LatencyHistogram(WAIT_BUCKETS_MS)
+        self._window_peak = 0
+        self._window_timeouts = 0
+        self.timeouts = 0
+
+    def attach(self, pool: aiomysql.Pool) -> None:
+        """Asocia el pool a controlar"""
+        self.pool = pool
+
+    @property
+    def in_use(self) -> int:
+        if self.pool is None:
+            return 0
+        return self.pool.size - self.pool.freesize
+
+    def _observe(self, wait_ms: float) -> None:
+        sumar_tiempo_db(wait_ms)
+        self.wait.observe(wait_ms)
+        self._window.observe(wait_ms)
+        self._window_peak = max(self._window_peak, self.in_use)
+
+    async def acquire(self) -> aiomysql.Connection:
+        """
+        Obtiene una conexión respetando el tiempo límite
+
+        Raises:
+            DatabasePoolTimeoutError: Si no hay conexión libre a tiempo
+        """
+        start = time.perf_counter()
+        try:
+            conn = await asyncio.wait_for(self.pool.acquire(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError as e:
+            self.timeouts += 1
+            self._window_timeouts += 1
+            self._observe((time.perf_counter() - start) * 1000)
+            raise DatabasePoolTimeoutError(
+                f"No hay conexiones libres tras {self.acquire_timeout}s",
+                details=f"en uso={self.in_use}, máximo={self.pool.maxsize}"
+            ) from e
+        self._observe((time.perf_counter() - start) * 1000)
+        return conn
+
+    async def release(self, conn: aiomysql.Connection) -> None:
+        """
+        Devuelve una conexión al pool
+
+        aiomysql cierra las conexiones que vuelven con una transacción
+        abierta, y con autocommit desactivado cualquier SELECT abre una.
+        Se hace rollback antes para que la conexión se reutilice.
+        """
+        if not conn.closed and conn.get_transaction_status():
+            try:
+                await conn.rollback()
+            except aiomysql.Error:
+                conn.close()
+        self.pool.release(conn)
+
+    async def prewarm(self, size: int) -> int:
+        """
+        Abre conexiones por adelantado hasta tener ``size`` en el pool
+
+        Las adquisiciones van directo al pool: no cuentan como espera ni
+        como timeouts para ``adjust``. Nunca se piden más conexiones de las
+        que quedan libres o por abrir, para no esperar a las que están en uso.
+
+        Returns:
+            Tamaño del pool tras el pre-calentamiento
+        """
+        if self.pool is None:
+            return 0
+        if size > self.pool.maxsize:
+            resize_pool(self.pool, min(size, self.max_limit))
+        faltan = min(size, self.pool.maxsize) - self.pool.size
+        if faltan <= 0:
+            return self.pool.size
+        # Las libres se toman primero, así que hay que tomarlas también para que se abran nuevas
+        cantidad = min(faltan + self.pool.freesize, self.pool.maxsize - self.in_use)
+
+        results = await asyncio.gather(
+            *(asyncio.wait_for(self.pool.acquire(), timeout=self.acquire_timeout) for _ in range(cantidad)),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.warning("No se pudo pre-calentar una conexión: %s", result)
+            else:
+                await self.release(result)
+        return self.pool.size
+
+    def adjust(self) -> Optional[int]:
+        """
+        Ajusta ``maxsize`` según la espera de la última ventana
+
+        Crece si el p95 de espera supera ``grow_wait_ms`` y se reduce si
+        es menor que ``shrink_wait_ms`` y el pico de uso quedó holgado.
+
+        Returns:
+            Nuevo tamaño máximo, o None si no hubo cambio
+        """
+        if not self.adaptive or self.pool is None:
+            return None
+
+        window, peak, timeouts = self._window, self._window_peak, self._window_timeouts
+        self._window = LatencyHistogram(WAIT_BUCKETS_MS)
+        self._window_peak = self.in_use
+        self._window_timeouts = 0
+        if not window.count:
+            return None
+
+        current = self.pool.maxsize
+        p95 = window.percentile(95)
+        target = current
+        if (p95 >= self.grow_wait_ms or timeouts) and current < self.max_limit:
+            target = min(self.max_limit, current + self.step)
+        elif p95 <= self.shrink_wait_ms and peak + self.step < current and current > self.base_size:
+            target = max(self.base_size, current - self.step)
+
+        if target == current:
+            return None
+        if not resize_pool(self.pool, target):
+            return None
+        logger.info(
+            "Pool de conexiones ajustado de %s a %s (p95 espera %s ms, pico en uso %s).", current, target, p95, peak
+        )
+        return target
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado del pool para métricas"""
+        pool = self.pool
+        return {
+            "tamano": pool.size if pool else 0,
+            "maximo": pool.maxsize if pool else 0,
+            "libres": pool.freesize if pool else 0,
+            "en_uso": self.in_use,
+            "timeouts": self.timeouts,
+            "espera": self.wait.snapshot(),
+        }
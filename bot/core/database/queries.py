@@ -0,0 +1,366 @@
+"""
+Consultas SQL con nombre usadas por el bot
+Centralizarlas aquí permite medir latencia, filas y errores por consulta
+"""
+
+from bot.config.constants import HORA_LIMITE_TARDANZA
+from .registry import Query, get_query_registry
+
+_registry = get_query_registry()
+
+
+# Practicantes
+PRACTICANTE_POR_DISCORD = _registry.register(
+    "practicante.por_discord",
+    "SELECT id FROM Practicante WHERE id_discord = %s",
+)
+
+PRACTICANTES_ROSTER = _registry.register(
+    "practicante.roster",
+    "SELECT id, id_discord FROM Practicante WHERE id_discord IS NOT NULL",
+)
+
+
+# Estados de asistencia
+ESTADO_POR_NOMBRE = _registry.register(
+    "estado.por_nombre",
+    "SELECT id FROM Estado_Asistencia WHERE estado = %s",
+)
+
+ESTADOS_CATALOGO = _registry.register(
+    "estado.catalogo",
+    "SELECT id, estado FROM Estado_Asistencia",
+)
+
+
+# Políticas por servidor (canales habilitados y roles de recuperación)
+POLITICAS_VERSION = _registry.register(
+    "politicas.version",
+    "SELECT COUNT(*) AS filas, MAX(updated_at) AS actualizado FROM Politica_Servidor",
+)
+
+POLITICAS_SERVIDOR = _registry.register(
+    "politicas.todas",
+    "SELECT guild_id, tipo, objetivo_id FROM Politica_Servidor",
+)
+
+
+# Asistencia
+ASISTENCIA_INSERTAR_LOTE = "asistencia.insertar_lote"
+
+# Una sola entrada (reproducción del diario local); como el lote, ignora duplicados
+ASISTENCIA_INSERTAR = _registry.register(
+    "asistencia.insertar",
+    """
+    INSERT INTO Asistencia (practicante_id, fecha, hora_entrada, estado_id)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE practicante_id = practicante_id
+    """,
+)
+
+ASISTENCIA_DIA = _registry.register(
+    "asistencia.dia",
+    """
+    SELECT id, practicante_id, hora_entrada, hora_salida, estado_id
+    FROM Asistencia
+    WHERE fecha = %s
+    """,
+)
+
+ASISTENCIA_HOY = _registry.register(
+    "asistencia.hoy",
+    """
+    SELECT id, hora_entrada, hora_salida, estado_id
+    FROM Asistencia
+    WHERE practicante_id = %s AND fecha = %s
+    """,
+)
+
+# Las salidas se actualizan por la clave única (practicante_id, fecha) y solo
+# si no había salida: 0 filas afectadas = ya registrada (o sin entrada)
+ASISTENCIA_REGISTRAR_SALIDA = _registry.register(
+    "asistencia.registrar_salida",
+    """
+    UPDATE Asistencia SET hora_salida = %s
+    WHERE practicante_id = %s AND fecha = %s AND hora_salida IS NULL
+    """,
+)
+
+ASISTENCIA_SALIDA_ANTICIPADA = _registry.register(
+    "asistencia.salida_anticipada",
+    """
+    UPDATE Asistencia
+    SET hora_salida = %s, estado_id = %s, motivo = %s
+    WHERE practicante_id = %s AND fecha = %s AND hora_salida IS NULL
+    """,
+)
+
+# Lecturas por Discord ID: Practicante LEFT JOIN datos en una sola consulta.
+# Sin filas = no registrado; columnas del JOIN en NULL = registrado sin datos
+ASISTENCIA_ESTADO_DIA_POR_DISCORD = _registry.register(
+    "asistencia.estado_dia",
+    """
+    SELECT p.id AS practicante_id, a.id AS asistencia_id,
+           a.hora_entrada, a.hora_salida, a.estado_id
+    FROM Practicante p
+    LEFT JOIN Asistencia a ON a.practicante_id = p.id AND a.fecha = %s
+    WHERE p.id_discord = %s
+    """,
+)
+
+# Historiales paginados por keyset sobre (practicante_id, fecha): la primera
+# página sale junto con el practicante, las siguientes con fecha < cursor
+ASISTENCIA_HISTORIAL_POR_DISCORD = _registry.register(
+    "asistencia.historial",
+    """
+    SELECT p.id AS practicante_id, date_format(a.fecha, '%%m-%%d') as fecha, a.fecha AS fecha_clave,
+           a.hora_entrada, a.hora_salida, a.estado_id
+    FROM Practicante p
+    LEFT JOIN Asistencia a ON a.practicante_id = p.id AND a.fecha >= %s
+    WHERE p.id_discord = %s
+    ORDER BY a.fecha DESC
+    LIMIT %s
+    """,
+)
+
+ASISTENCIA_HISTORIAL_PAGINA = _registry.register(
+    "asistencia.historial_pagina",
+    """
+    SELECT date_format(fecha, '%%m-%%d') as fecha, fecha AS fecha_clave,
+           hora_entrada, hora_salida, estado_id
+    FROM Asistencia
+    WHERE practicante_id = %s AND fecha >= %s AND fecha < %s
+    ORDER BY fecha DESC
+    LIMIT %s
+    """,
+)
+
+
+# Exportación por rango de fechas; se lee con stream() (cursor sin buffer)
+ASISTENCIA_REPORTE = _registry.register(
+    "asistencia.reporte",
+    """
+    SELECT a.fecha, p.id AS practicante_id, p.id_discord,
+           a.hora_entrada, a.hora_salida, e.estado, a.motivo
+    FROM Asistencia a
+    JOIN Practicante p ON p.id = a.practicante_id
+    LEFT JOIN Estado_Asistencia e ON e.id = a.estado_id
+    WHERE a.fecha BETWEEN %s AND %s
+    ORDER BY a.fecha, a.practicante_id
+    """,
+)
+
+
+# Faltas
+FALTAS_ULTIMAS_POR_DISCORD = _registry.register(
+    "faltas.ultimas",
+    """
+    SELECT p.id AS practicante_id, date_format(a.fecha, '%%m-%%d') as fecha, a.motivo
+    FROM Practicante p
+    LEFT JOIN Asistencia a ON a.practicante_id = p.id AND a.estado_id = %s
+    WHERE p.id_discord = %s
+    ORDER BY a.fecha DESC
+    LIMIT 5
+    """,
+)
+
+
+def faltas_materializar(dias: int) -> Query:
+    """
+    INSERT ... SELECT de las faltas injustificadas de ``dias`` fechas
+
+    Crea en una sola sentencia una fila de Asistencia por cada practicante
+    y fecha sin registro, solo desde su primera asistencia (para no marcar
+    faltas antes de que empezara). Es idempotente: las fechas ya cubiertas
+    no producen filas y la clave única descarta carreras con entradas tardías.
+    Parámetros: estado_id y luego las ``dias`` fechas.
+    """
+    fechas = " UNION ALL ".join(["SELECT CAST(%s AS DATE) AS fecha"] * dias)
+    return Query(
+        "faltas.materializar",
+        f"""
+    INSERT INTO Asistencia (practicante_id, fecha, estado_id)
+    SELECT p.id, d.fecha, %s
+    FROM Practicante p
+    JOIN (SELECT practicante_id, MIN(fecha) AS desde FROM Asistencia GROUP BY practicante_id) ini
+      ON ini.practicante_id = p.id
+    JOIN ({fechas}) d ON d.fecha >= ini.desde
+    LEFT JOIN Asistencia a ON a.practicante_id = p.id AND a.fecha = d.fecha
+    WHERE p.id_discord IS NOT NULL AND a.id IS NULL
+    ON DUPLICATE KEY UPDATE practicante_id = Asistencia.practicante_id
+    """,
+    )
+
+
+# Recuperación
+RECUPERACION_INSERTAR = _registry.register(
+    "recuperacion.insertar",
+    """
+    INSERT INTO Recuperacion (practicante_id, fecha, hora_entrada)
+    VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE practicante_id = practicante_id
+    """,
+)
+
+RECUPERACION_HISTORIAL_POR_DISCORD = _registry.register(
+    "recuperacion.historial",
+    """
+    SELECT p.id AS practicante_id, date_format(r.fecha, '%%m-%%d') as fecha, r.fecha AS fecha_clave,
+           r.hora_entrada, r.hora_salida
+    FROM Practicante p
+    LEFT JOIN Recuperacion r ON r.practicante_id = p.id AND r.fecha >= %s
+    WHERE p.id_discord = %s
+    ORDER BY r.fecha DESC
+    LIMIT %s
+    """,
+)
+
+RECUPERACION_HISTORIAL_PAGINA = _registry.register(
+    "recuperacion.historial_pagina",
+    """
+    SELECT date_format(fecha, '%%m-%%d') as fecha, fecha AS fecha_clave, hora_entrada, hora_salida
+    FROM Recuperacion
+    WHERE practicante_id = %s AND fecha >= %s AND fecha < %s
+    ORDER BY fecha DESC
+    LIMIT %s
+    """,
+)
+
+
+# Resumen mensual por practicante (Resumen_Asistencia_Mensual, mes = primer día).
+# Los pasos incrementales se aplican en la transacción de cada escritura (ver
+# resumen.py) y leen la fila ya guardada, con las mismas expresiones que la
+# reconstrucción completa
+_MES = "DATE_FORMAT(fecha, '%%Y-%%m-01')"
+_PRESENTE = f"COALESCE(hora_entrada <= '{HORA_LIMITE_TARDANZA}', 0)"
+_TARDANZA = f"COALESCE(hora_entrada > '{HORA_LIMITE_TARDANZA}', 0)"
+_MINUTOS = "COALESCE(GREATEST(TIME_TO_SEC(TIMEDIFF(hora_salida, hora_entrada)) DIV 60, 0), 0)"
+
+RESUMEN_SUMAR = _registry.register(
+    "resumen.sumar",
+    """
+    INSERT INTO Resumen_Asistencia_Mensual
+        (practicante_id, mes, presentes, tardanzas, salidas_anticipadas, faltas, recuperaciones, minutos_trabajados)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        presentes = presentes + VALUES(presentes),
+        tardanzas = tardanzas + VALUES(tardanzas),
+        salidas_anticipadas = salidas_anticipadas + VALUES(salidas_anticipadas),
+        faltas = faltas + VALUES(faltas),
+        recuperaciones = recuperaciones + VALUES(recuperaciones),
+        minutos_trabajados = minutos_trabajados + VALUES(minutos_trabajados)
+    """,
+)
+
+# Una salida solo cambia los minutos y, si es anticipada, ese contador:
+# antes de ella la fila no tenía hora_salida. Parámetros: anticipada (0/1), practicante_id, fecha
+RESUMEN_SUMAR_SALIDA = _registry.register(
+    "resumen.sumar_salida",
+    f"""
+    INSERT INTO Resumen_Asistencia_Mensual (practicante_id, mes, salidas_anticipadas, minutos_trabajados)
+    SELECT practicante_id, {_MES}, %s, {_MINUTOS}
+    FROM Asistencia
+    WHERE practicante_id = %s AND fecha = %s
+    ON DUPLICATE KEY UPDATE
+        salidas_anticipadas = salidas_anticipadas + VALUES(salidas_anticipadas),
+        minutos_trabajados = minutos_trabajados + VALUES(minutos_trabajados)
+    """,
+)
+
+# Las faltas solo las crea el registro nocturno: se recuentan los meses tocados.
+# Parámetros: estado_id de falta injustificada, desde (inclusive), hasta (exclusive)
+RESUMEN_RECONTAR_FALTAS = _registry.register(
+    "resumen.recontar_faltas",
+    f"""
+    INSERT INTO Resumen_Asistencia_Mensual (practicante_id, mes, faltas)
+    SELECT practicante_id, mes, faltas FROM (
+        SELECT practicante_id, {_MES} AS mes, COUNT(*) AS faltas
+        FROM Asistencia
+        WHERE estado_id = %s AND fecha >= %s AND fecha < %s
+        GROUP BY practicante_id, mes
+    ) AS f
+    ON DUPLICATE KEY UPDATE faltas = VALUES(faltas)
+    """,
+)
+
+RESUMEN_MES_POR_DISCORD = _registry.register(
+    "resumen.mes",
+    """
+    SELECT p.id AS practicante_id, r.mes, r.presentes, r.tardanzas, r.salidas_anticipadas,
+           r.faltas, r.recuperaciones, r.minutos_trabajados
+    FROM Practicante p
+    LEFT JOIN Resumen_Asistencia_Mensual r ON r.practicante_id = p.id AND r.mes = %s
+    WHERE p.id_discord = %s
+    """,
+)
+
+# Primer y último día con datos en las tablas de origen o en el propio resumen
+# (así una reconstrucción completa también borra contadores de meses ya sin registros)
+RESUMEN_RANGO = _registry.register(
+    "resumen.rango",
+    """
+    SELECT MIN(fecha) AS desde, MAX(fecha) AS hasta
+    FROM (
+        SELECT MIN(fecha) AS fecha FROM Asistencia
+        UNION ALL SELECT MAX(fecha) FROM Asistencia
+        UNION ALL SELECT MIN(fecha) FROM Recuperacion
+        UNION ALL SELECT MAX(fecha) FROM Recuperacion
+        UNION ALL SELECT MIN(mes) FROM Resumen_Asistencia_Mensual
+        UNION ALL SELECT MAX(mes) FROM Resumen_Asistencia_Mensual
+    ) AS limites
+    """,
+)
+
+RESUMEN_BORRAR_RANGO = _registry.register(
+    "resumen.borrar_rango",
+    "DELETE FROM Resumen_Asistencia_Mensual WHERE mes >= %s AND mes < %s",
+)
+
+# Reconstrucción completa de los meses en [desde, hasta).
+# Parámetros: estado_id de salida anticipada, estado_id de falta injustificada,
+# desde y hasta para Asistencia, y desde y hasta para Recuperacion
+RESUMEN_RECONSTRUIR = _registry.register(
+    "resumen.reconstruir",
+    f"""
+    INSERT INTO Resumen_Asistencia_Mensual
+        (practicante_id, mes, presentes, tardanzas, salidas_anticipadas, faltas, recuperaciones, minutos_trabajados)
+    SELECT practicante_id, mes, SUM(presentes), SUM(tardanzas), SUM(salidas_anticipadas),
+           SUM(faltas), SUM(recuperaciones), SUM(minutos)
+    FROM (
+        SELECT practicante_id, {_MES} AS mes, {_PRESENTE} AS presentes, {_TARDANZA} AS tardanzas,
+               COALESCE(estado_id = %s, 0) AS salidas_anticipadas, COALESCE(estado_id = %s, 0) AS faltas,
+               0 AS recuperaciones, {_MINUTOS} AS minutos
+        FROM Asistencia
+        WHERE fecha >= %s AND fecha < %s
+        UNION ALL
+        SELECT practicante_id, {_MES}, 0, 0, 0, 0, 1, 0
+        FROM Recuperacion
+        WHERE fecha >= %s AND fecha < %s
+    ) AS filas
+    GROUP BY practicante_id, mes
+    """,
+)
+
+
+def resumen_sumar_entradas(filas: int) -> Query:
+    """
+    Suma al resumen las entradas recién insertadas de ``filas`` claves
+    (practicante_id, fecha), con un solo INSERT ... SELECT para todo un lote.
+    Parámetros: practicante_id y fecha de cada fila, en orden.
+    """
+    claves = ", ".join(["(%s, %s)"] * filas)
+    return Query(
+        "resumen.sumar_entradas",
+        f"""
+    INSERT INTO Resumen_Asistencia_Mensual (practicante_id, mes, presentes, tardanzas)
+    SELECT practicante_id, mes, presentes, tardanzas FROM (
+        SELECT practicante_id, {_MES} AS mes, SUM({_PRESENTE}) AS presentes, SUM({_TARDANZA}) AS tardanzas
+        FROM Asistencia
+        WHERE (practicante_id, fecha) IN ({claves})
+        GROUP BY practicante_id, mes
+    ) AS e
+    ON DUPLICATE KEY UPDATE
+        presentes = presentes + VALUES(presentes),
+        tardanzas = tardanzas + VALUES(tardanzas)
+    """,
+    )
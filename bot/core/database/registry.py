@@ -0,0 +1,143 @@
+"""
+Registro de consultas con nombre y estadísticas por consulta
+Permite saber qué consulta consume el tiempo de base de datos sin un profiler
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from bot.core.metrics import LatencyHistogram, sumar_tiempo_db
+
+# Nombre con el que se agrupan las consultas que no están registradas
+ADHOC = "adhoc"
+
+
+class Query(str):
+    """
+    SQL con nombre
+
+    Es un ``str``, así que puede pasarse tal cual a ``cursor.execute``;
+    el nombre solo se usa para agrupar estadísticas.
+    """
+
+    name: str
+
+    def __new__(cls, name: str, sql: str) -> "Query":
+        obj = super().__new__(cls, sql)
+        obj.name = name
+        return obj
+
+
+def query_name(query: str) -> str:
+    """Nombre de una consulta, o ``adhoc`` si es un string sin registrar"""
+    return getattr(query, "name", ADHOC)
+
+
+class QueryStats:
+    """Estadísticas acumuladas de una consulta"""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.latency = LatencyHistogram()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "llamadas": self.calls,
+            "errores": self.errors,
+            "filas": self.rows,
+            "latencia": self.latency.snapshot(),
+        }
+
+
+class _Tracker:
+    """Acumulador de una ejecución; el llamador indica las filas obtenidas"""
+
+    __slots__ = ("rows",)
+
+    def __init__(self) -> None:
+        self.rows = 0
+
+
+class QueryRegistry:
+    """Catálogo de consultas con nombre y sus estadísticas"""
+
+    def __init__(self) -> None:
+        self._queries: Dict[str, Query] = {}
+        self._stats: Dict[str, QueryStats] = {}
+
+    def register(self, name: str, sql: str) -> Query:
+        """
+        Registra una consulta con nombre
+
+        Raises:
+            ValueError: Si el nombre ya existe con otro SQL
+        """
+        existing = self._queries.get(name)
+        if existing is not None and str(existing) != sql:
+            raise ValueError(f"La consulta '{name}' ya está registrada con otro SQL")
+        query = Query(name, sql)
+        self._queries[name] = query
+        return query
+
+    def get(self, name: str) -> Query:
+        """Obtiene una consulta registrada por su nombre"""
+        return self._queries[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._queries
+
+    def stats(self, name: str) -> QueryStats:
+        """Estadísticas de una consulta (se crean al primer uso)"""
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = QueryStats()
+        return stats
+
+    def record(self, name: str, elapsed_ms: float, rows: int = 0, error: bool = False) -> None:
+        """Registra una ejecución"""
+        stats = self.stats(name)
+        stats.calls += 1
+        stats.rows += rows
+        stats.latency.observe(elapsed_ms)
+        if error:
+            stats.errors += 1
+
+    @contextmanager
+    def track(self, query: str) -> Iterator[_Tracker]:
+        """Mide una ejecución; si el bloque lanza una excepción se cuenta como error"""
+        tracker = _Tracker()
+        start = time.perf_counter()
+        error = False
+        try:
+            yield tracker
+        except BaseException:
+            error = True
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.record(query_name(query), elapsed_ms, tracker.rows, error)
+            # Se suma al comando en curso para el desglose de latencia por fases
+            sumar_tiempo_db(elapsed_ms)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Estadísticas de todas las consultas ejecutadas, por nombre"""
+        return {name: stats.snapshot() for name, stats in self._stats.items()}
+
+    def reset(self) -> None:
+        """Reinicia las estadísticas (las consultas registradas se conservan)"""
+        self._stats.clear()
+
+
+# Instancia global del registro
+_registry: Optional[QueryRegistry] = None
+
+
+def get_query_registry() -> QueryRegistry:
+    """Obtiene el registro de consultas (singleton)"""
+    global _registry
+    if _registry is None:
+        _registry = QueryRegistry()
+    return _registry
@@ -0,0 +1,243 @@
+"""
+Réplicas de lectura
+Las escrituras y transacciones van al primario y las lecturas a una réplica
+sana. Tras una escritura, las lecturas del mismo usuario se quedan en el
+primario durante una ventana corta (read-your-writes). Una réplica que se
+atrasa demasiado o no responde deja de usarse hasta la siguiente revisión.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiomysql
+
+from bot.core.exceptions.database import DatabasePoolTimeoutError
+from .contexto import usuario_actual
+from .pool import PoolController
+
+logger = logging.getLogger(__name__)
+
+# Estado de replicación: sintaxis nueva (MySQL 8.0.22+, MariaDB 10.5+) y la anterior
+_CONSULTAS_ESTADO = ("SHOW REPLICA STATUS", "SHOW SLAVE STATUS")
+_COLUMNAS_RETRASO = ("Seconds_Behind_Source", "Seconds_Behind_Master")
+
+# Usuarios con ventana registrada a partir de los cuales se purgan las vencidas
+_MAX_VENTANAS = 1000
+
+
+def parse_hosts(valor: str, puerto: int) -> List[Tuple[str, int]]:
+    """Convierte ``"replica1:3307,replica2"`` en ``[("replica1", 3307), ("replica2", puerto)]``"""
+    hosts = []
+    for parte in valor.replace(" ", "").split(","):
+        if not parte:
+            continue
+        host, _, port = parte.partition(":")
+        hosts.append((host, int(port) if port else puerto))
+    return hosts
+
+
+async def medir_retraso(conn: aiomysql.Connection) -> Optional[float]:
+    """
+    Segundos de retraso de replicación de la conexión
+
+    Returns:
+        El retraso; 0.0 si el servidor no es réplica (p. ej. una instancia
+        de prueba), o None si la replicación está detenida
+    """
+    async with conn.cursor(aiomysql.DictCursor) as cursor:
+        try:
+            await cursor.execute(_CONSULTAS_ESTADO[0])
+        except aiomysql.ProgrammingError:
+            await cursor.execute(_CONSULTAS_ESTADO[1])
+        row = await cursor.fetchone()
+    if row is None:
+        return 0.0
+    for columna in _COLUMNAS_RETRASO:
+        if columna in row:
+            return None if row[columna] is None else float(row[columna])
+    return None
+
+
+class Replica:
+    """Una réplica con su propio pool y su último estado medido"""
+
+    def __init__(self, host: str, port: int, controller: PoolController):
+        self.host = host
+        self.port = port
+        self.nombre = f"{host}:{port}"
+        self.controller = controller
+        self.retraso_s: Optional[float] = None
+        self.sana = False
+        self.fallos = 0
+
+    async def conectar(self, config: Dict[str, Any], minsize: int, maxsize: int) -> None:
+        """Crea el pool de la réplica (si aún no existe)"""
+        if self.controller.pool is None:
+            pool = await aiomysql.create_pool(
+                minsize=minsize,
+                maxsize=maxsize,
+                **{**config, "host": self.host, "port": self.port},
+            )
+            self.controller.attach(pool)
+
+    async def cerrar(self) -> None:
+        pool = self.controller.pool
+        if pool is not None:
+            pool.close()
+            await pool.wait_closed()
+            self.controller.pool = None
+
+    def marcar_caida(self, motivo: Any) -> None:
+        """Deja de usar la réplica hasta que una revisión la encuentre sana"""
+        self.fallos += 1
+        if self.sana:
+            logger.warning("Réplica %s fuera de uso: %s", self.nombre, motivo)
+        self.sana = False
+
+
+class LecturasPegajosas:
+    """Ventana read-your-writes: usuario -> instante hasta el que lee del primario"""
+
+    def __init__(self, ventana_s: float):
+        self.ventana_s = ventana_s
+        self._hasta: Dict[int, float] = {}
+
+    def marcar(self, usuario_id: Optional[int]) -> None:
+        if usuario_id is None or self.ventana_s <= 0:
+            return
+        ahora = time.monotonic()
+        if len(self._hasta) >= _MAX_VENTANAS:
+            self._hasta = {u: hasta for u, hasta in self._hasta.items() if hasta > ahora}
+        self._hasta[usuario_id] = ahora + self.ventana_s
+
+    def activa(self, usuario_id: Optional[int]) -> bool:
+        hasta = self._hasta.get(usuario_id)
+        return hasta is not None and time.monotonic() < hasta
+
+
+class ReplicaRouter:
+    """
+    Decide a dónde va cada lectura
+
+    El usuario es el de la interacción en curso (``contexto_log``); fuera de
+    un comando no hay ventana y la lectura va a una réplica, salvo que quien
+    llama pida el primario.
+    """
+
+    def __init__(self, replicas: List[Replica], max_retraso_s: float = 2.0, ventana_s: float = 5.0):
+        self.replicas = replicas
+        self.max_retraso_s = max_retraso_s
+        self.pegajosas = LecturasPegajosas(ventana_s)
+        self._siguiente = 0
+        self._config: Optional[Tuple[Dict[str, Any], int, int]] = None
+        self.lecturas = {"replica": 0, "primario": 0, "pegajosas": 0}
+
+    @classmethod
+    def desde_settings(cls, settings: Any) -> Optional["ReplicaRouter"]:
+        """Router con las réplicas configuradas, o None si no hay"""
+        hosts = parse_hosts(settings.DB_REPLICA_HOSTS, settings.DB_PORT)
+        if not hosts:
+            return None
+        replicas = [
+            Replica(host, port, PoolController(
+                acquire_timeout=settings.DB_ACQUIRE_TIMEOUT,
+                base_size=settings.DB_REPLICA_POOL_MAXSIZE,
+                max_limit=settings.DB_REPLICA_POOL_MAXSIZE,
+                adaptive=False,
+            ))
+            for host, port in hosts
+        ]
+        return cls(replicas, settings.DB_REPLICA_MAX_LAG_S, settings.DB_READ_YOUR_WRITES_S)
+
+    async def iniciar(self, config: Dict[str, Any], minsize: int, maxsize: int) -> None:
+        """Crea los pools y mide el retraso; una réplica inaccesible no impide arrancar"""
+        self._config = (config, minsize, maxsize)
+        await self.revisar()
+
+    async def cerrar(self) -> None:
+        for replica in self.replicas:
+            await replica.cerrar()
+
+    def marcar_escritura(self) -> None:
+        """Abre la ventana read-your-writes del usuario en curso"""
+        self.pegajosas.marcar(usuario_actual())
+
+    def elegir(self) -> Optional[Replica]:
+        """Réplica para la siguiente lectura, o None si debe ir al primario"""
+        if self.pegajosas.activa(usuario_actual()):
+            self.lecturas["pegajosas"] += 1
+            return None
+        sanas = [replica for replica in self.replicas if replica.sana]
+        if not sanas:
+            self.lecturas["primario"] += 1
+            return None
+        replica = sanas[self._siguiente % len(sanas)]
+        self._siguiente += 1
+        self.lecturas["replica"] += 1
+        return replica
+
+    async def adquirir(self) -> Optional[Tuple[PoolController, aiomysql.Connection]]:
+        """
+        Conexión de réplica para una lectura
+
+        Returns:
+            (controlador, conexión), o None si la lectura debe ir al primario
+            (ventana activa, ninguna réplica sana, o la elegida no respondió)
+        """
+        replica = self.elegir()
+        if replica is None:
+            return None
+        try:
+            return replica.controller, await replica.controller.acquire()
+        except (DatabasePoolTimeoutError, aiomysql.Error, OSError) as e:
+            replica.marcar_caida(e)
+            self.lecturas["replica"] -= 1
+            self.lecturas["primario"] += 1
+            return None
+
+    async def revisar(self) -> None:
+        """Mide el retraso de cada réplica y actualiza cuáles se pueden usar"""
+        await asyncio.gather(*(self._revisar(replica) for replica in self.replicas))
+
+    async def _revisar(self, replica: Replica) -> None:
+        if self._config is None:
+            return
+        try:
+            await replica.conectar(*self._config)
+            conn = await replica.controller.acquire()
+            try:
+                retraso = await medir_retraso(conn)
+            finally:
+                await replica.controller.release(conn)
+        except Exception as e:
+            replica.retraso_s = None
+            replica.marcar_caida(e)
+            return
+
+        replica.retraso_s = retraso
+        sana = retraso is not None and retraso <= self.max_retraso_s
+        if sana and not replica.sana:
+            logger.info("Réplica %s en uso (retraso %s s).", replica.nombre, retraso)
+        elif not sana and replica.sana:
+            logger.warning(
+                "Réplica %s fuera de uso: retraso %s s (máximo %s s).",
+                replica.nombre, retraso, self.max_retraso_s,
+            )
+        replica.sana = sana
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado de las réplicas y reparto de lecturas para métricas"""
+        return {
+            "lecturas": dict(self.lecturas),
+            "replicas": {
+                replica.nombre: {
+                    "sana": replica.sana,
+                    "retraso_s": replica.retraso_s,
+                    "fallos": replica.fallos,
+                    "pool": replica.controller.snapshot(),
+                }
+                for replica in self.replicas
+            },
+        }
@@ -0,0 +1,90 @@
+"""
+Resumen mensual de asistencia por practicante
+Cada escritura de asistencia o recuperación suma su parte a
+Resumen_Asistencia_Mensual en la misma transacción, así que consultar un mes
+es leer una fila sin importar cuánta historia haya. ``scripts.reconstruir_resumen``
+recalcula los contadores desde las tablas de origen.
+"""
+
+from datetime import date, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+import aiomysql
+
+from . import queries
+from .registry import Query, get_query_registry
+
+Paso = Callable[[aiomysql.Cursor, Sequence[Any]], Awaitable[None]]
+
+CONTADORES = (
+    "presentes", "tardanzas", "salidas_anticipadas", "faltas", "recuperaciones", "minutos_trabajados",
+)
+
+
+def inicio_mes(fecha: date) -> date:
+    return fecha.replace(day=1)
+
+
+def mes_siguiente(fecha: date) -> date:
+    return (fecha.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+async def _ejecutar(cursor: aiomysql.Cursor, query: Query, params: Sequence[Any]) -> None:
+    with get_query_registry().track(query) as stats:
+        await cursor.execute(query, params)
+        stats.rows = cursor.rowcount
+
+
+async def sumar_entradas(cursor: aiomysql.Cursor, filas: Sequence[Tuple[Any, ...]]) -> None:
+    """Suma las entradas recién insertadas; cada fila empieza por (practicante_id, fecha)"""
+    if filas:
+        params = [valor for fila in filas for valor in fila[:2]]
+        await _ejecutar(cursor, queries.resumen_sumar_entradas(len(filas)), params)
+
+
+async def _entrada(cursor: aiomysql.Cursor, params: Sequence[Any]) -> None:
+    await sumar_entradas(cursor, [params])
+
+
+async def _salida(cursor: aiomysql.Cursor, params: Sequence[Any]) -> None:
+    # (hora_salida, practicante_id, fecha)
+    await _ejecutar(cursor, queries.RESUMEN_SUMAR_SALIDA, (0, params[1], params[2]))
+
+
+async def _salida_anticipada(cursor: aiomysql.Cursor, params: Sequence[Any]) -> None:
+    # (hora_salida, estado_id, motivo, practicante_id, fecha)
+    await _ejecutar(cursor, queries.RESUMEN_SUMAR_SALIDA, (1, params[3], params[4]))
+
+
+async def _recuperacion(cursor: aiomysql.Cursor, params: Sequence[Any]) -> None:
+    # (practicante_id, fecha, hora_entrada)
+    await _ejecutar(cursor, queries.RESUMEN_SUMAR, (params[0], inicio_mes(params[1]), 0, 0, 0, 0, 1, 0))
+
+
+async def _faltas(cursor: aiomysql.Cursor, params: Sequence[Any]) -> None:
+    # (estado_id, *fechas)
+    fechas = params[1:]
+    await _ejecutar(
+        cursor,
+        queries.RESUMEN_RECONTAR_FALTAS,
+        (params[0], inicio_mes(min(fechas)), mes_siguiente(max(fechas))),
+    )
+
+
+_PASOS: Dict[str, Paso] = {
+    queries.ASISTENCIA_INSERTAR.name: _entrada,
+    queries.ASISTENCIA_REGISTRAR_SALIDA.name: _salida,
+    queries.ASISTENCIA_SALIDA_ANTICIPADA.name: _salida_anticipada,
+    queries.RECUPERACION_INSERTAR.name: _recuperacion,
+    "faltas.materializar": _faltas,
+}
+
+
+def paso_resumen(query: Any) -> Optional[Paso]:
+    """
+    Actualización del resumen que acompaña a una escritura, o None
+
+    Se llama con el cursor de la escritura, antes del commit y solo si
+    afectó filas (un duplicado ignorado no suma nada).
+    """
+    return _PASOS.get(getattr(query, "name", None))
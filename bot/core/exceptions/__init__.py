@@ -1,7 +1,13 @@
 """Excepciones personalizadas del bot"""
 
 from .base import BotException
-from .database import DatabaseError, DatabaseConnectionError, DatabaseQueryError
+from .database import (
+    DatabaseError,
+    DatabaseConnectionError,
+    DatabaseQueryError,
+    DatabasePoolTimeoutError,
+    DatabaseUnavailableError,
+)
 from .validation import ValidationError, PermissionError, NotFoundError
 
 __all__ = [
@@ -9,6 +15,8 @@ __all__ = [
     "DatabaseError",
     "DatabaseConnectionError",
     "DatabaseQueryError",
+    "DatabasePoolTimeoutError",
+    "DatabaseUnavailableError",
     "ValidationError",
     "PermissionError",
     "NotFoundError",
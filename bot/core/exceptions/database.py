@@ -18,3 +18,11 @@ class DatabaseQueryError(DatabaseError):
     pass
 
 
+class DatabasePoolTimeoutError(DatabaseConnectionError):
+    """No se obtuvo una conexión del pool dentro del tiempo límite"""
+    pass
+
+
+class DatabaseUnavailableError(DatabaseConnectionError):
+    """El circuit breaker está abierto: se rechaza sin intentar conectar"""
+    pass
@@ -0,0 +1,16 @@
+"""Métricas internas del bot"""
+
+from .histogram import LatencyHistogram, DEFAULT_BUCKETS_MS
+from .serializer import MetricsSerializer, MetricsBatch
+from .commands import CommandMetrics, get_command_metrics, instrumentar_comandos, sumar_tiempo_db
+
+__all__ = [
+    "LatencyHistogram",
+    "DEFAULT_BUCKETS_MS",
+    "MetricsSerializer",
+    "MetricsBatch",
+    "CommandMetrics",
+    "get_command_metrics",
+    "instrumentar_comandos",
+    "sumar_tiempo_db",
+]
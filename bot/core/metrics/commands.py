@@ -0,0 +1,214 @@
+"""
+Latencia de los comandos por fases
+Total, tiempo hasta la primera respuesta, tiempo en MySQL, tiempo en la API
+de Discord y el resto (código propio), por comando y servidor
+"""
+
+import functools
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from discord import app_commands
+
+from bot.config.logging_config import contexto_log
+
+from .histogram import DEFAULT_BUCKETS_MS, LatencyHistogram
+
+# Fases registradas por comando
+FASES = ("total", "respuesta", "db", "discord", "codigo")
+
+# Métodos de la interacción que llaman a la API de Discord
+_METODOS_RESPUESTA = frozenset({"defer", "send_message", "send_modal", "edit_message"})
+_METODOS_INTERACCION = frozenset({"edit_original_response", "delete_original_response", "original_response"})
+
+
+class Medicion:
+    """Tiempos de una ejecución de comando"""
+
+    __slots__ = ("inicio", "respuesta_ms", "db_ms", "discord_ms")
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.respuesta_ms: Optional[float] = None
+        self.db_ms = 0.0
+        self.discord_ms = 0.0
+
+    def transcurrido_ms(self) -> float:
+        return (time.perf_counter() - self.inicio) * 1000
+
+    def fases(self) -> Dict[str, float]:
+        """Fases en ms; ``codigo`` es lo que no fue ni MySQL ni Discord"""
+        total = self.transcurrido_ms()
+        return {
+            "total": total,
+            "respuesta": total if self.respuesta_ms is None else self.respuesta_ms,
+            "db": self.db_ms,
+            "discord": self.discord_ms,
+            "codigo": max(0.0, total - self.db_ms - self.discord_ms),
+        }
+
+
+# Medición del comando en curso; la capa de base de datos le suma su tiempo
+_medicion_actual: ContextVar[Optional[Medicion]] = ContextVar("medicion_comando", default=None)
+
+
+def sumar_tiempo_db(ms: float) -> None:
+    """Suma tiempo de base de datos al comando en curso (si lo hay)"""
+    medicion = _medicion_actual.get()
+    if medicion is not None:
+        medicion.db_ms += ms
+
+
+def _medir_llamada(medicion: Medicion, metodo: Callable[..., Awaitable[Any]], es_respuesta: bool):
+    @functools.wraps(metodo)
+    async def medido(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return await metodo(*args, **kwargs)
+        finally:
+            medicion.discord_ms += (time.perf_counter() - inicio) * 1000
+            if es_respuesta and medicion.respuesta_ms is None:
+                medicion.respuesta_ms = medicion.transcurrido_ms()
+    return medido
+
+
+class _Proxy:
+    """Reenvía atributos al objeto original y mide los métodos indicados"""
+
+    def __init__(self, objetivo: Any, medicion: Medicion, metodos: frozenset, es_respuesta: bool):
+        self._objetivo = objetivo
+        self._medicion = medicion
+        self._metodos = metodos
+        self._es_respuesta = es_respuesta
+
+    def __getattr__(self, nombre: str) -> Any:
+        valor = getattr(self._objetivo, nombre)
+        if nombre in self._metodos:
+            return _medir_llamada(self._medicion, valor, self._es_respuesta)
+        return valor
+
+
+class InteraccionMedida(_Proxy):
+    """
+    Envoltorio de ``discord.Interaction`` que mide las llamadas a Discord
+
+    ``response`` marca el tiempo hasta la primera respuesta (defer incluido);
+    ``followup`` y las ediciones suman al tiempo en la API de Discord.
+    """
+
+    def __init__(self, interaction: Any, medicion: Medicion):
+        super().__init__(interaction, medicion, _METODOS_INTERACCION, es_respuesta=False)
+
+    @property
+    def response(self) -> Any:
+        return _Proxy(self._objetivo.response, self._medicion, _METODOS_RESPUESTA, es_respuesta=True)
+
+    @property
+    def followup(self) -> Any:
+        return _Proxy(self._objetivo.followup, self._medicion, frozenset({"send"}), es_respuesta=False)
+
+
+class CommandMetrics:
+    """Histogramas de latencia por fase, por comando y servidor"""
+
+    def __init__(self, buckets_ms=DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._histogramas: Dict[Tuple[str, Optional[int]], Dict[str, LatencyHistogram]] = {}
+
+    def record(self, comando: str, guild_id: Optional[int], fases: Dict[str, float]) -> None:
+        """Registra las fases de una ejecución"""
+        clave = (comando, guild_id)
+        histogramas = self._histogramas.get(clave)
+        if histogramas is None:
+            histogramas = self._histogramas[clave] = {
+                fase: LatencyHistogram(self.buckets_ms) for fase in FASES
+            }
+        for fase, valor in fases.items():
+            histogramas[fase].observe(valor)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Histogramas por comando y fase, sumando todos los servidores"""
+        return self._combinar(lambda guild: True)
+
+    def snapshot_guild(self, guild_id: Optional[int]) -> Dict[str, Dict[str, Any]]:
+        """Histogramas por comando y fase de un solo servidor"""
+        return self._combinar(lambda guild: guild == guild_id)
+
+    def snapshot_por_servidor(self) -> Dict[Optional[int], Dict[str, Dict[str, Any]]]:
+        """Histogramas por servidor, comando y fase, en una sola pasada"""
+        por_servidor: Dict[Optional[int], Dict[str, Dict[str, Any]]] = {}
+        for (comando, guild), histogramas in self._histogramas.items():
+            por_servidor.setdefault(guild, {})[comando] = {
+                fase: histograma.snapshot() for fase, histograma in histogramas.items()
+            }
+        return por_servidor
+
+    def guilds(self) -> set:
+        """Servidores con al menos un comando registrado"""
+        return {guild for _, guild in self._histogramas}
+
+    def _combinar(self, incluir: Callable[[Optional[int]], bool]) -> Dict[str, Dict[str, Any]]:
+        combinados: Dict[str, Dict[str, LatencyHistogram]] = {}
+        for (comando, guild), histogramas in self._histogramas.items():
+            if not incluir(guild):
+                continue
+            destino = combinados.setdefault(
+                comando, {fase: LatencyHistogram(self.buckets_ms) for fase in FASES}
+            )
+            for fase, histograma in histogramas.items():
+                destino[fase].merge(histograma)
+        return {
+            comando: {fase: histograma.snapshot() for fase, histograma in fases.items()}
+            for comando, fases in sorted(combinados.items())
+        }
+
+    def reset(self) -> None:
+        self._histogramas.clear()
+
+
+# Instancia global
+_command_metrics: Optional[CommandMetrics] = None
+
+
+def get_command_metrics() -> CommandMetrics:
+    """Obtiene las métricas de comandos (singleton)"""
+    global _command_metrics
+    if _command_metrics is None:
+        _command_metrics = CommandMetrics()
+    return _command_metrics
+
+
+def _medir_comando(nombre: str, callback: Callable[..., Awaitable[Any]]):
+    # Import diferido: bot.core.database importa este paquete
+    from bot.core.database.contexto import usuario_db
+
+    @functools.wraps(callback)
+    async def medido(binding, interaction, *args, **kwargs):
+        medicion = Medicion()
+        guild_id = getattr(getattr(interaction, "guild", None), "id", None)
+        usuario_id = getattr(getattr(interaction, "user", None), "id", None)
+        token = _medicion_actual.set(medicion)
+        try:
+            # Los logs del comando llevan servidor, comando y usuario; el usuario
+            # también decide si sus lecturas deben ir al primario (read-your-writes)
+            with contexto_log(guild_id=guild_id, comando=nombre, usuario_id=usuario_id), usuario_db(usuario_id):
+                return await callback(binding, InteraccionMedida(interaction, medicion), *args, **kwargs)
+        finally:
+            _medicion_actual.reset(token)
+            get_command_metrics().record(nombre, guild_id, medicion.fases())
+    return medido
+
+
+def instrumentar_comandos(cog: Any) -> None:
+    """
+    Mide todos los comandos de barra de un cog
+
+    Se llama desde el ``__init__`` del cog: envuelve el callback de cada
+    comando para registrar sus fases con el nombre completo (p. ej.
+    ``asistencia entrada``) y asociar ese nombre a sus logs.
+    """
+    for comando in cog.walk_app_commands():
+        if isinstance(comando, app_commands.Command) and not getattr(comando._callback, "__medido__", False):
+            comando._callback = _medir_comando(comando.qualified_name, comando._callback)
+            comando._callback.__medido__ = True
@@ -0,0 +1,73 @@
+"""
+Histograma de latencias con buckets fijos
+Costo O(1) por observación y memoria constante, apto para el event loop
+"""
+
+from bisect import bisect_left
+from typing import Any, Dict, Optional, Sequence
+
+# Límites superiores de cada bucket, en milisegundos
+DEFAULT_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    """Histograma acumulativo de latencias en milisegundos"""
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(sorted(buckets_ms))
+        # Un bucket extra para los valores mayores al último límite
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        """Registra una observación"""
+        self.counts[bisect_left(self.buckets_ms, value_ms)] += 1
+        self.count += 1
+        self.sum_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Percentil aproximado (límite superior del bucket que lo contiene)
+
+        Args:
+            p: Percentil entre 0 y 100
+
+        Returns:
+            Latencia en ms, o None si no hay observaciones
+        """
+        if not self.count:
+            return None
+        target = max(1, round(self.count * p / 100))
+        acumulado = 0
+        for i, n in enumerate(self.counts):
+            acumulado += n
+            if acumulado >= target:
+                return self.buckets_ms[i] if i < len(self.buckets_ms) else self.max_ms
+        return self.max_ms
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Suma otro histograma con los mismos buckets"""
+        if other.buckets_ms != self.buckets_ms:
+            raise ValueError("Los histogramas deben tener los mismos buckets")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum_ms += other.sum_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Representación serializable a JSON"""
+        buckets = {f"le_{int(b)}": n for b, n in zip(self.buckets_ms, self.counts)}
+        buckets["le_inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "sum_ms": round(self.sum_ms, 2),
+            "max_ms": round(self.max_ms, 2),
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "buckets": buckets,
+        }
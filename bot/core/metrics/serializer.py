@@ -0,0 +1,104 @@
+"""
+Serializador de métricas con deltas por servidor
+Recuerda el último estado enviado y solo incluye los servidores que
+cambiaron, con un snapshot completo periódico para resincronizar
+"""
+
+import gzip
+import json
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Campos de un servidor que se comparan para detectar cambios
+ServerState = Tuple[Any, ...]
+
+
+@dataclass
+class MetricsBatch:
+    """Payload listo para enviar, junto con el estado que confirma"""
+
+    payload: Dict[str, Any]
+    body: bytes
+    headers: Dict[str, str]
+    full: bool
+    _state: Dict[int, ServerState] = field(repr=False, default_factory=dict)
+
+
+class MetricsSerializer:
+    """
+    Construye payloads de métricas delta o completos
+
+    El estado enviado solo se actualiza al confirmar el envío (``confirm``);
+    si el envío falla hay que llamar a ``reset`` para que el siguiente
+    payload sea completo y el backend no pierda cambios.
+    """
+
+    def __init__(self, full_every: int = 30, gzip_threshold: int = 4096):
+        self.full_every = max(1, full_every)
+        self.gzip_threshold = gzip_threshold
+        self._sent: Optional[Dict[int, ServerState]] = None
+        self._ticks_since_full = 0
+        self._sequence = 0
+
+    @staticmethod
+    def _state(server: Dict[str, Any]) -> ServerState:
+        return tuple(sorted(server.items()))
+
+    def prepare(
+        self,
+        base: Dict[str, Any],
+        servers: Dict[int, Dict[str, Any]],
+        solo_completo: Optional[Callable[[], Dict[str, Any]]] = None,
+    ) -> MetricsBatch:
+        """
+        Prepara el siguiente payload
+
+        Args:
+            base: Campos que siempre se envían (resumen, estado, ...)
+            servers: Datos de cada servidor conectado, por ID
+            solo_completo: Campos voluminosos que solo van en los snapshots
+                completos; se calculan únicamente cuando hacen falta
+
+        Returns:
+            MetricsBatch con el cuerpo serializado (comprimido si supera el umbral)
+        """
+        state = {server_id: self._state(server) for server_id, server in servers.items()}
+        full = self._sent is None or self._ticks_since_full + 1 >= self.full_every
+
+        if full:
+            changed: List[Dict[str, Any]] = list(servers.values())
+            removed: List[int] = []
+        else:
+            changed = [
+                servers[server_id]
+                for server_id, server_state in state.items()
+                if self._sent.get(server_id) != server_state
+            ]
+            removed = [server_id for server_id in self._sent if server_id not in state]
+
+        self._sequence += 1
+        payload = dict(base)
+        payload["tipo"] = "completo" if full else "delta"
+        payload["secuencia"] = self._sequence
+        payload["servers"] = changed
+        if removed:
+            payload["servers_eliminados"] = removed
+        if full and solo_completo is not None:
+            payload.update(solo_completo())
+
+        body = json.dumps(payload, default=str, separators=(",", ":")).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.gzip_threshold and len(body) > self.gzip_threshold:
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+
+        return MetricsBatch(payload=payload, body=body, headers=headers, full=full, _state=state)
+
+    def confirm(self, batch: MetricsBatch) -> None:
+        """Marca el payload como recibido por el backend"""
+        self._sent = batch._state
+        self._ticks_since_full = 0 if batch.full else self._ticks_since_full + 1
+
+    def reset(self) -> None:
+        """Fuerza que el próximo payload sea un snapshot completo"""
+        self._sent = None
@@ -0,0 +1,12 @@
+"""Repositorios de lectura: una consulta por comando"""
+
+from .base import LecturaPracticante, PracticanteRepository
+from .asistencia import AsistenciaRepository
+from .recuperacion import RecuperacionRepository
+
+__all__ = [
+    "LecturaPracticante",
+    "PracticanteRepository",
+    "AsistenciaRepository",
+    "RecuperacionRepository",
+]
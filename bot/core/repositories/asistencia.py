@@ -0,0 +1,60 @@
+"""Repositorio de lecturas de asistencia"""
+
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from bot.core.database import queries
+from .base import LecturaPracticante, PracticanteRepository
+
+
+class AsistenciaRepository(PracticanteRepository):
+    """Lecturas de Asistencia en una sola consulta por Discord ID"""
+
+    async def estado_del_dia(self, discord_id: int, fecha: date) -> LecturaPracticante:
+        """Registro de asistencia del día (a lo sumo una fila)"""
+        return await self._leer(
+            discord_id,
+            queries.ASISTENCIA_ESTADO_DIA_POR_DISCORD,
+            (fecha, discord_id),
+            "asistencia_id",
+        )
+
+    async def historial(self, discord_id: int, desde: date, limite: int) -> LecturaPracticante:
+        """Primeros ``limite`` registros desde ``desde``, del más reciente al más antiguo"""
+        return await self._leer(
+            discord_id,
+            queries.ASISTENCIA_HISTORIAL_POR_DISCORD,
+            (desde, discord_id, limite),
+            "fecha",
+        )
+
+    async def historial_pagina(
+        self,
+        practicante_id: int,
+        desde: date,
+        antes_de: date,
+        limite: int,
+    ) -> List[Dict[str, Any]]:
+        """Siguiente página del historial: registros con fecha anterior a ``antes_de``"""
+        return await self.db.fetch_all(
+            queries.ASISTENCIA_HISTORIAL_PAGINA,
+            (practicante_id, desde, antes_de, limite),
+        )
+
+    async def faltas(self, discord_id: int, estado_id: Optional[int]) -> LecturaPracticante:
+        """Últimas 5 asistencias con el estado indicado (faltas injustificadas)"""
+        return await self._leer(
+            discord_id,
+            queries.FALTAS_ULTIMAS_POR_DISCORD,
+            (estado_id, discord_id),
+            "fecha",
+        )
+
+    async def resumen_mes(self, discord_id: int, mes: date) -> LecturaPracticante:
+        """Contadores del mes en Resumen_Asistencia_Mensual (a lo sumo una fila; ``mes`` es el primer día)"""
+        return await self._leer(
+            discord_id,
+            queries.RESUMEN_MES_POR_DISCORD,
+            (mes, discord_id),
+            "mes",
+        )
@@ -0,0 +1,69 @@
+"""
+Base de los repositorios de lectura
+Cada lectura es una sola consulta que parte de Practicante por id_discord,
+así "no registrado" y los datos llegan en el mismo viaje a la base de datos
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Protocol, Tuple, Union
+
+from bot.core.cache import get_practicante_cache
+
+Params = Optional[Union[Tuple, Dict[str, Any]]]
+
+
+class QueryExecutor(Protocol):
+    """Cualquier objeto con fetch_all: el módulo ``database`` o ``Database``"""
+
+    async def fetch_all(self, query: str, params: Params = None) -> List[Dict[str, Any]]:
+        ...
+
+
+@dataclass
+class LecturaPracticante:
+    """Resultado de una lectura por Discord ID"""
+
+    practicante_id: Optional[int]
+    filas: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def registrado(self) -> bool:
+        return self.practicante_id is not None
+
+
+class PracticanteRepository:
+    """Repositorio base para lecturas por Discord ID"""
+
+    def __init__(self, db: QueryExecutor):
+        self.db = db
+
+    async def _leer(
+        self,
+        discord_id: int,
+        query: str,
+        params: Params,
+        columna_dato: str,
+    ) -> LecturaPracticante:
+        """
+        Ejecuta una consulta ``Practicante LEFT JOIN ...`` por id_discord
+
+        Sin filas: el usuario no está registrado. Filas con ``columna_dato``
+        en NULL: está registrado pero el LEFT JOIN no encontró datos.
+        La caché de identidad se actualiza con el resultado y, si ya sabe
+        que el usuario no está registrado, se evita la consulta.
+        """
+        cache = get_practicante_cache()
+        if cache.get(discord_id) is None:
+            return LecturaPracticante(None)
+
+        filas = await self.db.fetch_all(query, params)
+        if not filas:
+            cache.set(discord_id, None)
+            return LecturaPracticante(None)
+
+        practicante_id = filas[0]["practicante_id"]
+        cache.set(discord_id, practicante_id)
+        return LecturaPracticante(
+            practicante_id,
+            [fila for fila in filas if fila[columna_dato] is not None],
+        )
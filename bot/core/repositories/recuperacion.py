@@ -0,0 +1,33 @@
+"""Repositorio de lecturas de recuperación"""
+
+from datetime import date
+from typing import Any, Dict, List
+
+from bot.core.database import queries
+from .base import LecturaPracticante, PracticanteRepository
+
+
+class RecuperacionRepository(PracticanteRepository):
+    """Lecturas de Recuperacion en una sola consulta por Discord ID"""
+
+    async def historial(self, discord_id: int, desde: date, limite: int) -> LecturaPracticante:
+        """Primeras ``limite`` recuperaciones desde ``desde``, de la más reciente a la más antigua"""
+        return await self._leer(
+            discord_id,
+            queries.RECUPERACION_HISTORIAL_POR_DISCORD,
+            (desde, discord_id, limite),
+            "fecha",
+        )
+
+    async def historial_pagina(
+        self,
+        practicante_id: int,
+        desde: date,
+        antes_de: date,
+        limite: int,
+    ) -> List[Dict[str, Any]]:
+        """Siguiente página del historial: recuperaciones con fecha anterior a ``antes_de``"""
+        return await self.db.fetch_all(
+            queries.RECUPERACION_HISTORIAL_PAGINA,
+            (practicante_id, desde, antes_de, limite),
+        )
@@ -0,0 +1,100 @@
+"""
+Reparto de shards entre procesos
+Un proceso con AutoShardedBot atiende un rango de shards; launcher.py
+lanza varios procesos y reparte entre ellos el pool de MySQL.
+"""
+
+import math
+from typing import Any, Dict, List, Optional
+
+
+def parse_shard_ids(valor: str) -> Optional[List[int]]:
+    """
+    Convierte ``"0-3"`` o ``"0,2,5"`` (o combinaciones) en una lista de IDs
+
+    Returns:
+        Lista ordenada, o None si el valor está vacío (todos los shards)
+    """
+    ids = set()
+    for parte in valor.replace(" ", "").split(","):
+        if not parte:
+            continue
+        if "-" in parte:
+            inicio, fin = (int(x) for x in parte.split("-", 1))
+            if fin < inicio:
+                raise ValueError(f"Rango de shards inválido: {parte}")
+            ids.update(range(inicio, fin + 1))
+        else:
+            ids.add(int(parte))
+    return sorted(ids) or None
+
+
+def formatear_shard_ids(ids: List[int]) -> str:
+    """Inverso de parse_shard_ids para rangos contiguos (``[0, 1, 2]`` -> ``"0-2"``)"""
+    if ids == list(range(ids[0], ids[-1] + 1)):
+        return f"{ids[0]}-{ids[-1]}" if len(ids) > 1 else str(ids[0])
+    return ",".join(str(i) for i in ids)
+
+
+def repartir_shards(shard_count: int, procesos: int) -> List[List[int]]:
+    """
+    Reparte ``shard_count`` shards en rangos contiguos, uno por proceso
+
+    Los primeros procesos reciben un shard más si la división no es exacta.
+    Nunca hay más procesos que shards.
+    """
+    if shard_count < 1 or procesos < 1:
+        raise ValueError("shard_count y procesos deben ser positivos")
+    procesos = min(procesos, shard_count)
+    base, resto = divmod(shard_count, procesos)
+    rangos, inicio = [], 0
+    for i in range(procesos):
+        tamano = base + (1 if i < resto else 0)
+        rangos.append(list(range(inicio, inicio + tamano)))
+        inicio += tamano
+    return rangos
+
+
+def tamano_pool(total: int, shards_proceso: int, shard_count: int) -> int:
+    """Parte de un tamaño de pool total proporcional a los shards del proceso (mínimo 1)"""
+    return max(1, math.ceil(total * shards_proceso / shard_count))
+
+
+def es_proceso_principal(shard_ids: Optional[List[int]]) -> bool:
+    """El proceso con el shard 0 (o el único) sincroniza comandos y corre las tareas globales"""
+    return shard_ids is None or 0 in shard_ids
+
+
+def metricas_shards(bot: Any) -> Dict[str, Dict[str, Any]]:
+    """Latencia y servidores por shard de este proceso, con clave el ID del shard"""
+    latencias = getattr(bot, "latencies", None)
+    latencias = dict(latencias) if latencias is not None else {bot.shard_id or 0: bot.latency}
+    servidores = dict.fromkeys(latencias, 0)
+    for guild in bot.guilds:
+        shard_id = guild.shard_id or 0
+        servidores[shard_id] = servidores.get(shard_id, 0) + 1
+
+    resultado = {}
+    for shard_id in sorted(servidores):
+        # Un shard desconectado reporta latencia infinita (o aún no tiene)
+        latencia = latencias.get(shard_id)
+        resultado[str(shard_id)] = {
+            "latencia_ms": round(latencia * 1000, 2) if latencia is not None and math.isfinite(latencia) else None,
+            "servidores": servidores[shard_id],
+        }
+    return resultado
+
+
+def identidad_proceso(shard_ids: Optional[List[int]], shard_count: Optional[int]) -> Dict[str, Any]:
+    """
+    Identifica al proceso en las métricas que envía al backend
+
+    Con launcher.py cada proceso envía su propio payload (completo o delta con
+    su propia secuencia); el backend debe guardar y agregar por ``clave``.
+    """
+    return {
+        "clave": formatear_shard_ids(shard_ids) if shard_ids else "todos",
+        "shard_ids": shard_ids,
+        "shard_count": shard_count,
+        "principal": es_proceso_principal(shard_ids),
+    }
@@ -1,8 +1,6 @@
 """Utilidades del bot"""
 
 from .validators import (
-    validate_channel,
-    validate_role,
     validate_horario,
     validate_dias_historial,
 )
@@ -18,15 +16,23 @@ from .datetime_utils import (
     get_current_date,
     get_current_time,
     is_weekday,
+    dias_laborables,
 )
 from .permissions import (
     check_channel_permission,
     check_role_permission,
+    ComandoRechazado,
+    canal_habilitado,
+    rol_recuperacion,
+    solo_administradores,
+    responder_rechazo,
 )
+from .pagination import PaginadorKeyset, partir_pagina
+from .plazo import PlazoInteraccion, AbrirModal
+from .reloj import Reloj, get_reloj
+from .reporte import ReporteCSV
 
 __all__ = [
-    "validate_channel",
-    "validate_role",
     "validate_horario",
     "validate_dias_historial",
     "format_time",
@@ -40,8 +46,21 @@ __all__ = [
     "get_current_date",
     "get_current_time",
     "is_weekday",
+    "dias_laborables",
     "check_channel_permission",
     "check_role_permission",
+    "ComandoRechazado",
+    "canal_habilitado",
+    "rol_recuperacion",
+    "solo_administradores",
+    "responder_rechazo",
+    "PaginadorKeyset",
+    "partir_pagina",
+    "PlazoInteraccion",
+    "AbrirModal",
+    "Reloj",
+    "get_reloj",
+    "ReporteCSV",
 ]
 
 
@@ -1,15 +1,16 @@
 """Utilidades para manejo de fechas y horas"""
 
-from datetime import datetime, date, time
-from typing import Optional
+from datetime import datetime, date, time, timedelta
+from typing import List, Optional
 
-from bot.config import Settings, DIAS_SEMANA_PERMITIDOS
+from bot.config import DIAS_SEMANA_PERMITIDOS
 from bot.core.exceptions import ValidationError
+from .reloj import get_reloj
 
 
 def get_current_datetime() -> datetime:
     """Obtiene la fecha y hora actual en la zona horaria configurada"""
-    return datetime.now(Settings.TIMEZONE)
+    return get_reloj().ahora()
 
 
 def get_current_date() -> date:
@@ -53,3 +54,21 @@ def is_time_in_range(current_time: time, start_time: time, end_time: time) -> bo
     return start_time <= current_time <= end_time
 
 
+def dias_laborables(desde: date, hasta: date) -> List[date]:
+    """
+    Lista los días laborables entre dos fechas (ambas incluidas)
+    
+    Args:
+        desde: Primera fecha del rango
+        hasta: Última fecha del rango
+        
+    Returns:
+        Fechas en orden ascendente cuyo día de la semana está permitido
+    """
+    dias = []
+    fecha = desde
+    while fecha <= hasta:
+        if fecha.weekday() in DIAS_SEMANA_PERMITIDOS:
+            dias.append(fecha)
+        fecha += timedelta(days=1)
+    return dias
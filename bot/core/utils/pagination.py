@@ -0,0 +1,93 @@
+"""Paginación de embeds con carga diferida por keyset"""
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import discord
+from discord import Embed, ui
+
+from bot.core.database.contexto import con_usuario_db
+
+# Carga la página que empieza después del cursor: (embed, cursor de la siguiente o None)
+CargarPagina = Callable[[Any, int], Awaitable[Tuple[Embed, Optional[Any]]]]
+
+
+def partir_pagina(
+    filas: Sequence[Dict[str, Any]],
+    por_pagina: int,
+    clave: str,
+) -> Tuple[List[Dict[str, Any]], Optional[Any]]:
+    """
+    Separa una página de filas leídas con ``LIMIT por_pagina + 1``
+
+    Returns:
+        (filas de la página, cursor para la siguiente o None si no hay más)
+    """
+    if len(filas) <= por_pagina:
+        return list(filas), None
+    pagina = list(filas[:por_pagina])
+    return pagina, pagina[-1][clave]
+
+
+class PaginadorKeyset(ui.View):
+    """
+    Vista con botones Anterior/Siguiente sobre páginas cargadas bajo demanda
+
+    La primera página llega ya renderizada; las siguientes se piden a
+    ``cargar`` con el cursor de la anterior solo cuando el usuario avanza,
+    y se guardan para volver atrás sin consultar de nuevo.
+    """
+
+    def __init__(
+        self,
+        usuario_id: int,
+        primera: Embed,
+        siguiente: Optional[Any],
+        cargar: CargarPagina,
+        timeout: Optional[float] = 300,
+    ):
+        super().__init__(timeout=timeout)
+        self.usuario_id = usuario_id
+        self.cargar = cargar
+        self.paginas: List[Embed] = [primera]
+        self.cursores: List[Optional[Any]] = [siguiente]
+        self.actual = 0
+        self._actualizar_botones()
+
+    def _actualizar_botones(self) -> None:
+        self.anterior.disabled = self.actual == 0
+        self.siguiente.disabled = (
+            self.actual == len(self.paginas) - 1 and self.cursores[self.actual] is None
+        )
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.usuario_id
+
+    @ui.button(label="◀ Anterior", style=discord.ButtonStyle.secondary)
+    @con_usuario_db
+    async def anterior(self, interaction: discord.Interaction, button: ui.Button):
+        self.actual = max(0, self.actual - 1)
+        self._actualizar_botones()
+        await interaction.response.edit_message(embed=self.paginas[self.actual], view=self)
+
+    @ui.button(label="Siguiente ▶", style=discord.ButtonStyle.primary)
+    @con_usuario_db
+    async def siguiente(self, interaction: discord.Interaction, button: ui.Button):
+        if self.actual + 1 < len(self.paginas):
+            self.actual += 1
+            self._actualizar_botones()
+            await interaction.response.edit_message(embed=self.paginas[self.actual], view=self)
+            return
+
+        cursor = self.cursores[self.actual]
+        if cursor is None:
+            await interaction.response.defer()
+            return
+
+        # Página nueva: se reconoce la interacción antes de ir a la base de datos
+        await interaction.response.defer()
+        embed, siguiente = await self.cargar(cursor, len(self.paginas) + 1)
+        self.paginas.append(embed)
+        self.cursores.append(siguiente)
+        self.actual += 1
+        self._actualizar_botones()
+        await interaction.edit_original_response(embed=embed, view=self)
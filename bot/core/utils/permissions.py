@@ -1,75 +1,138 @@
 """Utilidades para verificación de permisos"""
 
-from typing import List, Optional
+from typing import Iterable, Optional
 import discord
+from discord import app_commands
 import logging
 
-from bot.config import Settings, get_settings
+from bot.config import MSG_CANAL_NO_PERMITIDO, MSG_SIN_PERMISOS
+from bot.core.cache import get_politicas
 from bot.core.exceptions import PermissionError
 
 logger = logging.getLogger(__name__)
 
 
+class ComandoRechazado(app_commands.CheckFailure):
+    """Check de política que rechaza el comando antes de ejecutar el callback"""
+
+    def __init__(self, mensaje: str):
+        super().__init__(mensaje)
+        self.mensaje = mensaje
+
+
 async def check_channel_permission(interaction: discord.Interaction) -> bool:
     """
     Verifica si el canal está permitido para el comando
-    
+
     Args:
         interaction: Interacción de Discord
-        
+
     Returns:
         True si el canal está permitido
-        
+
     Raises:
         PermissionError: Si el canal no está permitido
     """
-    settings = get_settings()
     guild_id = interaction.guild.id
     channel_id = interaction.channel.id
-    
-    canales_permitidos = settings.get_canales_permitidos(guild_id)
-    
-    if channel_id not in canales_permitidos:
+
+    if not get_politicas().canal_permitido(guild_id, channel_id):
         logger.warning(
-            f'Canal no permitido para el usuario {interaction.user.display_name} '
-            f'en servidor {guild_id}, canal {channel_id}'
+            'Canal no permitido para el usuario %s en servidor %s, canal %s',
+            interaction.user.display_name, guild_id, channel_id,
         )
-        raise PermissionError("Este comando no está habilitado en este canal.")
-    
+        raise PermissionError(MSG_CANAL_NO_PERMITIDO)
+
     return True
 
 
 async def check_role_permission(
     interaction: discord.Interaction,
-    allowed_roles: Optional[List[int]] = None,
+    allowed_roles: Optional[Iterable[int]] = None,
     use_followup: bool = False
 ) -> bool:
     """
     Verifica si el usuario tiene alguno de los roles permitidos
-    
+
     Args:
         interaction: Interacción de Discord
-        allowed_roles: Lista de IDs de roles permitidos. Si es None o vacía, todos tienen permiso
+        allowed_roles: IDs de roles permitidos. Si es None, los roles de recuperación del servidor;
+            si está vacía, todos tienen permiso
         use_followup: Si usar followup en lugar de response
-        
+
     Returns:
         True si tiene permisos
-        
+
     Raises:
         PermissionError: Si no tiene permisos
     """
+    if allowed_roles is None:
+        allowed_roles = get_politicas().roles_recuperacion(interaction.guild.id)
     if not allowed_roles:
         return True
-    
-    user_roles = [role.id for role in interaction.user.roles]
-    has_permission = any(role_id in user_roles for role_id in allowed_roles)
-    
+
+    has_permission = not frozenset(allowed_roles).isdisjoint(role.id for role in interaction.user.roles)
+
     if not has_permission:
-        logger.warning(
-            f'Usuario {interaction.user.display_name} no tiene los roles necesarios'
-        )
-        raise PermissionError("No tienes los permisos necesarios para usar este comando.")
-    
+        logger.warning('Usuario %s no tiene los roles necesarios', interaction.user.display_name)
+        raise PermissionError(MSG_SIN_PERMISOS)
+
     return True
 
 
+def canal_habilitado():
+    """
+    Check de app_commands: el canal debe estar habilitado en el servidor
+
+    Se evalúa en memoria antes del callback; si falla, el comando no llega
+    a ejecutarse y ``responder_rechazo`` contesta al usuario.
+    """
+    def predicado(interaction: discord.Interaction) -> bool:
+        guild_id = interaction.guild.id if interaction.guild else None
+        if get_politicas().canal_permitido(guild_id, interaction.channel_id):
+            return True
+        logger.warning('Canal no permitido para el usuario %s.', interaction.user.display_name)
+        raise ComandoRechazado(MSG_CANAL_NO_PERMITIDO)
+
+    return app_commands.check(predicado)
+
+
+def rol_recuperacion():
+    """Check de app_commands: el usuario debe tener un rol de recuperación (si el servidor los define)"""
+    def predicado(interaction: discord.Interaction) -> bool:
+        guild_id = interaction.guild.id if interaction.guild else None
+        roles = getattr(interaction.user, "roles", ())
+        if get_politicas().rol_recuperacion_permitido(guild_id, (role.id for role in roles)):
+            return True
+        logger.warning('Usuario %s no tiene los roles necesarios para recuperación.', interaction.user.display_name)
+        raise ComandoRechazado(MSG_SIN_PERMISOS)
+
+    return app_commands.check(predicado)
+
+
+def solo_administradores():
+    """Check de app_commands: el usuario debe ser administrador del servidor"""
+    def predicado(interaction: discord.Interaction) -> bool:
+        permisos = getattr(interaction.user, "guild_permissions", None)
+        if permisos is not None and permisos.administrator:
+            return True
+        logger.warning('Usuario %s no es administrador.', interaction.user.display_name)
+        raise ComandoRechazado(MSG_SIN_PERMISOS)
+
+    return app_commands.check(predicado)
+
+
+async def responder_rechazo(interaction: discord.Interaction, error: app_commands.AppCommandError) -> bool:
+    """
+    Responde a un comando rechazado por una política
+
+    Returns:
+        True si el error era un rechazo y ya se respondió
+    """
+    if not isinstance(error, ComandoRechazado):
+        return False
+    if interaction.response.is_done():
+        await interaction.followup.send(error.mensaje, ephemeral=True)
+    else:
+        await interaction.response.send_message(error.mensaje, ephemeral=True)
+    return True
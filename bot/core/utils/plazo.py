@@ -0,0 +1,113 @@
+"""
+Plazo de respuesta de las interacciones
+Discord descarta la interacción si no se responde (o se hace defer) en 3 segundos
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+import discord
+from discord import ui
+
+from bot.config import get_settings, PLAZO_RESPUESTA_INTERACCION_S, RETRASO_ENTREGA_MAX_S
+from bot.core.database.contexto import con_usuario_db
+
+T = TypeVar("T")
+
+
+class PlazoInteraccion:
+    """
+    Lleva la cuenta del tiempo que le queda a una interacción
+
+    Los comandos que consultan la base de datos antes de responder pasan ese
+    trabajo por ``esperar``: si no termina antes de agotar el presupuesto
+    (plazo menos ``margen``), se hace defer y el resto del comando sigue con
+    followups. ``responder`` y ``enviar_modal`` eligen el camino según se
+    haya respondido o no.
+    """
+
+    def __init__(self, interaction: discord.Interaction, margen: Optional[float] = None):
+        self.interaction = interaction
+        self.margen = get_settings().INTERACCION_MARGEN_DEFER_MS / 1000 if margen is None else margen
+        self._inicio = time.monotonic()
+        self._retraso = self._retraso_entrega(interaction)
+        self.diferida = False
+
+    @staticmethod
+    def _retraso_entrega(interaction: discord.Interaction) -> float:
+        """Espera antes de llegar al bot según el snowflake, acotada frente a relojes desfasados"""
+        creada = getattr(interaction, "created_at", None)
+        if not isinstance(creada, datetime):
+            return 0.0
+        retraso = (discord.utils.utcnow() - creada).total_seconds()
+        return min(max(retraso, 0.0), RETRASO_ENTREGA_MAX_S)
+
+    def restante(self) -> float:
+        """Segundos que quedan para la primera respuesta"""
+        # El avance se mide con el reloj monótono; del reloj de pared solo sale el retraso inicial
+        return PLAZO_RESPUESTA_INTERACCION_S - self._retraso - (time.monotonic() - self._inicio)
+
+    async def defer(self, ephemeral: bool = True) -> None:
+        """Hace defer si aún no se respondió"""
+        if not self.interaction.response.is_done():
+            await self.interaction.response.defer(ephemeral=ephemeral)
+            self.diferida = True
+
+    async def esperar(self, trabajo: Awaitable[T], ephemeral: bool = True) -> T:
+        """
+        Espera un trabajo que no responde a Discord (consultas, cálculos)
+
+        Si no termina dentro del presupuesto, hace defer y lo sigue esperando.
+        """
+        if self.interaction.response.is_done():
+            return await trabajo
+        tarea = asyncio.ensure_future(trabajo)
+        try:
+            hecho, _ = await asyncio.wait({tarea}, timeout=max(0.0, self.restante() - self.margen))
+            if not hecho:
+                await self.defer(ephemeral=ephemeral)
+            return await tarea
+        except BaseException:
+            tarea.cancel()
+            raise
+
+    async def responder(self, content: Optional[str] = None, **kwargs: Any) -> None:
+        """Primera respuesta si aún se puede; si no, followup"""
+        if self.interaction.response.is_done():
+            await self.interaction.followup.send(content, **kwargs)
+        else:
+            await self.interaction.response.send_message(content, **kwargs)
+
+    async def enviar_modal(self, crear_modal: Callable[[], ui.Modal], mensaje: str, etiqueta: str) -> None:
+        """
+        Abre un modal, que solo puede ser la primera respuesta
+
+        Si ya se hizo defer, se envía ``mensaje`` con un botón que lo abre:
+        el clic es una interacción nueva con su propio plazo, y cada clic
+        recibe un modal nuevo de ``crear_modal``.
+        """
+        if not self.interaction.response.is_done():
+            await self.interaction.response.send_modal(crear_modal())
+            return
+        vista = AbrirModal(self.interaction.user.id, crear_modal, etiqueta)
+        await self.interaction.followup.send(mensaje, view=vista, ephemeral=True)
+
+
+class AbrirModal(ui.View):
+    """Vista con un botón que abre un modal (para cuando ya no se puede enviar directamente)"""
+
+    def __init__(self, usuario_id: int, crear_modal: Callable[[], ui.Modal], etiqueta: str, timeout: Optional[float] = 120):
+        super().__init__(timeout=timeout)
+        self.usuario_id = usuario_id
+        self.crear_modal = crear_modal
+        self.abrir.label = etiqueta
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.usuario_id
+
+    @ui.button(label="Continuar", style=discord.ButtonStyle.primary)
+    @con_usuario_db
+    async def abrir(self, interaction: discord.Interaction, button: ui.Button):
+        await interaction.response.send_modal(self.crear_modal())
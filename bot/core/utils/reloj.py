@@ -0,0 +1,68 @@
+"""
+Reloj del bot en la zona horaria configurada
+Se puede congelar o acelerar para tests y pruebas de carga
+"""
+
+import time as _time
+from datetime import date, datetime, time, timedelta, tzinfo
+from typing import Optional
+
+from bot.config import Settings
+
+
+class Reloj:
+    """
+    Fuente única de la fecha y hora del bot
+
+    Los comandos leen ``ahora()`` una sola vez al empezar y derivan fecha,
+    hora y día de la semana de ese mismo valor, para que no cambien a mitad
+    de la interacción. La zona horaria se resuelve una sola vez.
+    """
+
+    def __init__(self, tz: tzinfo = Settings.TIMEZONE):
+        self.tz = tz
+        self._ancla: Optional[datetime] = None
+        self._ancla_real = 0.0
+        self._factor = 1.0
+
+    def ahora(self) -> datetime:
+        """Fecha y hora actuales (con zona horaria)"""
+        if self._ancla is None:
+            return datetime.now(self.tz)
+        if not self._factor:
+            return self._ancla
+        return self._ancla + timedelta(seconds=(_time.monotonic() - self._ancla_real) * self._factor)
+
+    def hoy(self) -> date:
+        return self.ahora().date()
+
+    def hora(self) -> time:
+        return self.ahora().time()
+
+    def congelar(self, momento: datetime) -> None:
+        """Detiene el reloj en ``momento`` (sin zona horaria se asume la configurada)"""
+        self.acelerar(0, momento)
+
+    def acelerar(self, factor: float, desde: Optional[datetime] = None) -> None:
+        """Avanza ``factor`` veces más rápido que el tiempo real, a partir de ``desde`` (o de ahora)"""
+        desde = self.ahora() if desde is None else desde
+        self._ancla = desde if desde.tzinfo else desde.replace(tzinfo=self.tz)
+        self._ancla_real = _time.monotonic()
+        self._factor = factor
+
+    def reanudar(self) -> None:
+        """Vuelve a la hora real"""
+        self._ancla = None
+        self._factor = 1.0
+
+
+# Instancia global
+_reloj: Optional[Reloj] = None
+
+
+def get_reloj() -> Reloj:
+    """Obtiene el reloj del bot (singleton)"""
+    global _reloj
+    if _reloj is None:
+        _reloj = Reloj()
+    return _reloj
@@ -0,0 +1,66 @@
+"""
+Reportes CSV comprimidos
+Las filas se escriben por lotes en archivos .csv.gz; al acercarse al tamaño
+máximo se empieza una parte nueva (con su propio encabezado) para poder
+adjuntarlas por separado en Discord. Los métodos bloquean (compresión y
+disco): desde el event loop se llaman con ``asyncio.to_thread``.
+"""
+
+import csv
+import gzip
+import io
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, List, Optional, Sequence
+
+# Lo que el compresor aún retiene en memoria y no llegó al archivo
+_MARGEN_COMPRESOR = 256 * 1024
+
+
+class ReporteCSV:
+    """
+    CSV comprimido en partes de hasta ``max_bytes``
+
+    Solo se mantiene en memoria el lote que se está escribiendo: el resto ya
+    está comprimido en disco.
+    """
+
+    def __init__(self, directorio: Path, nombre: str, columnas: Sequence[str], max_bytes: int):
+        self.directorio = Path(directorio)
+        self.nombre = nombre
+        self.columnas = list(columnas)
+        self.limite = max(max_bytes - _MARGEN_COMPRESOR, max_bytes // 2)
+        self.partes: List[Path] = []
+        self.filas = 0
+        self._bruto: Optional[BinaryIO] = None
+        self._texto: Optional[io.TextIOWrapper] = None
+        self._csv: Any = None
+
+    def _nueva_parte(self) -> None:
+        self._cerrar_parte()
+        ruta = self.directorio / f"{self.nombre}_parte{len(self.partes) + 1}.csv.gz"
+        self._bruto = ruta.open("wb")
+        comprimido = gzip.GzipFile(filename=ruta.stem, fileobj=self._bruto, mode="wb")
+        self._texto = io.TextIOWrapper(comprimido, encoding="utf-8", newline="")
+        self._csv = csv.writer(self._texto)
+        self._csv.writerow(self.columnas)
+        self.partes.append(ruta)
+
+    def _cerrar_parte(self) -> None:
+        if self._texto is not None:
+            # Cierra el CSV y el gzip; el archivo se cierra aparte (GzipFile no es su dueño)
+            self._texto.close()
+            self._bruto.close()
+            self._texto = self._bruto = self._csv = None
+
+    def escribir(self, filas: Iterable[Sequence[Any]]) -> None:
+        """Agrega filas, abriendo una parte nueva cuando la actual se llena"""
+        for fila in filas:
+            if self._bruto is None or self._bruto.tell() >= self.limite:
+                self._nueva_parte()
+            self._csv.writerow(fila)
+            self.filas += 1
+
+    def cerrar(self) -> List[Path]:
+        """Termina la parte en curso y devuelve las rutas de todas las partes"""
+        self._cerrar_parte()
+        return list(self.partes)
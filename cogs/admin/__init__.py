@@ -0,0 +1,7 @@
+"""Módulo de Administración - Comandos de diagnóstico para administradores"""
+
+from .commands import Admin
+
+async def setup(bot):
+    await bot.add_cog(Admin(bot))
+
@@ -0,0 +1,106 @@
+"""Comandos del módulo de administración"""
+
+import discord
+from discord import app_commands, Embed, Color
+from discord.ext import commands
+import logging
+from typing import Optional
+
+from bot.core.database import get_query_registry
+from bot.core.metrics import get_command_metrics
+from utils import invalidar_practicante
+
+logger = logging.getLogger(__name__)
+
+
+@app_commands.guild_only()
+@app_commands.default_permissions(administrator=True)
+class Admin(commands.GroupCog, name="admin"):
+    """Cog con comandos de diagnóstico para administradores"""
+    
+    def __init__(self, bot: commands.Bot):
+        super().__init__()
+        self.bot = bot
+
+    @app_commands.command(name='consultas', description="Ver estadísticas de las consultas a la base de datos")
+    @app_commands.describe(limite="Cantidad de consultas a mostrar (1-20)")
+    async def consultas(self, interaction: discord.Interaction, limite: int = 10):
+        logger.info('Usuario %s está consultando las estadísticas de consultas.', interaction.user.display_name)
+        limite = max(1, min(limite, 20))
+
+        estadisticas = get_query_registry().snapshot()
+        if not estadisticas:
+            await interaction.response.send_message("Aún no se han ejecutado consultas.", ephemeral=True)
+            return
+
+        # Ordenar por tiempo total acumulado: las primeras son las que más tiempo de DB consumen
+        ordenadas = sorted(
+            estadisticas.items(),
+            key=lambda item: item[1]['latencia']['sum_ms'],
+            reverse=True
+        )[:limite]
+
+        embed = Embed(
+            title="🗄️ Estadísticas de Consultas",
+            description=f"Top {len(ordenadas)} consultas por tiempo total acumulado",
+            color=Color.dark_teal()
+        )
+        for nombre, datos in ordenadas:
+            latencia = datos['latencia']
+            embed.add_field(
+                name=nombre,
+                value=(
+                    f"**Llamadas**: {datos['llamadas']} | **Errores**: {datos['errores']} | "
+                    f"**Filas**: {datos['filas']}\n"
+                    f"**Total**: {latencia['sum_ms']} ms | **p50**: {latencia['p50_ms']} ms | "
+                    f"**p95**: {latencia['p95_ms']} ms | **Máx**: {latencia['max_ms']} ms"
+                ),
+                inline=False
+            )
+        embed.set_footer(text="Latencias aproximadas por buckets fijos.")
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+    @app_commands.command(name='comandos', description="Ver la latencia de los comandos por fase en este servidor")
+    async def comandos(self, interaction: discord.Interaction):
+        logger.info('Usuario %s está consultando la latencia de los comandos.', interaction.user.display_name)
+
+        estadisticas = get_command_metrics().snapshot_guild(interaction.guild.id)
+        if not estadisticas:
+            await interaction.response.send_message("Aún no se han ejecutado comandos en este servidor.", ephemeral=True)
+            return
+
+        embed = Embed(
+            title="⏱️ Latencia de Comandos",
+            description="p50 / p95 por fase: total, primera respuesta, MySQL, Discord y código propio",
+            color=Color.dark_teal()
+        )
+        # Como las consultas: los que más tiempo acumulan primero (un embed admite 25 campos)
+        ordenados = sorted(estadisticas.items(), key=lambda item: item[1]['total']['sum_ms'], reverse=True)[:25]
+        for nombre, fases in ordenados:
+            total = fases['total']
+            embed.add_field(
+                name=f"/{nombre} ({total['count']} llamadas)",
+                value="\n".join(
+                    f"**{fase.capitalize()}**: {datos['p50_ms']} / {datos['p95_ms']} ms"
+                    for fase, datos in fases.items()
+                ),
+                inline=False
+            )
+        embed.set_footer(text="Latencias aproximadas por buckets fijos.")
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name='practicante', description="Olvidar en caché la identidad de un practicante tras un alta o baja")
+    @app_commands.describe(usuario="Usuario dado de alta o de baja; sin indicar, se vacía toda la caché")
+    async def practicante(self, interaction: discord.Interaction, usuario: Optional[discord.Member] = None):
+        logger.info('Usuario %s está invalidando la caché de practicantes.', interaction.user.display_name)
+
+        # El siguiente comando de ese usuario vuelve a consultar Practicante
+        invalidar_practicante(usuario.id if usuario else None)
+        if usuario:
+            mensaje = f"Caché de {usuario.mention} invalidada: su próximo comando leerá la base de datos."
+        else:
+            mensaje = "Caché de practicantes vaciada: los próximos comandos leerán la base de datos."
+        await interaction.response.send_message(mensaje, ephemeral=True)
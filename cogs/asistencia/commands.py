@@ -3,42 +3,76 @@
 import discord
 from discord import app_commands, Embed, Color
 from discord.ext import commands
-from utils import obtener_practicante, verificar_entrada, obtener_estado_asistencia, canal_permitido
-from datetime import datetime, time, timedelta
+from utils import (
+    obtener_practicante, resolver_practicante, obtener_estado_asistencia, avisar_no_registrado,
+    asistencia_de_hoy,
+)
+from bot.core.cache import (
+    MISSING, Estado, get_estado_catalogo, get_asistencia_dia, get_practicante_cache,
+    get_historial_cache, HISTORIAL_ASISTENCIA,
+)
+from bot.core.database import queries
+from bot.core.database.resumen import CONTADORES, inicio_mes
+from bot.core.repositories import AsistenciaRepository
+from bot.core.utils import (
+    PaginadorKeyset, PlazoInteraccion, Reloj, ReporteCSV, canal_habilitado, get_reloj, partir_pagina,
+    solo_administradores,
+)
+from bot.config import (
+    DIAS_HISTORIAL_MIN, DIAS_HISTORIAL_MAX, HISTORIAL_FILAS_POR_PAGINA, MSG_REGISTRO_PENDIENTE,
+    REPORTE_ADJUNTOS_POR_MENSAJE, REPORTE_FILAS_POR_LOTE, get_settings,
+)
+from contextlib import aclosing
+from datetime import date, time, timedelta
+from pathlib import Path
+import asyncio
 import database as db
+from bot.core.metrics import instrumentar_comandos
 import logging
+import shutil
+import tempfile
+from typing import List, Optional, Set
 
 from .modals import SalidaAnticipadaModal
 
+logger = logging.getLogger(__name__)
+
+COLUMNAS_REPORTE = (
+    "fecha", "practicante_id", "id_discord", "nombre", "hora_entrada", "hora_salida", "estado", "motivo",
+)
+
 
 class Asistencia(commands.GroupCog, name="asistencia"):
     """Cog para gestionar comandos de asistencia"""
     
-    def __init__(self, bot: commands.Bot):
+    def __init__(self, bot: commands.Bot, reloj: Optional[Reloj] = None):
         super().__init__()
         self.bot = bot
+        self.reloj = reloj or get_reloj()
+        self.repositorio = AsistenciaRepository(db)
+        instrumentar_comandos(self)
 
     @app_commands.command(name='entrada', description="Registrar tu hora de entrada")
+    @canal_habilitado()
     async def entrada(self, interaction: discord.Interaction):
-        if not await canal_permitido(interaction):
-            logging.warning(f'Canal no permitido para el usuario {interaction.user.display_name}.')
-            return
-        
         await interaction.response.defer(ephemeral=True)
 
         discord_id = interaction.user.id
         nombre_usuario = interaction.user.mention
-        logging.info(f'Usuario {interaction.user.display_name} está intentando registrar entrada.')
+        logger.info('Usuario %s está intentando registrar entrada.', interaction.user.display_name)
         practicante_id = await obtener_practicante(interaction, discord_id)
         if not practicante_id:
-            logging.warning(f'Practicante no encontrado para el usuario {interaction.user.display_name}.')
+            logger.warning('Practicante no encontrado para el usuario %s.', interaction.user.display_name)
             return
 
-        fecha_actual = datetime.now().date()
-        hora_actual = datetime.now().time()
+        # Fecha, hora y día salen de una sola lectura del reloj; sin microsegundos, como los
+        # guarda la columna TIME, para que la instantánea del día coincida con la base de datos
+        ahora = self.reloj.ahora().replace(microsecond=0)
+        fecha_actual = ahora.date()
+        hora_actual = ahora.time()
         hora_inicio_permitida = time(7, 0)
         hora_fin_permitida = time(14, 0)
-        dia_actual = datetime.now().weekday()
+        dia_actual = ahora.weekday()
 
         # Verificar si la hora actual está dentro del rango permitido y no es domingo
         if not (hora_inicio_permitida <= hora_actual <= hora_fin_permitida) or dia_actual in [5, 6]:
@@ -48,24 +82,14 @@ class Asistencia(commands.GroupCog, name="asistencia"):
             )
             return
 
-        asistencia_existente = await verificar_entrada(practicante_id, fecha_actual)
-        
-        # Si ya existe una entrada para hoy, informar al usuario
-        if asistencia_existente:
-            await interaction.followup.send(
-                f"{nombre_usuario}, ya has registrado tu entrada el día de hoy.",
-                ephemeral=True
-            )
-            return
-
         hora_limite_tardanza = time(8, 10, 59)
         
         # Determinar estado de asistencia
         if hora_actual > hora_limite_tardanza:
-            estado_id = await obtener_estado_asistencia('Tardanza')
+            estado_id = await obtener_estado_asistencia(Estado.TARDANZA)
             mensaje = f"{nombre_usuario}, se ha registrado tu entrada a las {hora_actual.strftime('%H:%M')} con tardanza."
         else:
-            estado_id = await obtener_estado_asistencia('Presente')
+            estado_id = await obtener_estado_asistencia(Estado.PRESENTE)
             mensaje = f"{nombre_usuario}, se ha registrado tu entrada a las {hora_actual.strftime('%H:%M')}."
             
         if not estado_id:
@@ -75,89 +99,137 @@ class Asistencia(commands.GroupCog, name="asistencia"):
             )
             return
             
-        query_insert_asistencia = """
-        INSERT INTO Asistencia (practicante_id, fecha, hora_entrada, estado_id)
-        VALUES (%s, %s, %s, %s)
-        """
-        await db.execute_query(query_insert_asistencia, (practicante_id, fecha_actual, hora_actual, estado_id))
-        logging.info(f'Entrada registrada para el usuario {interaction.user.display_name}.')
+        # Si la instantánea del día ya tiene la entrada, no hace falta ir a la base de datos
+        if await asistencia_de_hoy(practicante_id, fecha_actual, respaldo_db=False):
+            await interaction.followup.send(
+                f"{nombre_usuario}, ya has registrado tu entrada el día de hoy.",
+                ephemeral=True
+            )
+            return
+
+        # Se encola en el escritor por lotes: en hora punta varias entradas comparten un commit.
+        # La clave única (practicante_id, fecha) hace el INSERT condicional: 0 filas = ya existía.
+        # Sin base de datos queda en el diario local (None = pendiente)
+        insertadas = await db.execute_durable(
+            queries.ASISTENCIA_INSERTAR,
+            (practicante_id, fecha_actual, hora_actual, estado_id),
+            submit=db.get_asistencia_writer().submit,
+        )
+
+        # Si ya existe una entrada para hoy, informar al usuario
+        if insertadas == 0:
+            await interaction.followup.send(
+                f"{nombre_usuario}, ya has registrado tu entrada el día de hoy.",
+                ephemeral=True
+            )
+            return
+
+        get_asistencia_dia().registrar_entrada(fecha_actual, practicante_id, hora_actual, estado_id)
+        get_historial_cache().invalidate(HISTORIAL_ASISTENCIA, practicante_id)
+        if insertadas is None:
+            logger.warning('Entrada del usuario %s pendiente en el diario local.', interaction.user.display_name)
+            mensaje = f"{mensaje}\n{MSG_REGISTRO_PENDIENTE}"
+        else:
+            logger.info('Entrada registrada para el usuario %s.', interaction.user.display_name)
         await interaction.followup.send(mensaje, ephemeral=True)
 
     @app_commands.command(name='salida', description="Registrar tu hora de salida")
+    @canal_habilitado()
     async def salida(self, interaction: discord.Interaction):
-        if not await canal_permitido(interaction):
-            logging.warning(f'Canal no permitido para el usuario {interaction.user.display_name}.')
-            return
-        
         discord_id = interaction.user.id
         nombre_usuario = interaction.user.mention
-        logging.info(f'Usuario {interaction.user.display_name} está intentando registrar salida.')
-        
-        practicante_id = await obtener_practicante(interaction, discord_id)
+        logger.info('Usuario %s está intentando registrar salida.', interaction.user.display_name)
+        ahora = self.reloj.ahora().replace(microsecond=0)
+        fecha_actual = ahora.date()
+
+        # Las lecturas van antes de responder: si MySQL tarda, se hace defer antes del plazo
+        async def leer_salida():
+            practicante_id = await resolver_practicante(discord_id)
+            asistencia = await asistencia_de_hoy(practicante_id, fecha_actual) if practicante_id else None
+            return practicante_id, asistencia
+
+        plazo = PlazoInteraccion(interaction)
+        practicante_id, asistencia = await plazo.esperar(leer_salida())
         if not practicante_id:
-            logging.warning(f'Practicante no encontrado para el usuario {interaction.user.display_name}.')
+            logger.warning('Practicante no encontrado para el usuario %s.', interaction.user.display_name)
+            await avisar_no_registrado(interaction)
             return
-
-        fecha_actual = datetime.now().date()
-        query_asistencia = "SELECT id, hora_salida FROM Asistencia WHERE practicante_id = %s AND fecha = %s"
-        asistencia = await db.fetch_one(query_asistencia, (practicante_id, fecha_actual))
         
         if not asistencia:
-            await interaction.response.send_message(
+            await plazo.responder(
                 f"{nombre_usuario}, no has registrado tu entrada el día de hoy.",
                 ephemeral=True
             )
             return
 
-        if asistencia['hora_salida']:
-            await interaction.response.send_message(
+        if asistencia.hora_salida:
+            await plazo.responder(
                 f"{nombre_usuario}, ya has registrado tu salida el día de hoy.",
                 ephemeral=True
             )
             return
 
-        hora_actual = datetime.now().time()
+        hora_actual = ahora.time()
 
         if hora_actual < time(14, 0):
-            # Abrir modal para salida anticipada
-            modal = SalidaAnticipadaModal(hora_actual, asistencia, nombre_usuario)
-            await interaction.response.send_modal(modal)
+            # Abrir modal para salida anticipada (tras un defer, desde un botón; uno nuevo por clic)
+            await plazo.enviar_modal(
+                lambda: SalidaAnticipadaModal(hora_actual, practicante_id, fecha_actual, nombre_usuario),
+                f"{nombre_usuario}, es antes de las 14:00: indica el motivo de tu salida anticipada.",
+                "Registrar salida anticipada"
+            )
         else:
-            await interaction.response.defer(ephemeral=True)
+            await plazo.defer(ephemeral=True)
             # Salida normal, solo actualizar hora
-            query_update_salida = "UPDATE Asistencia SET hora_salida = %s WHERE id = %s"
-            await db.execute_query(query_update_salida, (hora_actual, asistencia['id']))
-            logging.info(f'Salida registrada para el usuario {interaction.user.display_name}.')
-            await interaction.followup.send(
-                f"{nombre_usuario}, se ha registrado tu salida a las {hora_actual.strftime('%H:%M')}.",
-                ephemeral=True
+            actualizadas = await db.execute_durable(
+                queries.ASISTENCIA_REGISTRAR_SALIDA, (hora_actual, practicante_id, fecha_actual)
             )
+            if actualizadas == 0:
+                # La instantánea estaba desactualizada: se descarta para releer de la base de datos
+                get_asistencia_dia().descartar(practicante_id)
+                await interaction.followup.send(
+                    f"{nombre_usuario}, ya has registrado tu salida el día de hoy.",
+                    ephemeral=True
+                )
+                return
+            get_asistencia_dia().registrar_salida(fecha_actual, practicante_id, hora_actual)
+            get_historial_cache().invalidate(HISTORIAL_ASISTENCIA, practicante_id)
+            mensaje = f"{nombre_usuario}, se ha registrado tu salida a las {hora_actual.strftime('%H:%M')}."
+            if actualizadas is None:
+                logger.warning('Salida del usuario %s pendiente en el diario local.', interaction.user.display_name)
+                mensaje = f"{mensaje}\n{MSG_REGISTRO_PENDIENTE}"
+            else:
+                logger.info('Salida registrada para el usuario %s.', interaction.user.display_name)
+            await interaction.followup.send(mensaje, ephemeral=True)
 
     @app_commands.command(name='estado', description="Consultar tu estado de asistencia del día")
+    @canal_habilitado()
     async def estado(self, interaction: discord.Interaction):
-        if not await canal_permitido(interaction):
-            logging.warning(f'Canal no permitido para el usuario {interaction.user.display_name}.')
-            return
-        
         await interaction.response.defer(ephemeral=True)
 
         discord_id = interaction.user.id
         nombre_usuario = interaction.user.display_name
-        logging.info(f'Usuario {nombre_usuario} está consultando su estado de asistencia.')
-        practicante_id = await obtener_practicante(interaction, discord_id)
-        if not practicante_id:
-            logging.warning(f'Practicante no encontrado para el usuario {interaction.user.display_name}.')
-            return
-            
-        # Consultar estado de asistencia
-        fecha_actual = datetime.now().date()
-        query_estado = """
-        SELECT a.hora_entrada, a.hora_salida, ea.estado
-        FROM Asistencia a
-        INNER JOIN Estado_Asistencia ea ON a.estado_id = ea.id
-        WHERE a.practicante_id = %s AND a.fecha = %s
-        """
-        resultado = await db.fetch_one(query_estado, (practicante_id, fecha_actual))
+        logger.info('Usuario %s está consultando su estado de asistencia.', nombre_usuario)
+
+        fecha_actual = self.reloj.hoy()
+        resultado = None
+
+        # Si el practicante ya es conocido, el estado sale de la instantánea del día
+        practicante_id = get_practicante_cache().get(discord_id)
+        if isinstance(practicante_id, int):
+            resultado = await asistencia_de_hoy(practicante_id, fecha_actual, respaldo_db=False)
+
+        if resultado is None:
+            # Practicante y estado del día en una sola consulta
+            lectura = await self.repositorio.estado_del_dia(discord_id, fecha_actual)
+            if not lectura.registrado:
+                logger.warning('Practicante no encontrado para el usuario %s.', interaction.user.display_name)
+                await avisar_no_registrado(interaction)
+                return
+            if lectura.filas:
+                resultado = get_asistencia_dia().guardar(fecha_actual, lectura.practicante_id, lectura.filas[0])
+
+        catalogo = get_estado_catalogo()
         
         # Embed de respuesta
         embed = Embed(
@@ -167,9 +239,9 @@ class Asistencia(commands.GroupCog, name="asistencia"):
 
         if resultado:
             # Si tiene un registro, mostrar el estado, hora de entrada y salida
-            embed.add_field(name="✅ Estado de Asistencia", value=f"**{resultado['estado']}**", inline=False)
-            embed.add_field(name="🕒 Hora de Entrada", value=f"{resultado['hora_entrada'] or 'No registrada'}", inline=False)
-            embed.add_field(name="⏳ Hora de Salida", value=f"{resultado['hora_salida'] or 'No registrada'}", inline=False)
+            embed.add_field(name="✅ Estado de Asistencia", value=f"**{catalogo.nombre(resultado.estado_id) or 'No registrado'}**", inline=False)
+            embed.add_field(name="🕒 Hora de Entrada", value=f"{resultado.hora_entrada or 'No registrada'}", inline=False)
+            embed.add_field(name="⏳ Hora de Salida", value=f"{resultado.hora_salida or 'No registrada'}", inline=False)
         else:
             # Si no tiene registro, mostrar mensaje de falta injustificada
             embed.add_field(name="❌ Estado de Asistencia", value="Falta injustificada", inline=False)
@@ -179,68 +251,239 @@ class Asistencia(commands.GroupCog, name="asistencia"):
         await interaction.followup.send(embed=embed, ephemeral=True)
 
     @app_commands.command(name='historial', description="Consultar tu historial de asistencia")
-    @app_commands.describe(dias="Cantidad de días a mostrar (1-15)")
+    @app_commands.describe(dias=f"Cantidad de días a mostrar ({DIAS_HISTORIAL_MIN}-{DIAS_HISTORIAL_MAX})")
+    @canal_habilitado()
     async def historial(self, interaction: discord.Interaction, dias: int = 7):
-        if not await canal_permitido(interaction):
-            logging.warning(f'Canal no permitido para el usuario {interaction.user.display_name}.')
-            return
-        
         await interaction.response.defer(ephemeral=True)
 
         discord_id = interaction.user.id
         nombre_usuario = interaction.user.mention
-        logging.info(f'Usuario {interaction.user.display_name} está consultando su historial de asistencia.')
-        practicante_id = await obtener_practicante(interaction, discord_id)
-        if not practicante_id:
-            logging.warning(f'Practicante no encontrado para el usuario {interaction.user.display_name}.')
-            return
-        
+        logger.info('Usuario %s está consultando su historial de asistencia.', interaction.user.display_name)
+
         # Validar el rango de días
-        if dias < 1 or dias > 15:
+        if dias < DIAS_HISTORIAL_MIN or dias > DIAS_HISTORIAL_MAX:
             await interaction.followup.send(
-                f"{nombre_usuario}, el número de días debe estar entre 1 y 15.",
+                f"{nombre_usuario}, el número de días debe estar entre {DIAS_HISTORIAL_MIN} y {DIAS_HISTORIAL_MAX}.",
                 ephemeral=True
             )
             return
         
-        fecha_actual = datetime.now().date()
+        fecha_actual = self.reloj.hoy()
         fecha_inicio = fecha_actual - timedelta(days=dias)
 
-        query_historial = """
-            SELECT date_format(a.fecha, '%%m-%%d') as fecha, a.hora_entrada, a.hora_salida, ea.estado
-            FROM Asistencia a
-            INNER JOIN Estado_Asistencia ea ON ea.id = a.estado_id
-            WHERE Practicante_id = %s AND fecha >= %s
-            ORDER BY a.fecha DESC
+        # Un historial ya mostrado hoy y sin escrituras posteriores se reenvía tal cual
+        historiales = get_historial_cache()
+        practicante_id = get_practicante_cache().get(discord_id)
+        if isinstance(practicante_id, int):
+            mensaje = historiales.get(HISTORIAL_ASISTENCIA, practicante_id, dias, fecha_actual)
+            if mensaje is not MISSING:
+                await self._enviar_historial(interaction, practicante_id, dias, fecha_inicio, mensaje)
+                return
+
+        # Practicante y primera página del historial en una sola consulta
+        lectura = await self.repositorio.historial(discord_id, fecha_inicio, HISTORIAL_FILAS_POR_PAGINA + 1)
+        if not lectura.registrado:
+            logger.warning('Practicante no encontrado para el usuario %s.', interaction.user.display_name)
+            await avisar_no_registrado(interaction)
+            return
+
+        if not lectura.filas:
+            mensaje = {"content": f"{nombre_usuario}, no se encontraron registros en los últimos {dias} días."}
+        else:
+            filas, siguiente = partir_pagina(lectura.filas, HISTORIAL_FILAS_POR_PAGINA, "fecha_clave")
+            pagina = 1 if siguiente is not None else None
+            mensaje = {"embed": self._embed_historial(interaction, dias, filas, pagina), "siguiente": siguiente}
+        historiales.set(HISTORIAL_ASISTENCIA, lectura.practicante_id, dias, fecha_actual, mensaje)
+        await self._enviar_historial(interaction, lectura.practicante_id, dias, fecha_inicio, mensaje)
+
+    @app_commands.command(name='resumen', description="Consultar tu resumen de asistencia del mes")
+    @app_commands.describe(mes="Mes a consultar (AAAA-MM); por defecto el actual")
+    @canal_habilitado()
+    async def resumen(self, interaction: discord.Interaction, mes: Optional[str] = None):
+        await interaction.response.defer(ephemeral=True)
+        logger.info('Usuario %s está consultando su resumen de asistencia.', interaction.user.display_name)
+
+        try:
+            inicio = date.fromisoformat(f"{mes}-01") if mes else inicio_mes(self.reloj.hoy())
+        except ValueError:
+            await interaction.followup.send("El mes debe tener el formato AAAA-MM.", ephemeral=True)
+            return
+
+        # Una sola fila de contadores, sin recorrer las asistencias del mes
+        lectura = await self.repositorio.resumen_mes(interaction.user.id, inicio)
+        if not lectura.registrado:
+            logger.warning('Practicante no encontrado para el usuario %s.', interaction.user.display_name)
+            await avisar_no_registrado(interaction)
+            return
+
+        fila = lectura.filas[0] if lectura.filas else dict.fromkeys(CONTADORES, 0)
+        horas, minutos = divmod(fila['minutos_trabajados'], 60)
+        embed = Embed(
+            title=f"📊 Resumen de Asistencia - {inicio.strftime('%m/%Y')}",
+            description=f"**{interaction.user.display_name}**, este es tu resumen del mes:",
+            color=Color.blue()
+        )
+        embed.add_field(name="✅ Presentes", value=str(fila['presentes']), inline=True)
+        embed.add_field(name="🟠 Tardanzas", value=str(fila['tardanzas']), inline=True)
+        embed.add_field(name="🚪 Salidas anticipadas", value=str(fila['salidas_anticipadas']), inline=True)
+        embed.add_field(name="❌ Faltas injustificadas", value=str(fila['faltas']), inline=True)
+        embed.add_field(name="🔁 Recuperaciones", value=str(fila['recuperaciones']), inline=True)
+        embed.add_field(name="🕒 Tiempo trabajado", value=f"{horas} h {minutos} min", inline=True)
+        embed.set_footer(text="Si tienes dudas, contacta con el administrador.")
+
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+    @app_commands.command(name='reporte', description="Exportar la asistencia de un rango de fechas (solo administradores)")
+    @app_commands.describe(
+        desde="Fecha inicial (AAAA-MM-DD)",
+        hasta="Fecha final (AAAA-MM-DD)",
+        todos_los_servidores="Incluir a los practicantes de todos los servidores, no solo los de este",
+        rol="Incluir solo a los miembros con este rol",
+    )
+    @solo_administradores()
+    async def reporte(
+        self,
+        interaction: discord.Interaction,
+        desde: str,
+        hasta: str,
+        todos_los_servidores: bool = False,
+        rol: Optional[discord.Role] = None,
+    ):
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        logger.info(
+            'Usuario %s está exportando la asistencia de %s a %s (todos los servidores: %s).',
+            interaction.user.display_name, desde, hasta, todos_los_servidores
+        )
+
+        try:
+            fecha_desde = date.fromisoformat(desde)
+            fecha_hasta = date.fromisoformat(hasta)
+        except ValueError:
+            await interaction.followup.send("Las fechas deben tener el formato AAAA-MM-DD.", ephemeral=True)
+            return
+        if fecha_desde > fecha_hasta:
+            await interaction.followup.send("La fecha inicial no puede ser posterior a la final.", ephemeral=True)
+            return
+
+        # Filtros por Discord ID: los practicantes no guardan el servidor, se cruzan con sus miembros.
+        # Por defecto solo los de este servidor; todos los servidores hay que pedirlo explícitamente
+        miembros: Optional[Set[int]] = None
+        if rol is not None:
+            miembros = {miembro.id for miembro in rol.members}
+        elif not todos_los_servidores:
+            miembros = {miembro.id for miembro in interaction.guild.members}
+
+        limite = min(get_settings().REPORTE_PARTE_MAX_BYTES, interaction.guild.filesize_limit)
+        # Se borra en un hilo: con partes de varios MiB el rmtree bloquearía el event loop
+        directorio = Path(tempfile.mkdtemp(prefix="reporte_"))
+        try:
+            reporte = ReporteCSV(directorio, f"asistencia_{fecha_desde}_{fecha_hasta}", COLUMNAS_REPORTE, limite)
+            try:
+                await self._exportar_reporte(interaction.guild, reporte, fecha_desde, fecha_hasta, miembros)
+            finally:
+                partes = await asyncio.to_thread(reporte.cerrar)
+
+            if not reporte.filas:
+                await interaction.followup.send(
+                    f"No se encontraron registros de asistencia entre {fecha_desde} y {fecha_hasta}.",
+                    ephemeral=True
+                )
+                return
+
+            logger.info('Reporte de asistencia: %s filas en %s partes.', reporte.filas, len(partes))
+            await self._enviar_partes(interaction, partes, reporte.filas)
+        finally:
+            await asyncio.to_thread(shutil.rmtree, directorio, ignore_errors=True)
+
+    async def _exportar_reporte(
+        self, guild: discord.Guild, reporte: ReporteCSV, desde: date, hasta: date, miembros: Optional[Set[int]]
+    ) -> None:
+        """Lee el rango por lotes con un cursor sin buffer y comprime cada lote en un hilo"""
+        async with aclosing(
+            db.stream(queries.ASISTENCIA_REPORTE, (desde, hasta), chunk_size=REPORTE_FILAS_POR_LOTE)
+        ) as lotes:
+            async for lote in lotes:
+                filas = []
+                for fila in lote:
+                    if miembros is not None and fila['id_discord'] not in miembros:
+                        continue
+                    miembro = guild.get_member(fila['id_discord']) if fila['id_discord'] else None
+                    filas.append((
+                        fila['fecha'], fila['practicante_id'], fila['id_discord'],
+                        miembro.display_name if miembro else '',
+                        fila['hora_entrada'] or '', fila['hora_salida'] or '',
+                        fila['estado'] or '', fila['motivo'] or '',
+                    ))
+                if filas:
+                    await asyncio.to_thread(reporte.escribir, filas)
+
+    async def _enviar_partes(self, interaction: discord.Interaction, partes: List[Path], filas: int):
         """
+        Adjunta las partes en el menor número de mensajes
 
-        resultados = await db.fetch_all(query_historial, (practicante_id, fecha_inicio))
+        El límite de subida del servidor se aplica a la suma de adjuntos de cada
+        mensaje, así que se agrupan por tamaño acumulado y hasta el máximo de archivos.
+        """
+        limite = interaction.guild.filesize_limit
+        grupos: List[List[Path]] = []
+        acumulado = 0
+        for ruta in partes:
+            tamano = ruta.stat().st_size
+            if not grupos or len(grupos[-1]) >= REPORTE_ADJUNTOS_POR_MENSAJE or acumulado + tamano > limite:
+                grupos.append([])
+                acumulado = 0
+            grupos[-1].append(ruta)
+            acumulado += tamano
 
-        if not resultados:
+        inicio = 1
+        for grupo in grupos:
+            contenido = f"📊 Reporte de asistencia: {filas} registros en {len(partes)} archivo(s)."
+            if len(grupos) > 1:
+                contenido += f" Archivos {inicio}-{inicio + len(grupo) - 1}."
             await interaction.followup.send(
-                f"{nombre_usuario}, no se encontraron registros en los últimos {dias} días.",
-                ephemeral=True
+                contenido, files=[discord.File(ruta) for ruta in grupo], ephemeral=True
             )
-            return
-        
-        # Crear el Embed para el historial
+            inicio += len(grupo)
+
+    async def _enviar_historial(self, interaction: discord.Interaction, practicante_id: int, dias: int, fecha_inicio, mensaje: dict):
+        """Envía la primera página; si hay más, con botones que cargan las siguientes bajo demanda"""
+        kwargs = {clave: valor for clave, valor in mensaje.items() if clave != "siguiente"}
+        siguiente = mensaje.get("siguiente")
+
+        if siguiente is not None:
+            async def cargar(cursor, numero):
+                filas = await self.repositorio.historial_pagina(
+                    practicante_id, fecha_inicio, cursor, HISTORIAL_FILAS_POR_PAGINA + 1
+                )
+                filas, cursor_siguiente = partir_pagina(filas, HISTORIAL_FILAS_POR_PAGINA, "fecha_clave")
+                return self._embed_historial(interaction, dias, filas, numero), cursor_siguiente
+
+            kwargs["view"] = PaginadorKeyset(interaction.user.id, kwargs["embed"], siguiente, cargar)
+
+        await interaction.followup.send(**kwargs, ephemeral=True)
+
+    def _embed_historial(self, interaction: discord.Interaction, dias: int, resultados: list, pagina=None) -> Embed:
+        """Construye el embed de una página del historial (pagina=None si cabe en una sola)"""
         embed = Embed(
             title=f"📅 Historial de Asistencia - Últimos {dias} días",
             description=f"**{interaction.user.display_name}**, aquí está tu historial de asistencia para los últimos {dias} días:",
             color=Color.blue()
         )
 
+        catalogo = get_estado_catalogo()
+
         # Recorrer los resultados y añadirlos al Embed
         for resultado in resultados:
             fecha = resultado['fecha']
             entrada = resultado['hora_entrada'] or 'No registrada'
             salida = resultado['hora_salida'] or 'No registrada'
-            estado = resultado['estado'] or 'Falta injustificada'
+            estado_id = resultado['estado_id']
+            estado = catalogo.nombre(estado_id) or str(Estado.FALTA_INJUSTIFICADA)
 
             # Añadir el emoji al estado
-            if estado in ['Presente', 'Falta Recuperada']:
+            if catalogo.es(estado_id, Estado.PRESENTE) or catalogo.es(estado_id, Estado.FALTA_RECUPERADA):
                 estado_emoji = "✅"  # Verde: Asistencia
-            elif estado == 'Falta Injustificada':
+            elif estado_id is None or catalogo.es(estado_id, Estado.FALTA_INJUSTIFICADA):
                 estado_emoji = "❌"  # Rojo: Falta injustificada
             else:
                 estado_emoji = "🟠"  # Naranja para otros estados
@@ -252,7 +495,7 @@ class Asistencia(commands.GroupCog, name="asistencia"):
                 inline=False
             )
         
-        embed.set_footer(text="Si tienes dudas, contacta con el administrador.")
-
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        pie = "Si tienes dudas, contacta con el administrador."
+        embed.set_footer(text=f"Página {pagina} · {pie}" if pagina else pie)
 
+        return embed
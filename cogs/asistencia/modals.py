@@ -4,6 +4,10 @@ import database as db
 import discord
 from discord import TextStyle, ui
 from utils import obtener_estado_asistencia
+from bot.core.cache import Estado, get_asistencia_dia, get_historial_cache, HISTORIAL_ASISTENCIA
+from bot.core.database import con_usuario_db, queries
+from bot.config import MSG_REGISTRO_PENDIENTE
+from bot.core.utils import PlazoInteraccion
 
 
 class SalidaAnticipadaModal(ui.Modal, title="Salida Anticipada"):
@@ -17,31 +21,45 @@ class SalidaAnticipadaModal(ui.Modal, title="Salida Anticipada"):
         max_length=255
     )
 
-    def __init__(self, hora_actual, asistencia, nombre_usuario):
+    def __init__(self, hora_actual, practicante_id, fecha, nombre_usuario):
         super().__init__()
         self.hora_actual = hora_actual
-        self.asistencia = asistencia
+        self.practicante_id = practicante_id
+        self.fecha = fecha
         self.nombre_usuario = nombre_usuario
 
+    @con_usuario_db
     async def on_submit(self, interaction: discord.Interaction):
         """Maneja el envío del modal"""
         motivo_guardado = self.motivo.value
 
-        # Actualizar la DB con la salida anticipada
-        estado_id = await obtener_estado_asistencia('Salida Anticipada')
-        query_update_salida = """
-            UPDATE Asistencia 
-            SET hora_salida = %s, estado_id = %s, motivo = %s 
-            WHERE id = %s
-        """
-        await db.execute_query(
-            query_update_salida,
-            (self.hora_actual, estado_id, motivo_guardado, self.asistencia['id'])
-        )
-
-        await interaction.response.send_message(
-            f"{self.nombre_usuario}, tu salida anticipada ha sido registrada con éxito.",
-            ephemeral=True
-        )
+        # Actualizar la DB con la salida anticipada (el envío del modal también tiene plazo)
+        async def guardar_salida():
+            estado_id = await obtener_estado_asistencia(Estado.SALIDA_ANTICIPADA)
+            actualizadas = await db.execute_durable(
+                queries.ASISTENCIA_SALIDA_ANTICIPADA,
+                (self.hora_actual, estado_id, motivo_guardado, self.practicante_id, self.fecha)
+            )
+            return estado_id, actualizadas
+
+        plazo = PlazoInteraccion(interaction)
+        estado_id, actualizadas = await plazo.esperar(guardar_salida())
+
+        # Si otra interacción registró la salida mientras el modal estaba abierto
+        if actualizadas == 0:
+            get_asistencia_dia().descartar(self.practicante_id)
+            await plazo.responder(
+                f"{self.nombre_usuario}, ya has registrado tu salida el día de hoy.",
+                ephemeral=True
+            )
+            return
+
+        get_asistencia_dia().registrar_salida(self.fecha, self.practicante_id, self.hora_actual, estado_id)
+        get_historial_cache().invalidate(HISTORIAL_ASISTENCIA, self.practicante_id)
+
+        mensaje = f"{self.nombre_usuario}, tu salida anticipada ha sido registrada con éxito."
+        if actualizadas is None:
+            mensaje = f"{mensaje}\n{MSG_REGISTRO_PENDIENTE}"
+        await plazo.responder(mensaje, ephemeral=True)
 
 
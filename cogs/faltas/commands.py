@@ -3,10 +3,16 @@
 import discord
 from discord import app_commands, Embed, Color
 from discord.ext import commands
-from utils import obtener_practicante, obtener_estado_asistencia, canal_permitido
+from utils import obtener_estado_asistencia, avisar_no_registrado
+from bot.core.cache import Estado
+from bot.core.repositories import AsistenciaRepository
+from bot.core.utils import PlazoInteraccion, canal_habilitado
 import database as db
+from bot.core.metrics import instrumentar_comandos
 import logging
 
+logger = logging.getLogger(__name__)
+
 
 class Faltas(commands.GroupCog, name="faltas"):
     """Cog para gestionar comandos de faltas"""
@@ -14,34 +20,32 @@ class Faltas(commands.GroupCog, name="faltas"):
     def __init__(self, bot: commands.Bot):
         super().__init__()
         self.bot = bot
+        self.repositorio = AsistenciaRepository(db)
+        instrumentar_comandos(self)
 
     @app_commands.command(name='ver', description="Ver tus faltas injustificadas")
+    @canal_habilitado()
     async def ver_faltas(self, interaction: discord.Interaction):
-        if not await canal_permitido(interaction):
-            logging.warning(f'Canal no permitido para el usuario {interaction.user.display_name}.')
-            return
-
         discord_id = interaction.user.id
         nombre_usuario = interaction.user.mention
-        logging.info(f'Usuario {interaction.user.display_name} ha solicitado ver sus faltas injustificadas.')
-        practicante_id = await obtener_practicante(interaction, discord_id)
-        if not practicante_id:
-            logging.warning(f'Practicante no encontrado para el usuario {interaction.user.display_name}.')
+        logger.info('Usuario %s ha solicitado ver sus faltas injustificadas.', interaction.user.display_name)
+
+        # Practicante y sus faltas injustificadas en una sola consulta; si MySQL tarda, defer antes del plazo
+        async def leer_faltas():
+            estado_falta_injustificada_id = await obtener_estado_asistencia(Estado.FALTA_INJUSTIFICADA)
+            return await self.repositorio.faltas(discord_id, estado_falta_injustificada_id)
+
+        plazo = PlazoInteraccion(interaction)
+        lectura = await plazo.esperar(leer_faltas())
+        if not lectura.registrado:
+            logger.warning('Practicante no encontrado para el usuario %s.', interaction.user.display_name)
+            await avisar_no_registrado(interaction)
             return
 
-        # Consultar las faltas injustificadas del practicante
-        query_faltas = """
-            SELECT date_format(fecha, '%%m-%%d') as fecha, motivo
-            FROM Asistencia
-            WHERE practicante_id = %s AND estado_id = %s
-            ORDER BY fecha DESC
-            LIMIT 5
-        """
-        estado_falta_injustificada_id = await obtener_estado_asistencia('Falta injustificada')
-        faltas = await db.fetch_all(query_faltas, (practicante_id, estado_falta_injustificada_id))
+        faltas = lectura.filas
 
         if not faltas:
-            await interaction.response.send_message(
+            await plazo.responder(
                 f"{nombre_usuario}, no tienes faltas injustificadas registradas.",
                 ephemeral=True
             )
@@ -66,6 +70,6 @@ class Faltas(commands.GroupCog, name="faltas"):
 
         embed.set_footer(text="Si tienes dudas, contacta con el administrador.")
 
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await plazo.responder(embed=embed, ephemeral=True)
 
 
@@ -3,49 +3,51 @@
 import discord
 from discord import app_commands, Embed, Color
 from discord.ext import commands
-from utils import obtener_practicante, canal_permitido, verificar_rol_permitido, verificar_recuperacion
-from datetime import datetime, time, timedelta
+from utils import obtener_practicante, avisar_no_registrado
+from datetime import time, timedelta
 import database as db
+from bot.core.metrics import instrumentar_comandos
+from bot.core.database import queries
+from bot.core.repositories import RecuperacionRepository
+from bot.core.utils import PaginadorKeyset, Reloj, canal_habilitado, get_reloj, partir_pagina, rol_recuperacion
+from bot.config import (
+    DIAS_HISTORIAL_RECUPERACION_MIN, DIAS_HISTORIAL_RECUPERACION_MAX, HISTORIAL_FILAS_POR_PAGINA, MSG_REGISTRO_PENDIENTE,
+)
+from bot.core.cache import MISSING, get_practicante_cache, get_historial_cache, HISTORIAL_RECUPERACION
 import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
 
 
 class Recuperacion(commands.Cog):
     """Cog para gestionar comandos de recuperación"""
     
-    def __init__(self, bot: commands.Bot):
+    def __init__(self, bot: commands.Bot, reloj: Optional[Reloj] = None):
         super().__init__()
         self.bot = bot
+        self.reloj = reloj or get_reloj()
+        self.repositorio = RecuperacionRepository(db)
+        instrumentar_comandos(self)
 
     @app_commands.command(name='recuperación', description="Registrar una sesión de recuperación")
+    @rol_recuperacion()
+    @canal_habilitado()
     async def recuperacion(self, interaction: discord.Interaction):
-        if not await canal_permitido(interaction):
-            logging.warning(f'Canal no permitido para el usuario {interaction.user.display_name}.')
-            return
-        
-        # Verificar roles permitidos para recuperación (antes de defer)
-        servidor_id = interaction.guild.id
-        bot = interaction.client
-        roles_permitidos = bot.roles_recuperacion.get(servidor_id, [])
-        
-        # Si hay roles configurados, verificar permisos
-        if roles_permitidos:
-            if not await verificar_rol_permitido(interaction, roles_permitidos, usar_followup=False):
-                logging.warning(f'Usuario {interaction.user.display_name} no tiene los roles necesarios para recuperación.')
-                return
-        
         await interaction.response.defer(ephemeral=True)
 
         discord_id = interaction.user.id
         nombre_usuario = interaction.user.mention
-        logging.info(f'Usuario {interaction.user.display_name} está intentando registrar recuperación.')
+        logger.info('Usuario %s está intentando registrar recuperación.', interaction.user.display_name)
         
         practicante_id = await obtener_practicante(interaction, discord_id)
         if not practicante_id:
-            logging.warning(f'Practicante no encontrado para el usuario {interaction.user.display_name}.')
+            logger.warning('Practicante no encontrado para el usuario %s.', interaction.user.display_name)
             return
 
-        fecha_actual = datetime.now().date()
-        hora_actual = datetime.now().time()
+        ahora = self.reloj.ahora()
+        fecha_actual = ahora.date()
+        hora_actual = ahora.time()
         hora_inicio_permitida = time(14, 30)  # 2:30 PM
         hora_fin_permitida = time(20, 0)      # 8:00 PM
 
@@ -60,10 +62,12 @@ class Recuperacion(commands.Cog):
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
 
-        # Verificar si ya existe una recuperación para hoy
-        recuperacion_existente = await verificar_recuperacion(practicante_id, fecha_actual)
-        
-        if recuperacion_existente:
+        # Insertar la recuperación; la clave única (practicante_id, fecha) descarta duplicados.
+        # Sin base de datos queda en el diario local (None = pendiente)
+        insertadas = await db.execute_durable(queries.RECUPERACION_INSERTAR, (practicante_id, fecha_actual, hora_actual))
+
+        # Si no se insertó ninguna fila, ya existía una recuperación para hoy
+        if insertadas == 0:
             embed = Embed(
                 title="⚠️ Recuperación ya registrada",
                 description=f"{nombre_usuario}, ya has registrado una recuperación el día de hoy.",
@@ -73,20 +77,23 @@ class Recuperacion(commands.Cog):
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
 
-        # Insertar la recuperación en la base de datos
-        query_insert_recuperacion = """
-        INSERT INTO Recuperacion (practicante_id, fecha, hora_entrada)
-        VALUES (%s, %s, %s)
-        """
-        await db.execute_query(query_insert_recuperacion, (practicante_id, fecha_actual, hora_actual))
-        logging.info(f'Recuperación registrada para el usuario {interaction.user.display_name}.')
+        get_historial_cache().invalidate(HISTORIAL_RECUPERACION, practicante_id)
 
         # Crear embed de confirmación
-        embed = Embed(
-            title="✅ Recuperación Registrada",
-            description=f"{nombre_usuario}, se ha registrado tu recuperación correctamente.",
-            color=Color.green()
-        )
+        if insertadas is None:
+            logger.warning('Recuperación del usuario %s pendiente en el diario local.', interaction.user.display_name)
+            embed = Embed(
+                title="⏳ Recuperación Pendiente",
+                description=f"{nombre_usuario}, {MSG_REGISTRO_PENDIENTE}",
+                color=Color.gold()
+            )
+        else:
+            logger.info('Recuperación registrada para el usuario %s.', interaction.user.display_name)
+            embed = Embed(
+                title="✅ Recuperación Registrada",
+                description=f"{nombre_usuario}, se ha registrado tu recuperación correctamente.",
+                color=Color.green()
+            )
         embed.add_field(name="🕒 Hora de Entrada", value=f"{hora_actual.strftime('%H:%M')}", inline=False)
         embed.add_field(name="📅 Fecha", value=f"{fecha_actual.strftime('%d/%m/%Y')}", inline=False)
         embed.set_footer(text="Si tienes dudas, contacta con el administrador.")
@@ -94,54 +101,76 @@ class Recuperacion(commands.Cog):
         await interaction.followup.send(embed=embed, ephemeral=True)
 
     @app_commands.command(name='recuperación_historial', description="Consultar tu historial de recuperaciones")
-    @app_commands.describe(dias="Cantidad de días a mostrar (1-30)")
+    @app_commands.describe(dias=f"Cantidad de días a mostrar ({DIAS_HISTORIAL_RECUPERACION_MIN}-{DIAS_HISTORIAL_RECUPERACION_MAX})")
+    @canal_habilitado()
     async def historial_recuperaciones(self, interaction: discord.Interaction, dias: int = 15):
-        if not await canal_permitido(interaction):
-            logging.warning(f'Canal no permitido para el usuario {interaction.user.display_name}.')
-            return
-        
         await interaction.response.defer(ephemeral=True)
 
         discord_id = interaction.user.id
         nombre_usuario = interaction.user.mention
-        logging.info(f'Usuario {interaction.user.display_name} está consultando su historial de recuperaciones.')
-        
-        practicante_id = await obtener_practicante(interaction, discord_id)
-        if not practicante_id:
-            logging.warning(f'Practicante no encontrado para el usuario {interaction.user.display_name}.')
-            return
-        
+        logger.info('Usuario %s está consultando su historial de recuperaciones.', interaction.user.display_name)
+
         # Validar el rango de días
-        if dias < 1 or dias > 30:
+        if dias < DIAS_HISTORIAL_RECUPERACION_MIN or dias > DIAS_HISTORIAL_RECUPERACION_MAX:
             await interaction.followup.send(
-                f"{nombre_usuario}, el número de días debe estar entre 1 y 30.",
+                f"{nombre_usuario}, el número de días debe estar entre {DIAS_HISTORIAL_RECUPERACION_MIN} y {DIAS_HISTORIAL_RECUPERACION_MAX}.",
                 ephemeral=True
             )
             return
         
-        fecha_actual = datetime.now().date()
+        fecha_actual = self.reloj.hoy()
         fecha_inicio = fecha_actual - timedelta(days=dias)
 
-        query_historial = """
-            SELECT date_format(fecha, '%%m-%%d') as fecha, hora_entrada, hora_salida
-            FROM Recuperacion
-            WHERE practicante_id = %s AND fecha >= %s
-            ORDER BY fecha DESC
-        """
+        # Un historial ya mostrado hoy y sin escrituras posteriores se reenvía tal cual
+        historiales = get_historial_cache()
+        practicante_id = get_practicante_cache().get(discord_id)
+        if isinstance(practicante_id, int):
+            mensaje = historiales.get(HISTORIAL_RECUPERACION, practicante_id, dias, fecha_actual)
+            if mensaje is not MISSING:
+                await self._enviar_historial(interaction, practicante_id, dias, fecha_inicio, mensaje)
+                return
 
-        resultados = await db.fetch_all(query_historial, (practicante_id, fecha_inicio))
+        # Practicante y primera página del historial en una sola consulta
+        lectura = await self.repositorio.historial(discord_id, fecha_inicio, HISTORIAL_FILAS_POR_PAGINA + 1)
+        if not lectura.registrado:
+            logger.warning('Practicante no encontrado para el usuario %s.', interaction.user.display_name)
+            await avisar_no_registrado(interaction)
+            return
 
-        if not resultados:
+        if not lectura.filas:
             embed = Embed(
                 title="📋 Historial de Recuperaciones",
                 description=f"{nombre_usuario}, no se encontraron recuperaciones en los últimos {dias} días.",
                 color=Color.blue()
             )
             embed.set_footer(text="Si tienes dudas, contacta con el administrador.")
-            await interaction.followup.send(embed=embed, ephemeral=True)
-            return
-        
-        # Crear el Embed para el historial
+            mensaje = {"embed": embed}
+        else:
+            filas, siguiente = partir_pagina(lectura.filas, HISTORIAL_FILAS_POR_PAGINA, "fecha_clave")
+            pagina = 1 if siguiente is not None else None
+            mensaje = {"embed": self._embed_historial(interaction, dias, filas, pagina), "siguiente": siguiente}
+        historiales.set(HISTORIAL_RECUPERACION, lectura.practicante_id, dias, fecha_actual, mensaje)
+        await self._enviar_historial(interaction, lectura.practicante_id, dias, fecha_inicio, mensaje)
+
+    async def _enviar_historial(self, interaction: discord.Interaction, practicante_id: int, dias: int, fecha_inicio, mensaje: dict):
+        """Envía la primera página; si hay más, con botones que cargan las siguientes bajo demanda"""
+        kwargs = {clave: valor for clave, valor in mensaje.items() if clave != "siguiente"}
+        siguiente = mensaje.get("siguiente")
+
+        if siguiente is not None:
+            async def cargar(cursor, numero):
+                filas = await self.repositorio.historial_pagina(
+                    practicante_id, fecha_inicio, cursor, HISTORIAL_FILAS_POR_PAGINA + 1
+                )
+                filas, cursor_siguiente = partir_pagina(filas, HISTORIAL_FILAS_POR_PAGINA, "fecha_clave")
+                return self._embed_historial(interaction, dias, filas, numero), cursor_siguiente
+
+            kwargs["view"] = PaginadorKeyset(interaction.user.id, kwargs["embed"], siguiente, cargar)
+
+        await interaction.followup.send(**kwargs, ephemeral=True)
+
+    def _embed_historial(self, interaction: discord.Interaction, dias: int, resultados: list, pagina=None) -> Embed:
+        """Construye el embed de una página del historial (pagina=None si cabe en una sola)"""
         embed = Embed(
             title=f"📋 Historial de Recuperaciones - Últimos {dias} días",
             description=f"**{interaction.user.display_name}**, aquí está tu historial de recuperaciones para los últimos {dias} días:",
@@ -161,8 +190,7 @@ class Recuperacion(commands.Cog):
                 inline=False
             )
         
-        embed.set_footer(text="Si tienes dudas, contacta con el administrador.")
-
-        await interaction.followup.send(embed=embed, ephemeral=True)
-
+        pie = "Si tienes dudas, contacta con el administrador."
+        embed.set_footer(text=f"Página {pagina} · {pie}" if pagina else pie)
 
+        return embed
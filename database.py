@@ -1,13 +1,29 @@
 import os
-from typing import Any, Optional, List, Dict, Tuple, Union, AsyncIterator
+import logging
+from typing import Any, Awaitable, Callable, Optional, List, Dict, Tuple, Union, AsyncIterator, Sequence
 import aiomysql
 import asyncio
+import time
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
+from bot.config import get_settings
+from bot.core.database.batch_writer import BatchWriter
+from bot.core.database.circuit import CERRADO, CircuitBreaker, is_connection_error
+from bot.core.database.journal import WriteJournal
+from bot.core.database.pool import PoolController
+from bot.core.database.registry import Query, get_query_registry, query_name
+from bot.core.database.replicas import ReplicaRouter
+from bot.core.database.resumen import paso_resumen, sumar_entradas
+from bot.core.database.queries import ASISTENCIA_INSERTAR_LOTE
+from bot.core.exceptions.database import DatabasePoolTimeoutError, DatabaseUnavailableError
+from bot.core.metrics import sumar_tiempo_db
+
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 DB_CONFIG = {
     "host": os.getenv("DB_HOST"),
     "user": os.getenv("DB_USER"),
@@ -17,60 +33,338 @@ DB_CONFIG = {
     "autocommit": False,
 }
 
+# Filas leídas por viaje al servidor en stream() cuando no se indica chunk_size
+STREAM_FETCH_SIZE = 500
+
 # Pool de conexiones global
 _pool: Optional[aiomysql.Pool] = None
 
+# Control del pool: timeout de adquisición, métricas de espera y tamaño adaptativo
+_settings = get_settings()
+_pool_controller = PoolController(
+    acquire_timeout=_settings.DB_ACQUIRE_TIMEOUT,
+    base_size=_settings.DB_POOL_MAXSIZE,
+    max_limit=max(_settings.DB_POOL_MAX_LIMIT, _settings.DB_POOL_MAXSIZE),
+    grow_wait_ms=_settings.DB_POOL_GROW_WAIT_MS,
+    shrink_wait_ms=_settings.DB_POOL_SHRINK_WAIT_MS,
+    adaptive=_settings.DB_POOL_ADAPTIVE,
+)
+
+# Réplicas de lectura (None si DB_REPLICA_HOSTS está vacío)
+_replicas: Optional[ReplicaRouter] = ReplicaRouter.desde_settings(_settings)
+
+# Circuit breaker del primario: con MySQL caído se rechaza al instante en vez de esperar el timeout
+_circuit = CircuitBreaker(_settings.DB_CIRCUIT_FAILURES, _settings.DB_CIRCUIT_RESET_S)
+
+# Diario local de escrituras pendientes mientras el primario no está disponible
+_journal = WriteJournal(_settings.DB_JOURNAL_PATH)
+
+# Escritor por lotes para las entradas de asistencia
+_asistencia_writer: Optional[BatchWriter] = None
+
 # Inicializar el pool de conexiones
-async def init_db_pool(minsize: int = 1, maxsize: int = 10) -> aiomysql.Pool:
+async def init_db_pool(minsize: Optional[int] = None, maxsize: Optional[int] = None) -> aiomysql.Pool:
     global _pool
     if _pool is None:
-        _pool = await aiomysql.create_pool(minsize=minsize, maxsize=maxsize, **DB_CONFIG)
+        _pool = await aiomysql.create_pool(
+            minsize=_settings.DB_POOL_MINSIZE if minsize is None else minsize,
+            maxsize=_settings.DB_POOL_MAXSIZE if maxsize is None else maxsize,
+            **DB_CONFIG
+        )
+        _pool_controller.attach(_pool)
+        if _replicas is not None:
+            await _replicas.iniciar(DB_CONFIG, _settings.DB_POOL_MINSIZE, _settings.DB_REPLICA_POOL_MAXSIZE)
     return _pool
 
+# Controlador del pool (métricas, pre-calentamiento y ajuste de tamaño)
+def get_pool_controller() -> PoolController:
+    return _pool_controller
+
+# Router de réplicas de lectura (None si no hay réplicas configuradas)
+def get_replicas() -> Optional[ReplicaRouter]:
+    return _replicas
+
+# Medir el retraso de las réplicas y dejar de usar las atrasadas o caídas
+async def revisar_replicas() -> None:
+    if _replicas is not None:
+        await _replicas.revisar()
+
+# Circuit breaker del primario (estado para métricas)
+def get_circuit() -> CircuitBreaker:
+    return _circuit
+
+# Diario local de escrituras pendientes
+def get_journal() -> WriteJournal:
+    return _journal
+
+# Tras una escritura, las lecturas del usuario en curso van al primario (read-your-writes)
+def _marcar_escritura() -> None:
+    if _replicas is not None:
+        _replicas.marcar_escritura()
+
+# Abrir conexiones por adelantado (antes de la hora punta de entrada)
+async def prewarm_db_pool(size: Optional[int] = None) -> int:
+    await init_db_pool()
+    return await _pool_controller.prewarm(size or _settings.DB_POOL_WARM_SIZE)
+
 # Cerrar el pool de conexiones
 async def close_db_pool() -> None:
-    global _pool
+    global _pool, _asistencia_writer
+    if _asistencia_writer is not None:
+        await _asistencia_writer.close()
+        _asistencia_writer = None
     if _pool is not None:
         _pool.close()
         await _pool.wait_closed()
         _pool = None
+    if _replicas is not None:
+        await _replicas.cerrar()
+
+# Conexión del primario a través del circuit breaker.
+# Los fallos de conexión (no los de la consulta) cuentan para abrir el circuito
+@asynccontextmanager
+async def _primary_connection() -> AsyncIterator[aiomysql.Connection]:
+    if not _circuit.allow():
+        raise DatabaseUnavailableError("La base de datos no está disponible (circuito abierto)")
+    try:
+        await init_db_pool()
+        conn = await _pool_controller.acquire()
+    except Exception as e:
+        # Un timeout sin ninguna conexión en uso no es un pool lleno: el servidor no responde
+        if is_connection_error(e) or (isinstance(e, DatabasePoolTimeoutError) and not _pool_controller.in_use):
+            _circuit.record_failure()
+        raise
+    try:
+        yield conn
+    except Exception as e:
+        if is_connection_error(e):
+            _circuit.record_failure()
+        else:
+            _circuit.record_success()
+        raise
+    else:
+        _circuit.record_success()
+    finally:
+        await _pool_controller.release(conn)
 
 # Context manager para obtener una conexión del pool
+# Lanza DatabasePoolTimeoutError si no hay conexión libre en DB_ACQUIRE_TIMEOUT segundos,
+# o DatabaseUnavailableError al instante si el circuito está abierto.
+# Con lectura=True la conexión puede ser de una réplica; si no hay una disponible, es del primario
 @asynccontextmanager
-async def get_connection() -> AsyncIterator[aiomysql.Connection]:
-    pool = await init_db_pool()
-    conn = await pool.acquire()
+async def get_connection(lectura: bool = False) -> AsyncIterator[aiomysql.Connection]:
+    adquirida = await _replicas.adquirir() if lectura and _replicas is not None else None
+    if adquirida is None:
+        async with _primary_connection() as conn:
+            yield conn
+        return
+    controller, conn = adquirida
     try:
         yield conn
     finally:
-        pool.release(conn)
+        await controller.release(conn)
+
+# Escritor por lotes de INSERTs en Asistencia (un commit por lote, no por usuario)
+def get_asistencia_writer() -> BatchWriter:
+    global _asistencia_writer
+    if _asistencia_writer is None:
+        _asistencia_writer = BatchWriter(
+            "Asistencia",
+            ("practicante_id", "fecha", "hora_entrada", "estado_id"),
+            get_connection,
+            max_batch=_settings.DB_BATCH_MAX_SIZE,
+            max_delay=_settings.DB_BATCH_MAX_DELAY_MS / 1000,
+            skip_duplicates=True,
+            name=ASISTENCIA_INSERTAR_LOTE,
+            on_written=_marcar_escritura,
+            before_commit=sumar_entradas,
+        )
+    return _asistencia_writer
 
 # Funciones para ejecutar consultas
-async def fetch_one(query: str, params: Optional[Union[Tuple, Dict[str, Any]]] = None) -> Optional[Dict[str, Any]]:
-    async with get_connection() as conn:
+# Las lecturas van a una réplica si hay; primario=True las fuerza al primario
+async def fetch_one(
+    query: str,
+    params: Optional[Union[Tuple, Dict[str, Any]]] = None,
+    primario: bool = False,
+) -> Optional[Dict[str, Any]]:
+    async with get_connection(lectura=not primario) as conn:
         try:
-            async with conn.cursor(aiomysql.DictCursor) as cursor:
-                await cursor.execute(query, params)
-                return await cursor.fetchone()
+            with get_query_registry().track(query) as stats:
+                async with conn.cursor(aiomysql.DictCursor) as cursor:
+                    await cursor.execute(query, params)
+                    row = await cursor.fetchone()
+                    stats.rows = 1 if row else 0
+                    return row
         except aiomysql.Error as e:
             raise RuntimeError(f"Error ejecutando fetch_one: {e}") from e
 
-async def fetch_all(query: str, params: Optional[Union[Tuple, Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
-    async with get_connection() as conn:
+async def fetch_all(
+    query: str,
+    params: Optional[Union[Tuple, Dict[str, Any]]] = None,
+    primario: bool = False,
+) -> List[Dict[str, Any]]:
+    async with get_connection(lectura=not primario) as conn:
         try:
-            async with conn.cursor(aiomysql.DictCursor) as cursor:
-                await cursor.execute(query, params)
-                return list(await cursor.fetchall())
+            with get_query_registry().track(query) as stats:
+                async with conn.cursor(aiomysql.DictCursor) as cursor:
+                    await cursor.execute(query, params)
+                    rows = list(await cursor.fetchall())
+                    stats.rows = len(rows)
+                    return rows
         except aiomysql.Error as e:
             raise RuntimeError(f"Error ejecutando fetch_all: {e}") from e
 
 async def execute_query(query: str, params: Optional[Union[Tuple, Dict[str, Any]]] = None) -> int:
     async with get_connection() as conn:
         try:
-            async with conn.cursor() as cursor:
-                await cursor.execute(query, params)
-                await conn.commit()
-                return cursor.lastrowid or 0
+            with get_query_registry().track(query) as stats:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(query, params)
+                    await conn.commit()
+                    _marcar_escritura()
+                    stats.rows = cursor.rowcount
+                    return cursor.lastrowid or 0
         except aiomysql.Error as e:
             await conn.rollback()
             raise RuntimeError(f"Error ejecutando execute_query: {e}") from e
+
+async def execute_rowcount(query: str, params: Optional[Union[Tuple, Dict[str, Any]]] = None) -> int:
+    """
+    Igual que execute_query, pero retorna el número de filas afectadas.
+    Si la escritura cuenta para el resumen mensual, este se actualiza en la misma transacción
+    """
+    paso = paso_resumen(query)
+    async with get_connection() as conn:
+        try:
+            with get_query_registry().track(query) as stats:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(query, params)
+                    stats.rows = afectadas = cursor.rowcount
+            if afectadas and paso is not None:
+                async with conn.cursor() as cursor:
+                    await paso(cursor, params)
+            await conn.commit()
+            _marcar_escritura()
+            return afectadas
+        except aiomysql.Error as e:
+            await conn.rollback()
+            raise RuntimeError(f"Error ejecutando execute_rowcount: {e}") from e
+
+async def execute_many(query: str, seq_params: Sequence[Union[Tuple, Dict[str, Any]]]) -> int:
+    """
+    Ejecuta una misma consulta para muchas filas en una sola transacción.
+    Para INSERT ... VALUES, aiomysql agrupa las filas en INSERTs multi-fila.
+    Retorna el número de filas afectadas
+    """
+    if not seq_params:
+        return 0
+    async with get_connection() as conn:
+        try:
+            with get_query_registry().track(query) as stats:
+                async with conn.cursor() as cursor:
+                    await cursor.executemany(query, seq_params)
+                    await conn.commit()
+                    _marcar_escritura()
+                    stats.rows = cursor.rowcount
+                    return cursor.rowcount
+        except aiomysql.Error as e:
+            await conn.rollback()
+            raise RuntimeError(f"Error ejecutando execute_many: {e}") from e
+
+async def stream(
+    query: str,
+    params: Optional[Union[Tuple, Dict[str, Any]]] = None,
+    chunk_size: Optional[int] = None,
+    primario: bool = False,
+) -> AsyncIterator[Union[Dict[str, Any], List[Dict[str, Any]]]]:
+    """
+    Itera un resultado grande en memoria constante con un cursor sin buffer (SSDictCursor).
+    Sin chunk_size produce filas; con chunk_size produce listas de hasta chunk_size filas.
+
+    La conexión queda ocupada mientras dure la iteración. Usar con contextlib.aclosing
+    para liberarla en cuanto se salga del bucle:
+
+        async with aclosing(db.stream(query, params, chunk_size=500)) as chunks:
+            async for chunk in chunks:
+                ...
+
+    Si se sale antes de leer todo, la conexión se cierra en vez de drenar
+    las filas restantes, y el pool abre otra cuando haga falta.
+    """
+    fetch_size = chunk_size or STREAM_FETCH_SIZE
+    # Solo cuentan execute y fetchmany: el tiempo del consumidor entre lotes no es de la base
+    # de datos, y salir antes (GeneratorExit) es un final normal, no un error de la consulta
+    elapsed = 0.0
+    filas = 0
+    error = False
+    async with get_connection(lectura=not primario) as conn:
+        completed = False
+        try:
+            cursor = await conn.cursor(aiomysql.SSDictCursor)
+            inicio = time.perf_counter()
+            try:
+                await cursor.execute(query, params)
+            except aiomysql.Error as e:
+                error = True
+                raise RuntimeError(f"Error ejecutando stream: {e}") from e
+            finally:
+                elapsed += time.perf_counter() - inicio
+            while True:
+                inicio = time.perf_counter()
+                try:
+                    rows = await cursor.fetchmany(fetch_size)
+                except BaseException:
+                    error = True
+                    raise
+                finally:
+                    elapsed += time.perf_counter() - inicio
+                if not rows:
+                    break
+                filas += len(rows)
+                if chunk_size:
+                    yield list(rows)
+                else:
+                    for row in rows:
+                        yield row
+            await cursor.close()
+            completed = True
+        finally:
+            if not completed:
+                conn.close()
+            get_query_registry().record(query_name(query), elapsed * 1000, filas, error)
+            sumar_tiempo_db(elapsed * 1000)
+
+# Escritura idempotente que no se pierde si el primario no está disponible.
+# Con el circuito abierto, o con escrituras del diario aún sin aplicar (para no alterar
+# el orden), o si falla la conexión, se guarda en el diario local y retorna None (pendiente).
+# Si no, retorna las filas afectadas; submit permite escribir por otra vía (p. ej. por lotes)
+async def execute_durable(
+    query: Query,
+    params: Tuple[Any, ...],
+    submit: Optional[Callable[[Tuple[Any, ...]], Awaitable[int]]] = None,
+) -> Optional[int]:
+    if not _journal.pending and _circuit.state == CERRADO:
+        try:
+            return await (submit(params) if submit else execute_rowcount(query, params))
+        except Exception as e:
+            if not (is_connection_error(e) or _circuit.state != CERRADO):
+                raise
+            logger.warning("Escritura %s diferida al diario local: %s", query.name, e)
+    await _journal.append(query, params)
+    return None
+
+async def _replay_one(query: Query, params: Tuple[Any, ...]) -> None:
+    try:
+        await execute_rowcount(query, params)
+    except Exception as e:
+        # Sin conexión se detiene la reproducción; un registro que MySQL rechaza no debe bloquear al resto
+        if is_connection_error(e):
+            raise
+        logger.error("Escritura %s del diario descartada: %s (params %s)", query.name, e, params)
+
+# Aplicar en orden las escrituras del diario local. Retorna cuántas se aplicaron
+async def replay_journal() -> int:
+    if not _journal.pending:
+        return 0
+    return await _journal.replay(_replay_one)
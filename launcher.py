@@ -0,0 +1,160 @@
+"""
+Lanzador multi-proceso del bot
+
+Reparte los shards de Discord en rangos contiguos entre varios procesos
+de bot.py (cada uno con AutoShardedBot) en la misma máquina. Cada proceso
+recibe una parte del pool de MySQL proporcional a sus shards, y se
+reinicia si termina con error.
+
+Uso:
+    python launcher.py --procesos 4                # shards recomendados por Discord
+    python launcher.py --procesos 2 --shards 8
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import discord
+from dotenv import load_dotenv
+
+from bot.config import get_settings
+from bot.config.logging_config import setup_logging, stop_logging
+from bot.core.sharding import formatear_shard_ids, repartir_shards, tamano_pool
+
+logger = logging.getLogger("launcher")
+
+# Espera antes de relanzar un proceso caído (se duplica en cada caída seguida, hasta el máximo)
+REINICIO_ESPERA_S = 5
+REINICIO_ESPERA_MAX_S = 300
+# Un proceso que duró al menos esto se considera estable y reinicia la espera
+PROCESO_ESTABLE_S = 600
+
+
+async def shards_recomendados(token: str) -> int:
+    """Cantidad de shards que recomienda Discord para el bot"""
+    http = discord.http.HTTPClient(asyncio.get_running_loop())
+    try:
+        await http.static_login(token)
+        shards, _, _ = await http.get_bot_gateway()
+        return shards
+    finally:
+        await http.close()
+
+
+def entorno_proceso(shard_ids: List[int], shard_count: int) -> Dict[str, str]:
+    """Variables de entorno de un proceso: su rango de shards y su parte del pool de MySQL"""
+    settings = get_settings()
+    maxsize = tamano_pool(settings.DB_POOL_MAXSIZE, len(shard_ids), shard_count)
+    # Cada proceso necesita su propio diario de escrituras pendientes
+    diario = Path(settings.DB_JOURNAL_PATH)
+    diario = diario.with_name(f"{diario.stem}.{formatear_shard_ids(shard_ids)}{diario.suffix}")
+    entorno = dict(os.environ)
+    entorno.update({
+        "DISCORD_SHARDED": "true",
+        "DISCORD_SHARD_COUNT": str(shard_count),
+        "DISCORD_SHARD_IDS": formatear_shard_ids(shard_ids),
+        "DB_POOL_MINSIZE": str(min(settings.DB_POOL_MINSIZE, maxsize)),
+        "DB_POOL_MAXSIZE": str(maxsize),
+        "DB_POOL_MAX_LIMIT": str(max(maxsize, tamano_pool(settings.DB_POOL_MAX_LIMIT, len(shard_ids), shard_count))),
+        "DB_POOL_WARM_SIZE": str(min(maxsize, tamano_pool(settings.DB_POOL_WARM_SIZE, len(shard_ids), shard_count))),
+        "DB_JOURNAL_PATH": str(diario),
+        "DB_REPLICA_POOL_MAXSIZE": str(tamano_pool(settings.DB_REPLICA_POOL_MAXSIZE, len(shard_ids), shard_count)),
+    })
+    return entorno
+
+
+class Lanzador:
+    """Mantiene un proceso de bot.py por rango de shards"""
+
+    def __init__(self, rangos: List[List[int]], shard_count: int):
+        self.rangos = rangos
+        self.shard_count = shard_count
+        self.procesos: Dict[int, subprocess.Popen] = {}
+        self.inicios: Dict[int, float] = {}
+        self.esperas: Dict[int, float] = {}
+        self.reintentar_en: Dict[int, float] = {}
+        self.detenido = False
+
+    def lanzar(self, indice: int) -> None:
+        shard_ids = self.rangos[indice]
+        entorno = entorno_proceso(shard_ids, self.shard_count)
+        self.procesos[indice] = subprocess.Popen([sys.executable, "bot.py"], env=entorno)
+        self.inicios[indice] = time.monotonic()
+        logger.info(
+            "Proceso %s lanzado (pid %s, shards %s, pool %s).",
+            indice, self.procesos[indice].pid, entorno["DISCORD_SHARD_IDS"], entorno["DB_POOL_MAXSIZE"],
+        )
+
+    def revisar(self) -> None:
+        """Relanza los procesos que terminaron con error, con espera creciente"""
+        ahora = time.monotonic()
+        for indice, proceso in list(self.procesos.items()):
+            codigo = proceso.poll()
+            if codigo is None:
+                continue
+            del self.procesos[indice]
+            if codigo == 0:
+                logger.info("Proceso %s terminó normalmente.", indice)
+                continue
+            if ahora - self.inicios[indice] >= PROCESO_ESTABLE_S:
+                self.esperas[indice] = REINICIO_ESPERA_S
+            espera = self.esperas.get(indice, REINICIO_ESPERA_S)
+            self.esperas[indice] = min(espera * 2, REINICIO_ESPERA_MAX_S)
+            self.reintentar_en[indice] = ahora + espera
+            logger.error("Proceso %s terminó con código %s; se relanza en %s s.", indice, codigo, espera)
+        for indice, cuando in list(self.reintentar_en.items()):
+            if ahora >= cuando and not self.detenido:
+                del self.reintentar_en[indice]
+                self.lanzar(indice)
+
+    def detener(self, *_: object) -> None:
+        """Pide a todos los procesos que terminen (SIGINT, para que bot.py cierre en orden)"""
+        self.detenido = True
+        for proceso in self.procesos.values():
+            if proceso.poll() is None:
+                proceso.send_signal(signal.SIGINT)
+
+    def ejecutar(self) -> None:
+        for indice in range(len(self.rangos)):
+            self.lanzar(indice)
+        signal.signal(signal.SIGINT, self.detener)
+        signal.signal(signal.SIGTERM, self.detener)
+        while not self.detenido and (self.procesos or self.reintentar_en):
+            self.revisar()
+            time.sleep(1)
+        for proceso in self.procesos.values():
+            proceso.wait()
+
+
+def main() -> None:
+    load_dotenv()
+    setup_logging()
+    parser = argparse.ArgumentParser(description="Lanza el bot en varios procesos con shards repartidos")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1, help="Procesos de bot.py a lanzar")
+    parser.add_argument("--shards", type=int, default=get_settings().DISCORD_SHARD_COUNT,
+                        help="Total de shards (0 = el que recomiende Discord)")
+    args = parser.parse_args()
+
+    shard_count = args.shards
+    if shard_count <= 0:
+        shard_count = asyncio.run(shards_recomendados(get_settings().DISCORD_TOKEN))
+        logger.info("Discord recomienda %s shards.", shard_count)
+
+    rangos = repartir_shards(shard_count, args.procesos)
+    logger.info("%s shards repartidos en %s procesos.", shard_count, len(rangos))
+    try:
+        Lanzador(rangos, shard_count).ejecutar()
+    finally:
+        stop_logging()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,523 @@
+"""
+Prueba de carga de los comandos del bot
+
+Ejecuta los callbacks reales de los cogs con interacciones falsas y una
+base de datos en memoria con latencia y tamaño de pool configurables.
+Reporta p50/p95/p99 por comando, rendimiento y cuántas respuestas habrían
+superado la ventana de 3 segundos de Discord para reconocer la interacción.
+
+Uso:
+    python -m scripts.load_test --comando entrada --usuarios 300
+    python -m scripts.load_test --comando entrada,salida,estado --latencia-ms 20 --pool 5
+"""
+
+import argparse
+import asyncio
+import random
+import time as _time
+from contextlib import ExitStack, asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from unittest.mock import MagicMock, patch
+
+from bot.core.cache import get_asistencia_dia, get_historial_cache, get_practicante_cache, set_estado_catalogo
+from bot.core.database.batch_writer import BatchWriter
+from bot.core.database.queries import ASISTENCIA_INSERTAR_LOTE
+from bot.core.database.registry import query_name
+from bot.core.utils import Reloj
+
+# Ventana de Discord para responder o hacer defer de una interacción
+VENTANA_ACK_S = 3.0
+
+GUILD_ID = 1
+CANAL_ID = 10
+
+ESTADOS = [
+    {"id": 1, "estado": "Presente"},
+    {"id": 2, "estado": "Tardanza"},
+    {"id": 3, "estado": "Salida anticipada"},
+    {"id": 4, "estado": "Falta injustificada"},
+    {"id": 5, "estado": "Falta recuperada"},
+]
+
+# Hora simulada por comando, dentro del horario en que cada uno está permitido
+HORA_POR_COMANDO = {
+    "entrada": time(8, 0),
+    "salida": time(18, 0),
+    "estado": time(12, 0),
+    "historial": time(12, 0),
+    "faltas": time(12, 0),
+    "recuperacion": time(15, 0),
+    "recuperacion_historial": time(15, 0),
+}
+
+
+# ---------------------------------------------------------------------------
+# Base de datos en memoria
+# ---------------------------------------------------------------------------
+
+class FakeDatabase:
+    """
+    Sustituto del módulo ``database`` con latencia y límite de conexiones
+
+    Responde a las consultas con nombre de ``bot.core.database.queries``
+    sobre tablas en memoria. Cada operación ocupa una "conexión" del pool
+    (un semáforo) durante la latencia simulada.
+    """
+
+    def __init__(self, practicantes: int, latencia_ms: float, jitter_ms: float, pool: int, fecha: date):
+        self.latencia_ms = latencia_ms
+        self.jitter_ms = jitter_ms
+        self.fecha = fecha
+        self._pool = asyncio.Semaphore(pool)
+        self.espera_pool_ms: List[float] = []
+        self.practicantes = {1000 + i: i + 1 for i in range(practicantes)}
+        self.asistencia: Dict[Tuple[int, date], Dict[str, Any]] = {}
+        self.recuperacion: Dict[Tuple[int, date], Dict[str, Any]] = {}
+        self._writer: Optional[BatchWriter] = None
+        self._siguiente_id = 1
+
+    # -- Simulación de red y pool --------------------------------------------
+
+    @asynccontextmanager
+    async def get_connection(self):
+        inicio = _time.perf_counter()
+        async with self._pool:
+            self.espera_pool_ms.append((_time.perf_counter() - inicio) * 1000)
+            yield _FakeConnection(self)
+
+    async def _viaje(self) -> None:
+        demora = self.latencia_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        await asyncio.sleep(max(demora, 0) / 1000)
+
+    async def _ejecutar(self, query: str, params) -> Any:
+        async with self.get_connection():
+            await self._viaje()
+            return self._responder(query_name(query), tuple(params or ()))
+
+    # -- API del módulo database ---------------------------------------------
+
+    async def fetch_one(self, query, params=None, primario=False):
+        filas = await self._ejecutar(query, params)
+        return filas[0] if isinstance(filas, list) and filas else None
+
+    async def fetch_all(self, query, params=None, primario=False):
+        filas = await self._ejecutar(query, params)
+        return filas if isinstance(filas, list) else []
+
+    async def execute_query(self, query, params=None):
+        await self._ejecutar(query, params)
+        return 0
+
+    async def execute_rowcount(self, query, params=None):
+        resultado = await self._ejecutar(query, params)
+        return resultado if isinstance(resultado, int) else 0
+
+    async def execute_durable(self, query, params, submit=None):
+        # Sin diario local: la carga simulada mide el camino con la base de datos disponible
+        return await (submit(params) if submit else self.execute_rowcount(query, params))
+
+    def get_asistencia_writer(self) -> BatchWriter:
+        if self._writer is None:
+            self._writer = BatchWriter(
+                "Asistencia",
+                ("practicante_id", "fecha", "hora_entrada", "estado_id"),
+                self.get_connection,
+                skip_duplicates=True,
+                name=ASISTENCIA_INSERTAR_LOTE,
+            )
+        return self._writer
+
+    # -- Datos ---------------------------------------------------------------
+
+    def sembrar_entradas(self) -> None:
+        """Registra la entrada de hoy para todos los practicantes (para salida/estado)"""
+        for practicante_id in self.practicantes.values():
+            self._insertar_asistencia(practicante_id, self.fecha, time(8, 0), 1)
+
+    def _insertar_asistencia(self, practicante_id, fecha, hora_entrada, estado_id) -> int:
+        if (practicante_id, fecha) in self.asistencia:
+            return 0
+        self.asistencia[(practicante_id, fecha)] = {
+            "id": self._siguiente_id, "practicante_id": practicante_id, "fecha": fecha,
+            "hora_entrada": hora_entrada, "hora_salida": None, "estado_id": estado_id, "motivo": None,
+        }
+        self._siguiente_id += 1
+        return 1
+
+    def _con_practicante(self, discord_id, filas: List[Dict[str, Any]], vacia: Dict[str, Any]):
+        """Emula ``Practicante LEFT JOIN ...``: sin practicante no hay filas, sin datos una fila en NULL"""
+        practicante_id = self.practicantes.get(int(discord_id))
+        if practicante_id is None:
+            return []
+        filas = filas(practicante_id) if callable(filas) else filas
+        if not filas:
+            return [dict(vacia, practicante_id=practicante_id)]
+        return [dict(fila, practicante_id=practicante_id) for fila in filas]
+
+    def _historial(self, tabla, practicante_id, desde, antes_de=None, limite=None):
+        filas = sorted(
+            (fila for (pid, fecha), fila in tabla.items()
+             if pid == practicante_id and fecha >= desde and (antes_de is None or fecha < antes_de)),
+            key=lambda fila: fila["fecha"], reverse=True,
+        )
+        return [
+            dict(fila, fecha=fila["fecha"].strftime("%m-%d"), fecha_clave=fila["fecha"])
+            for fila in filas[:limite]
+        ]
+
+    def _responder(self, nombre: str, p: tuple) -> Any:
+        if nombre == "practicante.por_discord":
+            practicante_id = self.practicantes.get(int(p[0]))
+            return [{"id": practicante_id}] if practicante_id else []
+        if nombre == "practicante.roster":
+            return [{"id": pid, "id_discord": did} for did, pid in self.practicantes.items()]
+        if nombre == "estado.catalogo":
+            return list(ESTADOS)
+        if nombre == "asistencia.dia":
+            return [dict(fila) for (pid, fecha), fila in self.asistencia.items() if fecha == p[0]]
+        if nombre == "asistencia.hoy":
+            fila = self.asistencia.get((p[0], p[1]))
+            return [dict(fila)] if fila else []
+        if nombre == "asistencia.registrar_salida":
+            fila = self.asistencia.get((p[1], p[2]))
+            if not fila or fila["hora_salida"]:
+                return 0
+            fila["hora_salida"] = p[0]
+            return 1
+        if nombre == "asistencia.salida_anticipada":
+            fila = self.asistencia.get((p[3], p[4]))
+            if not fila or fila["hora_salida"]:
+                return 0
+            fila.update(hora_salida=p[0], estado_id=p[1], motivo=p[2])
+            return 1
+        if nombre == "asistencia.estado_dia":
+            def hoy(pid):
+                fila = self.asistencia.get((pid, p[0]))
+                return [dict(fila, asistencia_id=fila["id"])] if fila else []
+            return self._con_practicante(p[1], hoy, {"asistencia_id": None})
+        if nombre == "asistencia.historial":
+            return self._con_practicante(
+                p[1], lambda pid: self._historial(self.asistencia, pid, p[0], limite=p[2]), {"fecha": None}
+            )
+        if nombre == "asistencia.historial_pagina":
+            return self._historial(self.asistencia, p[0], p[1], p[2], p[3])
+        if nombre == "faltas.ultimas":
+            def faltas(pid):
+                filas = [f for (i, _), f in self.asistencia.items() if i == pid and f["estado_id"] == p[0]]
+                return [dict(f, fecha=f["fecha"].strftime("%m-%d")) for f in filas[:5]]
+            return self._con_practicante(p[1], faltas, {"fecha": None})
+        if nombre == "recuperacion.insertar":
+            if (p[0], p[1]) in self.recuperacion:
+                return 0
+            self.recuperacion[(p[0], p[1])] = {"fecha": p[1], "hora_entrada": p[2], "hora_salida": None}
+            return 1
+        if nombre == "recuperacion.historial":
+            return self._con_practicante(
+                p[1], lambda pid: self._historial(self.recuperacion, pid, p[0], limite=p[2]), {"fecha": None}
+            )
+        if nombre == "recuperacion.historial_pagina":
+            return self._historial(self.recuperacion, p[0], p[1], p[2], p[3])
+        return []
+
+
+class _FakeCursor:
+    """Cursor para el escritor por lotes: interpreta el INSERT multi-fila de Asistencia"""
+
+    def __init__(self, db: FakeDatabase):
+        self.db = db
+        self.rowcount = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def execute(self, query, params=None):
+        await self.db._viaje()
+        valores = list(params or ())
+        self.rowcount = sum(
+            self.db._insertar_asistencia(*valores[i:i + 4]) for i in range(0, len(valores), 4)
+        )
+
+
+class _FakeConnection:
+    def __init__(self, db: FakeDatabase):
+        self.db = db
+
+    def cursor(self, *args):
+        return _FakeCursor(self.db)
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Interacciones falsas
+# ---------------------------------------------------------------------------
+
+class _Respuesta:
+    def __init__(self, interaccion: "FakeInteraction"):
+        self._interaccion = interaccion
+        self._hecha = False
+
+    def is_done(self) -> bool:
+        return self._hecha
+
+    async def _responder(self) -> None:
+        self._hecha = True
+        self._interaccion._marcar_ack()
+
+    async def defer(self, *args, **kwargs):
+        await self._responder()
+
+    async def send_message(self, *args, **kwargs):
+        await self._responder()
+        self._interaccion._marcar_fin()
+
+    async def send_modal(self, modal):
+        await self._responder()
+        self._interaccion.modal = modal
+        self._interaccion._marcar_fin()
+
+    async def edit_message(self, *args, **kwargs):
+        await self._responder()
+        self._interaccion._marcar_fin()
+
+
+class _Followup:
+    def __init__(self, interaccion: "FakeInteraction"):
+        self._interaccion = interaccion
+        self.mensajes: List[Tuple[tuple, dict]] = []
+
+    async def send(self, *args, **kwargs):
+        self.mensajes.append((args, kwargs))
+        self._interaccion._marcar_fin()
+
+
+class FakeInteraction:
+    """Interacción mínima con marcas de tiempo de reconocimiento y de respuesta final"""
+
+    def __init__(self, discord_id: int, client: Any):
+        self.user = MagicMock()
+        self.user.id = discord_id
+        self.user.mention = f"<@{discord_id}>"
+        self.user.display_name = f"usuario-{discord_id}"
+        self.user.roles = []
+        self.guild = MagicMock()
+        self.guild.id = GUILD_ID
+        self.channel = MagicMock()
+        self.channel.id = CANAL_ID
+        self.client = client
+        self.response = _Respuesta(self)
+        self.followup = _Followup(self)
+        self.modal = None
+        self.inicio = _time.perf_counter()
+        self.ack: Optional[float] = None
+        self.fin: Optional[float] = None
+
+    def _marcar_ack(self) -> None:
+        if self.ack is None:
+            self.ack = _time.perf_counter() - self.inicio
+
+    def _marcar_fin(self) -> None:
+        self.fin = _time.perf_counter() - self.inicio
+
+
+# ---------------------------------------------------------------------------
+# Ejecución
+# ---------------------------------------------------------------------------
+
+@dataclass
+class ResultadoComando:
+    """Latencias medidas para un comando"""
+
+    comando: str
+    ack_ms: List[float] = field(default_factory=list)
+    total_ms: List[float] = field(default_factory=list)
+    errores: int = 0
+    duracion_s: float = 0.0
+
+    @staticmethod
+    def percentil(valores: List[float], p: float) -> float:
+        if not valores:
+            return 0.0
+        ordenados = sorted(valores)
+        indice = min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))
+        return ordenados[indice]
+
+    @property
+    def fuera_de_ventana(self) -> int:
+        """Interacciones sin reconocer (defer o respuesta) dentro de 3 s, o sin reconocer nunca"""
+        return self.errores + sum(1 for ms in self.ack_ms if ms > VENTANA_ACK_S * 1000)
+
+    def resumen(self) -> Dict[str, Any]:
+        total = len(self.total_ms) + self.errores
+        return {
+            "comando": self.comando,
+            "llamadas": total,
+            "errores": self.errores,
+            "rendimiento_rps": round(total / self.duracion_s, 1) if self.duracion_s else 0.0,
+            "ack_p50_ms": round(self.percentil(self.ack_ms, 50), 1),
+            "ack_p95_ms": round(self.percentil(self.ack_ms, 95), 1),
+            "ack_p99_ms": round(self.percentil(self.ack_ms, 99), 1),
+            "total_p50_ms": round(self.percentil(self.total_ms, 50), 1),
+            "total_p95_ms": round(self.percentil(self.total_ms, 95), 1),
+            "total_p99_ms": round(self.percentil(self.total_ms, 99), 1),
+            "fuera_de_3s": self.fuera_de_ventana,
+        }
+
+
+def _callbacks(reloj: Reloj) -> Dict[str, Callable]:
+    """Callbacks de cada comando, construidos sobre los cogs reales"""
+    from cogs.asistencia.commands import Asistencia
+    from cogs.faltas.commands import Faltas
+    from cogs.recuperacion.commands import Recuperacion
+
+    bot = MagicMock()
+    asistencia, faltas, recuperacion = Asistencia(bot, reloj), Faltas(bot), Recuperacion(bot, reloj)
+    return {
+        "entrada": lambda i: asistencia.entrada.callback(asistencia, i),
+        "salida": lambda i: asistencia.salida.callback(asistencia, i),
+        "estado": lambda i: asistencia.estado.callback(asistencia, i),
+        "historial": lambda i: asistencia.historial.callback(asistencia, i, 7),
+        "faltas": lambda i: faltas.ver_faltas.callback(faltas, i),
+        "recuperacion": lambda i: recuperacion.recuperacion.callback(recuperacion, i),
+        "recuperacion_historial": lambda i: recuperacion.historial_recuperaciones.callback(recuperacion, i, 15),
+    }
+
+
+def _reiniciar_caches() -> None:
+    get_practicante_cache().invalidate()
+    get_asistencia_dia().descartar()
+    get_historial_cache().invalidate()
+    set_estado_catalogo(ESTADOS)
+
+
+async def ejecutar_comando(
+    comando: str,
+    db: FakeDatabase,
+    usuarios: int,
+    concurrencia: int,
+    acelerar: float = 0,
+) -> ResultadoComando:
+    """
+    Lanza ``usuarios`` llamadas a ``comando`` con a lo sumo ``concurrencia`` en vuelo
+
+    El reloj de los cogs parte de la hora simulada del comando; con ``acelerar``
+    avanza ese factor de veces más rápido que el tiempo real (0 lo congela).
+    """
+    client = MagicMock()
+
+    reloj = Reloj()
+    reloj.acelerar(acelerar, datetime.combine(db.fecha, HORA_POR_COMANDO[comando]))
+    resultado = ResultadoComando(comando)
+    limite = asyncio.Semaphore(concurrencia)
+
+    with ExitStack() as stack:
+        for modulo in ("utils", "cogs.asistencia.commands", "cogs.asistencia.modals",
+                       "cogs.faltas.commands", "cogs.recuperacion.commands"):
+            stack.enter_context(patch(f"{modulo}.db", db))
+        callback = _callbacks(reloj)[comando]
+
+        async def una_llamada(discord_id: int) -> None:
+            async with limite:
+                interaccion = FakeInteraction(discord_id, client)
+                try:
+                    await callback(interaccion)
+                except Exception:
+                    resultado.errores += 1
+                    return
+                if interaccion.ack is None:
+                    resultado.errores += 1
+                    return
+                resultado.ack_ms.append(interaccion.ack * 1000)
+                resultado.total_ms.append((interaccion.fin or interaccion.ack) * 1000)
+
+        inicio = _time.perf_counter()
+        discord_ids = list(db.practicantes)[:usuarios]
+        await asyncio.gather(*(una_llamada(discord_id) for discord_id in discord_ids))
+        resultado.duracion_s = _time.perf_counter() - inicio
+
+    return resultado
+
+
+async def ejecutar(
+    comandos: List[str],
+    usuarios: int = 300,
+    concurrencia: int = 300,
+    latencia_ms: float = 5.0,
+    jitter_ms: float = 2.0,
+    pool: int = 10,
+    fecha: Optional[date] = None,
+    db: Optional[FakeDatabase] = None,
+    acelerar: float = 0,
+) -> List[ResultadoComando]:
+    """Ejecuta cada comando en secuencia sobre la misma base de datos en memoria"""
+    if db is None:
+        fecha = fecha or _siguiente_dia_laborable(date.today())
+        db = FakeDatabase(usuarios, latencia_ms, jitter_ms, pool, fecha)
+    if "entrada" not in comandos:
+        db.sembrar_entradas()
+    _reiniciar_caches()
+
+    resultados = []
+    for comando in comandos:
+        resultados.append(await ejecutar_comando(comando, db, usuarios, concurrencia, acelerar))
+    await db.get_asistencia_writer().close()
+    return resultados
+
+
+def _siguiente_dia_laborable(fecha: date) -> date:
+    while fecha.weekday() >= 5:
+        fecha += timedelta(days=1)
+    return fecha
+
+
+def _imprimir(resultados: List[ResultadoComando]) -> None:
+    columnas = ("comando", "llamadas", "errores", "rendimiento_rps", "ack_p50_ms", "ack_p95_ms",
+                "ack_p99_ms", "total_p50_ms", "total_p95_ms", "total_p99_ms", "fuera_de_3s")
+    filas = [r.resumen() for r in resultados]
+    anchos = {c: max(len(c), *(len(str(f[c])) for f in filas)) for c in columnas}
+    print("  ".join(c.ljust(anchos[c]) for c in columnas))
+    for fila in filas:
+        print("  ".join(str(fila[c]).ljust(anchos[c]) for c in columnas))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Prueba de carga de los comandos del bot")
+    parser.add_argument("--comando", default="entrada",
+                        help=f"Comandos separados por coma: {', '.join(HORA_POR_COMANDO)}")
+    parser.add_argument("--usuarios", type=int, default=300, help="Usuarios distintos por comando")
+    parser.add_argument("--concurrencia", type=int, default=300, help="Llamadas simultáneas como máximo")
+    parser.add_argument("--latencia-ms", type=float, default=5.0, help="Latencia por viaje a la base de datos")
+    parser.add_argument("--jitter-ms", type=float, default=2.0, help="Variación aleatoria de la latencia")
+    parser.add_argument("--pool", type=int, default=10, help="Conexiones simultáneas de la base de datos")
+    parser.add_argument("--acelerar", type=float, default=0,
+                        help="Factor del reloj simulado (0 lo congela en la hora del comando; 60 = un minuto por segundo)")
+    args = parser.parse_args()
+
+    comandos = [c.strip() for c in args.comando.split(",") if c.strip()]
+    desconocidos = [c for c in comandos if c not in HORA_POR_COMANDO]
+    if desconocidos:
+        parser.error(f"Comandos desconocidos: {', '.join(desconocidos)}")
+
+    resultados = asyncio.run(ejecutar(
+        comandos,
+        usuarios=args.usuarios,
+        concurrencia=args.concurrencia,
+        latencia_ms=args.latencia_ms,
+        jitter_ms=args.jitter_ms,
+        pool=args.pool,
+        acelerar=args.acelerar,
+    ))
+    _imprimir(resultados)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Reconstrucción del resumen mensual de asistencia
+
+Recalcula Resumen_Asistencia_Mensual desde Asistencia y Recuperacion, un
+mes por transacción (borra los contadores del mes y los vuelve a insertar,
+así que los meses sin registros quedan sin contadores).
+Sirve para el llenado inicial y para corregir contadores desviados. Puede
+ejecutarse con el bot en marcha: las escrituras del mes que se está
+recalculando esperan a que termine su transacción.
+
+Uso:
+    python -m scripts.reconstruir_resumen                          # todos los meses con datos
+    python -m scripts.reconstruir_resumen --desde 2026-01 --hasta 2026-03
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import date
+from typing import Optional
+
+import aiomysql
+
+import database as db
+from bot.core.cache import Estado
+from bot.core.database import queries
+from bot.core.database.resumen import inicio_mes, mes_siguiente
+from bot.core.utils import get_reloj
+
+logger = logging.getLogger(__name__)
+
+
+async def _estado_id(estado: Estado) -> Optional[int]:
+    fila = await db.fetch_one(queries.ESTADO_POR_NOMBRE, (str(estado),), primario=True)
+    return fila["id"] if fila else None
+
+
+async def reconstruir_mes(mes: date, salida_id: Optional[int], falta_id: Optional[int]) -> int:
+    """Recalcula un mes en una sola transacción. Retorna las filas de resumen escritas"""
+    siguiente = mes_siguiente(mes)
+    async with db.get_connection() as conn:
+        try:
+            async with conn.cursor() as cursor:
+                await cursor.execute(queries.RESUMEN_BORRAR_RANGO, (mes, siguiente))
+                await cursor.execute(
+                    queries.RESUMEN_RECONSTRUIR,
+                    (salida_id, falta_id, mes, siguiente, mes, siguiente),
+                )
+                escritas = cursor.rowcount
+            await conn.commit()
+            return escritas
+        except aiomysql.Error:
+            await conn.rollback()
+            raise
+
+
+async def reconstruir(desde: Optional[date] = None, hasta: Optional[date] = None) -> int:
+    """
+    Recalcula los meses de ``desde`` a ``hasta`` (inclusive)
+
+    Sin ``desde`` empieza en el primer mes con registros o contadores; sin
+    ``hasta`` termina en el mes actual (según el reloj del bot) o en el último
+    mes con datos si es posterior. Retorna el total de filas de resumen escritas.
+    """
+    hoy = get_reloj().hoy()
+    if desde is None or hasta is None:
+        rango = await db.fetch_one(queries.RESUMEN_RANGO, primario=True) or {}
+        desde = desde or rango.get("desde") or hoy
+        hasta = hasta or max(rango.get("hasta") or hoy, hoy)
+    mes = inicio_mes(desde)
+    fin = inicio_mes(hasta)
+
+    salida_id = await _estado_id(Estado.SALIDA_ANTICIPADA)
+    falta_id = await _estado_id(Estado.FALTA_INJUSTIFICADA)
+
+    total = 0
+    while mes <= fin:
+        escritas = await reconstruir_mes(mes, salida_id, falta_id)
+        logger.info("Resumen de %s reconstruido: %s practicantes.", mes.strftime("%Y-%m"), escritas)
+        total += escritas
+        mes = mes_siguiente(mes)
+    return total
+
+
+def _mes(valor: str) -> date:
+    try:
+        return date.fromisoformat(f"{valor}-01")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Mes inválido (AAAA-MM): {valor}")
+
+
+async def _ejecutar(desde: Optional[date], hasta: Optional[date]) -> int:
+    try:
+        return await reconstruir(desde, hasta)
+    finally:
+        await db.close_db_pool()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reconstruye el resumen mensual de asistencia")
+    parser.add_argument("--desde", type=_mes, help="Primer mes (AAAA-MM); por defecto el del primer registro")
+    parser.add_argument("--hasta", type=_mes, help="Último mes (AAAA-MM); por defecto el actual")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    total = asyncio.run(_ejecutar(args.desde, args.hasta))
+    print(f"Filas de resumen escritas: {total}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+-- Restricción de una asistencia por practicante y día
+-- Permite registrar la entrada con un único INSERT condicional (sin SELECT previo)
+
+-- Eliminar duplicados existentes, conservando el primer registro de cada día
+DELETE a_dup FROM Asistencia a_dup
+INNER JOIN Asistencia a_orig
+    ON a_dup.practicante_id = a_orig.practicante_id
+   AND a_dup.fecha = a_orig.fecha
+   AND a_dup.id > a_orig.id;
+
+ALTER TABLE Asistencia
+    ADD UNIQUE KEY unique_asistencia_dia (practicante_id, fecha);
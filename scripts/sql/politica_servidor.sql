@@ -0,0 +1,24 @@
+-- Canales habilitados y roles de recuperación por servidor
+-- El bot detecta los cambios (filas o updated_at) y recarga sin reiniciar
+CREATE TABLE IF NOT EXISTS Politica_Servidor (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    guild_id BIGINT UNSIGNED NOT NULL,
+    tipo ENUM('canal', 'rol_recuperacion') NOT NULL,
+    objetivo_id BIGINT UNSIGNED NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    UNIQUE KEY unique_politica (guild_id, tipo, objetivo_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Valores actuales (antes fijos en el código)
+INSERT IGNORE INTO Politica_Servidor (guild_id, tipo, objetivo_id) VALUES
+    (1389959112556679239, 'canal', 1390353417079361607),
+    (1389959112556679239, 'canal', 1390013888791183370),
+    (1389959112556679239, 'canal', 1395093712832565339),
+    (1389959112556679239, 'canal', 1400200650402431007),
+    (1389959112556679239, 'canal', 1404466917002969128),
+    (1389959112556679239, 'canal', 1412152264969162969),
+    (1389959112556679239, 'canal', 1415770590975102986),
+    (1405602519635202048, 'canal', 1406544076534190110);
+
+-- Ejemplo: restringir /recuperación a un rol
+-- INSERT INTO Politica_Servidor (guild_id, tipo, objetivo_id) VALUES (1389959112556679239, 'rol_recuperacion', 123456789012345678);
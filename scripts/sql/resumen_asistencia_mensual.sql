@@ -0,0 +1,16 @@
+-- Contadores de asistencia por practicante y mes (mes = primer día del mes)
+-- El bot los actualiza en la misma transacción que cada escritura; después de
+-- crear la tabla, llenarla con: python -m scripts.reconstruir_resumen
+CREATE TABLE IF NOT EXISTS Resumen_Asistencia_Mensual (
+    practicante_id INT NOT NULL,
+    mes DATE NOT NULL,
+    presentes INT UNSIGNED NOT NULL DEFAULT 0,
+    tardanzas INT UNSIGNED NOT NULL DEFAULT 0,
+    salidas_anticipadas INT UNSIGNED NOT NULL DEFAULT 0,
+    faltas INT UNSIGNED NOT NULL DEFAULT 0,
+    recuperaciones INT UNSIGNED NOT NULL DEFAULT 0,
+    minutos_trabajados INT UNSIGNED NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (practicante_id, mes),
+    FOREIGN KEY (practicante_id) REFERENCES Practicante(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,121 @@
+"""
+Tests para la instantánea de asistencia del día
+Ejecutar con: pytest tests/test_asistencia_dia.py -v
+"""
+
+import asyncio
+from datetime import date, time, timedelta
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from bot.core.cache import AsistenciaDelDia, RegistroAsistencia
+import utils
+
+
+HOY = date(2024, 12, 5)
+MANANA = date(2024, 12, 6)
+
+
+def hora(h, m, s=0):
+    """Columna TIME tal como la devuelve aiomysql"""
+    return timedelta(hours=h, minutes=m, seconds=s)
+
+
+def make_loader(rows_por_fecha, demora=0):
+    llamadas = []
+
+    async def loader(fecha):
+        llamadas.append(fecha)
+        await asyncio.sleep(demora)
+        return rows_por_fecha.get(fecha, [])
+    loader.llamadas = llamadas
+    return loader
+
+
+class TestAsistenciaDelDia:
+    """Tests para AsistenciaDelDia"""
+
+    @pytest.mark.asyncio
+    async def test_carga_una_vez_y_al_cambiar_de_dia(self):
+        """Test: Una sola carga aunque haya concurrencia, y otra al cambiar la fecha"""
+        loader = make_loader({HOY: [{"id": 1, "practicante_id": 7, "hora_entrada": hora(8, 0),
+                                     "hora_salida": None, "estado_id": 1}]}, demora=0.01)
+        hoy = AsistenciaDelDia()
+
+        await asyncio.gather(*(hoy.asegurar(HOY, loader) for _ in range(5)))
+        assert loader.llamadas == [HOY]
+        assert hoy.get(7).hora_entrada == hora(8, 0)
+
+        await hoy.asegurar(MANANA, loader)
+        assert loader.llamadas == [HOY, MANANA]
+        assert hoy.get(7) is None
+
+    @pytest.mark.asyncio
+    async def test_escrituras_actualizan_en_el_momento(self):
+        """Test: Entrada y salida se reflejan sin volver a leer"""
+        hoy = AsistenciaDelDia()
+        await hoy.asegurar(HOY, make_loader({}))
+
+        hoy.registrar_entrada(HOY, 7, time(8, 5), 1)
+        hoy.registrar_salida(HOY, 7, time(12, 0), estado_id=3)
+        assert hoy.get(7) == RegistroAsistencia(None, hora(8, 5), hora(12, 0), 3)
+
+        # Escrituras de otra fecha no tocan la instantánea
+        hoy.registrar_entrada(MANANA, 8, time(8, 0), 1)
+        assert hoy.get(8) is None
+
+    @pytest.mark.asyncio
+    async def test_reconciliacion_conserva_escrituras_en_curso(self):
+        """Test: La reconciliación cuenta diferencias y no pierde escrituras hechas mientras lee"""
+        rows = {HOY: [{"id": 1, "practicante_id": 7, "hora_entrada": hora(8, 0),
+                       "hora_salida": None, "estado_id": 1}]}
+        hoy = AsistenciaDelDia()
+        await hoy.asegurar(HOY, make_loader({}))
+
+        tarea = asyncio.create_task(hoy.reconciliar(make_loader(rows, demora=0.01)))
+        await asyncio.sleep(0)
+        hoy.registrar_entrada(HOY, 9, time(8, 1), 1)
+        diferencias = await tarea
+
+        assert diferencias == 1
+        assert hoy.get(7).id == 1
+        assert hoy.get(9).hora_entrada == hora(8, 1)
+
+    @pytest.mark.asyncio
+    async def test_escrituras_del_bot_coinciden_con_la_db(self):
+        """Test: Una escritura del bot (sin id, con microsegundos) no cuenta como diferencia"""
+        rows = {HOY: [{"id": 5, "practicante_id": 7, "hora_entrada": hora(8, 5, 12),
+                       "hora_salida": hora(13, 0, 1), "estado_id": 1}]}
+        hoy = AsistenciaDelDia()
+        await hoy.asegurar(HOY, make_loader({}))
+
+        hoy.registrar_entrada(HOY, 7, time(8, 5, 12, 345678), 1)
+        hoy.registrar_salida(HOY, 7, time(13, 0, 1, 999999))
+        assert str(hoy.get(7).hora_entrada) == "8:05:12"
+
+        assert await hoy.reconciliar(make_loader(rows)) == 0
+        assert hoy.get(7).id == 5
+
+
+class TestAsistenciaDeHoy:
+    """Tests para utils.asistencia_de_hoy"""
+
+    @pytest.mark.asyncio
+    async def test_respaldo_en_la_db(self):
+        """Test: Si la instantánea no tiene el registro se consulta la base de datos"""
+        hoy = AsistenciaDelDia()
+        with patch('utils.get_asistencia_dia', return_value=hoy), \
+             patch('utils.db') as mock_db:
+            mock_db.fetch_all = AsyncMock(return_value=[])
+            mock_db.fetch_one = AsyncMock(return_value={"id": 4, "hora_entrada": hora(8, 0),
+                                                        "hora_salida": None, "estado_id": 1})
+
+            assert await utils.asistencia_de_hoy(7, HOY, respaldo_db=False) is None
+            mock_db.fetch_one.assert_not_called()
+
+            registro = await utils.asistencia_de_hoy(7, HOY)
+            assert registro.id == 4
+            assert await utils.asistencia_de_hoy(7, HOY) == registro
+            mock_db.fetch_one.assert_called_once()
+            mock_db.fetch_all.assert_called_once()
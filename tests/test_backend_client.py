@@ -0,0 +1,139 @@
+"""
+Tests para el cliente del backend contra un servidor HTTP local
+Ejecutar con: pytest tests/test_backend_client.py -v
+"""
+
+import pytest
+from aiohttp import web
+
+from bot.core.backend import BackendClient, Outbox
+
+
+class StubBackend:
+    """Servidor HTTP local que simula el backend"""
+
+    def __init__(self):
+        self.received = []
+        self.fail_next = 0
+        self.status_on_fail = 503
+        self.connections = set()
+        self.runner = None
+        self.url = None
+
+    async def handler(self, request):
+        self.connections.add(request.transport.get_extra_info("peername"))
+        if self.fail_next:
+            self.fail_next -= 1
+            return web.Response(status=self.status_on_fail)
+        self.received.append((request.path, await request.json(), request.headers.get("Authorization")))
+        return web.Response(status=200)
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/{tail:.*}", self.handler)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+@pytest.fixture
+async def stub():
+    server = StubBackend()
+    await server.start()
+    yield server
+    await server.stop()
+
+
+def make_client(url, **kwargs):
+    kwargs.setdefault("backoff_base", 0.001)
+    kwargs.setdefault("backoff_max", 0.002)
+    return BackendClient(url, "clave", **kwargs)
+
+
+class TestOutbox:
+    """Tests para la bandeja de salida"""
+
+    def test_coalesce_por_clave_y_acota(self):
+        """Test: La misma clave reemplaza al pendiente y se descarta lo más antiguo"""
+        outbox = Outbox(max_size=2)
+        outbox.put("metrics", "/metrics/", {"n": 1})
+        outbox.put("status", "/status/", {"s": "online"})
+        outbox.put("metrics", "/metrics/", {"n": 2})
+        assert len(outbox) == 2
+        assert outbox.peek()[0] == "status"
+        outbox.put("otro", "/x/", {})
+        assert len(outbox) == 2
+        assert outbox.dropped == 1
+
+
+class TestBackendClient:
+    """Tests para BackendClient"""
+
+    @pytest.mark.asyncio
+    async def test_reutiliza_la_conexion(self, stub):
+        """Test: Varios envíos usan la misma sesión keep-alive"""
+        client = make_client(stub.url)
+        try:
+            for i in range(3):
+                assert await client.send("/metrics/", json={"n": i}, key="metrics")
+        finally:
+            await client.close()
+        assert [body["n"] for _, body, _ in stub.received] == [0, 1, 2]
+        assert stub.received[0][2] == "Bearer clave"
+        assert len(stub.connections) == 1
+
+    @pytest.mark.asyncio
+    async def test_reintenta_errores_transitorios(self, stub):
+        """Test: Un 503 se reintenta hasta tener éxito"""
+        stub.fail_next = 2
+        client = make_client(stub.url, max_retries=3)
+        try:
+            assert await client.post("/status/", json={"status": "online"})
+        finally:
+            await client.close()
+        assert len(stub.received) == 1
+
+    @pytest.mark.asyncio
+    async def test_no_reintenta_errores_del_cliente(self, stub):
+        """Test: Un 4xx no se reintenta"""
+        stub.fail_next = 5
+        stub.status_on_fail = 400
+        client = make_client(stub.url, max_retries=3)
+        try:
+            assert not await client.post("/status/", json={})
+        finally:
+            await client.close()
+        assert stub.fail_next == 4
+
+    @pytest.mark.asyncio
+    async def test_bandeja_reenvia_solo_el_ultimo_snapshot(self, stub):
+        """Test: Con el backend caído se guarda solo el último snapshot y se reenvía al volver"""
+        client = make_client(stub.url, max_retries=0)
+        try:
+            stub.fail_next = 2
+            assert not await client.send("/metrics/", json={"n": 1}, key="metrics")
+            assert not await client.send("/metrics/", json={"n": 2}, key="metrics")
+            assert len(client.outbox) == 1
+
+            assert await client.send("/status/", json={"status": "online"}, key="status")
+        finally:
+            await client.close()
+        assert [path for path, _, _ in stub.received] == ["/metrics/", "/status/"]
+        assert stub.received[0][1] == {"n": 2}
+        assert len(client.outbox) == 0
+
+    @pytest.mark.asyncio
+    async def test_backend_inalcanzable(self):
+        """Test: Si no hay servidor, el envío falla sin lanzar excepciones"""
+        client = make_client("http://127.0.0.1:9", max_retries=1)
+        try:
+            assert not await client.send("/metrics/", json={}, key="metrics")
+        finally:
+            await client.close()
+        assert len(client.outbox) == 1
@@ -0,0 +1,179 @@
+"""
+Tests para el escritor por lotes de la base de datos
+Ejecutar con: pytest tests/test_batch_writer.py -v
+"""
+
+import asyncio
+import contextvars
+from contextlib import asynccontextmanager
+
+import aiomysql
+import pytest
+
+from bot.core.database.batch_writer import BatchWriter
+from bot.core.exceptions import DatabaseQueryError
+
+
+class FakeCursor:
+    """Cursor falso que registra las queries ejecutadas"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def execute(self, query, params=None):
+        self.conn.queries.append((query, list(params or [])))
+        if self.conn.fail_when and self.conn.fail_when(query, params):
+            raise aiomysql.IntegrityError(1452, "fila inválida")
+        self.rowcount = query.count("(%s") - sum(1 for p in params or [] if p in self.conn.duplicates)
+
+
+class FakeConnection:
+    """Conexión falsa con contadores de commit/rollback"""
+
+    def __init__(self, fail_when=None, duplicates=()):
+        self.queries = []
+        self.duplicates = set(duplicates)
+        self.commits = 0
+        self.rollbacks = 0
+        self.acquired = 0
+        self.fail_when = fail_when
+
+    def cursor(self, *args):
+        return FakeCursor(self)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+def make_factory(conn):
+    @asynccontextmanager
+    async def factory():
+        conn.acquired += 1
+        yield conn
+    return factory
+
+
+class TestBatchWriter:
+    """Tests para BatchWriter"""
+
+    @pytest.mark.asyncio
+    async def test_agrupa_filas_en_un_solo_insert(self):
+        """Test: Varias filas concurrentes se escriben con un solo INSERT y un commit"""
+        conn = FakeConnection()
+        writer = BatchWriter("Asistencia", ("a", "b"), make_factory(conn), max_batch=100, max_delay=0.01)
+
+        resultados = await asyncio.gather(*(writer.submit((i, i * 2)) for i in range(20)))
+
+        assert resultados == [1] * 20
+        assert conn.acquired == 1
+        assert conn.commits == 1
+        query, params = conn.queries[0]
+        assert query.startswith("INSERT INTO Asistencia (a, b) VALUES")
+        assert query.count("(%s, %s)") == 20
+        assert params[:4] == [0, 0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_vacia_al_alcanzar_el_tamano_maximo(self):
+        """Test: El lote se escribe sin esperar la ventana al llegar a max_batch"""
+        conn = FakeConnection()
+        writer = BatchWriter("Asistencia", ("a",), make_factory(conn), max_batch=5, max_delay=60)
+
+        resultados = await asyncio.wait_for(
+            asyncio.gather(*(writer.submit((i,)) for i in range(10))),
+            timeout=1,
+        )
+
+        assert resultados == [1] * 10
+        assert conn.commits == 2
+
+    @pytest.mark.asyncio
+    async def test_fila_invalida_no_afecta_al_resto(self):
+        """Test: Si el lote falla, cada fila se reintenta por separado"""
+        conn = FakeConnection(fail_when=lambda q, p: 99 in list(p))
+        writer = BatchWriter("Asistencia", ("a",), make_factory(conn), max_delay=0.01)
+
+        resultados = await asyncio.gather(
+            writer.submit((1,)), writer.submit((99,)), writer.submit((2,)),
+            return_exceptions=True,
+        )
+
+        assert resultados[0] == 1
+        assert isinstance(resultados[1], DatabaseQueryError)
+        assert resultados[2] == 1
+        assert conn.rollbacks == 2
+
+    @pytest.mark.asyncio
+    async def test_close_vacia_pendientes_y_rechaza_nuevas(self):
+        """Test: close escribe lo pendiente y luego rechaza nuevas filas"""
+        conn = FakeConnection()
+        writer = BatchWriter("Asistencia", ("a",), make_factory(conn), max_delay=60)
+
+        pendiente = asyncio.create_task(writer.submit((1,)))
+        await asyncio.sleep(0)
+        await writer.close()
+
+        assert await pendiente == 1
+        with pytest.raises(DatabaseQueryError):
+            await writer.submit((2,))
+
+    @pytest.mark.asyncio
+    async def test_duplicados_reportan_cero_filas(self):
+        """Test: Con skip_duplicates, cada fila sabe si se insertó o ya existía"""
+        conn = FakeConnection(duplicates={2})
+        writer = BatchWriter("Asistencia", ("a",), make_factory(conn), max_delay=0.01, skip_duplicates=True)
+
+        resultados = await asyncio.gather(writer.submit((1,)), writer.submit((2,)), writer.submit((3,)))
+
+        assert resultados == [1, 0, 1]
+        assert "ON DUPLICATE KEY UPDATE a = a" in conn.queries[0][0]
+
+    @pytest.mark.asyncio
+    async def test_on_written_en_el_contexto_de_quien_envia(self):
+        """Test: on_written corre en el contexto de cada fila insertada, no en el del lote"""
+        usuario = contextvars.ContextVar("usuario")
+        escritos = []
+        conn = FakeConnection(duplicates={2})
+        writer = BatchWriter(
+            "Asistencia", ("a",), make_factory(conn), max_delay=0.01, skip_duplicates=True,
+            on_written=lambda: escritos.append(usuario.get()),
+        )
+
+        async def enviar(valor):
+            usuario.set(valor)
+            return await writer.submit((valor,))
+
+        await asyncio.gather(enviar(1), enviar(2), enviar(3))
+
+        assert sorted(escritos) == [1, 3]
+
+    @pytest.mark.asyncio
+    async def test_before_commit_en_la_misma_transaccion(self):
+        """Test: before_commit recibe solo las filas insertadas, antes de cada commit"""
+        conn = FakeConnection(duplicates={2})
+        llamadas = []
+
+        async def before_commit(cursor, rows):
+            llamadas.append((list(rows), conn.commits))
+
+        writer = BatchWriter(
+            "Asistencia", ("a",), make_factory(conn), max_delay=0.01, skip_duplicates=True,
+            before_commit=before_commit,
+        )
+        await asyncio.gather(writer.submit((1,)), writer.submit((2,)), writer.submit((3,)))
+
+        # Lote con duplicado: fila por fila, un commit por fila y sin llamada para el duplicado
+        assert llamadas == [([(1,)], 0), ([(3,)], 2)]
+
+        llamadas.clear()
+        await asyncio.gather(writer.submit((4,)), writer.submit((5,)))
+        assert llamadas == [([(4,), (5,)], 3)]
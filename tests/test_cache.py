@@ -0,0 +1,141 @@
+"""
+Tests para las cachés en memoria
+Ejecutar con: pytest tests/test_cache.py -v
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from bot.core.cache import MISSING, TTLCache, PracticanteCache, Estado, EstadoCatalogo
+import utils
+from cogs.admin.commands import Admin
+
+
+class FakeClock:
+    """Reloj manual para controlar la expiración"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+    """Tests para TTLCache"""
+
+    def test_expira_entradas(self):
+        """Test: Una entrada deja de estar disponible al vencer su TTL"""
+        clock = FakeClock()
+        cache = TTLCache(max_size=10, ttl=5, clock=clock)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        clock.now = 5
+        assert cache.get("a") is MISSING
+
+    def test_desaloja_la_menos_usada(self):
+        """Test: Al superar el tamaño máximo se descarta la entrada LRU"""
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is MISSING
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_distingue_none_de_missing(self):
+        """Test: Un None cacheado es un valor válido"""
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set("a", None)
+        assert cache.get("a") is None
+
+
+class TestPracticanteCache:
+    """Tests para PracticanteCache"""
+
+    def test_warm_e_invalidacion(self):
+        """Test: La precarga llena la caché y la invalidación la vacía"""
+        cache = PracticanteCache(max_size=10, ttl=60, negative_ttl=5)
+        total = cache.warm([{"id": 1, "id_discord": "111"}, {"id": 2, "id_discord": 222}])
+        assert total == 2
+        assert cache.get(111) == 1
+        cache.invalidate(111)
+        assert cache.get(111) is MISSING
+        cache.invalidate()
+        assert cache.get(222) is MISSING
+
+    @pytest.mark.asyncio
+    async def test_comando_admin_invalida(self):
+        """Test: /admin practicante olvida al usuario indicado (alta tras un 'no registrado')"""
+        cache = PracticanteCache(max_size=10, ttl=60, negative_ttl=5)
+        cache.set(111, None)
+        cache.set(222, 2)
+        interaction = MagicMock()
+        interaction.response = AsyncMock()
+        usuario = MagicMock(id=111)
+
+        cog = Admin(MagicMock())
+        with patch('utils.get_practicante_cache', return_value=cache):
+            await cog.practicante.callback(cog, interaction, usuario)
+        assert cache.get(111) is MISSING
+        assert cache.get(222) == 2
+
+
+class TestObtenerPracticante:
+    """Tests para utils.obtener_practicante con caché"""
+
+    @pytest.mark.asyncio
+    async def test_consulta_la_db_una_sola_vez(self):
+        """Test: Tras la primera consulta, las siguientes salen de la caché"""
+        cache = PracticanteCache(max_size=10, ttl=60, negative_ttl=5)
+        interaction = MagicMock()
+        interaction.followup = AsyncMock()
+
+        with patch('utils.get_practicante_cache', return_value=cache), \
+             patch('utils.db') as mock_db:
+            mock_db.fetch_one = AsyncMock(return_value={'id': 7})
+            assert await utils.obtener_practicante(interaction, 555) == 7
+            assert await utils.obtener_practicante(interaction, 555) == 7
+            mock_db.fetch_one.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_cachea_no_registrado(self):
+        """Test: La respuesta 'no registrado' también se cachea"""
+        cache = PracticanteCache(max_size=10, ttl=60, negative_ttl=5)
+        interaction = MagicMock()
+        interaction.followup = AsyncMock()
+
+        with patch('utils.get_practicante_cache', return_value=cache), \
+             patch('utils.db') as mock_db:
+            mock_db.fetch_one = AsyncMock(return_value=None)
+            assert await utils.obtener_practicante(interaction, 556) is None
+            assert await utils.obtener_practicante(interaction, 556) is None
+            mock_db.fetch_one.assert_called_once()
+            assert interaction.followup.send.call_count == 2
+
+
+class TestEstadoCatalogo:
+    """Tests para el catálogo de estados"""
+
+    def test_mapeo_bidireccional_sin_distinguir_mayusculas(self):
+        """Test: El catálogo resuelve nombre <-> id sin importar mayúsculas"""
+        catalogo = EstadoCatalogo([
+            {"id": 1, "estado": "Presente"},
+            {"id": 4, "estado": "Falta Injustificada"},
+        ])
+        assert catalogo.id(Estado.PRESENTE) == 1
+        assert catalogo.id("falta injustificada") == 4
+        assert catalogo.nombre(4) == "Falta Injustificada"
+        assert catalogo.es(4, Estado.FALTA_INJUSTIFICADA)
+        assert catalogo.nombre(None) is None
+
+    @pytest.mark.asyncio
+    async def test_obtener_estado_sin_ir_a_la_db(self):
+        """Test: obtener_estado_asistencia usa el catálogo cargado"""
+        catalogo = EstadoCatalogo([{"id": 2, "estado": "Tardanza"}])
+        with patch('utils.get_estado_catalogo', return_value=catalogo), \
+             patch('utils.db') as mock_db:
+            mock_db.fetch_one = AsyncMock()
+            assert await utils.obtener_estado_asistencia(Estado.TARDANZA) == 2
+            mock_db.fetch_one.assert_not_called()
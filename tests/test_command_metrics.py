@@ -0,0 +1,85 @@
+"""
+Tests para la latencia de comandos por fase
+Ejecutar con: pytest tests/test_command_metrics.py -v
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from bot.core.metrics import CommandMetrics, instrumentar_comandos, sumar_tiempo_db
+from bot.core.database.registry import QueryRegistry
+
+
+class Demo(commands.GroupCog, name="demo"):
+    def __init__(self):
+        super().__init__()
+        instrumentar_comandos(self)
+
+    @app_commands.command(name="consulta")
+    async def consulta(self, interaction: discord.Interaction, dias: int = 1):
+        await interaction.response.defer(ephemeral=True)
+        with QueryRegistry().track("SELECT 1"):
+            pass
+        sumar_tiempo_db(40)
+        await interaction.followup.send(f"{dias} días")
+        return interaction
+
+
+@pytest.fixture
+def metricas():
+    metricas = CommandMetrics()
+    with patch("bot.core.metrics.commands.get_command_metrics", return_value=metricas):
+        yield metricas
+
+
+@pytest.fixture
+def mock_interaction():
+    interaction = MagicMock()
+    interaction.guild.id = 123
+    interaction.response.defer = AsyncMock()
+    interaction.followup.send = AsyncMock()
+    return interaction
+
+
+class TestCommandMetrics:
+    """Tests para instrumentar_comandos y CommandMetrics"""
+
+    async def test_registra_fases_por_comando_y_servidor(self, metricas, mock_interaction):
+        """Test: Cada ejecución queda registrada con su nombre completo y servidor"""
+        cog = Demo()
+        await cog.consulta.callback(cog, mock_interaction, dias=3)
+
+        mock_interaction.response.defer.assert_awaited_once_with(ephemeral=True)
+        mock_interaction.followup.send.assert_awaited_once_with("3 días")
+
+        fases = metricas.snapshot_guild(123)["demo consulta"]
+        assert fases["total"]["count"] == 1
+        assert fases["db"]["sum_ms"] >= 40
+        assert fases["respuesta"]["sum_ms"] <= fases["total"]["sum_ms"]
+        assert metricas.snapshot_guild(999) == {}
+        assert metricas.guilds() == {123}
+        assert metricas.snapshot_por_servidor() == {123: {"demo consulta": fases}}
+
+    async def test_tiempo_db_fuera_de_comando_se_ignora(self, metricas):
+        """Test: sumar_tiempo_db sin comando en curso no falla ni registra"""
+        sumar_tiempo_db(10)
+        assert metricas.snapshot() == {}
+
+    async def test_registra_aunque_el_comando_falle(self, metricas, mock_interaction):
+        """Test: Un comando que lanza excepción también se mide"""
+        mock_interaction.followup.send.side_effect = RuntimeError("caído")
+        cog = Demo()
+        with pytest.raises(RuntimeError):
+            await cog.consulta.callback(cog, mock_interaction)
+        assert metricas.snapshot()["demo consulta"]["total"]["count"] == 1
+
+    def test_instrumentar_dos_veces_no_duplica(self):
+        """Test: Volver a instrumentar un cog no envuelve dos veces"""
+        cog = Demo()
+        callback = cog.consulta.callback
+        instrumentar_comandos(cog)
+        assert cog.consulta.callback is callback
@@ -0,0 +1,58 @@
+"""
+Tests para el registro nocturno de faltas injustificadas
+Ejecutar con: pytest tests/test_faltas.py -v
+"""
+
+from datetime import date
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from bot.core.cache import MISSING, HistorialCache
+from bot.core.utils import dias_laborables
+import utils
+
+
+class TestDiasLaborables:
+    """Tests para dias_laborables"""
+
+    def test_excluye_fin_de_semana(self):
+        """Test: Solo se incluyen los días de la semana permitidos"""
+        # 2024-12-06 es viernes, 2024-12-09 es lunes
+        assert dias_laborables(date(2024, 12, 6), date(2024, 12, 9)) == [date(2024, 12, 6), date(2024, 12, 9)]
+        assert dias_laborables(date(2024, 12, 7), date(2024, 12, 8)) == []
+
+
+class TestMaterializarFaltas:
+    """Tests para utils.materializar_faltas"""
+
+    @pytest.mark.asyncio
+    async def test_una_sola_sentencia_para_todas_las_fechas(self):
+        """Test: Todas las fechas y practicantes se cubren con un solo INSERT ... SELECT"""
+        fechas = [date(2024, 12, 5), date(2024, 12, 6)]
+        historiales = HistorialCache(max_size=10, ttl=60)
+        historiales.set("asistencia", 1, 7, date(2024, 12, 6), {"content": "x"})
+
+        with patch('utils.db') as mock_db, \
+             patch('utils.obtener_estado_asistencia', AsyncMock(return_value=4)), \
+             patch('utils.get_historial_cache', return_value=historiales):
+            mock_db.execute_rowcount = AsyncMock(return_value=12)
+
+            assert await utils.materializar_faltas(fechas) == 12
+
+            mock_db.execute_rowcount.assert_called_once()
+            query, params = mock_db.execute_rowcount.call_args[0]
+            assert "INSERT INTO Asistencia" in query
+            assert "LEFT JOIN Asistencia a" in query
+            assert query.count("%s") == 3
+            assert params == (4, *fechas)
+            # Los historiales ya renderizados dejan de ser válidos
+            assert historiales.get("asistencia", 1, 7, date(2024, 12, 6)) is MISSING
+
+    @pytest.mark.asyncio
+    async def test_sin_fechas_no_consulta(self):
+        """Test: Sin días laborables no se ejecuta nada"""
+        with patch('utils.db') as mock_db:
+            mock_db.execute_rowcount = AsyncMock()
+            assert await utils.materializar_faltas([]) == 0
+            mock_db.execute_rowcount.assert_not_called()
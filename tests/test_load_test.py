@@ -0,0 +1,47 @@
+"""
+Tests para la herramienta de prueba de carga
+Ejecutar con: pytest tests/test_load_test.py -v
+"""
+
+from datetime import date
+
+import pytest
+
+from bot.core.cache import get_asistencia_dia, get_historial_cache, get_practicante_cache, set_estado_catalogo
+from scripts import load_test
+
+
+@pytest.fixture(autouse=True)
+def limpiar_caches():
+    yield
+    get_practicante_cache().invalidate()
+    get_asistencia_dia().descartar()
+    get_historial_cache().invalidate()
+    set_estado_catalogo([])
+
+
+class TestLoadTest:
+    """Tests para scripts/load_test.py"""
+
+    @pytest.mark.asyncio
+    async def test_ejecuta_los_callbacks_reales(self):
+        """Test: Entrada y salida concurrentes se registran sin errores contra la base en memoria"""
+        db = load_test.FakeDatabase(20, latencia_ms=1, jitter_ms=0, pool=3, fecha=date(2024, 12, 5))
+        resultados = await load_test.ejecutar(["entrada", "salida", "historial"], usuarios=20, db=db)
+
+        assert len(db.asistencia) == 20
+        assert all(fila["hora_salida"] for fila in db.asistencia.values())
+
+        for resultado in resultados:
+            resumen = resultado.resumen()
+            assert resumen["llamadas"] == 20
+            assert resumen["errores"] == 0
+            assert resumen["fuera_de_3s"] == 0
+            assert resumen["total_p99_ms"] >= resumen["total_p50_ms"]
+
+    def test_percentiles(self):
+        """Test: Percentiles por rango sobre los valores medidos"""
+        valores = list(range(1, 101))
+        assert load_test.ResultadoComando.percentil(valores, 50) == 50
+        assert load_test.ResultadoComando.percentil(valores, 99) == 99
+        assert load_test.ResultadoComando.percentil([], 95) == 0.0
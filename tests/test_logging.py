@@ -0,0 +1,95 @@
+"""
+Tests para la configuración de logging
+Ejecutar con: pytest tests/test_logging.py -v
+"""
+
+import json
+import logging
+import queue
+
+import pytest
+
+from bot.config.logging_config import (
+    ContextoQueueHandler,
+    JsonFormatter,
+    MuestreoFilter,
+    contexto_log,
+    parse_muestreo,
+    setup_logging,
+    stop_logging,
+)
+
+
+def _registro(nombre="cogs.asistencia.commands", nivel=logging.INFO, msg="Usuario %s", args=("Ana",)):
+    return logging.LogRecord(nombre, nivel, __file__, 1, msg, args, None)
+
+
+@pytest.fixture
+def logger_raiz():
+    """Restaura los handlers y el nivel del logger raíz tras el test"""
+    raiz = logging.getLogger()
+    handlers, nivel = list(raiz.handlers), raiz.level
+    yield raiz
+    stop_logging()
+    for handler in list(raiz.handlers):
+        raiz.removeHandler(handler)
+    for handler in handlers:
+        raiz.addHandler(handler)
+    raiz.setLevel(nivel)
+
+
+class TestMuestreo:
+    """Tests para MuestreoFilter"""
+
+    def test_conserva_la_fraccion_por_logger(self):
+        """Test: Con 0.25 pasa 1 de cada 4 INFO del logger configurado"""
+        filtro = MuestreoFilter({"cogs.asistencia": 0.25})
+        pasan = sum(filtro.filter(_registro()) for _ in range(100))
+        assert pasan == 25
+        assert filtro.descartados == 75
+
+    def test_warning_y_otros_loggers_pasan(self):
+        """Test: WARNING siempre pasa; los loggers sin tasa no se muestrean"""
+        filtro = MuestreoFilter({"cogs.asistencia": 0})
+        assert filtro.filter(_registro(nivel=logging.WARNING))
+        assert filtro.filter(_registro(nombre="cogs.faltas.commands"))
+        assert filtro.filter(_registro(nombre="cogs.asistenciaX"))
+        assert not filtro.filter(_registro())
+
+    def test_parse_muestreo(self):
+        """Test: Formato logger=fracción separado por comas, acotado a [0, 1]"""
+        assert parse_muestreo("cogs.asistencia=0.2, cogs.faltas=3,,x") == {
+            "cogs.asistencia": 0.2, "cogs.faltas": 1.0,
+        }
+        assert parse_muestreo("") == {}
+
+
+class TestCola:
+    """Tests para el handler con cola y el formato JSON"""
+
+    def test_encola_sin_formatear_y_con_contexto(self):
+        """Test: El mensaje se formatea después, con los campos de la interacción"""
+        cola = queue.SimpleQueue()
+        handler = ContextoQueueHandler(cola)
+        with contexto_log(guild_id=1, comando="asistencia entrada", usuario_id=42):
+            handler.handle(_registro())
+
+        encolado = cola.get_nowait()
+        assert encolado.msg == "Usuario %s" and encolado.args == ("Ana",)
+
+        datos = json.loads(JsonFormatter().format(encolado))
+        assert datos["mensaje"] == "Usuario Ana"
+        assert datos["comando"] == "asistencia entrada"
+        assert datos["guild_id"] == 1 and datos["usuario_id"] == 42
+
+    def test_setup_escribe_desde_el_listener(self, logger_raiz, capsys):
+        """Test: setup_logging deja una sola QueueHandler y el listener escribe JSON"""
+        setup_logging(level="INFO", formato="json", muestreo="ruidoso=0")
+        assert [type(h) for h in logger_raiz.handlers] == [ContextoQueueHandler]
+
+        logging.getLogger("ruidoso").info("descartado")
+        logging.getLogger("cogs.faltas.commands").info("Faltas de %s", "Ana")
+        stop_logging()
+
+        lineas = [json.loads(linea) for linea in capsys.readouterr().out.splitlines()]
+        assert [linea["mensaje"] for linea in lineas] == ["Faltas de Ana"]
@@ -0,0 +1,92 @@
+"""
+Tests para el serializador de métricas
+Ejecutar con: pytest tests/test_metrics_serializer.py -v
+"""
+
+import gzip
+import json
+
+from bot.core.metrics import MetricsSerializer
+
+
+def servidores(n, miembros=10):
+    return {
+        i: {"server_id": i, "server_name": f"S{i}", "miembros": miembros, "canales": 3, "status": "conectado"}
+        for i in range(n)
+    }
+
+
+class TestMetricsSerializer:
+    """Tests para MetricsSerializer"""
+
+    def test_primer_envio_completo_y_luego_deltas(self):
+        """Test: Tras el primer snapshot solo se envían los servidores que cambiaron"""
+        serializer = MetricsSerializer(full_every=100, gzip_threshold=0)
+        estado = servidores(50)
+
+        batch = serializer.prepare({"resumen": {}}, estado)
+        assert batch.payload["tipo"] == "completo"
+        assert len(batch.payload["servers"]) == 50
+        serializer.confirm(batch)
+
+        estado[7] = dict(estado[7], miembros=11)
+        del estado[8]
+        batch = serializer.prepare({"resumen": {}}, estado)
+        assert batch.payload["tipo"] == "delta"
+        assert [s["server_id"] for s in batch.payload["servers"]] == [7]
+        assert batch.payload["servers_eliminados"] == [8]
+        assert json.loads(batch.body) == batch.payload
+
+    def test_sin_cambios_payload_vacio(self):
+        """Test: Sin cambios, el delta no incluye servidores"""
+        serializer = MetricsSerializer(full_every=100, gzip_threshold=0)
+        serializer.confirm(serializer.prepare({}, servidores(20)))
+        batch = serializer.prepare({}, servidores(20))
+        assert batch.payload["servers"] == []
+
+    def test_snapshot_completo_periodico(self):
+        """Test: Cada full_every envíos se manda un snapshot completo"""
+        serializer = MetricsSerializer(full_every=3, gzip_threshold=0)
+        tipos = []
+        for _ in range(6):
+            batch = serializer.prepare({}, servidores(2))
+            serializer.confirm(batch)
+            tipos.append(batch.payload["tipo"])
+        assert tipos == ["completo", "delta", "delta", "completo", "delta", "delta"]
+
+    def test_campos_solo_en_completo(self):
+        """Test: Los campos de solo_completo se calculan y envían solo en snapshots completos"""
+        serializer = MetricsSerializer(full_every=2, gzip_threshold=0)
+        llamadas = []
+
+        def desglose():
+            llamadas.append(1)
+            return {"comandos_por_servidor": {1: {}}}
+
+        presentes = []
+        for _ in range(3):
+            batch = serializer.prepare({}, servidores(2), solo_completo=desglose)
+            serializer.confirm(batch)
+            presentes.append("comandos_por_servidor" in batch.payload)
+        assert presentes == [True, False, True]
+        assert len(llamadas) == 2
+
+    def test_reset_tras_fallo(self):
+        """Test: Si el envío falla, el siguiente payload es completo"""
+        serializer = MetricsSerializer(full_every=100, gzip_threshold=0)
+        serializer.confirm(serializer.prepare({}, servidores(5)))
+        serializer.prepare({}, servidores(5, miembros=12))
+        serializer.reset()
+        batch = serializer.prepare({}, servidores(5, miembros=12))
+        assert batch.payload["tipo"] == "completo"
+        assert len(batch.payload["servers"]) == 5
+
+    def test_comprime_sobre_el_umbral(self):
+        """Test: El cuerpo se comprime con gzip al superar el umbral"""
+        serializer = MetricsSerializer(gzip_threshold=512)
+        batch = serializer.prepare({}, servidores(100))
+        assert batch.headers["Content-Encoding"] == "gzip"
+        assert json.loads(gzip.decompress(batch.body))["tipo"] == "completo"
+
+        pequeno = MetricsSerializer(gzip_threshold=512).prepare({}, servidores(1))
+        assert "Content-Encoding" not in pequeno.headers
@@ -0,0 +1,180 @@
+"""
+Tests para el modo degradado: circuit breaker y diario local de escrituras
+Ejecutar con: pytest tests/test_modo_degradado.py -v
+"""
+
+from datetime import date, time
+from unittest.mock import AsyncMock, patch
+
+import aiomysql
+import pytest
+
+import database
+from bot.core.database import CircuitBreaker, Query, WriteJournal, is_connection_error, queries
+from bot.core.database.circuit import ABIERTO, CERRADO, SEMIABIERTO
+from bot.core.exceptions import DatabasePoolTimeoutError, DatabaseQueryError, DatabaseUnavailableError
+
+
+class TestCircuitBreaker:
+    """Tests para bot/core/database/circuit.py"""
+
+    def test_clasifica_errores_de_conexion(self):
+        """Test: Solo cuentan los errores en los que el servidor no respondió"""
+        caida = aiomysql.OperationalError(2003, "Can't connect to MySQL server")
+        envuelta = RuntimeError("Error ejecutando execute_rowcount")
+        envuelta.__cause__ = aiomysql.OperationalError(2013, "Lost connection")
+
+        assert is_connection_error(caida)
+        assert is_connection_error(envuelta)
+        assert is_connection_error(DatabaseUnavailableError("circuito abierto"))
+        assert not is_connection_error(aiomysql.OperationalError(1205, "Lock wait timeout exceeded"))
+        assert not is_connection_error(aiomysql.IntegrityError(1452, "foreign key"))
+        assert not is_connection_error(DatabasePoolTimeoutError("pool lleno"))
+
+    def test_abre_y_se_recupera(self):
+        """Test: Se abre tras los fallos seguidos, prueba una vez al vencer la espera y se cierra"""
+        circuito = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+        with patch("bot.core.database.circuit.time.monotonic", return_value=100.0):
+            circuito.record_failure()
+            circuito.record_success()
+            for _ in range(3):
+                assert circuito.allow()
+                circuito.record_failure()
+            assert circuito.state == ABIERTO
+            assert not circuito.allow()
+
+        with patch("bot.core.database.circuit.time.monotonic", return_value=111.0):
+            assert circuito.allow()
+            assert circuito.state == SEMIABIERTO
+            # Mientras la prueba está en curso no pasa nadie más
+            assert not circuito.allow()
+            circuito.record_success()
+            assert circuito.state == CERRADO
+            assert circuito.allow()
+
+    def test_prueba_fallida_reabre(self):
+        """Test: Si la prueba falla el circuito vuelve a abrirse"""
+        circuito = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        with patch("bot.core.database.circuit.time.monotonic", return_value=100.0):
+            circuito.record_failure()
+        with patch("bot.core.database.circuit.time.monotonic", return_value=111.0):
+            assert circuito.allow()
+            circuito.record_failure()
+            assert circuito.state == ABIERTO
+            assert not circuito.allow()
+        assert circuito.opened == 2
+
+
+class TestWriteJournal:
+    """Tests para bot/core/database/journal.py"""
+
+    @pytest.mark.asyncio
+    async def test_reproduce_en_orden_con_tipos(self, tmp_path):
+        """Test: Las escrituras se aplican en orden, con fechas y horas restauradas"""
+        diario = WriteJournal(str(tmp_path / "diario.jsonl"))
+        await diario.append(queries.ASISTENCIA_INSERTAR, (1, date(2026, 3, 2), time(8, 5), 1))
+        await diario.append(queries.ASISTENCIA_REGISTRAR_SALIDA, (time(14, 3), 1, date(2026, 3, 2)))
+        assert diario.pending == 2
+
+        # Un diario abierto de nuevo (p. ej. tras reiniciar) ve los pendientes
+        assert WriteJournal(str(tmp_path / "diario.jsonl")).pending == 2
+
+        aplicadas = []
+        execute = AsyncMock(side_effect=lambda query, params: aplicadas.append((query.name, params)))
+        assert await diario.replay(execute) == 2
+
+        assert aplicadas == [
+            ("asistencia.insertar", (1, date(2026, 3, 2), time(8, 5), 1)),
+            ("asistencia.registrar_salida", (time(14, 3), 1, date(2026, 3, 2))),
+        ]
+        assert diario.pending == 0
+        assert not list(tmp_path.iterdir())
+
+    @pytest.mark.asyncio
+    async def test_fallo_conserva_pendientes(self, tmp_path):
+        """Test: Si la base de datos vuelve a fallar, nada se pierde y lo nuevo va después"""
+        diario = WriteJournal(str(tmp_path / "diario.jsonl"))
+        await diario.append(queries.RECUPERACION_INSERTAR, (1, date(2026, 3, 2), time(15, 0)))
+
+        with pytest.raises(DatabaseUnavailableError):
+            await diario.replay(AsyncMock(side_effect=DatabaseUnavailableError("circuito abierto")))
+        assert diario.pending == 1
+
+        await diario.append(queries.RECUPERACION_INSERTAR, (2, date(2026, 3, 2), time(15, 1)))
+        aplicadas = []
+        execute = AsyncMock(side_effect=lambda query, params: aplicadas.append(params[0]))
+        assert await diario.replay(execute) == 2
+        assert aplicadas == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_solo_consultas_registradas(self, tmp_path):
+        """Test: El diario guarda nombres de consultas, no SQL suelto"""
+        diario = WriteJournal(str(tmp_path / "diario.jsonl"))
+        with pytest.raises(ValueError):
+            await diario.append(Query("sin_registrar", "DELETE FROM Asistencia"), ())
+
+
+class TestExecuteDurable:
+    """Tests para database.execute_durable"""
+
+    @pytest.fixture
+    def degradado(self, tmp_path):
+        circuito = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        diario = WriteJournal(str(tmp_path / "diario.jsonl"))
+        with patch.object(database, "_circuit", circuito), patch.object(database, "_journal", diario):
+            yield circuito, diario
+
+    @pytest.mark.asyncio
+    async def test_circuito_abierto_va_al_diario(self, degradado):
+        """Test: Con el circuito abierto la escritura queda pendiente sin tocar MySQL"""
+        circuito, diario = degradado
+        circuito.record_failure()
+        submit = AsyncMock()
+
+        params = (1, date(2026, 3, 2), time(8, 0), 1)
+        assert await database.execute_durable(queries.ASISTENCIA_INSERTAR, params, submit=submit) is None
+
+        submit.assert_not_called()
+        assert diario.pending == 1
+
+    @pytest.mark.asyncio
+    async def test_caida_durante_la_escritura(self, degradado):
+        """Test: Si la conexión se pierde al escribir, la fila se guarda en el diario"""
+        _, diario = degradado
+        error = DatabaseQueryError("Error escribiendo lote en Asistencia")
+        error.__cause__ = aiomysql.OperationalError(2013, "Lost connection")
+
+        params = (1, date(2026, 3, 2), time(8, 0), 1)
+        resultado = await database.execute_durable(
+            queries.ASISTENCIA_INSERTAR, params, submit=AsyncMock(side_effect=error)
+        )
+
+        assert resultado is None
+        assert diario.pending == 1
+
+    @pytest.mark.asyncio
+    async def test_error_de_consulta_se_propaga(self, degradado):
+        """Test: Un error de la consulta no es una caída y no se difiere"""
+        _, diario = degradado
+        error = RuntimeError("Error ejecutando execute_rowcount")
+        error.__cause__ = aiomysql.IntegrityError(1452, "foreign key")
+
+        with patch.object(database, "execute_rowcount", AsyncMock(side_effect=error)):
+            with pytest.raises(RuntimeError):
+                await database.execute_durable(queries.RECUPERACION_INSERTAR, (1, date(2026, 3, 2), time(15, 0)))
+        assert diario.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_replay_descarta_registros_rechazados(self, degradado):
+        """Test: Un registro que MySQL rechaza no bloquea a los siguientes"""
+        _, diario = degradado
+        await diario.append(queries.RECUPERACION_INSERTAR, (1, date(2026, 3, 2), time(15, 0)))
+        await diario.append(queries.RECUPERACION_INSERTAR, (2, date(2026, 3, 2), time(15, 1)))
+        rechazo = RuntimeError("Error ejecutando execute_rowcount")
+        rechazo.__cause__ = aiomysql.IntegrityError(1452, "foreign key")
+
+        with patch.object(database, "execute_rowcount", AsyncMock(side_effect=[rechazo, 1])) as ejecutar:
+            assert await database.replay_journal() == 2
+
+        assert ejecutar.call_count == 2
+        assert diario.pending == 0
@@ -0,0 +1,70 @@
+"""
+Tests para la paginación de historiales
+Ejecutar con: pytest tests/test_pagination.py -v
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from discord import Embed
+
+from bot.core.utils import PaginadorKeyset, partir_pagina
+
+
+def make_interaction(user_id=1):
+    interaction = MagicMock()
+    interaction.user.id = user_id
+    interaction.response = AsyncMock()
+    interaction.edit_original_response = AsyncMock()
+    return interaction
+
+
+class TestPartirPagina:
+    """Tests para partir_pagina"""
+
+    def test_con_fila_extra_hay_siguiente(self):
+        """Test: La fila extra de LIMIT n+1 indica que hay otra página"""
+        filas = [{"fecha_clave": date(2024, 12, 10) - timedelta(days=i)} for i in range(4)]
+        pagina, cursor = partir_pagina(filas, 3, "fecha_clave")
+        assert len(pagina) == 3
+        assert cursor == date(2024, 12, 8)
+
+    def test_sin_fila_extra_es_la_ultima(self):
+        """Test: Sin fila extra no hay cursor"""
+        pagina, cursor = partir_pagina([{"fecha_clave": 1}], 3, "fecha_clave")
+        assert pagina == [{"fecha_clave": 1}]
+        assert cursor is None
+
+
+class TestPaginadorKeyset:
+    """Tests para PaginadorKeyset"""
+
+    @pytest.mark.asyncio
+    async def test_carga_paginas_solo_al_avanzar(self):
+        """Test: Las páginas siguientes se cargan bajo demanda y una sola vez"""
+        segunda = Embed(title="2")
+        cargar = AsyncMock(return_value=(segunda, None))
+        vista = PaginadorKeyset(1, Embed(title="1"), date(2024, 12, 8), cargar)
+
+        assert vista.anterior.disabled
+        assert not vista.siguiente.disabled
+        cargar.assert_not_called()
+
+        await vista.siguiente.callback(make_interaction())
+        cargar.assert_awaited_once_with(date(2024, 12, 8), 2)
+        assert vista.siguiente.disabled
+
+        await vista.anterior.callback(make_interaction())
+        assert vista.actual == 0
+        interaction = make_interaction()
+        await vista.siguiente.callback(interaction)
+        cargar.assert_awaited_once()
+        interaction.response.edit_message.assert_awaited_once_with(embed=segunda, view=vista)
+
+    @pytest.mark.asyncio
+    async def test_solo_el_autor_usa_los_botones(self):
+        """Test: Otros usuarios no pueden paginar el historial ajeno"""
+        vista = PaginadorKeyset(1, Embed(), None, AsyncMock())
+        assert await vista.interaction_check(make_interaction(1))
+        assert not await vista.interaction_check(make_interaction(2))
@@ -0,0 +1,104 @@
+"""
+Tests para el plazo de respuesta de las interacciones
+Ejecutar con: pytest tests/test_plazo.py -v
+"""
+
+import asyncio
+from datetime import timedelta
+
+import discord
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from bot.core.utils import AbrirModal, PlazoInteraccion
+
+
+@pytest.fixture
+def mock_interaction():
+    """Interacción cuya respuesta queda marcada al hacer defer o responder"""
+    interaction = MagicMock()
+    interaction.user.id = 42
+    interaction.created_at = discord.utils.utcnow()
+    respondida = {"valor": False}
+
+    async def responder(*args, **kwargs):
+        respondida["valor"] = True
+
+    interaction.response.is_done = MagicMock(side_effect=lambda: respondida["valor"])
+    interaction.response.defer = AsyncMock(side_effect=responder)
+    interaction.response.send_message = AsyncMock(side_effect=responder)
+    interaction.response.send_modal = AsyncMock(side_effect=responder)
+    interaction.followup.send = AsyncMock()
+    return interaction
+
+
+class TestPlazoInteraccion:
+    """Tests para PlazoInteraccion"""
+
+    async def test_trabajo_rapido_responde_sin_defer(self, mock_interaction):
+        """Test: Si el trabajo termina a tiempo, la respuesta es la primera"""
+        plazo = PlazoInteraccion(mock_interaction)
+        assert await plazo.esperar(asyncio.sleep(0, result=7)) == 7
+        await plazo.responder("hola", ephemeral=True)
+
+        mock_interaction.response.defer.assert_not_awaited()
+        mock_interaction.response.send_message.assert_awaited_once_with("hola", ephemeral=True)
+        assert not plazo.diferida
+
+    async def test_trabajo_lento_hace_defer_y_sigue_con_followup(self, mock_interaction):
+        """Test: Al agotar el presupuesto se hace defer y luego se responde por followup"""
+        plazo = PlazoInteraccion(mock_interaction, margen=2.95)
+        assert await plazo.esperar(asyncio.sleep(0.2, result="filas")) == "filas"
+        await plazo.responder("hola", ephemeral=True)
+
+        mock_interaction.response.defer.assert_awaited_once_with(ephemeral=True)
+        mock_interaction.followup.send.assert_awaited_once_with("hola", ephemeral=True)
+        mock_interaction.response.send_message.assert_not_awaited()
+        assert plazo.diferida
+
+    async def test_cuenta_desde_la_creacion_de_la_interaccion(self, mock_interaction):
+        """Test: El tiempo antes de llegar al bot se descuenta del plazo"""
+        mock_interaction.created_at = discord.utils.utcnow() - timedelta(seconds=0.8)
+        plazo = PlazoInteraccion(mock_interaction, margen=2)
+        assert plazo.restante() <= 2.2
+        await plazo.esperar(asyncio.sleep(0.3))
+        mock_interaction.response.defer.assert_awaited_once()
+
+    async def test_reloj_desfasado_no_agota_el_plazo(self, mock_interaction):
+        """Test: Con el reloj local adelantado o atrasado el retraso de entrega se acota"""
+        mock_interaction.created_at = discord.utils.utcnow() - timedelta(seconds=30)
+        plazo = PlazoInteraccion(mock_interaction, margen=1)
+        assert 1.9 <= plazo.restante() <= 2.0
+        await plazo.esperar(asyncio.sleep(0))
+        mock_interaction.response.defer.assert_not_awaited()
+
+        mock_interaction.created_at = discord.utils.utcnow() + timedelta(seconds=30)
+        assert PlazoInteraccion(mock_interaction).restante() > 2.9
+
+    async def test_modal_tras_defer_se_abre_con_boton(self, mock_interaction):
+        """Test: Después de un defer, el modal se ofrece con un botón"""
+        plazo = PlazoInteraccion(mock_interaction)
+        await plazo.defer()
+        await plazo.enviar_modal(MagicMock, "Indica el motivo", "Abrir")
+
+        mock_interaction.response.send_modal.assert_not_awaited()
+        args, kwargs = mock_interaction.followup.send.await_args
+        assert args == ("Indica el motivo",)
+        assert isinstance(kwargs["view"], AbrirModal)
+
+        # Cada clic abre un modal nuevo
+        enviados = []
+        for _ in range(2):
+            clic = MagicMock()
+            clic.response.send_modal = AsyncMock()
+            await kwargs["view"].abrir.callback(clic)
+            enviados.append(clic.response.send_modal.await_args.args[0])
+        assert enviados[0] is not enviados[1]
+
+    async def test_modal_sin_defer_es_la_respuesta(self, mock_interaction):
+        """Test: Sin defer previo, el modal se envía directamente"""
+        plazo = PlazoInteraccion(mock_interaction)
+        modal = MagicMock()
+        await plazo.enviar_modal(lambda: modal, "Indica el motivo", "Abrir")
+        mock_interaction.response.send_modal.assert_awaited_once_with(modal)
+        mock_interaction.followup.send.assert_not_awaited()
@@ -0,0 +1,116 @@
+"""
+Tests para las políticas por servidor (canales y roles de recuperación)
+Ejecutar con: pytest tests/test_politicas.py -v
+"""
+
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import discord
+import pytest
+
+import utils
+from bot.config import MSG_CANAL_NO_PERMITIDO
+from bot.core.cache import (
+    TIPO_CANAL,
+    TIPO_ROL_RECUPERACION,
+    PoliticasServidor,
+    get_politicas,
+    set_politicas,
+)
+from bot.core.utils import ComandoRechazado, responder_rechazo
+
+
+@pytest.fixture(autouse=True)
+def restaurar_politicas():
+    """Cada test deja las políticas como estaban"""
+    anteriores = get_politicas()
+    yield
+    set_politicas(anteriores)
+
+
+class TestPoliticasServidor:
+    """Tests para bot/core/cache/politicas.py"""
+
+    def test_desde_filas(self):
+        """Test: Las filas se indexan por servidor y tipo"""
+        politicas = PoliticasServidor.desde_filas([
+            {"guild_id": 1, "tipo": TIPO_CANAL, "objetivo_id": 10},
+            {"guild_id": 1, "tipo": TIPO_CANAL, "objetivo_id": 11},
+            {"guild_id": 2, "tipo": TIPO_ROL_RECUPERACION, "objetivo_id": 20},
+        ])
+        assert politicas.canales(1) == frozenset({10, 11})
+        assert politicas.canal_permitido(1, 11)
+        assert not politicas.canal_permitido(2, 10)
+        assert not politicas.canal_permitido(None, 10)
+
+        # Sin roles configurados la recuperación es libre
+        assert politicas.rol_recuperacion_permitido(1, [])
+        assert politicas.rol_recuperacion_permitido(2, [5, 20])
+        assert not politicas.rol_recuperacion_permitido(2, [5])
+
+    def test_indices_inmutables(self):
+        """Test: Los índices no se pueden modificar en el lugar"""
+        politicas = PoliticasServidor({1: [10]}, {})
+        with pytest.raises(TypeError):
+            politicas._canales[2] = frozenset({20})
+
+
+class TestCargarPoliticas:
+    """Tests para utils.cargar_politicas"""
+
+    @pytest.mark.asyncio
+    async def test_recarga_solo_si_cambia_la_version(self):
+        """Test: Con la misma versión no se vuelve a leer la tabla"""
+        actualizado = datetime(2026, 1, 1, 8, 0)
+        with patch('utils.db') as mock_db:
+            mock_db.fetch_one = AsyncMock(return_value={"filas": 1, "actualizado": actualizado})
+            mock_db.fetch_all = AsyncMock(return_value=[
+                {"guild_id": 1, "tipo": TIPO_CANAL, "objetivo_id": 10},
+            ])
+
+            politicas = await utils.cargar_politicas()
+            assert politicas is get_politicas()
+            assert politicas.canal_permitido(1, 10)
+
+            assert await utils.cargar_politicas() is None
+            mock_db.fetch_all.assert_called_once()
+
+            mock_db.fetch_one.return_value = {"filas": 2, "actualizado": actualizado}
+            assert await utils.cargar_politicas() is not None
+            assert mock_db.fetch_all.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_tabla_vacia_usa_configuracion(self):
+        """Test: Sin filas se usan los valores de configuración"""
+        with patch('utils.db') as mock_db:
+            mock_db.fetch_one = AsyncMock(return_value={"filas": 0, "actualizado": None})
+            mock_db.fetch_all = AsyncMock()
+
+            politicas = await utils.cargar_politicas()
+
+            mock_db.fetch_all.assert_not_called()
+            assert politicas.canales(1) == PoliticasServidor.desde_settings().canales(1)
+
+
+class TestResponderRechazo:
+    """Tests para el manejo de checks rechazados"""
+
+    @pytest.mark.asyncio
+    async def test_responde_rechazo(self):
+        """Test: Un ComandoRechazado se contesta en privado"""
+        interaction = AsyncMock(spec=discord.Interaction)
+        interaction.response = AsyncMock()
+        interaction.response.is_done = MagicMock(return_value=False)
+
+        assert await responder_rechazo(interaction, ComandoRechazado(MSG_CANAL_NO_PERMITIDO))
+        interaction.response.send_message.assert_called_once_with(MSG_CANAL_NO_PERMITIDO, ephemeral=True)
+
+    @pytest.mark.asyncio
+    async def test_ignora_otros_errores(self):
+        """Test: Otros errores quedan para el manejador general"""
+        interaction = AsyncMock(spec=discord.Interaction)
+        interaction.response = AsyncMock()
+
+        assert not await responder_rechazo(interaction, discord.app_commands.CheckFailure())
+        interaction.response.send_message.assert_not_called()
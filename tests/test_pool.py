@@ -0,0 +1,177 @@
+"""
+Tests para el control del pool de conexiones
+Ejecutar con: pytest tests/test_pool.py -v
+"""
+
+import asyncio
+import collections
+
+import pytest
+
+from bot.core.database.pool import PoolController, resize_pool
+from bot.core.exceptions import DatabasePoolTimeoutError, DatabaseConnectionError
+
+
+class FakeConnection:
+    """Conexión falsa que recuerda si tiene una transacción abierta"""
+
+    def __init__(self):
+        self.closed = False
+        self.in_trans = False
+        self.rollbacks = 0
+
+    def get_transaction_status(self):
+        return self.in_trans
+
+    async def rollback(self):
+        self.rollbacks += 1
+        self.in_trans = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakePool:
+    """Pool mínimo con la misma interfaz que usa PoolController"""
+
+    def __init__(self, maxsize):
+        self.minsize = 1
+        self._free = collections.deque(maxlen=maxsize)
+        self._used = set()
+        self._cond = asyncio.Condition()
+
+    @property
+    def maxsize(self):
+        return self._free.maxlen
+
+    @property
+    def size(self):
+        return len(self._free) + len(self._used)
+
+    @property
+    def freesize(self):
+        return len(self._free)
+
+    async def acquire(self):
+        async with self._cond:
+            while True:
+                if self._free:
+                    conn = self._free.popleft()
+                    break
+                if self.size < self.maxsize:
+                    conn = FakeConnection()
+                    break
+                await self._cond.wait()
+        self._used.add(conn)
+        return conn
+
+    def release(self, conn):
+        self._used.discard(conn)
+        if conn.in_trans:
+            conn.close()
+            return
+        self._free.append(conn)
+
+
+class TestPoolController:
+    """Tests para PoolController"""
+
+    @pytest.mark.asyncio
+    async def test_timeout_lanza_error_tipado(self):
+        """Test: Si el pool está agotado se lanza DatabasePoolTimeoutError"""
+        controller = PoolController(acquire_timeout=0.01)
+        controller.attach(FakePool(maxsize=1))
+        await controller.acquire()
+
+        with pytest.raises(DatabasePoolTimeoutError) as exc_info:
+            await controller.acquire()
+
+        assert isinstance(exc_info.value, DatabaseConnectionError)
+        assert controller.timeouts == 1
+        assert controller.snapshot()["en_uso"] == 1
+
+    @pytest.mark.asyncio
+    async def test_release_reutiliza_conexiones_con_transaccion_abierta(self):
+        """Test: Se hace rollback antes de devolver la conexión para no perderla"""
+        controller = PoolController()
+        pool = FakePool(maxsize=2)
+        controller.attach(pool)
+
+        conn = await controller.acquire()
+        conn.in_trans = True
+        await controller.release(conn)
+
+        assert conn.rollbacks == 1
+        assert not conn.closed
+        assert pool.freesize == 1
+
+    @pytest.mark.asyncio
+    async def test_prewarm_abre_conexiones(self):
+        """Test: El pre-calentamiento deja el número pedido de conexiones libres"""
+        controller = PoolController(max_limit=20)
+        pool = FakePool(maxsize=4)
+        controller.attach(pool)
+
+        tamano = await controller.prewarm(8)
+
+        assert tamano == 8
+        assert pool.maxsize == 8
+        assert pool.freesize == 8
+        # El pre-calentamiento no cuenta como espera: no debe hacer crecer el pool
+        assert controller.wait.count == 0
+        assert controller.adjust() is None
+
+    @pytest.mark.asyncio
+    async def test_adjust_crece_y_se_reduce(self):
+        """Test: El pool crece con esperas altas y vuelve al tamaño base sin carga"""
+        controller = PoolController(base_size=4, max_limit=6, grow_wait_ms=50, shrink_wait_ms=5, step=2)
+        pool = FakePool(maxsize=4)
+        controller.attach(pool)
+
+        for _ in range(10):
+            controller._observe(200)
+        assert controller.adjust() == 6
+        assert pool.maxsize == 6
+
+        for _ in range(10):
+            controller._observe(200)
+        assert controller.adjust() is None
+
+        for _ in range(10):
+            controller._observe(0.5)
+        assert controller.adjust() == 4
+        assert controller.adjust() is None
+
+
+def test_resize_cierra_conexiones_libres_sobrantes():
+    """Test: Al reducir el pool se cierran las conexiones libres que no caben"""
+    pool = FakePool(maxsize=4)
+    conexiones = [FakeConnection() for _ in range(4)]
+    pool._free.extend(conexiones)
+
+    resize_pool(pool, 2)
+
+    assert pool.maxsize == 2
+    assert sum(c.closed for c in conexiones) == 2
+
+
+@pytest.mark.asyncio
+async def test_resize_despierta_a_quien_espera():
+    """Test: Al crecer el pool, una adquisición ya bloqueada obtiene conexión sin esperar a una devolución"""
+    pool = FakePool(maxsize=1)
+    await pool.acquire()
+    esperando = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0)
+
+    assert resize_pool(pool, 2)
+
+    conn = await asyncio.wait_for(esperando, timeout=1)
+    assert isinstance(conn, FakeConnection)
+
+
+def test_resize_sin_estructura_esperada():
+    """Test: Con otra versión de aiomysql el tamaño no se toca"""
+    class OtroPool:
+        minsize, maxsize, size, freesize = 1, 4, 0, 0
+
+    assert not resize_pool(OtroPool(), 8)
@@ -0,0 +1,71 @@
+"""
+Tests para el registro de consultas y el histograma de latencias
+Ejecutar con: pytest tests/test_query_registry.py -v
+"""
+
+import pytest
+
+from bot.core.database.registry import ADHOC, Query, QueryRegistry
+from bot.core.metrics import LatencyHistogram
+
+
+class TestLatencyHistogram:
+    """Tests para LatencyHistogram"""
+
+    def test_percentiles_por_bucket(self):
+        """Test: Los percentiles se aproximan al límite del bucket"""
+        hist = LatencyHistogram(buckets_ms=(10, 100, 1000))
+        for _ in range(90):
+            hist.observe(5)
+        for _ in range(10):
+            hist.observe(500)
+        assert hist.percentile(50) == 10
+        assert hist.percentile(95) == 1000
+        assert hist.snapshot()["count"] == 100
+
+    def test_valores_fuera_de_rango(self):
+        """Test: Valores mayores al último bucket usan el máximo observado"""
+        hist = LatencyHistogram(buckets_ms=(10,))
+        hist.observe(50)
+        assert hist.percentile(99) == 50
+        assert hist.snapshot()["buckets"]["le_inf"] == 1
+
+
+class TestQueryRegistry:
+    """Tests para QueryRegistry"""
+
+    def test_query_es_un_str(self):
+        """Test: Una Query se comporta como el SQL que contiene"""
+        registry = QueryRegistry()
+        query = registry.register("practicante.por_discord", "SELECT id FROM Practicante")
+        assert isinstance(query, str)
+        assert "FROM Practicante" in query
+        assert query.name == "practicante.por_discord"
+        assert registry.get("practicante.por_discord") is query
+
+    def test_nombre_duplicado_con_otro_sql(self):
+        """Test: No se puede registrar el mismo nombre con otro SQL"""
+        registry = QueryRegistry()
+        registry.register("a", "SELECT 1")
+        registry.register("a", "SELECT 1")
+        with pytest.raises(ValueError):
+            registry.register("a", "SELECT 2")
+
+    def test_track_registra_filas_y_errores(self):
+        """Test: track acumula llamadas, filas y errores por nombre"""
+        registry = QueryRegistry()
+        query = Query("asistencia.historial", "SELECT ...")
+
+        with registry.track(query) as stats:
+            stats.rows = 3
+        with pytest.raises(RuntimeError):
+            with registry.track(query):
+                raise RuntimeError("fallo")
+        with registry.track("SELECT 1"):
+            pass
+
+        snapshot = registry.snapshot()
+        assert snapshot["asistencia.historial"]["llamadas"] == 2
+        assert snapshot["asistencia.historial"]["filas"] == 3
+        assert snapshot["asistencia.historial"]["errores"] == 1
+        assert snapshot[ADHOC]["llamadas"] == 1
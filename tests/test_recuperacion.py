@@ -5,11 +5,15 @@ Ejecutar con: pytest tests/test_recuperacion.py -v
 
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
-from datetime import time, date
+from datetime import datetime, time, date
 import discord
 from discord.ext import commands
 
 from cogs.recuperacion.commands import Recuperacion
+from bot.core.repositories import LecturaPracticante
+from bot.core.cache import HistorialCache, PoliticasServidor, PracticanteCache, get_politicas, set_politicas
+from bot.core.utils import ComandoRechazado, Reloj
+from bot.config import DIAS_HISTORIAL_RECUPERACION_MAX, MSG_CANAL_NO_PERMITIDO
 
 
 # Fixtures para crear objetos mock de Discord
@@ -17,9 +21,6 @@ from cogs.recuperacion.commands import Recuperacion
 def mock_bot():
     """Bot mock para los tests"""
     bot = MagicMock(spec=commands.Bot)
-    bot.roles_recuperacion = {
-        123456789: []  # Servidor de prueba sin restricciones
-    }
     return bot
 
 
@@ -57,8 +58,8 @@ def mock_interaction(mock_guild, mock_channel, mock_user):
     interaction.guild = mock_guild
     interaction.channel = mock_channel
     interaction.user = mock_user
+    interaction.channel_id = mock_channel.id
     interaction.client = MagicMock()
-    interaction.client.roles_recuperacion = {123456789: []}
     interaction.response = AsyncMock()
     interaction.followup = AsyncMock()
     return interaction
@@ -67,7 +68,7 @@ def mock_interaction(mock_guild, mock_channel, mock_user):
 @pytest.fixture
 def recuperacion_cog(mock_bot):
     """Instancia del cog de recuperación"""
-    return Recuperacion(mock_bot)
+    return Recuperacion(mock_bot, reloj=Reloj())
 
 
 class TestComandoRecuperacion:
@@ -76,15 +77,14 @@ class TestComandoRecuperacion:
     @pytest.mark.asyncio
     async def test_canal_no_permitido(self, recuperacion_cog, mock_interaction):
         """Test: Debe rechazar si el canal no está permitido"""
-        with patch('cogs.recuperacion.commands.canal_permitido', return_value=False):
-            await recuperacion_cog.recuperacion.callback(recuperacion_cog, mock_interaction)
-            mock_interaction.response.defer.assert_not_called()
+        mock_interaction.channel_id = 555
+        with pytest.raises(ComandoRechazado):
+            await recuperacion_cog.recuperacion._check_can_run(mock_interaction)
     
     @pytest.mark.asyncio
     async def test_usuario_no_registrado(self, recuperacion_cog, mock_interaction):
         """Test: Debe rechazar si el usuario no está registrado"""
-        with patch('cogs.recuperacion.commands.canal_permitido', return_value=True), \
-             patch('cogs.recuperacion.commands.obtener_practicante', return_value=None):
+        with patch('cogs.recuperacion.commands.obtener_practicante', return_value=None):
             
             await recuperacion_cog.recuperacion.callback(recuperacion_cog, mock_interaction)
             mock_interaction.followup.send.assert_not_called()
@@ -94,15 +94,9 @@ class TestComandoRecuperacion:
         """Test: Debe rechazar si está fuera del horario permitido"""
         hora_fuera_rango = time(10, 0)
         fecha_hoy = date.today()
-        mock_datetime_obj = MagicMock()
-        mock_datetime_obj.date.return_value = fecha_hoy
-        mock_datetime_obj.time.return_value = hora_fuera_rango
+        recuperacion_cog.reloj.congelar(datetime.combine(fecha_hoy, hora_fuera_rango))
         
-        with patch('cogs.recuperacion.commands.canal_permitido', return_value=True), \
-             patch('cogs.recuperacion.commands.obtener_practicante', return_value=1), \
-             patch('cogs.recuperacion.commands.datetime') as mock_datetime:
-            
-            mock_datetime.now.return_value = mock_datetime_obj
+        with patch('cogs.recuperacion.commands.obtener_practicante', return_value=1):
             
             await recuperacion_cog.recuperacion.callback(recuperacion_cog, mock_interaction)
             
@@ -116,16 +110,11 @@ class TestComandoRecuperacion:
         """Test: Debe rechazar si ya hay una recuperación hoy"""
         hora_permitida = time(15, 0)
         fecha_hoy = date.today()
-        mock_datetime_obj = MagicMock()
-        mock_datetime_obj.date.return_value = fecha_hoy
-        mock_datetime_obj.time.return_value = hora_permitida
+        recuperacion_cog.reloj.congelar(datetime.combine(fecha_hoy, hora_permitida))
         
-        with patch('cogs.recuperacion.commands.canal_permitido', return_value=True), \
-             patch('cogs.recuperacion.commands.obtener_practicante', return_value=1), \
-             patch('cogs.recuperacion.commands.verificar_recuperacion', return_value={'id': 1}), \
-             patch('cogs.recuperacion.commands.datetime') as mock_datetime:
-            
-            mock_datetime.now.return_value = mock_datetime_obj
+        with patch('cogs.recuperacion.commands.obtener_practicante', return_value=1), \
+             patch('cogs.recuperacion.commands.db') as mock_db:
+            mock_db.execute_durable = AsyncMock(return_value=0)
             
             await recuperacion_cog.recuperacion.callback(recuperacion_cog, mock_interaction)
             
@@ -139,23 +128,16 @@ class TestComandoRecuperacion:
         """Test: Debe registrar correctamente una recuperación"""
         hora_permitida = time(15, 0)
         fecha_hoy = date.today()
-        mock_datetime_obj = MagicMock()
-        mock_datetime_obj.date.return_value = fecha_hoy
-        mock_datetime_obj.time.return_value = hora_permitida
+        recuperacion_cog.reloj.congelar(datetime.combine(fecha_hoy, hora_permitida))
         
-        with patch('cogs.recuperacion.commands.canal_permitido', return_value=True), \
-             patch('cogs.recuperacion.commands.obtener_practicante', return_value=1), \
-             patch('cogs.recuperacion.commands.verificar_recuperacion', return_value=None), \
-             patch('cogs.recuperacion.commands.db') as mock_db, \
-             patch('cogs.recuperacion.commands.datetime') as mock_datetime:
-            
-            mock_datetime.now.return_value = mock_datetime_obj
-            mock_db.execute_query = AsyncMock(return_value=1)
+        with patch('cogs.recuperacion.commands.obtener_practicante', return_value=1), \
+             patch('cogs.recuperacion.commands.db') as mock_db:
+            mock_db.execute_durable = AsyncMock(return_value=1)
             
             await recuperacion_cog.recuperacion.callback(recuperacion_cog, mock_interaction)
             
-            mock_db.execute_query.assert_called_once()
-            call_args = mock_db.execute_query.call_args
+            mock_db.execute_durable.assert_called_once()
+            call_args = mock_db.execute_durable.call_args
             assert call_args[0][1][0] == 1
             assert call_args[0][1][1] == fecha_hoy
             assert call_args[0][1][2] == hora_permitida
@@ -171,22 +153,15 @@ class TestComandoRecuperacion:
         """Test: Debe permitir el registro exactamente a las 14:30"""
         hora_limite = time(14, 30)
         fecha_hoy = date.today()
-        mock_datetime_obj = MagicMock()
-        mock_datetime_obj.date.return_value = fecha_hoy
-        mock_datetime_obj.time.return_value = hora_limite
+        recuperacion_cog.reloj.congelar(datetime.combine(fecha_hoy, hora_limite))
         
-        with patch('cogs.recuperacion.commands.canal_permitido', return_value=True), \
-             patch('cogs.recuperacion.commands.obtener_practicante', return_value=1), \
-             patch('cogs.recuperacion.commands.verificar_recuperacion', return_value=None), \
-             patch('cogs.recuperacion.commands.db') as mock_db, \
-             patch('cogs.recuperacion.commands.datetime') as mock_datetime:
-            
-            mock_datetime.now.return_value = mock_datetime_obj
-            mock_db.execute_query = AsyncMock(return_value=1)
+        with patch('cogs.recuperacion.commands.obtener_practicante', return_value=1), \
+             patch('cogs.recuperacion.commands.db') as mock_db:
+            mock_db.execute_durable = AsyncMock(return_value=1)
             
             await recuperacion_cog.recuperacion.callback(recuperacion_cog, mock_interaction)
             
-            mock_db.execute_query.assert_called_once()
+            mock_db.execute_durable.assert_called_once()
             mock_interaction.followup.send.assert_called_once()
     
     @pytest.mark.asyncio
@@ -194,22 +169,15 @@ class TestComandoRecuperacion:
         """Test: Debe permitir el registro exactamente a las 20:00"""
         hora_limite = time(20, 0)
         fecha_hoy = date.today()
-        mock_datetime_obj = MagicMock()
-        mock_datetime_obj.date.return_value = fecha_hoy
-        mock_datetime_obj.time.return_value = hora_limite
+        recuperacion_cog.reloj.congelar(datetime.combine(fecha_hoy, hora_limite))
         
-        with patch('cogs.recuperacion.commands.canal_permitido', return_value=True), \
-             patch('cogs.recuperacion.commands.obtener_practicante', return_value=1), \
-             patch('cogs.recuperacion.commands.verificar_recuperacion', return_value=None), \
-             patch('cogs.recuperacion.commands.db') as mock_db, \
-             patch('cogs.recuperacion.commands.datetime') as mock_datetime:
-            
-            mock_datetime.now.return_value = mock_datetime_obj
-            mock_db.execute_query = AsyncMock(return_value=1)
+        with patch('cogs.recuperacion.commands.obtener_practicante', return_value=1), \
+             patch('cogs.recuperacion.commands.db') as mock_db:
+            mock_db.execute_durable = AsyncMock(return_value=1)
             
             await recuperacion_cog.recuperacion.callback(recuperacion_cog, mock_interaction)
             
-            mock_db.execute_query.assert_called_once()
+            mock_db.execute_durable.assert_called_once()
             mock_interaction.followup.send.assert_called_once()
     
     @pytest.mark.asyncio
@@ -217,15 +185,9 @@ class TestComandoRecuperacion:
         """Test: Debe rechazar el registro a las 14:29"""
         hora_antes = time(14, 29)
         fecha_hoy = date.today()
-        mock_datetime_obj = MagicMock()
-        mock_datetime_obj.date.return_value = fecha_hoy
-        mock_datetime_obj.time.return_value = hora_antes
+        recuperacion_cog.reloj.congelar(datetime.combine(fecha_hoy, hora_antes))
         
-        with patch('cogs.recuperacion.commands.canal_permitido', return_value=True), \
-             patch('cogs.recuperacion.commands.obtener_practicante', return_value=1), \
-             patch('cogs.recuperacion.commands.datetime') as mock_datetime:
-            
-            mock_datetime.now.return_value = mock_datetime_obj
+        with patch('cogs.recuperacion.commands.obtener_practicante', return_value=1):
             
             await recuperacion_cog.recuperacion.callback(recuperacion_cog, mock_interaction)
             
@@ -239,15 +201,9 @@ class TestComandoRecuperacion:
         """Test: Debe rechazar el registro a las 20:01"""
         hora_despues = time(20, 1)
         fecha_hoy = date.today()
-        mock_datetime_obj = MagicMock()
-        mock_datetime_obj.date.return_value = fecha_hoy
-        mock_datetime_obj.time.return_value = hora_despues
+        recuperacion_cog.reloj.congelar(datetime.combine(fecha_hoy, hora_despues))
         
-        with patch('cogs.recuperacion.commands.canal_permitido', return_value=True), \
-             patch('cogs.recuperacion.commands.obtener_practicante', return_value=1), \
-             patch('cogs.recuperacion.commands.datetime') as mock_datetime:
-            
-            mock_datetime.now.return_value = mock_datetime_obj
+        with patch('cogs.recuperacion.commands.obtener_practicante', return_value=1):
             
             await recuperacion_cog.recuperacion.callback(recuperacion_cog, mock_interaction)
             
@@ -262,23 +218,16 @@ class TestComandoRecuperacion:
         hora_permitida = time(16, 30)
         fecha_hoy = date.today()
         practicante_id = 42
-        mock_datetime_obj = MagicMock()
-        mock_datetime_obj.date.return_value = fecha_hoy
-        mock_datetime_obj.time.return_value = hora_permitida
+        recuperacion_cog.reloj.congelar(datetime.combine(fecha_hoy, hora_permitida))
         
-        with patch('cogs.recuperacion.commands.canal_permitido', return_value=True), \
-             patch('cogs.recuperacion.commands.obtener_practicante', return_value=practicante_id), \
-             patch('cogs.recuperacion.commands.verificar_recuperacion', return_value=None), \
-             patch('cogs.recuperacion.commands.db') as mock_db, \
-             patch('cogs.recuperacion.commands.datetime') as mock_datetime:
-            
-            mock_datetime.now.return_value = mock_datetime_obj
-            mock_db.execute_query = AsyncMock(return_value=1)
+        with patch('cogs.recuperacion.commands.obtener_practicante', return_value=practicante_id), \
+             patch('cogs.recuperacion.commands.db') as mock_db:
+            mock_db.execute_durable = AsyncMock(return_value=1)
             
             await recuperacion_cog.recuperacion.callback(recuperacion_cog, mock_interaction)
             
-            mock_db.execute_query.assert_called_once()
-            call_args = mock_db.execute_query.call_args
+            mock_db.execute_durable.assert_called_once()
+            call_args = mock_db.execute_durable.call_args
             query = call_args[0][0]
             params = call_args[0][1]
             
@@ -291,28 +240,24 @@ class TestComandoRecuperacion:
             assert params[2] == hora_permitida
     
     @pytest.mark.asyncio
-    async def test_verificar_recuperacion_llamada_correcta(self, recuperacion_cog, mock_interaction):
-        """Test: Verificar que verificar_recuperacion se llama con los parámetros correctos"""
+    async def test_insercion_condicional_un_solo_round_trip(self, recuperacion_cog, mock_interaction):
+        """Test: La recuperación se registra con un único INSERT condicional"""
         hora_permitida = time(17, 0)
         fecha_hoy = date.today()
         practicante_id = 99
-        mock_datetime_obj = MagicMock()
-        mock_datetime_obj.date.return_value = fecha_hoy
-        mock_datetime_obj.time.return_value = hora_permitida
+        recuperacion_cog.reloj.congelar(datetime.combine(fecha_hoy, hora_permitida))
         
-        with patch('cogs.recuperacion.commands.canal_permitido', return_value=True), \
-             patch('cogs.recuperacion.commands.obtener_practicante', return_value=practicante_id), \
-             patch('cogs.recuperacion.commands.verificar_recuperacion') as mock_verificar, \
-             patch('cogs.recuperacion.commands.db') as mock_db, \
-             patch('cogs.recuperacion.commands.datetime') as mock_datetime:
-            
-            mock_verificar.return_value = None
-            mock_datetime.now.return_value = mock_datetime_obj
-            mock_db.execute_query = AsyncMock(return_value=1)
+        with patch('cogs.recuperacion.commands.obtener_practicante', return_value=practicante_id), \
+             patch('cogs.recuperacion.commands.db') as mock_db:
+            mock_db.execute_durable = AsyncMock(return_value=1)
             
             await recuperacion_cog.recuperacion.callback(recuperacion_cog, mock_interaction)
             
-            mock_verificar.assert_called_once_with(practicante_id, fecha_hoy)
+            mock_db.execute_durable.assert_called_once()
+            mock_db.fetch_one.assert_not_called()
+            query, params = mock_db.execute_durable.call_args[0]
+            assert "ON DUPLICATE KEY UPDATE" in query
+            assert params == (practicante_id, fecha_hoy, hora_permitida)
 
 
 class TestComandoHistorial:
@@ -321,42 +266,50 @@ class TestComandoHistorial:
     @pytest.mark.asyncio
     async def test_historial_canal_no_permitido(self, recuperacion_cog, mock_interaction):
         """Test: Debe rechazar si el canal no está permitido"""
-        with patch('cogs.recuperacion.commands.canal_permitido', return_value=False):
-            await recuperacion_cog.historial_recuperaciones.callback(recuperacion_cog, mock_interaction, dias=15)
-            mock_interaction.response.defer.assert_not_called()
+        mock_interaction.channel_id = 555
+        with pytest.raises(ComandoRechazado):
+            await recuperacion_cog.historial_recuperaciones._check_can_run(mock_interaction)
     
     @pytest.mark.asyncio
     async def test_historial_dias_invalidos(self, recuperacion_cog, mock_interaction):
         """Test: Debe rechazar días fuera del rango"""
-        with patch('cogs.recuperacion.commands.canal_permitido', return_value=True), \
-             patch('cogs.recuperacion.commands.obtener_practicante', return_value=1):
-            
-            # Test con días < 1
-            await recuperacion_cog.historial_recuperaciones.callback(recuperacion_cog, mock_interaction, dias=0)
-            mock_interaction.followup.send.assert_called_once()
-            
-            mock_interaction.followup.reset_mock()
-            
-            # Test con días > 30
-            await recuperacion_cog.historial_recuperaciones.callback(recuperacion_cog, mock_interaction, dias=31)
-            mock_interaction.followup.send.assert_called_once()
+        recuperacion_cog.repositorio.historial = AsyncMock()
+        # Test con días < 1
+        await recuperacion_cog.historial_recuperaciones.callback(recuperacion_cog, mock_interaction, dias=0)
+        mock_interaction.followup.send.assert_called_once()
+            
+        mock_interaction.followup.reset_mock()
+            
+        # Test con días por encima del máximo
+        await recuperacion_cog.historial_recuperaciones.callback(
+            recuperacion_cog, mock_interaction, dias=DIAS_HISTORIAL_RECUPERACION_MAX + 1
+        )
+        mock_interaction.followup.send.assert_called_once()
+
+        # La validación ocurre antes de consultar la base de datos
+        recuperacion_cog.repositorio.historial.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_historial_no_registrado(self, recuperacion_cog, mock_interaction):
+        """Test: Debe avisar si el usuario no está registrado"""
+        recuperacion_cog.repositorio.historial = AsyncMock(return_value=LecturaPracticante(None))
+        mock_interaction.response.is_done = MagicMock(return_value=True)
+        await recuperacion_cog.historial_recuperaciones.callback(recuperacion_cog, mock_interaction, dias=15)
+            
+        mock_interaction.followup.send.assert_called_once()
+        assert "no estás registrado" in mock_interaction.followup.send.call_args[0][0]
     
     @pytest.mark.asyncio
     async def test_historial_vacio(self, recuperacion_cog, mock_interaction):
         """Test: Debe mostrar mensaje cuando no hay recuperaciones"""
-        with patch('cogs.recuperacion.commands.canal_permitido', return_value=True), \
-             patch('cogs.recuperacion.commands.obtener_practicante', return_value=1), \
-             patch('cogs.recuperacion.commands.db') as mock_db:
-            
-            mock_db.fetch_all = AsyncMock(return_value=[])
-            
-            await recuperacion_cog.historial_recuperaciones.callback(recuperacion_cog, mock_interaction, dias=15)
-            
-            # Verificar que se envió un embed informando que no hay datos
-            mock_interaction.followup.send.assert_called_once()
-            call_args = mock_interaction.followup.send.call_args
-            embed = call_args[1]['embed']
-            assert "no se encontraron" in embed.description.lower()
+        recuperacion_cog.repositorio.historial = AsyncMock(return_value=LecturaPracticante(1, []))
+        await recuperacion_cog.historial_recuperaciones.callback(recuperacion_cog, mock_interaction, dias=15)
+            
+        # Verificar que se envió un embed informando que no hay datos
+        mock_interaction.followup.send.assert_called_once()
+        call_args = mock_interaction.followup.send.call_args
+        embed = call_args[1]['embed']
+        assert "no se encontraron" in embed.description.lower()
     
     @pytest.mark.asyncio
     async def test_historial_con_datos(self, recuperacion_cog, mock_interaction):
@@ -374,64 +327,83 @@ class TestComandoHistorial:
             }
         ]
         
-        with patch('cogs.recuperacion.commands.canal_permitido', return_value=True), \
-             patch('cogs.recuperacion.commands.obtener_practicante', return_value=1), \
-             patch('cogs.recuperacion.commands.db') as mock_db:
-            
-            mock_db.fetch_all = AsyncMock(return_value=datos_mock)
+        recuperacion_cog.repositorio.historial = AsyncMock(return_value=LecturaPracticante(1, datos_mock))
+        await recuperacion_cog.historial_recuperaciones.callback(recuperacion_cog, mock_interaction, dias=15)
+            
+        # Verificar que se envió un embed con el historial
+        mock_interaction.followup.send.assert_called_once()
+        call_args = mock_interaction.followup.send.call_args
+        embed = call_args[1]['embed']
+        assert "Historial" in embed.title
+        assert len(embed.fields) == 2  # Dos recuperaciones
+
+    
+    @pytest.mark.asyncio
+    async def test_historial_repetido_sin_db(self, recuperacion_cog, mock_interaction):
+        """Test: Un historial repetido se reenvía desde caché hasta que hay una escritura"""
+        practicantes = PracticanteCache(max_size=10, ttl=60, negative_ttl=5)
+        practicantes.set(mock_interaction.user.id, 1)
+        historiales = HistorialCache(max_size=10, ttl=60)
+        recuperacion_cog.repositorio.historial = AsyncMock(return_value=LecturaPracticante(1, []))
+        
+        with patch('cogs.recuperacion.commands.get_practicante_cache', return_value=practicantes), \
+             patch('cogs.recuperacion.commands.get_historial_cache', return_value=historiales):
             
             await recuperacion_cog.historial_recuperaciones.callback(recuperacion_cog, mock_interaction, dias=15)
+            await recuperacion_cog.historial_recuperaciones.callback(recuperacion_cog, mock_interaction, dias=15)
+            recuperacion_cog.repositorio.historial.assert_called_once()
+            primero, segundo = mock_interaction.followup.send.call_args_list
+            assert primero[1]['embed'] is segundo[1]['embed']
             
-            # Verificar que se envió un embed con el historial
-            mock_interaction.followup.send.assert_called_once()
-            call_args = mock_interaction.followup.send.call_args
-            embed = call_args[1]['embed']
-            assert "Historial" in embed.title
-            assert len(embed.fields) == 2  # Dos recuperaciones
+            historiales.invalidate(practicante_id=1, tipo="recuperacion")
+            await recuperacion_cog.historial_recuperaciones.callback(recuperacion_cog, mock_interaction, dias=15)
+            assert recuperacion_cog.repositorio.historial.call_count == 2
 
 
 class TestValidacionRoles:
     """Tests para validación de roles"""
     
+    @pytest.fixture
+    def politicas_con_rol(self):
+        """El servidor de prueba exige un rol específico para recuperación"""
+        anteriores = get_politicas()
+        set_politicas(PoliticasServidor({123456789: [987654321]}, {123456789: [999888777]}))
+        yield
+        set_politicas(anteriores)
+    
     @pytest.mark.asyncio
-    async def test_roles_requeridos_sin_rol(self, recuperacion_cog, mock_interaction):
+    async def test_roles_requeridos_sin_rol(self, recuperacion_cog, mock_interaction, politicas_con_rol):
         """Test: Debe rechazar si se requieren roles y el usuario no los tiene"""
-        mock_interaction.client.roles_recuperacion = {
-            123456789: [999888777]  # Requiere un rol específico
-        }
         mock_interaction.user.roles = []  # Usuario sin roles
         
-        with patch('cogs.recuperacion.commands.canal_permitido', return_value=True), \
-             patch('cogs.recuperacion.commands.verificar_rol_permitido', return_value=False):
-            
-            await recuperacion_cog.recuperacion.callback(recuperacion_cog, mock_interaction)
-            mock_interaction.response.defer.assert_not_called()
+        with pytest.raises(ComandoRechazado):
+            await recuperacion_cog.recuperacion._check_can_run(mock_interaction)
+    
+    @pytest.mark.asyncio
+    async def test_canal_se_valida_antes_que_el_rol(self, recuperacion_cog, mock_interaction, politicas_con_rol):
+        """Test: En un canal no habilitado el rechazo es por canal aunque falte el rol"""
+        mock_interaction.user.roles = []
+        mock_interaction.channel_id = 555
+
+        with pytest.raises(ComandoRechazado) as error:
+            await recuperacion_cog.recuperacion._check_can_run(mock_interaction)
+        assert error.value.mensaje == MSG_CANAL_NO_PERMITIDO
     
     @pytest.mark.asyncio
-    async def test_roles_requeridos_con_rol(self, recuperacion_cog, mock_interaction):
+    async def test_roles_requeridos_con_rol(self, recuperacion_cog, mock_interaction, politicas_con_rol):
         """Test: Debe permitir si el usuario tiene el rol requerido"""
-        mock_interaction.client.roles_recuperacion = {
-            123456789: [999888777]
-        }
         mock_role = MagicMock()
         mock_role.id = 999888777
         mock_interaction.user.roles = [mock_role]
         hora_permitida = time(15, 0)
         fecha_hoy = date.today()
-        mock_datetime_obj = MagicMock()
-        mock_datetime_obj.date.return_value = fecha_hoy
-        mock_datetime_obj.time.return_value = hora_permitida
+        recuperacion_cog.reloj.congelar(datetime.combine(fecha_hoy, hora_permitida))
         
-        with patch('cogs.recuperacion.commands.canal_permitido', return_value=True), \
-             patch('cogs.recuperacion.commands.verificar_rol_permitido', return_value=True), \
-             patch('cogs.recuperacion.commands.obtener_practicante', return_value=1), \
-             patch('cogs.recuperacion.commands.verificar_recuperacion', return_value=None), \
-             patch('cogs.recuperacion.commands.db') as mock_db, \
-             patch('cogs.recuperacion.commands.datetime') as mock_datetime:
-            
-            mock_datetime.now.return_value = mock_datetime_obj
-            mock_db.execute_query = AsyncMock(return_value=1)
+        with patch('cogs.recuperacion.commands.obtener_practicante', return_value=1), \
+             patch('cogs.recuperacion.commands.db') as mock_db:
+            mock_db.execute_durable = AsyncMock(return_value=1)
             
+            assert await recuperacion_cog.recuperacion._check_can_run(mock_interaction)
             await recuperacion_cog.recuperacion.callback(recuperacion_cog, mock_interaction)
             
             mock_interaction.response.defer.assert_called_once()
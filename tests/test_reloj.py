@@ -0,0 +1,42 @@
+"""
+Tests para el reloj del bot
+Ejecutar con: pytest tests/test_reloj.py -v
+"""
+
+import time
+from datetime import datetime, timezone
+
+from bot.config import Settings
+from bot.core.utils import Reloj
+
+
+class TestReloj:
+    """Tests para Reloj"""
+
+    def test_hora_real_en_zona_configurada(self):
+        """Test: Sin congelar, devuelve la hora actual de Lima"""
+        ahora = Reloj().ahora()
+        assert ahora.tzinfo is Settings.TIMEZONE
+        assert abs((datetime.now(timezone.utc) - ahora).total_seconds()) < 5
+
+    def test_congelado(self):
+        """Test: Congelado devuelve siempre el mismo momento, con la zona configurada"""
+        reloj = Reloj()
+        reloj.congelar(datetime(2024, 12, 5, 8, 15))
+        time.sleep(0.01)
+        assert reloj.ahora() == datetime(2024, 12, 5, 8, 15, tzinfo=Settings.TIMEZONE)
+        assert reloj.hoy().isoformat() == "2024-12-05"
+        assert reloj.hora().strftime("%H:%M") == "08:15"
+
+        reloj.reanudar()
+        assert reloj.hoy() != datetime(2024, 12, 5).date()
+
+    def test_acelerado(self):
+        """Test: Acelerado avanza el factor indicado por cada segundo real"""
+        reloj = Reloj()
+        inicio = datetime(2024, 12, 5, 8, 0, tzinfo=Settings.TIMEZONE)
+        reloj.acelerar(3600, inicio)
+        time.sleep(0.05)
+        avance = (reloj.ahora() - inicio).total_seconds()
+        assert 150 <= avance < 3600
+
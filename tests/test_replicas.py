@@ -0,0 +1,167 @@
+"""
+Tests para el enrutamiento de lecturas a réplicas
+Ejecutar con: pytest tests/test_replicas.py -v
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+import database
+from cogs.asistencia.modals import SalidaAnticipadaModal
+from bot.core.database import usuario_db
+from bot.core.database.replicas import Replica, ReplicaRouter, medir_retraso, parse_hosts
+from bot.core.exceptions import DatabasePoolTimeoutError
+
+
+class FakeCursor:
+    """Cursor que devuelve una fila fija de SHOW REPLICA STATUS"""
+
+    def __init__(self, row):
+        self.row = row
+        self.ejecutadas = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query, params=None):
+        self.ejecutadas.append(query)
+
+    async def fetchone(self):
+        return self.row
+
+
+def conexion_con_estado(row):
+    conn = MagicMock()
+    conn.cursor = MagicMock(return_value=FakeCursor(row))
+    return conn
+
+
+def controller_falso(conn=None):
+    controller = MagicMock()
+    controller.pool = MagicMock()
+    controller.acquire = AsyncMock(return_value=conn or MagicMock())
+    controller.release = AsyncMock()
+    return controller
+
+
+def router_con(*sanas, ventana_s=5.0):
+    replicas = []
+    for i, sana in enumerate(sanas):
+        replica = Replica(f"replica{i}", 3306, controller_falso())
+        replica.sana = sana
+        replicas.append(replica)
+    return ReplicaRouter(replicas, max_retraso_s=2.0, ventana_s=ventana_s)
+
+
+class TestReplicaRouter:
+    """Tests para bot/core/database/replicas.py"""
+
+    def test_parse_hosts(self):
+        """Test: Puerto propio o el del primario"""
+        assert parse_hosts("r1:3307, r2", 3306) == [("r1", 3307), ("r2", 3306)]
+        assert parse_hosts("", 3306) == []
+
+    def test_reparte_entre_replicas_sanas(self):
+        """Test: Las lecturas rotan entre réplicas sanas; sin ninguna van al primario"""
+        router = router_con(True, False, True)
+        elegidas = [router.elegir().nombre for _ in range(4)]
+        assert elegidas == ["replica0:3306", "replica2:3306"] * 2
+
+        for replica in router.replicas:
+            replica.sana = False
+        assert router.elegir() is None
+        assert router.lecturas == {"replica": 4, "primario": 1, "pegajosas": 0}
+
+    def test_read_your_writes(self):
+        """Test: Tras escribir, solo las lecturas de ese usuario van al primario"""
+        router = router_con(True)
+        with usuario_db(1):
+            router.marcar_escritura()
+            assert router.elegir() is None
+        with usuario_db(2):
+            assert router.elegir() is not None
+        # Fuera de un comando no hay usuario ni ventana
+        assert router.elegir() is not None
+
+    def test_ventana_vence(self):
+        """Test: Al vencer la ventana el usuario vuelve a leer de la réplica"""
+        router = router_con(True, ventana_s=5.0)
+        with patch("bot.core.database.replicas.time.monotonic", return_value=100.0), \
+             usuario_db(1):
+            router.marcar_escritura()
+        with patch("bot.core.database.replicas.time.monotonic", return_value=106.0), \
+             usuario_db(1):
+            assert router.elegir() is not None
+
+    @pytest.mark.asyncio
+    async def test_medir_retraso(self):
+        """Test: Retraso, réplica detenida y servidor que no es réplica"""
+        assert await medir_retraso(conexion_con_estado({"Seconds_Behind_Source": 3})) == 3.0
+        assert await medir_retraso(conexion_con_estado({"Seconds_Behind_Master": None})) is None
+        assert await medir_retraso(conexion_con_estado(None)) == 0.0
+
+    @pytest.mark.asyncio
+    async def test_revisar_por_retraso(self):
+        """Test: Una réplica atrasada deja de usarse y vuelve cuando se pone al día"""
+        replica = Replica("replica", 3306, controller_falso(conexion_con_estado({"Seconds_Behind_Source": 10})))
+        router = ReplicaRouter([replica], max_retraso_s=2.0)
+        await router.iniciar({}, 1, 5)
+        assert not replica.sana and replica.retraso_s == 10.0
+
+        replica.controller.acquire.return_value = conexion_con_estado({"Seconds_Behind_Source": 1})
+        await router.revisar()
+        assert replica.sana
+
+        replica.controller.acquire.side_effect = OSError("sin conexión")
+        await router.revisar()
+        assert not replica.sana and replica.fallos == 1
+
+    @pytest.mark.asyncio
+    async def test_lectura_cae_al_primario(self):
+        """Test: Si la réplica no entrega conexión, la lectura usa el primario"""
+        router = router_con(True)
+        replica = router.replicas[0]
+        replica.controller.acquire.side_effect = DatabasePoolTimeoutError("sin conexiones")
+        primario = controller_falso()
+
+        with patch.object(database, "_replicas", router), \
+             patch.object(database, "_pool_controller", primario), \
+             patch.object(database, "init_db_pool", AsyncMock()):
+            async with database.get_connection(lectura=True) as conn:
+                assert conn is primario.acquire.return_value
+
+        assert not replica.sana
+        primario.release.assert_called_once()
+        assert router.lecturas == {"replica": 0, "primario": 1, "pegajosas": 0}
+
+
+class TestVentanaDesdeInteracciones:
+    """Tests para la ventana read-your-writes fuera de los comandos"""
+
+    @pytest.mark.asyncio
+    async def test_escritura_desde_modal(self):
+        """Test: La salida anticipada enviada desde el modal abre la ventana de su usuario"""
+        router = router_con(True)
+        interaction = MagicMock()
+        interaction.user.id = 7
+        interaction.response.is_done = MagicMock(return_value=False)
+        interaction.response.send_message = AsyncMock()
+        modal = SalidaAnticipadaModal(None, 1, None, "Usuario")
+
+        async def escribir(query, params):
+            database._marcar_escritura()
+            return 1
+
+        with patch.object(database, "_replicas", router), \
+             patch("cogs.asistencia.modals.db.execute_durable", side_effect=escribir), \
+             patch("cogs.asistencia.modals.obtener_estado_asistencia", AsyncMock(return_value=3)):
+            await modal.on_submit(interaction)
+
+        with usuario_db(7):
+            assert router.elegir() is None
+        with usuario_db(8):
+            assert router.elegir() is not None
@@ -0,0 +1,187 @@
+"""
+Tests para el reporte de asistencia en CSV comprimido
+Ejecutar con: pytest tests/test_reporte.py -v
+"""
+
+import csv
+import gzip
+import io
+import random
+from datetime import date, time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import discord
+import pytest
+from discord.ext import commands
+
+from cogs.asistencia.commands import COLUMNAS_REPORTE, Asistencia
+from bot.core.utils import ComandoRechazado, Reloj, ReporteCSV
+
+
+def leer_csv(contenido: bytes):
+    return list(csv.reader(io.StringIO(gzip.decompress(contenido).decode("utf-8"))))
+
+
+def fila_asistencia(i: int):
+    return {
+        "fecha": date(2026, 3, 2), "practicante_id": i, "id_discord": 1000 + i,
+        "hora_entrada": time(8, 0), "hora_salida": None, "estado": "Presente", "motivo": None,
+    }
+
+
+class TestReporteCSV:
+    """Tests para bot/core/utils/reporte.py"""
+
+    def test_una_parte(self, tmp_path):
+        """Test: Encabezado y filas en un solo archivo"""
+        reporte = ReporteCSV(tmp_path, "asistencia", ("fecha", "id"), 8 * 1024 * 1024)
+        reporte.escribir([("2026-03-02", 1)])
+        reporte.escribir([("2026-03-03", 2)])
+        partes = reporte.cerrar()
+
+        assert [p.name for p in partes] == ["asistencia_parte1.csv.gz"]
+        assert leer_csv(partes[0].read_bytes()) == [["fecha", "id"], ["2026-03-02", "1"], ["2026-03-03", "2"]]
+        assert reporte.filas == 2
+
+    def test_parte_nueva_al_llenarse(self, tmp_path):
+        """Test: Al pasar el tamaño máximo se abre otra parte, cada una con encabezado y sin perder filas"""
+        azar = random.Random(0)
+        reporte = ReporteCSV(tmp_path, "asistencia", ("id", "dato"), 64 * 1024)
+        # Datos poco comprimibles para llenar varias partes
+        for lote in range(20):
+            reporte.escribir([(lote * 500 + i, "%030x" % azar.getrandbits(120)) for i in range(500)])
+        partes = reporte.cerrar()
+
+        assert len(partes) > 1
+        ids = []
+        for parte in partes:
+            assert parte.stat().st_size <= 64 * 1024
+            filas = leer_csv(parte.read_bytes())
+            assert filas[0] == ["id", "dato"]
+            ids.extend(int(fila[0]) for fila in filas[1:])
+        assert ids == list(range(10000))
+
+
+@pytest.fixture
+def interaccion_admin():
+    guild = MagicMock(spec=discord.Guild)
+    guild.id = 123
+    guild.filesize_limit = 10 * 1024 * 1024
+    guild.get_member = MagicMock(return_value=None)
+    guild.members = []
+    interaction = AsyncMock(spec=discord.Interaction)
+    interaction.guild = guild
+    interaction.user = MagicMock()
+    interaction.user.display_name = "Admin"
+    interaction.user.guild_permissions = discord.Permissions(administrator=True)
+    interaction.response = AsyncMock()
+    interaction.followup = AsyncMock()
+    return interaction
+
+
+def stream_falso(lotes):
+    async def stream(query, params=None, chunk_size=None, primario=False):
+        for lote in lotes:
+            yield lote
+    return stream
+
+
+class TestComandoReporte:
+    """Tests para /asistencia reporte"""
+
+    @pytest.fixture
+    def cog(self):
+        return Asistencia(MagicMock(spec=commands.Bot), reloj=Reloj())
+
+    @pytest.mark.asyncio
+    async def test_solo_administradores(self, cog, interaccion_admin):
+        """Test: Sin permisos de administrador el comando se rechaza"""
+        interaccion_admin.user.guild_permissions = discord.Permissions.none()
+        with pytest.raises(ComandoRechazado):
+            await cog.reporte._check_can_run(interaccion_admin)
+
+    @pytest.mark.asyncio
+    async def test_exporta_filtrando_por_rol(self, cog, interaccion_admin):
+        """Test: Las filas se leen por lotes y solo quedan los miembros del rol"""
+        rol = MagicMock(spec=discord.Role)
+        rol.members = [MagicMock(id=1000 + i) for i in range(0, 30, 2)]
+        lotes = [[fila_asistencia(i) for i in range(inicio, inicio + 10)] for inicio in range(0, 30, 10)]
+
+        adjuntos = []
+        interaccion_admin.followup.send.side_effect = lambda *a, files=(), **k: adjuntos.extend(
+            f.fp.read() for f in files
+        )
+        with patch("cogs.asistencia.commands.db.stream", stream_falso(lotes)):
+            await cog.reporte.callback(cog, interaccion_admin, "2026-03-01", "2026-03-31", rol=rol)
+
+        assert len(adjuntos) == 1
+        filas = leer_csv(adjuntos[0])
+        assert filas[0] == list(COLUMNAS_REPORTE)
+        assert [int(fila[1]) for fila in filas[1:]] == list(range(0, 30, 2))
+
+    @pytest.mark.asyncio
+    async def test_por_defecto_solo_este_servidor(self, cog, interaccion_admin):
+        """Test: Sin filtros solo se exportan los miembros del servidor; todos los servidores es explícito"""
+        interaccion_admin.guild.members = [MagicMock(id=1001), MagicMock(id=1003)]
+        lotes = [[fila_asistencia(i) for i in range(5)]]
+
+        adjuntos = []
+        interaccion_admin.followup.send.side_effect = lambda *a, files=(), **k: adjuntos.extend(
+            f.fp.read() for f in files
+        )
+        with patch("cogs.asistencia.commands.db.stream", stream_falso(lotes)):
+            await cog.reporte.callback(cog, interaccion_admin, "2026-03-01", "2026-03-31")
+            await cog.reporte.callback(cog, interaccion_admin, "2026-03-01", "2026-03-31", todos_los_servidores=True)
+
+        assert [int(fila[1]) for fila in leer_csv(adjuntos[0])[1:]] == [1, 3]
+        assert [int(fila[1]) for fila in leer_csv(adjuntos[1])[1:]] == list(range(5))
+
+    @pytest.mark.asyncio
+    async def test_borra_el_directorio_temporal(self, cog, interaccion_admin, tmp_path):
+        """Test: El directorio de las partes se borra también si no hay registros"""
+        directorio = tmp_path / "reporte"
+        directorio.mkdir()
+        with patch("cogs.asistencia.commands.tempfile.mkdtemp", return_value=str(directorio)), \
+             patch("cogs.asistencia.commands.db.stream", stream_falso([])):
+            await cog.reporte.callback(cog, interaccion_admin, "2026-03-01", "2026-03-31")
+
+        assert not directorio.exists()
+        assert "No se encontraron" in interaccion_admin.followup.send.call_args.args[0]
+
+    @pytest.mark.asyncio
+    async def test_fechas_invalidas(self, cog, interaccion_admin):
+        """Test: Un rango invertido no llega a la base de datos"""
+        with patch("cogs.asistencia.commands.db.stream") as stream:
+            await cog.reporte.callback(cog, interaccion_admin, "2026-03-31", "2026-03-01")
+        stream.assert_not_called()
+        assert "posterior" in interaccion_admin.followup.send.call_args.args[0]
+
+    @pytest.mark.asyncio
+    async def test_muchas_partes_en_varios_mensajes(self, cog, interaccion_admin, tmp_path):
+        """Test: Con más de 10 partes se envían en varios mensajes"""
+        partes = []
+        for i in range(12):
+            ruta = tmp_path / f"parte{i}.csv.gz"
+            ruta.write_bytes(b"")
+            partes.append(ruta)
+
+        await cog._enviar_partes(interaccion_admin, partes, 100)
+
+        envios = interaccion_admin.followup.send.call_args_list
+        assert [len(envio.kwargs["files"]) for envio in envios] == [10, 2]
+
+    @pytest.mark.asyncio
+    async def test_agrupa_partes_por_tamano(self, cog, interaccion_admin, tmp_path):
+        """Test: Cada mensaje suma como mucho el límite de subida del servidor"""
+        interaccion_admin.guild.filesize_limit = 1000
+        partes = []
+        for i, tamano in enumerate((600, 300, 200, 1000, 100)):
+            ruta = tmp_path / f"parte{i}.csv.gz"
+            ruta.write_bytes(b"x" * tamano)
+            partes.append(ruta)
+
+        await cog._enviar_partes(interaccion_admin, partes, 100)
+
+        envios = interaccion_admin.followup.send.call_args_list
+        assert [len(envio.kwargs["files"]) for envio in envios] == [2, 1, 1, 1]
+        assert envios[1].args[0].endswith("Archivos 3-3.")
@@ -0,0 +1,75 @@
+"""
+Tests para los repositorios de lectura por Discord ID
+Ejecutar con: pytest tests/test_repositories.py -v
+"""
+
+from datetime import date
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from bot.core.cache import MISSING, PracticanteCache
+from bot.core.database import queries
+from bot.core.repositories import AsistenciaRepository, RecuperacionRepository
+
+
+@pytest.fixture
+def cache():
+    cache = PracticanteCache(max_size=10, ttl=60, negative_ttl=5)
+    with patch('bot.core.repositories.base.get_practicante_cache', return_value=cache):
+        yield cache
+
+
+def make_db(filas):
+    db = MagicMock()
+    db.fetch_all = AsyncMock(return_value=filas)
+    return db
+
+
+class TestPracticanteRepository:
+    """Tests para las lecturas con LEFT JOIN sobre Practicante"""
+
+    @pytest.mark.asyncio
+    async def test_sin_filas_es_no_registrado(self, cache):
+        """Test: Sin filas el usuario no está registrado y se cachea la respuesta"""
+        db = make_db([])
+        repo = AsistenciaRepository(db)
+
+        lectura = await repo.historial(555, date(2024, 12, 1), 11)
+        assert not lectura.registrado
+        assert cache.get(555) is None
+
+        # La respuesta negativa en caché evita la segunda consulta
+        assert not (await repo.historial(555, date(2024, 12, 1), 11)).registrado
+        db.fetch_all.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_registrado_sin_datos(self, cache):
+        """Test: Una fila con las columnas del JOIN en NULL es un registrado sin datos"""
+        db = make_db([{'practicante_id': 7, 'fecha': None, 'hora_entrada': None, 'hora_salida': None}])
+        repo = RecuperacionRepository(db)
+
+        lectura = await repo.historial(555, date(2024, 12, 1), 11)
+
+        assert lectura.registrado
+        assert lectura.practicante_id == 7
+        assert lectura.filas == []
+        assert cache.get(555) == 7
+
+    @pytest.mark.asyncio
+    async def test_una_sola_consulta_con_datos(self, cache):
+        """Test: Identidad y datos llegan en la misma consulta"""
+        db = make_db([
+            {'practicante_id': 7, 'asistencia_id': 3, 'hora_entrada': None, 'hora_salida': None, 'estado_id': 1},
+        ])
+        repo = AsistenciaRepository(db)
+
+        lectura = await repo.estado_del_dia(555, date(2024, 12, 5))
+
+        assert lectura.practicante_id == 7
+        assert lectura.filas[0]['asistencia_id'] == 3
+        db.fetch_all.assert_called_once_with(
+            queries.ASISTENCIA_ESTADO_DIA_POR_DISCORD, (date(2024, 12, 5), 555)
+        )
+        assert cache.get(555) == 7
+        assert cache.get(556) is MISSING
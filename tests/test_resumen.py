@@ -0,0 +1,213 @@
+"""
+Tests para el resumen mensual de asistencia
+Ejecutar con: pytest tests/test_resumen.py -v
+"""
+
+from contextlib import asynccontextmanager
+from datetime import date, datetime, time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import aiomysql
+import discord
+import pytest
+from discord.ext import commands
+
+import database
+from bot.core.database import queries
+from bot.core.database.resumen import mes_siguiente, paso_resumen
+from bot.core.repositories import LecturaPracticante
+from bot.core.utils import Reloj
+from cogs.asistencia.commands import Asistencia
+from scripts import reconstruir_resumen
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query, params=None):
+        nombre = getattr(query, "name", query)
+        self.conn.ejecutadas.append((nombre, tuple(params or ())))
+        if nombre in self.conn.fallan:
+            raise aiomysql.OperationalError(1146, "Table doesn't exist")
+        self.rowcount = self.conn.filas.get(nombre, 1)
+
+
+class FakeConnection:
+    """Registra consultas, commits y rollbacks de una transacción"""
+
+    def __init__(self, filas=None, fallan=()):
+        self.filas = filas or {}
+        self.fallan = set(fallan)
+        self.ejecutadas = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self, *args):
+        return FakeCursor(self)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+    @asynccontextmanager
+    async def factory(self, lectura=False):
+        yield self
+
+
+class TestPasosResumen:
+    """Tests para bot/core/database/resumen.py y database.execute_rowcount"""
+
+    def test_meses(self):
+        """Test: El mes siguiente cruza el fin de año"""
+        assert mes_siguiente(date(2026, 1, 31)) == date(2026, 2, 1)
+        assert mes_siguiente(date(2026, 12, 15)) == date(2027, 1, 1)
+
+    @pytest.mark.asyncio
+    async def test_salida_anticipada_en_la_misma_transaccion(self):
+        """Test: La escritura y su contador se confirman juntos con un solo commit"""
+        conn = FakeConnection()
+        params = (time(11, 0), 3, "cita médica", 7, date(2026, 3, 2))
+        with patch.object(database, "get_connection", conn.factory):
+            assert await database.execute_rowcount(queries.ASISTENCIA_SALIDA_ANTICIPADA, params) == 1
+
+        assert conn.ejecutadas == [
+            ("asistencia.salida_anticipada", params),
+            ("resumen.sumar_salida", (1, 7, date(2026, 3, 2))),
+        ]
+        assert conn.commits == 1
+
+    @pytest.mark.asyncio
+    async def test_sin_filas_afectadas_no_suma(self):
+        """Test: Un duplicado ignorado no cuenta dos veces"""
+        conn = FakeConnection(filas={"recuperacion.insertar": 0})
+        with patch.object(database, "get_connection", conn.factory):
+            await database.execute_rowcount(queries.RECUPERACION_INSERTAR, (7, date(2026, 3, 2), time(15, 0)))
+
+        assert [nombre for nombre, _ in conn.ejecutadas] == ["recuperacion.insertar"]
+
+    @pytest.mark.asyncio
+    async def test_fallo_del_resumen_revierte_la_escritura(self):
+        """Test: Si el contador no se puede actualizar, la escritura tampoco se confirma"""
+        conn = FakeConnection(fallan={"resumen.sumar"})
+        with patch.object(database, "get_connection", conn.factory):
+            with pytest.raises(RuntimeError):
+                await database.execute_rowcount(queries.RECUPERACION_INSERTAR, (7, date(2026, 3, 2), time(15, 0)))
+
+        assert conn.commits == 0
+        assert conn.rollbacks == 1
+
+    @pytest.mark.asyncio
+    async def test_faltas_recuentan_los_meses_tocados(self):
+        """Test: El registro de faltas recuenta desde el primer mes hasta el siguiente al último"""
+        cursor = FakeCursor(FakeConnection())
+        await paso_resumen(queries.faltas_materializar(2))(cursor, (4, date(2026, 2, 27), date(2026, 3, 2)))
+
+        assert cursor.conn.ejecutadas == [("resumen.recontar_faltas", (4, date(2026, 2, 1), date(2026, 4, 1)))]
+
+    def test_lecturas_sin_paso(self):
+        """Test: Solo las escrituras que cambian contadores tienen paso"""
+        assert paso_resumen(queries.ASISTENCIA_HOY) is None
+        assert paso_resumen("SELECT 1") is None
+
+
+class TestComandoResumen:
+    """Tests para /asistencia resumen"""
+
+    @pytest.fixture
+    def cog(self):
+        return Asistencia(MagicMock(spec=commands.Bot), reloj=Reloj())
+
+    @pytest.fixture
+    def interaction(self):
+        interaction = AsyncMock(spec=discord.Interaction)
+        interaction.user = MagicMock()
+        interaction.user.id = 555
+        interaction.user.display_name = "Practicante"
+        interaction.response = AsyncMock()
+        interaction.followup = AsyncMock()
+        return interaction
+
+    @pytest.mark.asyncio
+    async def test_lee_una_fila(self, cog, interaction):
+        """Test: El resumen sale de una sola fila del mes pedido"""
+        fila = {
+            "mes": date(2026, 3, 1), "presentes": 15, "tardanzas": 2, "salidas_anticipadas": 1,
+            "faltas": 1, "recuperaciones": 1, "minutos_trabajados": 125,
+        }
+        cog.repositorio.resumen_mes = AsyncMock(return_value=LecturaPracticante(7, [fila]))
+
+        await cog.resumen.callback(cog, interaction, "2026-03")
+
+        cog.repositorio.resumen_mes.assert_called_once_with(555, date(2026, 3, 1))
+        embed = interaction.followup.send.call_args.kwargs["embed"]
+        valores = {campo.name: campo.value for campo in embed.fields}
+        assert valores["✅ Presentes"] == "15"
+        assert valores["🕒 Tiempo trabajado"] == "2 h 5 min"
+
+    @pytest.mark.asyncio
+    async def test_mes_sin_registros(self, cog, interaction):
+        """Test: Registrado sin fila del mes: todo en cero"""
+        cog.repositorio.resumen_mes = AsyncMock(return_value=LecturaPracticante(7, []))
+
+        await cog.resumen.callback(cog, interaction, None)
+
+        embed = interaction.followup.send.call_args.kwargs["embed"]
+        assert all(campo.value in ("0", "0 h 0 min") for campo in embed.fields)
+
+    @pytest.mark.asyncio
+    async def test_mes_invalido(self, cog, interaction):
+        """Test: Un mes mal escrito no llega a la base de datos"""
+        cog.repositorio.resumen_mes = AsyncMock()
+
+        await cog.resumen.callback(cog, interaction, "marzo")
+
+        cog.repositorio.resumen_mes.assert_not_called()
+        assert "AAAA-MM" in interaction.followup.send.call_args.args[0]
+
+
+class TestReconstruirResumen:
+    """Tests para scripts/reconstruir_resumen.py"""
+
+    @pytest.mark.asyncio
+    async def test_un_mes_por_transaccion(self):
+        """Test: Cada mes se borra y se recalcula en su propia transacción"""
+        conn = FakeConnection()
+        estados = AsyncMock(side_effect=[{"id": 3}, {"id": 4}])
+        with patch.object(database, "get_connection", conn.factory), \
+             patch.object(database, "fetch_one", estados):
+            total = await reconstruir_resumen.reconstruir(date(2025, 12, 10), date(2026, 1, 5))
+
+        assert total == 2
+        assert conn.commits == 2
+        assert conn.ejecutadas[:2] == [
+            ("resumen.borrar_rango", (date(2025, 12, 1), date(2026, 1, 1))),
+            ("resumen.reconstruir", (3, 4, date(2025, 12, 1), date(2026, 1, 1), date(2025, 12, 1), date(2026, 1, 1))),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_rango_por_defecto_con_el_reloj_del_bot(self):
+        """Test: Sin rango se borran y recalculan todos los meses con datos hasta el mes del bot"""
+        conn = FakeConnection()
+        reloj = Reloj()
+        # Medianoche en Lima: en UTC aún es el día anterior, pero el mes ya es marzo
+        reloj.congelar(datetime(2026, 3, 1, 0, 30))
+        consultas = AsyncMock(side_effect=[
+            {"desde": date(2025, 12, 20), "hasta": date(2026, 1, 15)}, {"id": 3}, {"id": 4},
+        ])
+        with patch.object(database, "get_connection", conn.factory), \
+             patch.object(database, "fetch_one", consultas), \
+             patch("scripts.reconstruir_resumen.get_reloj", return_value=reloj):
+            await reconstruir_resumen.reconstruir()
+
+        borrados = [params[0] for nombre, params in conn.ejecutadas if nombre == "resumen.borrar_rango"]
+        assert borrados == [date(2025, 12, 1), date(2026, 1, 1), date(2026, 2, 1), date(2026, 3, 1)]
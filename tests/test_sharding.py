@@ -0,0 +1,81 @@
+"""
+Tests para el reparto de shards entre procesos
+Ejecutar con: pytest tests/test_sharding.py -v
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from bot.config import Settings
+from bot.core.sharding import (
+    es_proceso_principal,
+    formatear_shard_ids,
+    identidad_proceso,
+    metricas_shards,
+    parse_shard_ids,
+    repartir_shards,
+    tamano_pool,
+)
+
+
+class TestSharding:
+    """Tests para bot/core/sharding.py"""
+
+    def test_parse_y_formatear(self):
+        """Test: Rangos y listas de shards en ambos sentidos"""
+        assert parse_shard_ids("0-2, 5") == [0, 1, 2, 5]
+        assert parse_shard_ids("") is None
+        assert formatear_shard_ids([3, 4, 5]) == "3-5"
+        assert formatear_shard_ids([1, 4]) == "1,4"
+        with pytest.raises(ValueError):
+            parse_shard_ids("3-1")
+
+    def test_repartir_shards(self):
+        """Test: Rangos contiguos que cubren todos los shards, sin procesos vacíos"""
+        assert repartir_shards(10, 3) == [[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]]
+        assert repartir_shards(2, 4) == [[0], [1]]
+
+    def test_tamano_pool_proporcional(self):
+        """Test: Cada proceso recibe su parte del pool, al menos una conexión"""
+        assert tamano_pool(10, 4, 10) == 4
+        assert tamano_pool(10, 3, 10) == 3
+        assert tamano_pool(2, 1, 16) == 1
+
+    def test_proceso_principal(self):
+        """Test: Solo el proceso con el shard 0 (o sin sharding) es el principal"""
+        assert es_proceso_principal(None)
+        assert es_proceso_principal([0, 1])
+        assert not es_proceso_principal([2, 3])
+
+    def test_metricas_por_shard(self):
+        """Test: Latencia y servidores por shard; un shard caído no tiene latencia"""
+        bot = MagicMock()
+        bot.latencies = [(2, 0.05), (3, float("inf"))]
+        bot.guilds = [MagicMock(shard_id=2), MagicMock(shard_id=2), MagicMock(shard_id=3)]
+        assert metricas_shards(bot) == {
+            "2": {"latencia_ms": 50.0, "servidores": 2},
+            "3": {"latencia_ms": None, "servidores": 1},
+        }
+
+    def test_metricas_sin_sharding(self):
+        """Test: Un Bot sin sharding se reporta como shard 0"""
+        bot = MagicMock(spec=["latency", "shard_id", "guilds"])
+        bot.latency, bot.shard_id = 0.02, None
+        bot.guilds = [MagicMock(shard_id=None)]
+        assert metricas_shards(bot) == {"0": {"latencia_ms": 20.0, "servidores": 1}}
+
+    def test_identidad_proceso(self):
+        """Test: Cada proceso se identifica por su rango de shards"""
+        assert identidad_proceso([2, 3], 4) == {"clave": "2-3", "shard_ids": [2, 3], "shard_count": 4, "principal": False}
+        assert identidad_proceso(None, None)["clave"] == "todos"
+        assert identidad_proceso([0, 1], 4)["principal"]
+
+    def test_ttl_acotado_con_varios_procesos(self, monkeypatch):
+        """Test: Con DISCORD_SHARD_IDS los TTL de las cachés locales se acortan"""
+        monkeypatch.setattr(Settings, "CACHE_TTL_MULTIPROCESO", 120.0)
+        monkeypatch.setattr(Settings, "DISCORD_SHARD_IDS", "")
+        assert Settings.ttl_cache(3600) == 3600
+        monkeypatch.setattr(Settings, "DISCORD_SHARD_IDS", "2-3")
+        assert Settings.ttl_cache(3600) == 120
+        assert Settings.ttl_cache(60) == 60
@@ -0,0 +1,187 @@
+"""
+Tests para la API de streaming y execute_many de la base de datos
+Ejecutar con: pytest tests/test_streaming.py -v
+"""
+
+from contextlib import aclosing
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+import database as db
+from bot.core.database import Query, get_query_registry
+
+
+class FakeSSCursor:
+    """Cursor sin buffer falso que entrega filas por lotes"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.pos = 0
+        self.rowcount = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def execute(self, query, params=None):
+        self.conn.executed.append((query, params))
+
+    async def executemany(self, query, seq_params):
+        self.conn.executed.append((query, list(seq_params)))
+        self.rowcount = len(seq_params)
+
+    async def fetchmany(self, size):
+        rows = self.conn.rows[self.pos:self.pos + size]
+        self.pos += len(rows)
+        self.conn.fetches += 1
+        return rows
+
+    async def close(self):
+        self.conn.cursor_closed = True
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+        self.fetches = 0
+        self.closed = False
+        self.cursor_closed = False
+        self.commits = 0
+
+    def cursor(self, *args):
+        return _Awaitable(FakeSSCursor(self))
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class _Awaitable:
+    """Imita el _ContextManager de aiomysql: se puede usar con await o async with"""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def __await__(self):
+        async def _get():
+            return self.cursor
+        return _get().__await__()
+
+    async def __aenter__(self):
+        return self.cursor
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class FakeController:
+    def __init__(self, conn):
+        self.conn = conn
+        self.released = []
+
+    async def acquire(self):
+        return self.conn
+
+    async def release(self, conn):
+        self.released.append(conn)
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """Reemplaza el pool por una conexión falsa con las filas indicadas"""
+    def factory(rows):
+        conn = FakeConnection(rows)
+        controller = FakeController(conn)
+        monkeypatch.setattr(db, "init_db_pool", AsyncMock())
+        monkeypatch.setattr(db, "_pool_controller", controller)
+        return conn, controller
+    return factory
+
+
+class TestStream:
+    """Tests para database.stream"""
+
+    @pytest.mark.asyncio
+    async def test_itera_todas_las_filas_por_lotes(self, fake_db):
+        """Test: stream produce todas las filas leyendo por lotes"""
+        conn, controller = fake_db([{"id": i} for i in range(1200)])
+
+        ids = [row["id"] async for row in db.stream("SELECT id FROM Asistencia")]
+
+        assert ids == list(range(1200))
+        assert conn.fetches == 4  # 500 + 500 + 200 + fin
+        assert conn.cursor_closed and not conn.closed
+        assert controller.released == [conn]
+
+    @pytest.mark.asyncio
+    async def test_chunks(self, fake_db):
+        """Test: Con chunk_size se producen listas de tamaño fijo"""
+        fake_db([{"id": i} for i in range(25)])
+
+        tamanos = [len(chunk) async for chunk in db.stream("SELECT id FROM Asistencia", chunk_size=10)]
+
+        assert tamanos == [10, 10, 5]
+
+    @pytest.mark.asyncio
+    async def test_salida_anticipada_cierra_la_conexion(self, fake_db):
+        """Test: Salir antes de tiempo cierra la conexión (no la devuelve con filas sin leer)"""
+        conn, controller = fake_db([{"id": i} for i in range(1000)])
+
+        async with aclosing(db.stream("SELECT id FROM Asistencia")) as filas:
+            async for fila in filas:
+                if fila["id"] == 3:
+                    break
+
+        assert conn.closed
+        assert controller.released == [conn]
+
+    @pytest.mark.asyncio
+    async def test_estadisticas_sin_tiempo_del_consumidor(self, fake_db, monkeypatch):
+        """Test: La latencia solo cuenta execute y fetch, y salir antes no es un error"""
+        fake_db([{"id": i} for i in range(1000)])
+        reloj = iter(range(100))
+        monkeypatch.setattr(db, "time", SimpleNamespace(perf_counter=lambda: next(reloj)))
+        consulta = Query("test.stream_parcial", "SELECT id FROM Asistencia")
+        get_query_registry().reset()
+
+        async with aclosing(db.stream(consulta, chunk_size=10)) as lotes:
+            async for _ in lotes:
+                # El consumidor "tarda": avanza el reloj sin que cuente
+                next(reloj)
+                break
+
+        stats = get_query_registry().stats("test.stream_parcial")
+        assert (stats.calls, stats.errors, stats.rows) == (1, 0, 10)
+        # execute (1 unidad) + primer fetch (1 unidad), en segundos -> ms
+        assert stats.latency.snapshot()["sum_ms"] == 2000
+
+
+class TestExecuteMany:
+    """Tests para database.execute_many"""
+
+    @pytest.mark.asyncio
+    async def test_una_transaccion(self, fake_db):
+        """Test: execute_many hace un solo commit para todas las filas"""
+        conn, _ = fake_db([])
+
+        afectadas = await db.execute_many("INSERT INTO T (a) VALUES (%s)", [(1,), (2,), (3,)])
+
+        assert afectadas == 3
+        assert conn.commits == 1
+
+    @pytest.mark.asyncio
+    async def test_lista_vacia(self, fake_db):
+        """Test: Sin filas no se toca la base de datos"""
+        conn, _ = fake_db([])
+        assert await db.execute_many("INSERT INTO T (a) VALUES (%s)", []) == 0
+        assert conn.executed == []
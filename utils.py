@@ -1,72 +1,171 @@
 import database as db
 import discord
+import logging
 from discord import TextStyle, ui
 
+from bot.core.database import queries
+from bot.core.cache import (
+    MISSING, Estado, get_practicante_cache, get_estado_catalogo, set_estado_catalogo,
+    get_asistencia_dia, get_historial_cache, PoliticasServidor, get_politicas, set_politicas,
+)
+from bot.config import MSG_CANAL_NO_PERMITIDO, MSG_SIN_PERMISOS
+
+logger = logging.getLogger(__name__)
+
+
+async def avisar_no_registrado(interaction):
+    """Informa al usuario que no está registrado, con followup si ya se respondió o hizo defer"""
+    mensaje = f"{interaction.user.mention}, no estás registrado como practicante."
+    if interaction.response.is_done():
+        await interaction.followup.send(mensaje, ephemeral=True)
+    else:
+        await interaction.response.send_message(mensaje, ephemeral=True)
+
+async def resolver_practicante(discord_id):
+    """Practicante de un usuario de Discord (o None), sin responder a la interacción"""
+    cache = get_practicante_cache()
+    practicante_id = cache.get(discord_id)
+
+    # Solo se consulta la base de datos si no hay respuesta (positiva o negativa) en caché
+    if practicante_id is MISSING:
+        practicante = await db.fetch_one(queries.PRACTICANTE_POR_DISCORD, (discord_id,))
+        practicante_id = practicante['id'] if practicante else None
+        cache.set(discord_id, practicante_id)
+    return practicante_id
 
 async def obtener_practicante(interaction, discord_id):
-    nombre_usuario = interaction.user.mention
-    query_practicante = "SELECT id FROM Practicante WHERE id_discord = %s"
-    practicante = await db.fetch_one(query_practicante, (discord_id,))
+    practicante_id = await resolver_practicante(discord_id)
     
     # Si no se encuentra el practicante, informar al usuario
-    if not practicante:
-        await interaction.followup.send(
-            f"{nombre_usuario}, no estás registrado como practicante.",
-            ephemeral=True
-        )
+    if not practicante_id:
+        await avisar_no_registrado(interaction)
         return None
-    return practicante['id']
+    return practicante_id
+
+async def precargar_practicantes():
+    """Carga en caché todos los practicantes con una sola consulta"""
+    practicantes = await db.fetch_all(queries.PRACTICANTES_ROSTER)
+    return get_practicante_cache().warm(practicantes)
 
-async def verificar_entrada(practicante_id, fecha_actual):
-    query_asistencia_existente = "SELECT id FROM Asistencia WHERE practicante_id = %s AND fecha = %s"
-    asistencia_existente = await db.fetch_one(query_asistencia_existente, (practicante_id, fecha_actual))
-    return asistencia_existente
+def invalidar_practicante(discord_id=None):
+    """
+    Invalida la caché de practicantes tras altas o bajas.
+    discord_id: Practicante a invalidar. Si es None, se invalida toda la caché
+    """
+    get_practicante_cache().invalidate(discord_id)
 
 async def obtener_estado_asistencia(estado_nombre):
-    query_estado = "SELECT id FROM Estado_Asistencia WHERE estado = %s"
-    estado = await db.fetch_one(query_estado, (estado_nombre,))
+    # El catálogo en memoria resuelve el caso normal sin tocar la base de datos
+    estado_id = get_estado_catalogo().id(estado_nombre)
+    if estado_id is not None:
+        return estado_id
+    estado = await db.fetch_one(queries.ESTADO_POR_NOMBRE, (str(estado_nombre),))
     return estado['id'] if estado else None
 
-async def canal_permitido(interaction: discord.Interaction) -> bool:
-    servidor_id = interaction.guild.id
-    bot = interaction.client
-    canales_permitidos = bot.canales_permitidos.get(servidor_id, [])
+async def cargar_estados_asistencia():
+    """Carga (o recarga) el catálogo de Estado_Asistencia en memoria"""
+    estados = await db.fetch_all(queries.ESTADOS_CATALOGO)
+    return set_estado_catalogo(estados)
+
+async def leer_asistencia_dia(fecha):
+    """
+    Lee todos los registros de Asistencia de una fecha (carga de la instantánea del día).
+    Se lee del primario: la reconciliación compara con escrituras recientes que una réplica podría no tener aún
+    """
+    return await db.fetch_all(queries.ASISTENCIA_DIA, (fecha,), primario=True)
+
+async def asistencia_de_hoy(practicante_id, fecha, respaldo_db=True):
+    """
+    Registro de asistencia de un practicante para la fecha, servido desde la
+    instantánea del día. Si la instantánea no puede cargarse o no tiene el
+    registro, se consulta la base de datos (salvo respaldo_db=False).
+    Retorna un RegistroAsistencia o None si no hay registro
+    """
+    hoy = get_asistencia_dia()
+    try:
+        await hoy.asegurar(fecha, leer_asistencia_dia)
+    except Exception as e:
+        logger.warning('No se pudo cargar la asistencia del día %s: %s', fecha, e)
+
+    if hoy.vigente(fecha):
+        registro = hoy.get(practicante_id)
+        if registro is not None:
+            return registro
+    if not respaldo_db:
+        return None
+
+    fila = await db.fetch_one(queries.ASISTENCIA_HOY, (practicante_id, fecha))
+    return hoy.guardar(fecha, practicante_id, fila) if fila else None
+
+async def reconciliar_asistencia_dia():
+    """Compara la instantánea del día con MySQL y la corrige. Retorna las diferencias encontradas"""
+    return await get_asistencia_dia().reconciliar(leer_asistencia_dia)
+
+async def materializar_faltas(fechas):
+    """
+    Registra como falta injustificada a cada practicante sin asistencia en las
+    fechas indicadas, con un solo INSERT ... SELECT (una transacción, que
+    también recuenta las faltas del resumen mensual).
+    Es idempotente: repetir fechas ya procesadas no inserta nada.
+    Retorna el número de faltas insertadas
+    """
+    if not fechas:
+        return 0
+    estado_id = await obtener_estado_asistencia(Estado.FALTA_INJUSTIFICADA)
+    if estado_id is None:
+        raise RuntimeError("No existe el estado de falta injustificada en Estado_Asistencia")
 
-    # Verificar si el canal es permitido
-    if interaction.channel.id not in canales_permitidos:
+    insertadas = await db.execute_rowcount(queries.faltas_materializar(len(fechas)), (estado_id, *fechas))
+    if insertadas:
+        # Las nuevas filas cambian historiales y, si incluye hoy, la instantánea del día
+        get_historial_cache().invalidate()
+        if get_asistencia_dia().fecha in fechas:
+            await reconciliar_asistencia_dia()
+    return insertadas
+
+async def cargar_politicas(forzar=False):
+    """
+    Recarga las políticas por servidor si Politica_Servidor cambió (filas o updated_at).
+    Sin filas se usan los valores de configuración.
+    Retorna las políticas nuevas, o None si no hubo cambios
+    """
+    fila = await db.fetch_one(queries.POLITICAS_VERSION)
+    version = (fila['filas'], fila['actualizado']) if fila else None
+    if not forzar and version == get_politicas().version:
+        return None
+    if not fila or not fila['filas']:
+        return set_politicas(PoliticasServidor.desde_settings(version))
+    filas = await db.fetch_all(queries.POLITICAS_SERVIDOR)
+    return set_politicas(PoliticasServidor.desde_filas(filas, version))
+
+async def canal_permitido(interaction: discord.Interaction) -> bool:
+    # Búsqueda en el índice de políticas (frozenset por servidor)
+    if not get_politicas().canal_permitido(interaction.guild.id, interaction.channel.id):
         await interaction.response.send_message(
-            "Este comando no está habilitado en este canal.",
+            MSG_CANAL_NO_PERMITIDO,
             ephemeral=True
         )
         return False
     return True
 
-async def verificar_rol_permitido(interaction: discord.Interaction, roles_permitidos: list, usar_followup: bool = False) -> bool:
+async def verificar_rol_permitido(interaction: discord.Interaction, roles_permitidos=None, usar_followup: bool = False) -> bool:
     """
     Verifica si el usuario tiene alguno de los roles permitidos.
-    roles_permitidos: Lista de IDs de roles permitidos
+    roles_permitidos: IDs de roles permitidos. Si es None, los roles de recuperación del servidor
     usar_followup: Si es True, usa followup en lugar de response (para cuando ya se hizo defer)
     """
+    if roles_permitidos is None:
+        roles_permitidos = get_politicas().roles_recuperacion(interaction.guild.id)
     if not roles_permitidos:
         return True
     
-    usuario = interaction.user
-    roles_usuario = [role.id for role in usuario.roles]
-    
     # Verificar si tiene alguno de los roles permitidos
-    tiene_rol = any(role_id in roles_usuario for role_id in roles_permitidos)
+    tiene_rol = not frozenset(roles_permitidos).isdisjoint(role.id for role in interaction.user.roles)
     
     if not tiene_rol:
-        mensaje = "No tienes los permisos necesarios para usar este comando."
         if usar_followup:
-            await interaction.followup.send(mensaje, ephemeral=True)
+            await interaction.followup.send(MSG_SIN_PERMISOS, ephemeral=True)
         else:
-            await interaction.response.send_message(mensaje, ephemeral=True)
+            await interaction.response.send_message(MSG_SIN_PERMISOS, ephemeral=True)
         return False
     return True
-
-async def verificar_recuperacion(practicante_id, fecha_actual):
-    """Verifica si ya existe una recuperación para el practicante en la fecha dada"""
-    query_recuperacion = "SELECT id FROM Recuperacion WHERE practicante_id = %s AND fecha = %s"
-    recuperacion_existente = await db.fetch_one(query_recuperacion, (practicante_id, fecha_actual))
-    return recuperacion_existente